@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单次遍历颜色统计
+功能：按行分块遍历RGB图像一次，同时得到白色/黑色/彩色像素数量、RGB均值、灰度直方图和对比度，
+每块的临时数组大小固定，不再为每项统计分配整图大小的掩码；
+也可只统计与阈值无关的通道直方图，之后在任意白色/黑色阈值下直接换算出像素数量
+"""
+
+import math
+
+import cv2
+import numpy as np
+
+# 每块的行数（2倍渲染的A4页面约1190像素宽，128行的临时数组可留在CPU缓存中）
+TILE_ROWS = 128
+
+_GRAY_LEVELS = np.arange(256, dtype=np.int64)
+
+
+def count_colored_pixels(r, g, b, max_rgb, min_rgb, not_white, black_text_max):
+    """
+    统计彩色文字像素（红色、蓝色、绿色等非黑白色）
+
+    Args:
+        r, g, b: RGB三个通道（uint8数组）
+        max_rgb: 每个像素三个通道的最大值
+        min_rgb: 每个像素三个通道的最小值
+        not_white: 非白色背景掩码
+        black_text_max: 黑色文字阈值
+
+    Returns:
+        int: 彩色文字像素数量
+    """
+    # 黑色/灰色：最大RGB值小于阈值，且RGB通道差异小
+    grayscale_mask = (max_rgb <= black_text_max + 50) & \
+                     (max_rgb - min_rgb <= 20)  # RGB通道差异小于20认为是灰度
+
+    colored_text_pixels = 0
+
+    # 检测红色文字（红色分量明显大于绿色和蓝色）
+    colored_text_pixels += np.count_nonzero((r > g + 50) & (r > b + 50) & (r > 120) & not_white)
+
+    # 检测蓝色文字（蓝色分量明显大于红色和绿色）
+    colored_text_pixels += np.count_nonzero((b > r + 50) & (b > g + 50) & (b > 120) & not_white)
+
+    # 检测绿色文字（绿色分量明显大于红色和蓝色）
+    colored_text_pixels += np.count_nonzero((g > r + 50) & (g > b + 50) & (g > 120) & not_white)
+
+    # 检测其他明显的彩色（RGB通道差异很大且不是白色背景）
+    rgb_range = max_rgb - min_rgb
+    colored_text_pixels += np.count_nonzero((rgb_range > 60) & not_white & ~grayscale_mask & (max_rgb > 100))
+
+    return colored_text_pixels
+
+
+def contrast_from_histogram(histogram):
+    """
+    由灰度直方图计算对比度（灰度标准差）
+
+    使用整数矩精确计算方差，无需再遍历一次灰度图。
+
+    Args:
+        histogram: 256级灰度直方图（计数）
+
+    Returns:
+        float: 灰度标准差
+    """
+    counts = np.asarray(histogram).astype(np.int64).ravel()
+    total = int(counts.sum())
+    if total == 0:
+        return 0.0
+    first_moment = int(counts @ _GRAY_LEVELS)
+    second_moment = int(counts @ (_GRAY_LEVELS * _GRAY_LEVELS))
+    variance = (total * second_moment - first_moment * first_moment) / (total * total)
+    return math.sqrt(variance)
+
+
+def compute_color_statistics(rgb_image, white_bg_min, black_text_max, count_colored=True,
+                             gray=None, gray_out=None, tile_rows=TILE_ROWS):
+    """
+    单次分块遍历计算第一特征所需的全部颜色统计
+
+    Args:
+        rgb_image: RGB图像数组 (height, width, 3)
+        white_bg_min: 白色背景阈值（RGB三个通道都 >= 该值）
+        black_text_max: 黑色文字阈值（RGB三个通道都 <= 该值）
+        count_colored: 是否统计彩色文字像素
+        gray: 已计算的灰度图（提供时不再转换灰度）
+        gray_out: 灰度图输出数组 (height, width) uint8，提供时写入各块的灰度结果供后续检测复用
+        tile_rows: 每块的行数
+
+    Returns:
+        dict: 颜色统计结果
+            - total_pixels: 像素总数
+            - mean_rgb: RGB各通道平均值 (float64数组)
+            - white_pixels / black_pixels: 白色背景/黑色文字像素数量
+            - colored_text_pixels: 彩色文字像素数量（count_colored=False时为None）
+            - histogram: 256级灰度直方图 (int64数组)
+            - contrast: 灰度标准差
+    """
+    height, width = rgb_image.shape[:2]
+    total_pixels = height * width
+    tile_rows = max(1, tile_rows)
+
+    channel_sums = np.zeros(3, dtype=np.int64)
+    histogram = np.zeros(256, dtype=np.int64)
+    white_pixels = 0
+    black_pixels = 0
+    colored_text_pixels = 0
+
+    # 各块复用的临时数组
+    buffer_rows = min(tile_rows, height)
+    max_buffer = np.empty((buffer_rows, width), dtype=np.uint8)
+    min_buffer = np.empty((buffer_rows, width), dtype=np.uint8)
+    mask_buffer = np.empty((buffer_rows, width), dtype=bool)
+
+    for y0 in range(0, height, tile_rows):
+        y1 = min(y0 + tile_rows, height)
+        rows = y1 - y0
+        tile = np.ascontiguousarray(rgb_image[y0:y1])
+        r, g, b = tile[:, :, 0], tile[:, :, 1], tile[:, :, 2]
+
+        max_rgb = np.maximum(r, g, out=max_buffer[:rows])
+        np.maximum(max_rgb, b, out=max_rgb)
+        min_rgb = np.minimum(r, g, out=min_buffer[:rows])
+        np.minimum(min_rgb, b, out=min_rgb)
+
+        channel_sums += tile.reshape(-1, 3).sum(axis=0, dtype=np.int64)
+
+        not_white = np.less(min_rgb, white_bg_min, out=mask_buffer[:rows])
+        white_pixels += not_white.size - np.count_nonzero(not_white)
+        black_pixels += np.count_nonzero(max_rgb <= black_text_max)
+        if count_colored:
+            colored_text_pixels += count_colored_pixels(r, g, b, max_rgb, min_rgb, not_white, black_text_max)
+
+        if gray is not None:
+            gray_tile = gray[y0:y1]
+        elif gray_out is not None:
+            gray_tile = cv2.cvtColor(tile, cv2.COLOR_RGB2GRAY, dst=gray_out[y0:y1])
+        else:
+            gray_tile = cv2.cvtColor(tile, cv2.COLOR_RGB2GRAY)
+        histogram += np.bincount(gray_tile.ravel(), minlength=256)
+
+    return {
+        'total_pixels': total_pixels,
+        'mean_rgb': channel_sums / total_pixels,
+        'white_pixels': white_pixels,
+        'black_pixels': black_pixels,
+        'colored_text_pixels': colored_text_pixels if count_colored else None,
+        'histogram': histogram,
+        'contrast': contrast_from_histogram(histogram)
+    }
+
+
+def compute_channel_histograms(rgb_image, gray=None, gray_out=None, tile_rows=TILE_ROWS):
+    """
+    单次分块遍历计算与颜色阈值无关的通道直方图
+
+    白色背景像素即三通道最小值 >= white_bg_min 的像素，黑色文字像素即三通道最大值 <= black_text_max
+    的像素，因此只需保存最小值/最大值的直方图。彩色文字的各项判定条件除"非白色背景"外都与阈值无关
+    （"非灰度"条件要求通道差 <= 20，与"通道差 > 60"互斥，black_text_max不起作用），
+    按像素的三通道最小值统计命中次数后，任意white_bg_min下的彩色文字像素数即该直方图的前缀和。
+
+    Args:
+        rgb_image: RGB图像数组 (height, width, 3)
+        gray: 已计算的灰度图（提供时不再转换灰度）
+        gray_out: 灰度图输出数组 (height, width) uint8，提供时写入各块的灰度结果供后续检测复用
+        tile_rows: 每块的行数
+
+    Returns:
+        dict: 通道直方图
+            - total_pixels: 像素总数
+            - channel_sums: RGB各通道像素值之和 (int64数组)
+            - gray_histogram: 256级灰度直方图
+            - min_histogram / max_histogram: 三通道最小值/最大值的256级直方图
+            - colored_histogram: 按三通道最小值统计的彩色文字判定命中次数
+    """
+    height, width = rgb_image.shape[:2]
+    tile_rows = max(1, tile_rows)
+
+    channel_sums = np.zeros(3, dtype=np.int64)
+    histograms = {name: np.zeros(256, dtype=np.int64)
+                  for name in ('gray_histogram', 'min_histogram', 'max_histogram', 'colored_histogram')}
+
+    buffer_rows = min(tile_rows, height)
+    max_buffer = np.empty((buffer_rows, width), dtype=np.uint8)
+    min_buffer = np.empty((buffer_rows, width), dtype=np.uint8)
+
+    for y0 in range(0, height, tile_rows):
+        y1 = min(y0 + tile_rows, height)
+        rows = y1 - y0
+        tile = np.ascontiguousarray(rgb_image[y0:y1])
+        r, g, b = tile[:, :, 0], tile[:, :, 1], tile[:, :, 2]
+
+        max_rgb = np.maximum(r, g, out=max_buffer[:rows])
+        np.maximum(max_rgb, b, out=max_rgb)
+        min_rgb = np.minimum(r, g, out=min_buffer[:rows])
+        np.minimum(min_rgb, b, out=min_rgb)
+
+        channel_sums += tile.reshape(-1, 3).sum(axis=0, dtype=np.int64)
+        histograms['min_histogram'] += np.bincount(min_rgb.ravel(), minlength=256)
+        histograms['max_histogram'] += np.bincount(max_rgb.ravel(), minlength=256)
+
+        # 与count_colored_pixels相同的判定条件（不含非白色背景），各项分别计数；彩色像素很少，只对命中的像素统计
+        hits = ((r > g + 50) & (r > b + 50) & (r > 120)).view(np.uint8)
+        hits = hits + ((b > r + 50) & (b > g + 50) & (b > 120)).view(np.uint8)
+        hits += ((g > r + 50) & (g > b + 50) & (g > 120)).view(np.uint8)
+        hits += (((max_rgb - min_rgb) > 60) & (max_rgb > 100)).view(np.uint8)
+        hit_index = np.flatnonzero(hits)
+        if hit_index.size:
+            histograms['colored_histogram'] += np.bincount(min_rgb.ravel()[hit_index], weights=hits.ravel()[hit_index],
+                                                           minlength=256).astype(np.int64)
+
+        if gray is not None:
+            gray_tile = gray[y0:y1]
+        elif gray_out is not None:
+            gray_tile = cv2.cvtColor(tile, cv2.COLOR_RGB2GRAY, dst=gray_out[y0:y1])
+        else:
+            gray_tile = cv2.cvtColor(tile, cv2.COLOR_RGB2GRAY)
+        histograms['gray_histogram'] += np.bincount(gray_tile.ravel(), minlength=256)
+
+    return {
+        'total_pixels': height * width,
+        'channel_sums': channel_sums,
+        **histograms
+    }
+
+
+def statistics_from_histograms(histograms, white_bg_min, black_text_max):
+    """
+    由通道直方图换算指定阈值下的颜色统计（结果与compute_color_statistics一致）
+
+    Args:
+        histograms: compute_channel_histograms的结果
+        white_bg_min: 白色背景阈值
+        black_text_max: 黑色文字阈值
+
+    Returns:
+        dict: 颜色统计结果（字段见compute_color_statistics）
+    """
+    white_bg_min = int(white_bg_min)
+    black_text_max = int(black_text_max)
+    total_pixels = histograms['total_pixels']
+    histogram = np.asarray(histograms['gray_histogram'], dtype=np.int64)
+    return {
+        'total_pixels': total_pixels,
+        'mean_rgb': np.asarray(histograms['channel_sums'], dtype=np.int64) / total_pixels,
+        'white_pixels': int(np.sum(histograms['min_histogram'][max(white_bg_min, 0):])),
+        'black_pixels': int(np.sum(histograms['max_histogram'][:max(black_text_max + 1, 0)])),
+        'colored_text_pixels': int(np.sum(histograms['colored_histogram'][:max(white_bg_min, 0)])),
+        'histogram': histogram,
+        'contrast': contrast_from_histogram(histogram)
+    }
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+连通域长横线提取工具
+功能：对黑色像素掩码做水平闭运算连接断开的线段、水平开运算去掉文字笔画和竖线，再以
+cv2.connectedComponentsWithStats一次得到所有连通域的外接矩形，按宽度占比、高度和填充率筛选长横线；
+可处理略粗或带缺口的长横线，结果为与行扫描检测相同结构的潜在长横线列表
+"""
+
+import functools
+
+import cv2
+import numpy as np
+
+# 长横线的最小宽度占比（与行扫描检测一致）
+MIN_WIDTH_RATIO = 0.70
+
+# 长横线外接矩形的最大高度占页面高度的比例（与行扫描检测的线宽上限一致）
+MAX_HEIGHT_RATIO = 0.02
+
+# 闭运算连接的最大缺口占页面宽度的比例
+GAP_RATIO = 0.05
+
+# 开运算保留的最短水平线段占页面宽度的比例（去掉文字笔画和表格竖线）
+MIN_SEGMENT_RATIO = 0.05
+
+# 外接矩形内原始黑色像素的最小填充率（文字行连接后的填充率通常低于0.3）
+MIN_FILL = 0.5
+
+
+@functools.lru_cache(maxsize=16)
+def _horizontal_kernel(length):
+    """水平结构元素（按长度缓存）"""
+    return cv2.getStructuringElement(cv2.MORPH_RECT, (max(1, length), 1))
+
+
+def _candidate_bands(row_counts, min_black, reach, rows):
+    """
+    可能包含长横线连通域的行范围
+
+    长横线外接矩形的填充率不低于min_fill、宽度不低于min_width_ratio，其中至少有一行的黑色像素
+    不少于二者之积；外接矩形高度不超过reach，因此只需检查这些行上下reach行以内的范围。
+    """
+    hint_rows = np.nonzero(row_counts >= min_black)[0]
+    bands = []
+    for row in hint_rows.tolist():
+        start, end = max(0, row - reach), min(rows, row + reach + 1)
+        if bands and start <= bands[-1][1]:
+            bands[-1][1] = end
+        else:
+            bands.append([start, end])
+    return bands
+
+
+def find_component_lines(mask, width=None, height=None, row_counts=None, gap_ratio=GAP_RATIO,
+                         min_width_ratio=MIN_WIDTH_RATIO, max_height_ratio=MAX_HEIGHT_RATIO, min_fill=MIN_FILL,
+                         y_offset=0):
+    """
+    基于连通域提取潜在长横线
+
+    闭运算和开运算只使用水平结构元素，连通域分析只在可能包含长横线的行范围内进行，
+    结果与整幅掩码上的连通域分析相同。
+
+    Args:
+        mask: 黑色像素掩码（整页或条带，bool或uint8）
+        width, height: 整页图像尺寸（默认为掩码尺寸）
+        row_counts: 掩码每行的黑色像素数量（行投影，可选，未提供时在此计算）
+        gap_ratio: 闭运算连接的最大缺口占宽度的比例
+        min_width_ratio: 外接矩形的最小宽度占比
+        max_height_ratio: 外接矩形的最大高度占页面高度的比例
+        min_fill: 外接矩形内原始黑色像素的最小填充率
+        y_offset: 掩码第0行在整页中的行号
+
+    Returns:
+        list: 潜在长横线列表（coords、length、y_center、angle、width_ratio、y_percent、line_width、fill_ratio），
+              y_center为外接矩形的中间行
+    """
+    mask = np.asarray(mask)
+    binary = mask.view(np.uint8) if mask.dtype == bool else (mask != 0).view(np.uint8)
+    rows = binary.shape[0]
+    height = rows if height is None else height
+    width = binary.shape[1] if width is None else width
+    if row_counts is None:
+        row_counts = np.count_nonzero(binary, axis=1)
+
+    reach = int(height * max_height_ratio)
+    lines = []
+    for band_start, band_end in _candidate_bands(row_counts, min_fill * min_width_ratio * width, reach, rows):
+        band = binary[band_start:band_end]
+        closed = cv2.morphologyEx(band, cv2.MORPH_CLOSE, _horizontal_kernel(int(width * gap_ratio)))
+        opened = cv2.morphologyEx(closed, cv2.MORPH_OPEN, _horizontal_kernel(int(width * MIN_SEGMENT_RATIO)))
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(opened, connectivity=8)
+
+        for label in range(1, count):
+            x, y, box_width, box_height, _ = (int(value) for value in stats[label])
+            width_ratio = box_width / width
+            if width_ratio < min_width_ratio or box_height > height * max_height_ratio:
+                continue
+            # 触及范围边界（非掩码边界）的连通域被截断，完整的长横线不会触及边界
+            if (y == 0 and band_start > 0) or (y + box_height == band_end - band_start and band_end < rows):
+                continue
+
+            # 填充率按原始掩码计算（闭运算填补的缺口不计入）
+            inside = labels[y:y + box_height, x:x + box_width] == label
+            black = np.count_nonzero(band[y:y + box_height, x:x + box_width][inside])
+            fill_ratio = black / (box_width * box_height)
+            if fill_ratio < min_fill:
+                continue
+
+            y_center = y_offset + band_start + y + (box_height - 1) // 2
+            lines.append({
+                'coords': (x, y_center, x + box_width - 1, y_center),
+                'length': box_width,
+                'y_center': float(y_center),
+                'angle': 0,
+                'width_ratio': width_ratio,
+                'y_percent': y_center / height * 100,
+                'line_width': box_height,
+                'fill_ratio': fill_ratio
+            })
+
+    lines.sort(key=lambda line: line['y_center'])
+    return lines
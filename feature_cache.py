@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面特征缓存
+功能：使用本地SQLite数据库保存每个PDF页面与颜色阈值无关的测量结果（通道直方图、RGB通道和、第二特征检测结果），
+颜色阈值调整后可直接由缓存重新计算特征和判定，不再重新渲染和分析页面
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from color_stats import contrast_from_histogram
+from scan_manifest import COMMIT_INTERVAL, json_default
+
+# 直方图在数据库中的存储顺序
+HISTOGRAM_NAMES = ('gray_histogram', 'min_histogram', 'max_histogram', 'colored_histogram')
+
+
+class FeatureCache:
+    """页面特征缓存（SQLite）"""
+
+    def __init__(self, db_path, fingerprint):
+        """
+        初始化特征缓存
+
+        Args:
+            db_path: SQLite数据库文件路径
+            fingerprint: 测量方式指纹（算法版本、渲染倍率等，不含颜色阈值），指纹不同的记录不会被读取
+        """
+        self.db_path = Path(db_path)
+        self.fingerprint = fingerprint
+
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+        self._pending_writes = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS page_features (
+                path TEXT NOT NULL,
+                page_number INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                channel_sums TEXT NOT NULL,
+                histograms BLOB NOT NULL,
+                second_feature TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (path, page_number)
+            )
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def _key(pdf_path):
+        return os.path.abspath(str(pdf_path))
+
+    def lookup(self, pdf_path, page_number):
+        """
+        查询页面的测量结果
+
+        Args:
+            pdf_path: PDF文件路径
+            page_number: 页码（从1开始）
+
+        Returns:
+            dict: 文件未变化且指纹一致时返回测量结果（见store），否则返回None
+        """
+        key = self._key(pdf_path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, fingerprint, width, height, channel_sums, histograms, second_feature "
+            "FROM page_features WHERE path = ? AND page_number = ?",
+            (key, page_number)
+        ).fetchone()
+
+        if row is None or row[2] != self.fingerprint:
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            stat = os.stat(key)
+        except OSError:
+            self.stats['misses'] += 1
+            return None
+        if stat.st_size != row[0] or stat.st_mtime_ns != row[1]:
+            self.stats['misses'] += 1
+            return None
+
+        self.stats['hits'] += 1
+        return self._decode(row[3:])
+
+    def lookup_many(self, pdf_path, page_numbers):
+        """
+        查询多个页面的测量结果
+
+        Args:
+            pdf_path: PDF文件路径
+            page_numbers: 页码列表（从1开始）
+
+        Returns:
+            list: 与page_numbers对应的测量结果，任一页面缺失时返回None
+        """
+        measurements = []
+        for page_number in page_numbers:
+            page_measurements = self.lookup(pdf_path, page_number)
+            if page_measurements is None:
+                return None
+            measurements.append(page_measurements)
+        return measurements
+
+    def store(self, pdf_path, page_number, measurements):
+        """
+        存储页面的测量结果
+
+        Args:
+            pdf_path: PDF文件路径
+            page_number: 页码（从1开始）
+            measurements: 测量结果
+                - image_size: [宽, 高]
+                - histograms: 通道直方图（见color_stats.compute_channel_histograms）
+                - second_feature: 第二特征检测结果
+        """
+        key = self._key(pdf_path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return
+
+        histograms = measurements['histograms']
+        width, height = measurements['image_size']
+        packed = np.stack([np.asarray(histograms[name], dtype='<i8') for name in HISTOGRAM_NAMES])
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO page_features
+                (path, page_number, size, mtime_ns, fingerprint, width, height,
+                 channel_sums, histograms, second_feature, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key, page_number, stat.st_size, stat.st_mtime_ns, self.fingerprint, int(width), int(height),
+                json.dumps([int(value) for value in histograms['channel_sums']]),
+                packed.tobytes(),
+                json.dumps(measurements['second_feature'], ensure_ascii=False, default=json_default),
+                datetime.now().isoformat()
+            )
+        )
+        self.stats['stored'] += 1
+        self._mark_write()
+
+    @staticmethod
+    def _decode(row):
+        """将数据库记录还原为测量结果"""
+        width, height, channel_sums, histograms, second_feature = row
+        packed = np.frombuffer(histograms, dtype='<i8').reshape(len(HISTOGRAM_NAMES), 256)
+        decoded = {name: packed[index] for index, name in enumerate(HISTOGRAM_NAMES)}
+        decoded['total_pixels'] = width * height
+        decoded['channel_sums'] = np.array(json.loads(channel_sums), dtype=np.int64)
+        return {
+            'image_size': [width, height],
+            'histograms': decoded,
+            'second_feature': json.loads(second_feature) if second_feature else None
+        }
+
+    def load_arrays(self):
+        """
+        读取所有有效记录并堆叠为数组（阈值扫描时向量化计算）
+
+        对比度与阈值无关，读取时即由灰度直方图算出，不保留灰度直方图；
+        其余直方图以int32保存（单页像素数远小于2^31），每页约3KB。
+
+        Returns:
+            dict: 页面特征数组（N为页面数，同一文件的页面相邻）
+                - paths: 文件路径列表
+                - file_index: 每页所属文件在paths中的索引 (N,)
+                - page_numbers: 页码 (N,)
+                - total_pixels: 像素总数 (N,)
+                - channel_sums: RGB各通道像素值之和 (N, 3)
+                - contrast: 对比度（灰度标准差） (N,)
+                - min_histogram / max_histogram / colored_histogram: 对应直方图 (N, 256)
+                - has_second_feature: 是否检测到第二特征 (N,)
+        """
+        self.commit()
+        count = self.conn.execute(
+            "SELECT COUNT(*) FROM page_features WHERE fingerprint = ?", (self.fingerprint,)
+        ).fetchone()[0]
+
+        paths = []
+        arrays = {
+            'file_index': np.empty(count, dtype=np.int64),
+            'page_numbers': np.empty(count, dtype=np.int64),
+            'total_pixels': np.empty(count, dtype=np.int64),
+            'channel_sums': np.empty((count, 3), dtype=np.int64),
+            'contrast': np.empty(count, dtype=np.float64),
+            'has_second_feature': np.empty(count, dtype=bool),
+        }
+        for name in HISTOGRAM_NAMES[1:]:
+            arrays[name] = np.empty((count, 256), dtype=np.int32)
+
+        rows = self.conn.execute(
+            "SELECT path, page_number, width, height, channel_sums, histograms, second_feature "
+            "FROM page_features WHERE fingerprint = ? ORDER BY path, page_number",
+            (self.fingerprint,)
+        )
+        for index, (path, page_number, width, height, sums, packed, second_feature) in enumerate(rows):
+            if not paths or paths[-1] != path:
+                paths.append(path)
+            histograms = np.frombuffer(packed, dtype='<i8').reshape(len(HISTOGRAM_NAMES), 256)
+            second_feature = json.loads(second_feature) if second_feature else None
+
+            arrays['file_index'][index] = len(paths) - 1
+            arrays['page_numbers'][index] = page_number
+            arrays['total_pixels'][index] = width * height
+            arrays['channel_sums'][index] = json.loads(sums)
+            arrays['contrast'][index] = contrast_from_histogram(histograms[0])
+            arrays['has_second_feature'][index] = bool(second_feature) and bool(second_feature['has_second_feature'])
+            for position, name in enumerate(HISTOGRAM_NAMES[1:], start=1):
+                arrays[name][index] = histograms[position]
+
+        arrays['paths'] = paths
+        return arrays
+
+    def _mark_write(self):
+        """累计写入次数，定期提交事务"""
+        self._pending_writes += 1
+        if self._pending_writes >= COMMIT_INTERVAL:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def commit(self):
+        """提交未完成的写入"""
+        self.conn.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        """提交未完成的写入并关闭数据库"""
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
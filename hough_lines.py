@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hough长横线提取工具
+功能：以cv2.HoughLinesP在黑色像素掩码上提取接近水平的长线段，允许线段内有小缺口，
+线宽按与行扫描检测相同的规则测量，结果为与行扫描检测相同结构的潜在长横线列表
+"""
+
+import math
+
+import cv2
+import numpy as np
+
+from line_scanner import run_thickness
+
+# 长横线的最小宽度占比（与行扫描检测一致）
+MIN_WIDTH_RATIO = 0.70
+
+# 线条的最大粗细占页面高度的比例（与行扫描检测一致）
+MAX_HEIGHT_RATIO = 0.02
+
+# 视为水平线的最大倾斜角度（度）
+MAX_ANGLE = 1.0
+
+# 线段内允许的最大缺口（2倍渲染下的像素，抗锯齿造成的断点）
+MAX_GAP_PX = 3
+
+
+def find_hough_lines(mask, width=None, height=None, search_range=5, pixel_factor=1.0,
+                     min_width_ratio=MIN_WIDTH_RATIO, max_height_ratio=MAX_HEIGHT_RATIO, max_angle=MAX_ANGLE,
+                     y_offset=0):
+    """
+    基于概率Hough变换提取潜在长横线
+
+    同一条粗线会被检测为相邻行上的多条线段，线宽范围内的重复线段只保留最长的一条。
+
+    Args:
+        mask: 黑色像素掩码（整页或条带，bool或uint8）
+        width, height: 整页图像尺寸（默认为掩码尺寸）
+        search_range: 线宽测量向上/向下的搜索范围
+        pixel_factor: 渲染倍率相对2倍基准的比例（用于换算允许的缺口）
+        min_width_ratio: 线段的最小宽度占比
+        max_height_ratio: 线条的最大粗细占页面高度的比例
+        max_angle: 视为水平线的最大倾斜角度（度）
+        y_offset: 掩码第0行在整页中的行号
+
+    Returns:
+        list: 潜在长横线列表（coords、length、y_center、angle、width_ratio、y_percent、line_width）
+    """
+    mask = np.asarray(mask)
+    binary = mask.view(np.uint8) if mask.dtype == bool else (mask != 0).view(np.uint8)
+    height = binary.shape[0] if height is None else height
+    width = binary.shape[1] if width is None else width
+
+    min_length = int(math.ceil(width * min_width_ratio))
+    max_gap = max(1, int(round(MAX_GAP_PX * pixel_factor)))
+    segments = cv2.HoughLinesP(binary, 1, np.pi / 180, threshold=min_length // 2,
+                               minLineLength=min_length, maxLineGap=max_gap)
+    if segments is None:
+        return []
+
+    candidates = []
+    # 不同OpenCV版本返回 (N, 1, 4) 或 (N, 4)
+    for x1, y1, x2, y2 in segments.reshape(-1, 4).tolist():
+        if x1 > x2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        angle = math.degrees(math.atan2(y2 - y1, x2 - x1))
+        if abs(angle) > max_angle:
+            continue
+        candidates.append((x2 - x1 + 1, (y1 + y2) // 2, x1, x2, y1, y2, angle))
+    if not candidates:
+        return []
+
+    # 长线段优先，线宽范围内的重复线段只保留最长的一条
+    candidates.sort(key=lambda item: (-item[0], item[1]))
+    rows = np.array([item[1] for item in candidates])
+    starts = np.array([item[2] for item in candidates])
+    ends = np.array([item[3] for item in candidates])
+    thickness = run_thickness(binary, rows, starts, ends, search_range).tolist()
+
+    lines = []
+    for (length, row, x1, x2, y1, y2, angle), line_width in zip(candidates, thickness):
+        if line_width > height * max_height_ratio:
+            continue
+        y = y_offset + row
+        if any(abs(y - line['y_center']) <= max(line_width, line['line_width']) for line in lines):
+            continue
+        lines.append({
+            'coords': (x1, y_offset + y1, x2, y_offset + y2),
+            'length': length,
+            'y_center': float(y),
+            'angle': angle,
+            'width_ratio': length / width,
+            'y_percent': y / height * 100,
+            'line_width': line_width
+        })
+
+    lines.sort(key=lambda line: line['y_center'])
+    return lines
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+长横线检测器对比
+功能：在templates/*.png和PDF文件夹的页面上依次运行已注册的各长横线检测器（LINE_DETECTORS），
+以参考检测器的结果为基准统计每个检测器的判定一致率、长横线位置一致率和单页耗时（p50/p95），
+据此选择--line-detector使用的检测器
+"""
+
+import argparse
+import csv
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import fitz
+import numpy as np
+from PIL import Image
+
+from page_raster import PageRaster, render_raster
+from pdf_discovery import DirectoryWalker
+from pdf_feature_extractor import PDFFeatureExtractor, LINE_DETECTORS, DEFAULT_LINE_DETECTOR
+
+
+def iter_template_pages(templates_dir, pattern='*.png'):
+    """
+    逐个读取模板图片
+
+    Yields:
+        tuple: (页面名称, PageRaster)
+    """
+    for path in sorted(Path(templates_dir).glob(pattern)):
+        yield path.name, PageRaster(np.array(Image.open(str(path)).convert('RGB')))
+
+
+def iter_pdf_pages(pdf_folder, max_pages=None):
+    """
+    逐页渲染PDF文件夹（递归）中各文件的页面（只渲染亮度平面）
+
+    Args:
+        pdf_folder: PDF文件夹路径（也可以是单个PDF文件）
+        max_pages: 每个文件最多渲染的页数（默认全部页面）
+
+    Yields:
+        tuple: (页面名称, PageRaster)
+    """
+    pdf_folder = Path(pdf_folder)
+    pdf_files = [pdf_folder] if pdf_folder.is_file() else sorted(DirectoryWalker(pdf_folder, report_interval=None))
+    for pdf_path in pdf_files:
+        try:
+            with fitz.open(str(pdf_path)) as doc:
+                page_count = len(doc) if max_pages is None else min(len(doc), max_pages)
+                for index in range(page_count):
+                    yield f"{Path(pdf_path).name} 第{index + 1}页", render_raster(doc[index], profile='structure')
+        except Exception as e:
+            print(f"⚠️  跳过无法读取的文件 {pdf_path}: {e}")
+
+
+def same_lines(result, reference, tolerance):
+    """两次检测选出的长横线数量相同，且按位置排序后每条线的y坐标相差不超过tolerance（或线宽）"""
+    lines = sorted(line['y_center'] for line in result['long_lines'])
+    expected = sorted(reference['long_lines'], key=lambda line: line['y_center'])
+    if len(lines) != len(expected):
+        return False
+    return all(abs(y - line['y_center']) <= max(tolerance, line.get('line_width', 0))
+               for y, line in zip(lines, expected))
+
+
+def benchmark_detectors(extractor, pages, detectors=None, reference=DEFAULT_LINE_DETECTOR, repeat=1, tolerance=8,
+                        progress=None):
+    """
+    在每一页上依次运行各检测器，统计与参考检测器的一致性和单页耗时
+
+    各检测器共用页面的黑色像素掩码和行投影（与实际分析流程一致，两者在计时之前计算）。
+
+    Args:
+        extractor: PDFFeatureExtractor实例
+        pages: (页面名称, PageRaster) 的可迭代对象
+        detectors: 参与对比的检测器名称列表（默认全部已注册的检测器）
+        reference: 参考检测器名称
+        repeat: 每页重复检测的次数（耗时取平均）
+        tolerance: 长横线位置一致的最大y坐标差（像素，线条更粗时按线宽）
+        progress: 每页完成后的回调 progress(页面名称, 各检测器结果)（可选）
+
+    Returns:
+        dict: 检测器名称 -> 统计（pages、verdict_agree、lines_agree、times（秒）、disagreements（判定不同的页面））
+    """
+    detectors = list(LINE_DETECTORS) if detectors is None else list(detectors)
+    for name in detectors + [reference]:
+        if name not in LINE_DETECTORS:
+            raise ValueError(f"不支持的长横线检测器: {name}")
+    if reference not in detectors:
+        detectors.insert(0, reference)
+
+    stats = {name: {'pages': 0, 'verdict_agree': 0, 'lines_agree': 0, 'times': [], 'disagreements': []}
+             for name in detectors}
+    for page_name, raster in pages:
+        raster.dark_mask(80)
+        raster.row_projection(80)
+
+        results = {}
+        for name in detectors:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                results[name] = extractor.detect_mb_second_feature(raster, line_detector=name)
+            stats[name]['times'].append((time.perf_counter() - start) / repeat)
+
+        expected = results[reference]
+        for name in detectors:
+            entry = stats[name]
+            entry['pages'] += 1
+            if results[name]['has_second_feature'] == expected['has_second_feature']:
+                entry['verdict_agree'] += 1
+            else:
+                entry['disagreements'].append(page_name)
+            if same_lines(results[name], expected, tolerance):
+                entry['lines_agree'] += 1
+        if progress is not None:
+            progress(page_name, results)
+    return stats
+
+
+def summarize(stats):
+    """
+    汇总每个检测器的一致率和耗时分位数
+
+    Returns:
+        list: 每个检测器一行 dict（detector、pages、verdict_agreement、line_agreement、p50_ms、p95_ms、max_ms）
+    """
+    rows = []
+    for name, entry in stats.items():
+        times = np.array(entry['times']) * 1000 if entry['times'] else np.zeros(1)
+        pages = max(entry['pages'], 1)
+        rows.append({
+            'detector': name,
+            'pages': entry['pages'],
+            'verdict_agreement': entry['verdict_agree'] / pages,
+            'line_agreement': entry['lines_agree'] / pages,
+            'p50_ms': float(np.percentile(times, 50)),
+            'p95_ms': float(np.percentile(times, 95)),
+            'max_ms': float(times.max())
+        })
+    return rows
+
+
+def recommend_detector(rows, min_agreement=1.0):
+    """
+    在判定一致率不低于min_agreement的检测器中选出p95耗时最低的一个
+
+    Returns:
+        str: 检测器名称（没有满足条件的检测器时为None）
+    """
+    eligible = [row for row in rows if row['verdict_agreement'] >= min_agreement]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda row: (row['p95_ms'], row['p50_ms']))['detector']
+
+
+def print_table(rows, reference):
+    """在控制台显示各检测器的一致率和耗时"""
+    print(f"{'检测器':<14}{'页数':>8}{'判定一致':>12}{'位置一致':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'最大(ms)':>10}")
+    for row in rows:
+        mark = ' (参考)' if row['detector'] == reference else ''
+        print(f"{row['detector'] + mark:<14}{row['pages']:>8}{row['verdict_agreement']:>13.1%}"
+              f"{row['line_agreement']:>13.1%}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['max_ms']:>10.2f}")
+
+
+def write_table(output_path, rows):
+    """将各检测器的统计写入CSV表格"""
+    columns = ['detector', 'pages', 'verdict_agreement', 'line_agreement', 'p50_ms', 'p95_ms', 'max_ms']
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='长横线检测器对比（判定一致率与单页耗时）')
+    parser.add_argument('pdf_folder', nargs='?', help='PDF文件夹或文件路径（可选，递归查找PDF）')
+    parser.add_argument('--templates', default='templates', help='模板图片文件夹（默认：templates，设为空字符串则不使用）')
+    parser.add_argument('--max-pages', type=int, default=None, help='每个PDF最多检测的页数（默认全部页面）')
+    parser.add_argument('--detectors', default=','.join(LINE_DETECTORS),
+                       help=f'参与对比的检测器，逗号分隔（默认全部：{",".join(LINE_DETECTORS)}）')
+    parser.add_argument('--reference', default=DEFAULT_LINE_DETECTOR,
+                       help=f'参考检测器（默认：{DEFAULT_LINE_DETECTOR}）')
+    parser.add_argument('--repeat', type=int, default=3, help='每页重复检测的次数，耗时取平均（默认：3）')
+    parser.add_argument('--tolerance', type=int, default=8, help='长横线位置一致的最大y坐标差（像素，默认：8）')
+    parser.add_argument('--min-agreement', type=float, default=1.0,
+                       help='推荐检测器所需的最低判定一致率（默认：1.0）')
+    parser.add_argument('--data-dir', default='data', help='数据保存目录')
+    parser.add_argument('--output', help='输出CSV文件名（可选）')
+
+    args = parser.parse_args()
+
+    detectors = [name.strip() for name in args.detectors.split(',') if name.strip()]
+    unknown = [name for name in detectors + [args.reference] if name not in LINE_DETECTORS]
+    if unknown:
+        print(f"❌ 不支持的长横线检测器: {unknown}（可用：{', '.join(LINE_DETECTORS)}）")
+        return 1
+
+    def pages():
+        if args.templates:
+            yield from iter_template_pages(args.templates)
+        if args.pdf_folder:
+            yield from iter_pdf_pages(args.pdf_folder, args.max_pages)
+
+    extractor = PDFFeatureExtractor(data_dir=args.data_dir)
+    start = time.perf_counter()
+    stats = benchmark_detectors(extractor, pages(), detectors, args.reference, max(1, args.repeat), args.tolerance)
+    rows = summarize(stats)
+    if not rows or rows[0]['pages'] == 0:
+        print("❌ 没有可检测的页面")
+        return 1
+
+    print(f"\n{'='*80}")
+    print(f"长横线检测器对比: {rows[0]['pages']} 页，参考检测器 {args.reference}，"
+          f"总耗时 {time.perf_counter() - start:.1f} 秒")
+    print(f"{'='*80}")
+    print_table(rows, args.reference)
+    for name, entry in stats.items():
+        if entry['disagreements']:
+            shown = '、'.join(entry['disagreements'][:5])
+            more = f" 等{len(entry['disagreements'])}页" if len(entry['disagreements']) > 5 else ''
+            print(f"  {name} 判定不同: {shown}{more}")
+
+    recommended = recommend_detector(rows, args.min_agreement)
+    if recommended:
+        print(f"\n✅ 判定一致率≥{args.min_agreement:.0%}的检测器中p95耗时最低: {recommended}"
+              f"（使用 --line-detector {recommended}）")
+    else:
+        print(f"\n⚠️  没有判定一致率≥{args.min_agreement:.0%}的检测器")
+
+    output_name = args.output or f"line_detector_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    output_path = extractor.data_dir / output_name
+    write_table(output_path, rows)
+    print(f"\n💾 统计已保存到: {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+线条扫描工具
+功能：基于NumPy的游程（run-length）引擎，一次性提取整幅掩码中每一行的黑色像素段
+"""
+
+import numpy as np
+
+
+def find_row_runs(mask):
+    """
+    提取掩码中所有行的连续非零像素段（游程）
+
+    通过对每行两端补零后做差分，一次性得到所有游程的起止位置，
+    结果按行优先顺序排列（与逐像素扫描的顺序一致）。
+
+    Args:
+        mask: 二维掩码数组（bool或uint8，非零视为黑色像素）
+
+    Returns:
+        tuple: (rows, starts, ends) 三个等长的int数组，
+               ends为闭区间终点（与原逐像素扫描的 (start, x - 1) 一致）
+    """
+    binary = np.asarray(mask) != 0
+    height = binary.shape[0]
+
+    # 两端补零，使每个游程都有明确的上升沿和下降沿
+    padded = np.zeros((height, binary.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = binary
+    transitions = np.diff(padded, axis=1)
+
+    rows, starts = np.nonzero(transitions == 1)
+    _, ends_exclusive = np.nonzero(transitions == -1)
+
+    return rows, starts, ends_exclusive - 1
+
+
+def longest_row_runs(mask):
+    """
+    计算每一行最长的连续黑色像素段
+
+    与逐像素扫描 + max(segments, key=...) 的结果完全一致：
+    长度相同时取最靠左（最先出现）的线段。
+
+    Args:
+        mask: 二维掩码数组（bool或uint8，非零视为黑色像素）
+
+    Returns:
+        tuple: (lengths, starts, ends) 三个长度为height的int数组，
+               没有黑色像素的行长度为0，起止位置为-1
+    """
+    height = np.asarray(mask).shape[0]
+    lengths = np.zeros(height, dtype=np.int64)
+    best_starts = np.full(height, -1, dtype=np.int64)
+    best_ends = np.full(height, -1, dtype=np.int64)
+
+    rows, starts, ends = find_row_runs(mask)
+    if rows.size == 0:
+        return lengths, best_starts, best_ends
+
+    run_lengths = ends - starts + 1
+
+    # 按 行 -> 长度降序 -> 起点升序 排序，每行第一个即为最长且最靠左的线段
+    order = np.lexsort((starts, -run_lengths, rows))
+    sorted_rows = rows[order]
+    first_in_row = np.ones(sorted_rows.size, dtype=bool)
+    first_in_row[1:] = sorted_rows[1:] != sorted_rows[:-1]
+    best = order[first_in_row]
+
+    lengths[rows[best]] = run_lengths[best]
+    best_starts[rows[best]] = starts[best]
+    best_ends[rows[best]] = ends[best]
+
+    return lengths, best_starts, best_ends
+
+
+def row_prefix_sums(mask):
+    """
+    计算掩码的水平前缀和（每行独立的积分图）
+
+    prefix[r, x] 为第r行前x个像素中的黑色像素数，因此任意行区间 [x1, x2] 的
+    黑色像素数为 prefix[r, x2 + 1] - prefix[r, x1]，只需两次查表。
+
+    Args:
+        mask: 二维掩码数组（bool或uint8，非零视为黑色像素）
+
+    Returns:
+        np.ndarray: 形状为 (height, width + 1) 的int32数组，第0列为0
+    """
+    binary = np.asarray(mask) != 0
+    prefix = np.zeros((binary.shape[0], binary.shape[1] + 1), dtype=np.int32)
+    np.cumsum(binary, axis=1, dtype=np.int32, out=prefix[:, 1:])
+    return prefix
+
+
+def span_counts(prefix, rows, starts, ends):
+    """
+    由水平前缀和查询若干行区间内的黑色像素数
+
+    Args:
+        prefix: row_prefix_sums的结果
+        rows: 前缀和中的行号（int数组，可与starts/ends广播）
+        starts, ends: 区间起止列（闭区间）
+
+    Returns:
+        np.ndarray: 每个区间的黑色像素数
+    """
+    return prefix[rows, np.asarray(ends) + 1] - prefix[rows, starts]
+
+
+def run_thickness(mask, rows, starts, ends, search_range, min_coverage=0.3):
+    """
+    批量测量水平线段在垂直方向上的厚度
+
+    与逐行向上、向下扩展的实现结果一致：从线段所在行起，相邻行在 [start, end] 内的
+    黑色像素数不少于线段长度的min_coverage时继续扩展，最多扩展search_range行。
+    只对各线段上下search_range行计算前缀和，所有线段的覆盖率一次查表得到。
+
+    Args:
+        mask: 二维掩码数组
+        rows: 线段所在行号（int数组）
+        starts, ends: 线段起止列（闭区间，int数组）
+        search_range: 向上/向下的最大扩展行数
+        min_coverage: 相邻行视为线条一部分的最小覆盖率
+
+    Returns:
+        np.ndarray: 每条线段的厚度（像素行数，int64）
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    height = np.asarray(mask).shape[0]
+    thickness = np.ones(rows.size, dtype=np.int64)
+
+    offsets = np.arange(1, search_range + 1)
+    windows = np.concatenate([rows[:, None] - offsets, rows[:, None] + offsets], axis=1)
+    needed = np.unique(windows)
+    needed = needed[(needed >= 0) & (needed < height)]
+    if rows.size == 0 or needed.size == 0:
+        return thickness
+
+    prefix = row_prefix_sums(np.asarray(mask)[needed])
+    minimum = (ends - starts + 1) * min_coverage
+    valid_span = ends >= starts
+
+    for test_rows in (windows[:, :search_range], windows[:, search_range:]):
+        inside = (test_rows >= 0) & (test_rows < height)
+        index = np.minimum(np.searchsorted(needed, test_rows), needed.size - 1)
+        counts = span_counts(prefix, index, starts[:, None], ends[:, None])
+        covered = inside & (counts >= minimum[:, None]) & valid_span[:, None]
+        # 遇到第一行覆盖不足即停止扩展
+        thickness += np.cumprod(covered, axis=1).sum(axis=1)
+
+    return thickness
+
+
+def find_projection_lines(mask, row_counts, width=None, height=None, min_width_ratio=0.70, max_height_ratio=0.02,
+                          y_offset=0):
+    """
+    仅凭行投影提取潜在长横线
+
+    黑色像素总数不少于min_width_ratio宽度的行视为线条行，相邻的线条行合并为一条线，
+    不检查像素是否连续（不做游程扫描和线宽测量），是最快但最粗略的检测方式。
+
+    Args:
+        mask: 黑色像素掩码（整页或条带）
+        row_counts: 掩码每行的黑色像素数量（行投影）
+        width, height: 整页图像尺寸（默认为掩码尺寸）
+        min_width_ratio: 线条行黑色像素的最小宽度占比
+        max_height_ratio: 线条的最大高度占页面高度的比例（更粗的合并行视为文字或色块）
+        y_offset: 掩码第0行在整页中的行号
+
+    Returns:
+        list: 潜在长横线列表（coords、length、y_center、angle、width_ratio、y_percent、line_width），
+              length为黑色像素最多一行的像素数，coords为该行首尾黑色像素的列号，y_center为合并行的中间行
+    """
+    mask = np.asarray(mask)
+    row_counts = np.asarray(row_counts)
+    height = mask.shape[0] if height is None else height
+    width = mask.shape[1] if width is None else width
+
+    line_rows = np.nonzero(row_counts >= min_width_ratio * width)[0]
+    if line_rows.size == 0:
+        return []
+    # 按相邻行分组：行号不连续处断开
+    breaks = np.nonzero(np.diff(line_rows) > 1)[0] + 1
+    lines = []
+    for group in np.split(line_rows, breaks):
+        line_width = int(group.size)
+        if line_width > height * max_height_ratio:
+            continue
+        row = int(group[np.argmax(row_counts[group])])
+        columns = np.flatnonzero(mask[row])
+        length = int(row_counts[row])
+        y_center = y_offset + int(group[0]) + (line_width - 1) // 2
+        lines.append({
+            'coords': (int(columns[0]), y_center, int(columns[-1]), y_center),
+            'length': length,
+            'y_center': float(y_center),
+            'angle': 0,
+            'width_ratio': length / width,
+            'y_percent': y_center / height * 100,
+            'line_width': line_width
+        })
+    return lines
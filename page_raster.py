@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面栅格对象
+功能：包装单页RGB图像，按需计算并缓存派生数组（灰度图、白色/黑色掩码、通道最大/最小值、行投影、颜色统计），
+同一页面的各项特征检测共用一个PageRaster，避免重复的整图计算；
+只做结构检查（长横线检测）时可直接由MuPDF渲染单通道灰度图，得到仅含亮度平面的PageRaster
+"""
+
+import cv2
+import numpy as np
+
+from color_stats import compute_channel_histograms, compute_color_statistics
+from pdf_renderer import DEFAULT_SCALE, render_page
+
+# 渲染配置：颜色检查需要RGB图像，结构检查（长横线检测）只需要亮度平面
+RENDER_PROFILES = {
+    'color': 'rgb',
+    'structure': 'gray',
+}
+
+
+class PageRaster:
+    """单页RGB图像（或仅亮度平面）及其派生数组的惰性缓存"""
+
+    def __init__(self, rgb_image, scale=DEFAULT_SCALE):
+        """
+        初始化页面栅格
+
+        Args:
+            rgb_image: RGB图像数组 (height, width, 3)，或灰度图数组 (height, width)（仅支持结构检查）
+            scale: 图像的渲染倍率（检测中的像素常数以DEFAULT_SCALE为基准按比例换算）
+        """
+        self.scale = scale
+        self.pixel_factor = scale / DEFAULT_SCALE
+        self.height, self.width = rgb_image.shape[:2]
+        self.total_pixels = self.height * self.width
+        self._cache = {}
+        if rgb_image.ndim == 2:
+            self.rgb = None
+            self._cache['gray'] = rgb_image
+        else:
+            self.rgb = rgb_image
+
+    @property
+    def has_color(self):
+        """是否包含RGB图像（灰度渲染的PageRaster只能用于结构检查）"""
+        return self.rgb is not None
+
+    def _require_color(self):
+        if self.rgb is None:
+            raise ValueError("灰度渲染的PageRaster不包含颜色信息，请使用color渲染配置")
+        return self.rgb
+
+    @classmethod
+    def from_image(cls, image):
+        """
+        由图像数组或已有的PageRaster得到PageRaster
+
+        Args:
+            image: PageRaster对象，或图像数组（三通道视为RGB，二维数组视为灰度图，否则按BGR转换为RGB）
+
+        Returns:
+            PageRaster: 页面栅格对象
+        """
+        if isinstance(image, cls):
+            return image
+        if image.ndim == 2 or (image.ndim == 3 and image.shape[2] == 3):
+            return cls(image)
+        return cls(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+    def _cached(self, key, compute):
+        value = self._cache.get(key)
+        if value is None:
+            value = compute()
+            self._cache[key] = value
+        return value
+
+    @property
+    def red(self):
+        """R通道视图"""
+        return self._require_color()[:, :, 0]
+
+    @property
+    def green(self):
+        """G通道视图"""
+        return self._require_color()[:, :, 1]
+
+    @property
+    def blue(self):
+        """B通道视图"""
+        return self._require_color()[:, :, 2]
+
+    @property
+    def gray(self):
+        """灰度图（cv2.COLOR_RGB2GRAY）"""
+        return self._cached('gray', lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY))
+
+    @property
+    def max_channel(self):
+        """每个像素RGB三个通道的最大值"""
+        return self._cached('max_channel', lambda: np.maximum(np.maximum(self.red, self.green), self.blue))
+
+    @property
+    def min_channel(self):
+        """每个像素RGB三个通道的最小值"""
+        return self._cached('min_channel', lambda: np.minimum(np.minimum(self.red, self.green), self.blue))
+
+    @property
+    def mean_rgb(self):
+        """RGB各通道的平均值"""
+        return self._cached('mean_rgb', lambda: np.mean(self._require_color().reshape(-1, 3), axis=0))
+
+    def white_mask(self, threshold):
+        """
+        白色掩码：RGB三个通道都 >= threshold
+
+        Args:
+            threshold: 白色阈值
+
+        Returns:
+            numpy.ndarray: 布尔掩码
+        """
+        return self._cached(('white_mask', threshold), lambda: self.min_channel >= threshold)
+
+    def black_mask(self, threshold):
+        """
+        黑色掩码：RGB三个通道都 <= threshold
+
+        Args:
+            threshold: 黑色阈值
+
+        Returns:
+            numpy.ndarray: 布尔掩码
+        """
+        return self._cached(('black_mask', threshold), lambda: self.max_channel <= threshold)
+
+    def dark_mask(self, threshold):
+        """
+        深色掩码：灰度值 < threshold（长横线检测使用）
+
+        Args:
+            threshold: 灰度阈值
+
+        Returns:
+            numpy.ndarray: 布尔掩码
+        """
+        return self._cached(('dark_mask', threshold), lambda: self.gray < threshold)
+
+    def row_projection(self, threshold):
+        """
+        深色掩码的行投影：每行灰度值 < threshold 的像素数量
+
+        Args:
+            threshold: 灰度阈值
+
+        Returns:
+            numpy.ndarray: 长度为height的整数数组
+        """
+        return self._cached(('row_projection', threshold),
+                            lambda: np.count_nonzero(self.dark_mask(threshold), axis=1))
+
+    def color_statistics(self, white_bg_min, black_text_max, count_colored=True):
+        """
+        单次遍历计算颜色统计（见color_stats.compute_color_statistics）
+
+        遍历时顺带生成灰度图并缓存，RGB均值也一并缓存。
+
+        Args:
+            white_bg_min: 白色背景阈值
+            black_text_max: 黑色文字阈值
+            count_colored: 是否统计彩色文字像素
+
+        Returns:
+            dict: 颜色统计结果
+        """
+        key = ('color_statistics', white_bg_min, black_text_max, count_colored)
+        stats = self._cache.get(key)
+        if stats is None:
+            gray = self._cache.get('gray')
+            gray_out = None if gray is not None else np.empty((self.height, self.width), dtype=np.uint8)
+            stats = compute_color_statistics(self._require_color(), white_bg_min, black_text_max,
+                                             count_colored=count_colored, gray=gray, gray_out=gray_out)
+            self._cache[key] = stats
+            if gray is None:
+                self._cache['gray'] = gray_out
+            self._cache.setdefault('mean_rgb', stats['mean_rgb'])
+        return stats
+
+    def channel_histograms(self):
+        """
+        单次遍历计算与颜色阈值无关的通道直方图（见color_stats.compute_channel_histograms）
+
+        Returns:
+            dict: 通道直方图
+        """
+        histograms = self._cache.get('channel_histograms')
+        if histograms is None:
+            gray = self._cache.get('gray')
+            gray_out = None if gray is not None else np.empty((self.height, self.width), dtype=np.uint8)
+            histograms = compute_channel_histograms(self._require_color(), gray=gray, gray_out=gray_out)
+            self._cache['channel_histograms'] = histograms
+            if gray is None:
+                self._cache['gray'] = gray_out
+        return histograms
+
+
+def render_raster(page, scale=DEFAULT_SCALE, profile='color'):
+    """
+    按渲染配置渲染PDF页面为PageRaster
+
+    structure配置直接向MuPDF请求单通道灰度图（csGRAY），渲染缓冲区只有RGB的三分之一，
+    也不需要再做RGB到灰度的转换，适用于只做长横线检测的场景。
+
+    Args:
+        page: fitz.Page对象
+        scale: 渲染倍率（默认2倍）
+        profile: 渲染配置，'color'（RGB图像）或 'structure'（仅亮度平面）
+
+    Returns:
+        PageRaster: 页面栅格对象
+    """
+    if profile not in RENDER_PROFILES:
+        raise ValueError(f"不支持的渲染配置: {profile}")
+    return PageRaster(render_page(page, scale=scale, colorspace=RENDER_PROFILES[profile]), scale=scale)
@@ -9,18 +9,23 @@
 """
 
 import os
+import queue
 import shutil
-import fitz  # PyMuPDF
+import multiprocessing
 import cv2
 import numpy as np
-from PIL import Image
-from pdf_feature_extractor import PDFFeatureExtractor
+from pdf_discovery import DirectoryWalker, DEFAULT_WALK_THREADS
+from pdf_feature_extractor import PDFFeatureExtractor, LINE_DETECTORS, DEFAULT_LINE_DETECTOR
+from page_raster import PageRaster, render_raster
+from pdf_session import PDFSession, SessionCache
+from pipeline import Pipeline, Stage, DEFAULT_QUEUE_SIZE
+from render_cache import RenderCache, DEFAULT_MAX_BYTES
+from scan_manifest import ScanManifest, config_fingerprint
+from result_sink import JsonlResultSink, FORMAT_UNIFIED
 import logging
-import json
 from datetime import datetime
 from pathlib import Path
 import argparse
-import io
 
 # 设置日志
 # 获取项目根目录
@@ -38,20 +43,81 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 流水线各阶段的默认并发数（预读和复制为线程，分析（渲染并检查两个特征）为进程）
+PIPELINE_WORKERS = {'read': 4, 'analyze': 4, 'copy': 2}
+
+
 class UnifiedPDFAnalyzer:
     """统一PDF分析器"""
     
-    def __init__(self, source_folder, target_folder="jc"):
+    def __init__(self, source_folder, target_folder="jc", workers=1, manifest_path=None, use_content_hash=False,
+                 line_source="raster", render_profile="shared", color_scale=2.0,
+                 render_cache_dir=None, render_cache_max_bytes=DEFAULT_MAX_BYTES, walk_threads=DEFAULT_WALK_THREADS,
+                 pipeline_workers=None, pipeline_queue_size=DEFAULT_QUEUE_SIZE, line_detector=DEFAULT_LINE_DETECTOR):
         """
         初始化分析器
         
         Args:
             source_folder: 源文件夹路径
             target_folder: 目标文件夹路径（默认为jc）
+            workers: 递归分类时的并行进程数（默认为1，即串行处理）
+            manifest_path: 增量扫描清单（SQLite）路径，指定后重复运行时跳过未变化的文件
+            use_content_hash: 清单是否额外记录并比较文件内容哈希
+            line_source: 第二特征长横线来源
+                - "raster": 在渲染后的位图上检测（默认）
+                - "vector": 优先读取PDF矢量绘图层，扫描件/纯图片页面回退到位图检测
+            render_profile: 页面渲染方式
+                - "shared": 以2倍渲染一张RGB图像，两个特征检查共用（默认）
+                - "split": 第一特征使用color_scale倍的RGB图像，第二特征按需以2倍渲染灰度图（csGRAY）
+            color_scale: split方式下第一特征的RGB渲染倍率（默认2倍；低于2倍时白色/黑色占比和对比度会偏低，
+                可能改变判定：test.pdf的43页中1倍时11页、1.5倍时2页的判定与2倍不同）
+            render_cache_dir: 页面渲染磁盘缓存目录（可选），指定后重复运行时直接读取已渲染的页面
+            render_cache_max_bytes: 页面渲染磁盘缓存的大小上限（字节，多进程处理时由各工作进程平分）
+            walk_threads: 递归分类时并行遍历目录的线程数
+            pipeline_workers: 递归分类的流水线各阶段并发数（可选，如 {'read': 4, 'analyze': 4}，
+                              未指定的阶段使用PIPELINE_WORKERS中的默认值）；指定后忽略workers
+            pipeline_queue_size: 流水线阶段之间的队列长度上限
+            line_detector: 第二特征位图检测使用的长横线检测器（见LINE_DETECTORS，默认为adaptive）
         """
+        if line_source not in ("raster", "vector"):
+            raise ValueError(f"不支持的长横线来源: {line_source}")
+        if render_profile not in ("shared", "split"):
+            raise ValueError(f"不支持的渲染方式: {render_profile}")
+        if line_detector not in LINE_DETECTORS:
+            raise ValueError(f"不支持的长横线检测器: {line_detector}")
+        
         self.source_folder = Path(source_folder)
         self.target_folder = Path(target_folder)
-        self.extractor = PDFFeatureExtractor()
+        self.workers = max(1, int(workers))
+        self.line_source = line_source
+        self.line_detector = line_detector
+        self.render_profile = render_profile
+        self.color_scale = color_scale
+        self.walk_threads = walk_threads
+        self.pipeline_workers = None
+        if pipeline_workers is not None:
+            unknown = set(pipeline_workers) - set(PIPELINE_WORKERS)
+            if unknown:
+                raise ValueError(f"未知的流水线阶段: {sorted(unknown)}")
+            self.pipeline_workers = dict(PIPELINE_WORKERS, **pipeline_workers)
+        self.pipeline_queue_size = pipeline_queue_size
+        self.pipeline = None
+        # 流水线预读的文件内容（发送到分析进程时不回传，复制阶段使用主进程中保留的这一份，不再读取源文件）
+        self._prefetched = {}
+        self.extractor = PDFFeatureExtractor(line_detector=line_detector)
+        
+        # 增量扫描清单（可选）
+        self.manifest = None
+        if manifest_path:
+            fingerprint = config_fingerprint(
+                self.extractor.get_color_thresholds(),
+                PDFFeatureExtractor.ALGORITHM_VERSION,
+                line_source=line_source,
+                line_detector=line_detector,
+                render_profile=render_profile,
+                color_scale=color_scale if render_profile == "split" else None
+            )
+            self.manifest = ScanManifest(manifest_path, "unified", fingerprint, use_content_hash)
         
         # 确保目标文件夹存在
         self.target_folder.mkdir(exist_ok=True)
@@ -63,11 +129,23 @@ class UnifiedPDFAnalyzer:
             'second_feature_passed': 0,
             'copied_files': 0,
             'errors': 0,
-            'specific_files_analyzed': 0
+            'specific_files_analyzed': 0,
+            'cached_files': 0
         }
         
-        # 详细结果记录
-        self.results = []
+        # 页面渲染磁盘缓存（可选）
+        self.render_cache_dir = render_cache_dir
+        self.render_cache_max_bytes = render_cache_max_bytes
+        self.render_cache = None
+        if render_cache_dir:
+            self.render_cache = RenderCache(render_cache_dir, max_bytes=render_cache_max_bytes)
+        
+        # 打开的PDF文档（特定文件模式下同一文件可能被多次访问，保留少量打开的文档避免重复解析）
+        self.sessions = SessionCache(render_cache=self.render_cache)
+        
+        # 详细结果逐条写入JSONL文件（不在内存中累积），这里只保留已复制文件的简要信息用于总结报告
+        self.results_file = None
+        self.copied_results = []
     
     def find_pdf_file(self, filename):
         """在源文件夹中查找指定的PDF文件"""
@@ -101,21 +179,15 @@ class UnifiedPDFAnalyzer:
         """将PDF页面转换为图像"""
         try:
             logger.info(f"正在转换PDF: {pdf_path}")
-            doc = fitz.open(pdf_path)
-            if page_num >= len(doc):
+            session = self.sessions.get(pdf_path)
+            if page_num >= session.page_count:
                 page_num = 0
             
-            page = doc[page_num]
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2倍放大
-            
-            # 转换为PIL图像
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
+            img_rgb = session.render(page_num + 1, scale=2.0)  # 2倍放大
             
             # 转换为OpenCV格式
-            img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+            img_cv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)
             
-            doc.close()
             logger.info(f"PDF转换成功，图像尺寸: {img_cv.shape}")
             return img_cv
             
@@ -128,39 +200,38 @@ class UnifiedPDFAnalyzer:
         检查第一特征：白色背景+黑色文字
         
         Args:
-            image: 图像数组
+            image: 图像数组或PageRaster
             
         Returns:
             dict: 第一特征检查结果
         """
         try:
             # 转换为RGB
-            if len(image.shape) == 3 and image.shape[2] == 3:
-                rgb_image = image
+            if isinstance(image, PageRaster):
+                raster = image
+            elif len(image.shape) == 3 and image.shape[2] == 3:
+                raster = PageRaster(image)
             else:
                 rgb_image = cv2.cvtColor(image, cv2.IMREAD_COLOR)
-                rgb_image = cv2.cvtColor(rgb_image, cv2.COLOR_BGR2RGB)
+                raster = PageRaster(cv2.cvtColor(rgb_image, cv2.COLOR_BGR2RGB))
+            
+            total_pixels = raster.total_pixels
             
-            height, width = rgb_image.shape[:2]
-            total_pixels = height * width
+            # 单次遍历得到白色/黑色像素数量、RGB均值和对比度
+            stats = raster.color_statistics(200, 80, count_colored=False)  # 白色RGB >= 200，黑色RGB <= 80
             
             # 分析白色背景像素
-            white_mask = np.all(rgb_image >= 200, axis=2)  # RGB >= 200
-            white_pixels = np.sum(white_mask)
-            white_ratio = white_pixels / total_pixels
+            white_ratio = stats['white_pixels'] / total_pixels
             
             # 分析黑色文字像素
-            black_mask = np.all(rgb_image <= 80, axis=2)  # RGB <= 80
-            black_pixels = np.sum(black_mask)
-            black_ratio = black_pixels / total_pixels
+            black_ratio = stats['black_pixels'] / total_pixels
             
             # 计算整体亮度
-            mean_rgb = np.mean(rgb_image.reshape(-1, 3), axis=0)
+            mean_rgb = stats['mean_rgb']
             avg_brightness = np.mean(mean_rgb)
             
-            # 计算对比度
-            gray_image = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2GRAY)
-            contrast = np.std(gray_image)
+            # 计算对比度（由灰度直方图得到）
+            contrast = stats['contrast']
             
             # 检查是否符合第一特征要求
             first_feature_ok = (
@@ -191,17 +262,25 @@ class UnifiedPDFAnalyzer:
                 'error': str(e)
             }
     
-    def check_second_feature(self, image):
+    def check_second_feature(self, image, page=None):
         """
         检查第二特征：两条长黑横线
         
         Args:
-            image: 图像数组
+            image: 图像数组或PageRaster（为None时由page以2倍渲染灰度图）
+            page: 图像对应的fitz.Page对象（line_source为"vector"时用于读取矢量绘图层）
             
         Returns:
             dict: 第二特征检查结果
         """
         try:
+            if self.line_source == "vector" and page is not None:
+                return self.extractor.detect_mb_second_feature_from_page(page, image)
+            
+            # 只需要亮度平面，直接渲染灰度图
+            if image is None:
+                image = render_raster(page, scale=2.0, profile='structure')
+            
             # 使用现有的第二特征检测方法
             result = self.extractor.detect_mb_second_feature(image)
             return result
@@ -343,7 +422,7 @@ class UnifiedPDFAnalyzer:
                 continue
             
             # 检测长黑线并可视化
-            vis_image, result = self.detectAnd_visualize_lines(image, filename)
+            vis_image, result = self.detect_and_visualize_lines(image, filename)
             
             # 使用简单的英文文件名避免编码问题
             output_filename = f"file_{i+1}_analysis.png"
@@ -366,14 +445,16 @@ class UnifiedPDFAnalyzer:
             
             self.stats['specific_files_analyzed'] += 1
         
+        self.sessions.close_all()
         return results
     
-    def process_pdf_file(self, pdf_path):
+    def process_pdf_file(self, pdf_path, data=None):
         """
         处理单个PDF文件（用于递归分类）
         
         Args:
             pdf_path: PDF文件路径
+            data: 已读取的文件内容（可选）
             
         Returns:
             dict: 处理结果
@@ -382,120 +463,462 @@ class UnifiedPDFAnalyzer:
             file_name = pdf_path.name
             logger.info(f"处理文件: {file_name}")
             
-            # 打开PDF文件
-            doc = fitz.open(pdf_path)
-            
-            if len(doc) == 0:
-                logger.warning(f"空PDF文件: {file_name}")
-                doc.close()
-                return {
-                    'file_path': str(pdf_path),
-                    'file_name': file_name,
-                    'success': False,
-                    'error': '空PDF文件',
-                    'first_feature': False,
-                    'second_feature': False,
-                    'copied': False
-                }
-            
-            # 只处理第一页
-            page = doc.load_page(0)
-            
-            # 转换为图像
-            mat = fitz.Matrix(2.0, 2.0)  # 2倍缩放提高质量
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("ppm")
-            
-            # 转换为numpy数组
-            nparr = np.frombuffer(img_data, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            doc.close()
-            
-            # 第一阶段：检查第一特征
-            logger.info(f"检查第一特征: {file_name}")
-            first_feature_result = self.check_first_feature(image_rgb)
-            
-            if not first_feature_result['passed']:
-                logger.info(f"第一特征检查失败: {file_name}")
-                return {
-                    'file_path': str(pdf_path),
-                    'file_name': file_name,
-                    'success': True,
-                    'first_feature': False,
-                    'second_feature': False,
-                    'copied': False,
-                    'first_feature_details': first_feature_result
-                }
-            
-            # 第一特征通过，更新统计
-            self.stats['first_feature_passed'] += 1
-            logger.info(f"第一特征检查通过: {file_name}")
-            
-            # 第二阶段：检查第二特征
-            logger.info(f"检查第二特征: {file_name}")
-            second_feature_result = self.check_second_feature(image_rgb)
-            
-            if not second_feature_result['has_second_feature']:
-                logger.info(f"第二特征检查失败: {file_name}")
-                return {
-                    'file_path': str(pdf_path),
-                    'file_name': file_name,
-                    'success': True,
-                    'first_feature': True,
-                    'second_feature': False,
-                    'copied': False,
-                    'first_feature_details': first_feature_result,
-                    'second_feature_details': second_feature_result
-                }
-            
-            # 第二特征通过，更新统计
-            self.stats['second_feature_passed'] += 1
-            logger.info(f"第二特征检查通过: {file_name}")
-            
-            # 复制文件到jc文件夹
-            target_path = self.target_folder / file_name
-            
-            # 如果目标文件已存在，添加序号
-            counter = 1
-            original_target_path = target_path
-            while target_path.exists():
-                name_without_ext = original_target_path.stem
-                ext = original_target_path.suffix
-                target_path = self.target_folder / f"{name_without_ext}_{counter}{ext}"
-                counter += 1
+            # 打开PDF文件（矢量检测需要在检查第二特征时访问页面，处理完成后再关闭）
+            with PDFSession(pdf_path, render_cache=self.render_cache, data=data) as session:
+                if session.page_count == 0:
+                    logger.warning(f"空PDF文件: {file_name}")
+                    return self._empty_result(pdf_path)
+                
+                # 只处理第一页
+                page = session.load_page(1)
+                raster = self._render_first_page(session)
+                result = self._classify_first_page(pdf_path, raster, page)
+                
+                # 复制文件到jc文件夹
+                if result['second_feature']:
+                    self._mark_copied(result, self._copy_to_target(pdf_path, data))
+                    self.stats['copied_files'] += 1
+                return result
             
-            # 复制文件
-            shutil.copy2(pdf_path, target_path)
-            self.stats['copied_files'] += 1
+        except Exception as e:
+            logger.error(f"处理文件失败 {pdf_path}: {str(e)}")
+            self.stats['errors'] += 1
+            return self._error_result(pdf_path, e)
+    
+    def _render_first_page(self, session):
+        """
+        按渲染方式渲染第一页
+        
+        Args:
+            session: PDF文档会话
             
-            logger.info(f"文件已复制到: {target_path}")
+        Returns:
+            PageRaster: 第一特征使用的页面栅格
+        """
+        if self.render_profile == "split":
+            # 第一特征使用较低倍率的RGB图像，第二特征需要时再单独渲染2倍灰度图
+            return PageRaster(session.render(1, scale=self.color_scale), scale=self.color_scale)
+        # 转换为图像（2倍缩放提高质量），直接得到RGB数组；两个特征检查共用派生数组
+        return PageRaster(session.render(1, scale=2.0))
+    
+    def _classify_first_page(self, pdf_path, raster, page):
+        """
+        对第一页依次检查两个特征（不复制文件）
+        
+        Args:
+            pdf_path: PDF文件路径
+            raster: 第一页的页面栅格（见_render_first_page）
+            page: 第一页的fitz.Page对象（矢量检测或split方式渲染灰度图时使用，否则可为None）
             
+        Returns:
+            dict: 处理结果（copied为False，通过两个特征检查时由调用方复制）
+        """
+        file_name = pdf_path.name
+        line_image = raster if self.render_profile == "shared" else None
+        
+        # 第一阶段：检查第一特征
+        logger.info(f"检查第一特征: {file_name}")
+        first_feature_result = self.check_first_feature(raster)
+        
+        if not first_feature_result['passed']:
+            logger.info(f"第一特征检查失败: {file_name}")
+            return {
+                'file_path': str(pdf_path),
+                'file_name': file_name,
+                'success': True,
+                'first_feature': False,
+                'second_feature': False,
+                'copied': False,
+                'first_feature_details': first_feature_result
+            }
+        
+        # 第一特征通过，更新统计
+        self.stats['first_feature_passed'] += 1
+        logger.info(f"第一特征检查通过: {file_name}")
+        
+        # 第二阶段：检查第二特征
+        logger.info(f"检查第二特征: {file_name}")
+        second_feature_result = self.check_second_feature(line_image, page)
+        
+        if not second_feature_result['has_second_feature']:
+            logger.info(f"第二特征检查失败: {file_name}")
             return {
                 'file_path': str(pdf_path),
                 'file_name': file_name,
                 'success': True,
                 'first_feature': True,
-                'second_feature': True,
-                'copied': True,
-                'target_path': str(target_path),
+                'second_feature': False,
+                'copied': False,
                 'first_feature_details': first_feature_result,
                 'second_feature_details': second_feature_result
             }
+        
+        # 第二特征通过，更新统计
+        self.stats['second_feature_passed'] += 1
+        logger.info(f"第二特征检查通过: {file_name}")
+        
+        return {
+            'file_path': str(pdf_path),
+            'file_name': file_name,
+            'success': True,
+            'first_feature': True,
+            'second_feature': True,
+            'copied': False,
+            'target_path': None,
+            'first_feature_details': first_feature_result,
+            'second_feature_details': second_feature_result
+        }
+    
+    @staticmethod
+    def _mark_copied(result, target_path):
+        """在处理结果中记录复制的目标路径"""
+        result['copied'] = True
+        result['target_path'] = str(target_path)
+    
+    @staticmethod
+    def _empty_result(pdf_path):
+        """空PDF文件的处理结果"""
+        return {
+            'file_path': str(pdf_path),
+            'file_name': pdf_path.name,
+            'success': False,
+            'error': '空PDF文件',
+            'first_feature': False,
+            'second_feature': False,
+            'copied': False
+        }
+    
+    @staticmethod
+    def _error_result(pdf_path, error):
+        """处理失败的结果"""
+        return {
+            'file_path': str(pdf_path),
+            'file_name': pdf_path.name if hasattr(pdf_path, 'name') else str(pdf_path),
+            'success': False,
+            'error': str(error),
+            'first_feature': False,
+            'second_feature': False,
+            'copied': False
+        }
+    
+    def _copy_to_target(self, pdf_path, data=None):
+        """
+        复制文件到目标文件夹（如果目标文件已存在，添加序号）
+        
+        Args:
+            pdf_path: PDF文件路径
+            data: 已读取的文件内容（可选），指定时直接写入，不再读取源文件
+            
+        Returns:
+            Path: 实际的目标路径
+        """
+        target_path = self._reserve_target_path(pdf_path.name)
+        
+        # 复制文件（复制失败时删除占位文件）
+        try:
+            if data is None:
+                shutil.copy2(pdf_path, target_path)
+            else:
+                target_path.write_bytes(data)
+                shutil.copystat(pdf_path, target_path)
+        except Exception:
+            target_path.unlink(missing_ok=True)
+            raise
+        
+        logger.info(f"文件已复制到: {target_path}")
+        return target_path
+    
+    def _reuse_cached_result(self, pdf_path, cached_result):
+        """
+        复用增量扫描清单中的结果，并按结果更新统计
+        
+        如果文件应被复制但目标文件夹中已没有对应文件，则重新复制。
+        
+        Args:
+            pdf_path: PDF文件路径
+            cached_result: 清单中存储的处理结果
+            
+        Returns:
+            dict: 处理结果（带有 cached=True 标记）
+        """
+        result = dict(cached_result)
+        result['cached'] = True
+        
+        if result.get('copied', False):
+            target_path = Path(result.get('target_path', ''))
+            in_target_folder = target_path.parent.resolve() == self.target_folder.resolve()
+            if not (in_target_folder and target_path.exists()):
+                result['target_path'] = str(self._copy_to_target(pdf_path))
+            self.stats['copied_files'] += 1
+        
+        if result.get('first_feature', False):
+            self.stats['first_feature_passed'] += 1
+        if result.get('second_feature', False):
+            self.stats['second_feature_passed'] += 1
+        self.stats['cached_files'] += 1
+        
+        return result
+    
+    def _iter_results(self, pdf_files):
+        """
+        逐个返回处理结果
+        
+        pdf_files可以是发现阶段流式产生的路径迭代器，每得到一个路径即开始处理，不等待目录遍历完成。
+        启用增量扫描清单时，未变化的文件直接复用已存储的结果，
+        只有新增或变化的文件会被（串行或并行）重新处理，处理成功的结果写回清单。
+        串行处理时结果按输入顺序返回；并行处理时复用的结果立即返回，其余结果在处理完成后按提交顺序返回。
+        
+        Args:
+            pdf_files: PDF文件路径列表或迭代器
+            
+        Yields:
+            dict: 单个文件的处理结果
+        """
+        counts = {'cached': 0, 'processed': 0}
+        if self.pipeline_workers is not None:
+            logger.info(f"使用流水线处理: {self.pipeline_workers}")
+            yield from self._iter_results_pipeline(pdf_files, counts)
+        elif self.workers > 1:
+            logger.info(f"使用 {self.workers} 个进程并行处理")
+            yield from self._iter_results_streaming(pdf_files, counts)
+        else:
+            for pdf_path in pdf_files:
+                cached_result = self._lookup_cached(pdf_path)
+                if cached_result is not None:
+                    counts['cached'] += 1
+                    yield self._reuse_cached_result(pdf_path, cached_result)
+                    continue
+                counts['processed'] += 1
+                yield self._store_processed(pdf_path, self.process_pdf_file(pdf_path))
+        
+        if self.manifest is not None:
+            logger.info(f"增量扫描: {counts['cached']} 个文件未变化，{counts['processed']} 个文件已处理")
+    
+    def _iter_results_streaming(self, pdf_files, counts):
+        """
+        边接收路径边提交到进程池处理
+        
+        清单查询在主进程中进行（SQLite连接不跨线程使用），需要处理的路径经队列交给进程池，
+        每接收一个路径后取回已完成的结果，遍历结束后等待剩余结果。
+        
+        Args:
+            pdf_files: PDF文件路径列表或迭代器
+            counts: 复用/处理的文件计数（就地更新）
+            
+        Yields:
+            dict: 单个文件的处理结果
+        """
+        pending_paths = queue.Queue()
+        with self._classify_pool() as pool:
+            processed = pool.imap(_classify_worker, iter(pending_paths.get, None))
+            in_flight = 0
+            try:
+                for pdf_path in pdf_files:
+                    cached_result = self._lookup_cached(pdf_path)
+                    if cached_result is not None:
+                        counts['cached'] += 1
+                        yield self._reuse_cached_result(pdf_path, cached_result)
+                        continue
+                    
+                    pending_paths.put(pdf_path)
+                    counts['processed'] += 1
+                    in_flight += 1
+                    while in_flight:
+                        try:
+                            item = processed.next(timeout=0)
+                        except multiprocessing.TimeoutError:
+                            break
+                        in_flight -= 1
+                        yield self._finish_worker_item(item)
+            finally:
+                # 通知进程池的任务线程输入已结束（提前退出时也必须发送，否则关闭进程池会一直等待）
+                pending_paths.put(None)
+            
+            for item in processed:
+                yield self._finish_worker_item(item)
+    
+    def _iter_results_pipeline(self, pdf_files, counts):
+        """
+        以 发现 → 预读 → 分析（渲染并检查两个特征） → 复制 流水线处理
+        
+        各阶段之间为有界队列，预读和复制在线程中进行，分析在进程池中进行，
+        网络共享盘的读取、页面计算和复制写入互相重叠。统计增量随条目返回，在本线程中累加。
+        
+        Args:
+            pdf_files: PDF文件路径列表或迭代器
+            counts: 复用/处理的文件计数（就地更新）
             
+        Yields:
+            dict: 单个文件的处理结果（按完成顺序）
+        """
+        initargs = (str(self.source_folder), str(self.target_folder), self.line_source,
+                    self.render_profile, self.color_scale, self.render_cache_dir,
+                    self._worker_cache_bytes(self.pipeline_workers['analyze']), self.line_detector)
+        finished = lambda job: 'result' in job or 'cached_result' in job
+        stages = [
+            Stage('read', self._read_job, self.pipeline_workers['read'], bypass=finished),
+            Stage('analyze', _pipeline_analyze, self.pipeline_workers['analyze'], kind='process',
+                  initializer=_init_classify_worker, initargs=initargs, bypass=finished),
+            Stage('copy', self._copy_job, self.pipeline_workers['copy'],
+                  bypass=lambda job: not job.get('result', {}).get('second_feature', False)),
+        ]
+        self.pipeline = Pipeline(self._pipeline_jobs(pdf_files), stages, queue_size=self.pipeline_queue_size)
+        
+        try:
+            for job in self.pipeline:
+                self._prefetched.pop(job['path'], None)
+                if 'cached_result' in job:
+                    counts['cached'] += 1
+                    yield self._reuse_cached_result(job['path'], job['cached_result'])
+                    continue
+                
+                counts['processed'] += 1
+                for key, value in job['stats'].items():
+                    self.stats[key] += value
+                for key, value in job.get('render_cache_stats', {}).items():
+                    self.render_cache.stats[key] += value
+                yield self._store_processed(job['path'], job['result'])
+        finally:
+            self._prefetched.clear()
+        
+        logger.info(f"流水线各阶段统计（瓶颈: {self.pipeline.bottleneck()}）:\n{self.pipeline.format_stats()}")
+    
+    def _pipeline_jobs(self, pdf_files):
+        """流水线输入：查询增量扫描清单，未变化的文件带着已存储的结果直接通过各阶段"""
+        for pdf_path in pdf_files:
+            cached_result = self._lookup_cached(pdf_path)
+            if cached_result is not None:
+                yield {'path': pdf_path, 'cached_result': cached_result}
+            else:
+                yield {'path': pdf_path, 'stats': {}}
+    
+    def _read_job(self, job):
+        """预读阶段：读取文件内容（后续阶段不再访问源文件）"""
+        try:
+            job['data'] = self._prefetched[job['path']] = job['path'].read_bytes()
+        except Exception as e:
+            logger.error(f"读取文件失败 {job['path']}: {str(e)}")
+            _count(job['stats'], 'errors')
+            job['result'] = self._error_result(job['path'], e)
+        return job
+    
+    def _analyze_job(self, job):
+        """
+        分析阶段（工作进程）：由预读的内容打开PDF，渲染并检查第一页的两个特征
+        
+        渲染和分析在同一进程中进行，页面图像不在进程之间传递；文件内容只发送到本进程一次，
+        返回主进程的条目中只有处理结果和统计增量。
+        """
+        pdf_path = job['path']
+        data = job.pop('data')
+        try:
+            with PDFSession(pdf_path, render_cache=self.render_cache, data=data) as session:
+                if session.page_count == 0:
+                    logger.warning(f"空PDF文件: {pdf_path.name}")
+                    job['result'] = self._empty_result(pdf_path)
+                    return job
+                raster = self._render_first_page(session)
+                job['result'] = self._classify_first_page(pdf_path, raster, session.load_page(1))
         except Exception as e:
             logger.error(f"处理文件失败 {pdf_path}: {str(e)}")
-            self.stats['errors'] += 1
-            return {
-                'file_path': str(pdf_path),
-                'file_name': pdf_path.name if hasattr(pdf_path, 'name') else str(pdf_path),
-                'success': False,
-                'error': str(e),
-                'first_feature': False,
-                'second_feature': False,
-                'copied': False
-            }
+            _count(job['stats'], 'errors')
+            job['result'] = self._error_result(pdf_path, e)
+        return job
+    
+    def _copy_job(self, job):
+        """复制阶段：将预读的内容写入目标文件夹"""
+        pdf_path = job['path']
+        try:
+            self._mark_copied(job['result'], self._copy_to_target(pdf_path, self._prefetched.pop(pdf_path, None)))
+            _count(job['stats'], 'copied_files')
+        except Exception as e:
+            logger.error(f"处理文件失败 {pdf_path}: {str(e)}")
+            _count(job['stats'], 'errors')
+            job['result'] = self._error_result(pdf_path, e)
+        return job
+    
+    def _lookup_cached(self, pdf_path):
+        """查询增量扫描清单中未变化文件的结果（未启用清单时返回None）"""
+        if self.manifest is None:
+            return None
+        return self.manifest.lookup(pdf_path)
+    
+    def _store_processed(self, pdf_path, result):
+        """将处理成功的结果写回增量扫描清单"""
+        if self.manifest is not None and result.get('success', False):
+            self.manifest.store(pdf_path, result)
+        return result
+    
+    def _finish_worker_item(self, item):
+        """累加工作进程的统计增量，并将结果写回清单"""
+        result = self._merge_worker_stats(item)
+        return self._store_processed(Path(result['file_path']), result)
+    
+    def _reserve_target_path(self, file_name):
+        """
+        为待复制文件预留目标路径
+        
+        使用O_CREAT|O_EXCL原子地创建占位文件，多个进程同时复制同名文件时
+        也不会得到相同的目标路径。
+        
+        Args:
+            file_name: 源文件名
+            
+        Returns:
+            Path: 已预留的目标路径
+        """
+        original_target_path = self.target_folder / file_name
+        target_path = original_target_path
+        counter = 1
+        while True:
+            try:
+                fd = os.open(target_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return target_path
+            except FileExistsError:
+                target_path = self.target_folder / f"{original_target_path.stem}_{counter}{original_target_path.suffix}"
+                counter += 1
+    
+    def _classify_pool(self):
+        """创建递归分类的进程池（每个工作进程初始化一次分析器）"""
+        return multiprocessing.Pool(
+            processes=self.workers,
+            initializer=_init_classify_worker,
+            initargs=(str(self.source_folder), str(self.target_folder), self.line_source,
+                      self.render_profile, self.color_scale, self.render_cache_dir,
+                      self._worker_cache_bytes(self.workers), self.line_detector)
+        )
+    
+    def _worker_cache_bytes(self, processes):
+        """
+        计算每个工作进程的渲染缓存大小上限
+        
+        RenderCache的上限按进程计算，各工作进程平分总上限，共用的缓存目录不会超过指定大小。
+        
+        Args:
+            processes: 工作进程数
+            
+        Returns:
+            int: 单个工作进程的大小上限（字节）
+        """
+        return max(1, int(self.render_cache_max_bytes) // max(1, int(processes)))
+    
+    def _merge_worker_stats(self, item):
+        """
+        将工作进程返回的统计增量累加到本进程
+        
+        Args:
+            item: _classify_worker的返回值 (处理结果, 统计增量, 渲染缓存统计增量)
+            
+        Returns:
+            dict: 处理结果
+        """
+        result, stats_delta, cache_delta = item
+        for key, value in stats_delta.items():
+            self.stats[key] += value
+        for key, value in cache_delta.items():
+            self.render_cache.stats[key] += value
+        return result
     
     def recursive_classify(self):
         """
@@ -503,59 +926,87 @@ class UnifiedPDFAnalyzer:
         """
         logger.info(f"开始扫描文件夹: {self.source_folder}")
         
-        # 递归查找所有PDF文件
-        pdf_files = []
-        for root, dirs, files in os.walk(self.source_folder):
-            for file in files:
-                if file.lower().endswith('.pdf'):
-                    pdf_path = Path(root) / file
-                    pdf_files.append(pdf_path)
-        
-        self.stats['total_pdfs'] = len(pdf_files)
-        logger.info(f"找到 {len(pdf_files)} 个PDF文件")
+        # 并行遍历目录，发现的PDF文件立即进入处理阶段
+        walker = DirectoryWalker(self.source_folder, threads=self.walk_threads)
+        results_iter = self._iter_results(walker)
         
-        if len(pdf_files) == 0:
-            logger.warning("未找到PDF文件")
-            return
+        # 每处理完一个文件即追加写入JSONL，运行中断也不会丢失已完成的结果
+        data_dir = Path(__file__).parent / "tests" / "data"
+        self.results_file = data_dir / f"unified_analysis_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        sink = JsonlResultSink(self.results_file, FORMAT_UNIFIED, metadata={
+            'start_time': datetime.now().isoformat(),
+            'source_directory': str(self.source_folder),
+            'target_folder': str(self.target_folder)
+        })
         
-        # 处理每个PDF文件
         print(f"\n开始处理PDF文件...")
         print(f"{'='*120}")
         print(f"{'序号':<4} {'文件名':<50} {'第一特征':<10} {'第二特征':<10} {'复制状态':<10} {'详细信息'}")
         print(f"{'-'*4} {'-'*50} {'-'*10} {'-'*10} {'-'*10} {'-'*30}")
         
-        for i, pdf_path in enumerate(pdf_files):
-            file_name = pdf_path.name
-            if len(file_name) > 47:
-                display_name = file_name[:44] + "..."
-            else:
-                display_name = file_name
-            
-            # 处理文件
-            result = self.process_pdf_file(pdf_path)
-            self.results.append(result)
-            
-            # 显示处理结果
-            first_status = "✅ 通过" if result.get('first_feature', False) else "❌ 失败"
-            second_status = "✅ 通过" if result.get('second_feature', False) else "❌ 失败"
-            copy_status = "✅ 已复制" if result.get('copied', False) else "❌ 未复制"
-            
-            # 详细信息
-            if result.get('success', False):
-                if result.get('first_feature', False) and result.get('second_feature', False):
-                    detail = "符合标准，已复制"
-                elif result.get('first_feature', False):
-                    detail = f"第一特征通过，第二特征失败: {result.get('second_feature_details', {}).get('reason', '未知原因')}"
-                else:
-                    detail = f"第一特征失败: 白={result.get('first_feature_details', {}).get('white_ratio', 0):.1%}, 黑={result.get('first_feature_details', {}).get('black_ratio', 0):.1%}"
-            else:
-                detail = f"处理错误: {result.get('error', '未知错误')}"
-            
-            print(f"{i+1:<4} {display_name:<50} {first_status:<10} {second_status:<10} {copy_status:<10} {detail}")
+        try:
+            for i, result in enumerate(results_iter):
+                self.stats['total_pdfs'] += 1
+                pdf_path = Path(result['file_path'])
+                sink.write(result)
+                if result.get('copied', False):
+                    self.copied_results.append({
+                        'file_name': result['file_name'],
+                        'target_path': result.get('target_path', '未知')
+                    })
+                self._print_result_row(i, pdf_path, result)
+        finally:
+            # 中途出错时结束目录遍历线程和进程池
+            results_iter.close()
+            if self.manifest is not None:
+                self.manifest.commit()
+            sink.flush(fsync=True)
+        
+        walk_stats = walker.get_stats()
+        logger.info(f"目录遍历完成: {walk_stats['directories']} 个文件夹，找到 {walk_stats['files']} 个PDF文件，"
+                    f"耗时 {walk_stats['elapsed_seconds']:.1f} 秒（{walk_stats['directories_per_second']:.0f} 个文件夹/秒）")
+        if self.stats['total_pdfs'] == 0:
+            logger.warning("未找到PDF文件")
+        
+        summary = {
+            'scan_time': datetime.now().isoformat(),
+            'statistics': self.stats
+        }
+        if self.pipeline is not None:
+            summary['pipeline'] = self.pipeline.get_stats()
+        sink.close(summary=summary)
         
         # 生成总结报告
         self._generate_summary()
     
+    def _print_result_row(self, i, pdf_path, result):
+        """在控制台表格中显示单个文件的处理结果"""
+        file_name = pdf_path.name
+        if len(file_name) > 47:
+            display_name = file_name[:44] + "..."
+        else:
+            display_name = file_name
+        
+        # 显示处理结果
+        first_status = "✅ 通过" if result.get('first_feature', False) else "❌ 失败"
+        second_status = "✅ 通过" if result.get('second_feature', False) else "❌ 失败"
+        copy_status = "✅ 已复制" if result.get('copied', False) else "❌ 未复制"
+        
+        # 详细信息
+        if result.get('success', False):
+            if result.get('first_feature', False) and result.get('second_feature', False):
+                detail = "符合标准，已复制"
+            elif result.get('first_feature', False):
+                detail = f"第一特征通过，第二特征失败: {result.get('second_feature_details', {}).get('reason', '未知原因')}"
+            else:
+                detail = f"第一特征失败: 白={result.get('first_feature_details', {}).get('white_ratio', 0):.1%}, 黑={result.get('first_feature_details', {}).get('black_ratio', 0):.1%}"
+        else:
+            detail = f"处理错误: {result.get('error', '未知错误')}"
+        if result.get('cached', False):
+            detail = f"[缓存] {detail}"
+        
+        print(f"{i+1:<4} {display_name:<50} {first_status:<10} {second_status:<10} {copy_status:<10} {detail}")
+    
     def _generate_summary(self):
         """生成总结报告"""
         print(f"\n{'='*120}")
@@ -569,6 +1020,15 @@ class UnifiedPDFAnalyzer:
         print(f"  成功复制文件: {self.stats['copied_files']}")
         print(f"  处理错误: {self.stats['errors']}")
         print(f"  特定文件分析: {self.stats['specific_files_analyzed']}")
+        if self.manifest is not None:
+            print(f"  复用缓存结果: {self.stats['cached_files']}")
+        if self.render_cache is not None:
+            cache_stats = self.render_cache.get_stats()
+            print(f"  渲染缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次 "
+                  f"({cache_stats['hit_rate']:.1%})，淘汰 {cache_stats['evictions']} 个条目")
+        if self.pipeline is not None:
+            print(f"\n🔀 流水线各阶段（瓶颈: {self.pipeline.bottleneck()}）:")
+            print(self.pipeline.format_stats())
         
         if self.stats['total_pdfs'] > 0:
             first_pass_rate = self.stats['first_feature_passed'] / self.stats['total_pdfs'] * 100
@@ -581,7 +1041,7 @@ class UnifiedPDFAnalyzer:
             print(f"  最终复制率: {copy_rate:.1f}%")
         
         # 显示成功复制的文件
-        copied_files = [r for r in self.results if r.get('copied', False)]
+        copied_files = self.copied_results
         if copied_files:
             print(f"\n🎉 成功复制的文件 ({len(copied_files)}个):")
             print(f"{'序号':<4} {'文件名':<60} {'目标路径'}")
@@ -598,38 +1058,10 @@ class UnifiedPDFAnalyzer:
                 
                 print(f"{i+1:<4} {file_name:<60} {target_path}")
         
-        # 保存详细结果到JSON文件
-        # 确保tests/data目录存在
-        data_dir = Path(__file__).parent / "tests" / "data"
-        data_dir.mkdir(parents=True, exist_ok=True)
-        
-        output_file = data_dir / f"unified_analysis_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        # 清理数据，确保JSON序列化兼容
-        cleaned_results = []
-        for result in self.results:
-            cleaned_result = {}
-            for key, value in result.items():
-                if isinstance(value, (bool, int, float, str)):
-                    cleaned_result[key] = value
-                elif value is None:
-                    cleaned_result[key] = None
-                else:
-                    cleaned_result[key] = str(value)
-            cleaned_results.append(cleaned_result)
-        
-        summary_data = {
-            'scan_time': datetime.now().isoformat(),
-            'source_directory': str(self.source_folder),
-            'target_folder': str(self.target_folder),
-            'statistics': self.stats,
-            'files': cleaned_results
-        }
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(summary_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"\n💾 详细结果已保存到: {output_file}")
+        # 详细结果已在处理过程中逐条写入JSONL文件
+        if self.results_file is not None:
+            print(f"\n💾 详细结果已保存到: {self.results_file}")
+            print(f"   如需原汇总JSON格式: python result_sink.py {self.results_file}")
         print(f"📁 符合条件的PDF文件已复制到: {self.target_folder}")
     
     def run_analysis(self, mode="recursive", specific_files=None):
@@ -652,6 +1084,64 @@ class UnifiedPDFAnalyzer:
         else:
             raise ValueError(f"不支持的分析模式: {mode}")
 
+# 并行工作进程内的分析器（每个进程初始化一次）
+_worker_analyzer = None
+
+
+def _init_classify_worker(source_folder, target_folder, line_source="raster", render_profile="shared", color_scale=2.0,
+                          render_cache_dir=None, render_cache_max_bytes=DEFAULT_MAX_BYTES,
+                          line_detector=DEFAULT_LINE_DETECTOR):
+    """工作进程初始化：创建本进程专用的分析器"""
+    global _worker_analyzer
+    _worker_analyzer = UnifiedPDFAnalyzer(source_folder, target_folder, line_source=line_source,
+                                          render_profile=render_profile, color_scale=color_scale,
+                                          render_cache_dir=render_cache_dir,
+                                          render_cache_max_bytes=render_cache_max_bytes,
+                                          line_detector=line_detector)
+
+
+def _classify_worker(pdf_path):
+    """
+    工作进程中处理单个PDF文件
+    
+    Returns:
+        tuple: (处理结果, 本次处理产生的统计增量, 渲染缓存统计增量)
+    """
+    render_cache = _worker_analyzer.render_cache
+    stats_before = dict(_worker_analyzer.stats)
+    cache_before = dict(render_cache.stats) if render_cache is not None else {}
+    result = _worker_analyzer.process_pdf_file(pdf_path)
+    stats_delta = {key: _worker_analyzer.stats[key] - value for key, value in stats_before.items()}
+    cache_delta = {key: render_cache.stats[key] - value for key, value in cache_before.items()}
+    return result, stats_delta, cache_delta
+
+
+def _count(stats, key, value=1):
+    """累加统计增量"""
+    stats[key] = stats.get(key, 0) + value
+
+
+def _run_pipeline_stage(method, job):
+    """在工作进程中执行流水线阶段，并将本进程分析器的统计增量记录到条目中"""
+    render_cache = _worker_analyzer.render_cache
+    stats_before = dict(_worker_analyzer.stats)
+    cache_before = dict(render_cache.stats) if render_cache is not None else {}
+    job = method(_worker_analyzer, job)
+    for key, value in stats_before.items():
+        if _worker_analyzer.stats[key] != value:
+            _count(job['stats'], key, _worker_analyzer.stats[key] - value)
+    if cache_before:
+        cache_stats = job.setdefault('render_cache_stats', {})
+        for key, value in cache_before.items():
+            _count(cache_stats, key, render_cache.stats[key] - value)
+    return job
+
+
+def _pipeline_analyze(job):
+    """流水线分析阶段（工作进程）"""
+    return _run_pipeline_stage(UnifiedPDFAnalyzer._analyze_job, job)
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='统一PDF分析工具')
@@ -659,6 +1149,35 @@ def main():
     parser.add_argument('--target', '-t', default='jc', help='目标文件夹路径（默认为jc）')
     parser.add_argument('--mode', '-m', choices=['recursive', 'specific'], default='recursive',
                        help='分析模式：recursive(递归分类) 或 specific(特定文件分析)')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='递归分类模式下的并行进程数（默认为1，即串行处理）')
+    parser.add_argument('--manifest', help='增量扫描清单（SQLite）路径，重复运行时跳过未变化的PDF文件')
+    parser.add_argument('--hash-content', action='store_true',
+                       help='增量扫描清单额外比较文件内容哈希（文件被重新复制但内容未变时仍复用结果）')
+    parser.add_argument('--line-source', choices=['raster', 'vector'], default='raster',
+                       help='第二特征长横线来源：raster=位图检测（默认），vector=优先读取PDF矢量绘图层')
+    parser.add_argument('--line-detector', choices=list(LINE_DETECTORS), default=DEFAULT_LINE_DETECTOR,
+                       help=f'第二特征位图检测使用的长横线检测器（默认：{DEFAULT_LINE_DETECTOR}，'
+                            f'可先用line_detector_benchmark.py比较各检测器的一致性和耗时）')
+    parser.add_argument('--render-profile', choices=['shared', 'split'], default='shared',
+                       help='页面渲染方式：shared=2倍RGB图像两个特征共用（默认），'
+                            'split=第一特征用--color-scale倍RGB图像，第二特征单独渲染2倍灰度图')
+    parser.add_argument('--color-scale', type=float, default=2.0,
+                       help='split渲染方式下第一特征的RGB渲染倍率（默认：2.0，与shared方式的判定一致；'
+                            '更低的倍率渲染更快，但白色/黑色占比和对比度偏低，可能改变判定，'
+                            'test.pdf上1.0倍时43页中11页、1.5倍时2页的判定与2倍不同）')
+    parser.add_argument('--render-cache', help='页面渲染磁盘缓存目录，重复运行时直接读取已渲染的页面')
+    parser.add_argument('--render-cache-size', type=int, default=2048,
+                       help='页面渲染磁盘缓存的大小上限（MB，默认：2048，多进程处理时由各工作进程平分）')
+    parser.add_argument('--walk-threads', type=int, default=DEFAULT_WALK_THREADS,
+                       help=f'递归分类模式下并行遍历目录的线程数（默认：{DEFAULT_WALK_THREADS}）')
+    parser.add_argument('--pipeline', action='store_true',
+                       help='递归分类模式下使用 发现→预读→分析→复制 流水线（读取、计算和复制互相重叠）')
+    parser.add_argument('--stage-workers', default='',
+                       help='流水线各阶段并发数，如 "read=8,analyze=8,copy=2"（默认：'
+                            + ','.join(f'{name}={count}' for name, count in PIPELINE_WORKERS.items()) + '）')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                       help=f'流水线阶段之间的队列长度上限（默认：{DEFAULT_QUEUE_SIZE}）')
     parser.add_argument('--verbose', '-v', action='store_true', help='详细输出模式')
     
     args = parser.parse_args()
@@ -672,8 +1191,24 @@ def main():
         print(f"❌ 源文件夹不存在: {args.source_folder}")
         return
     
+    pipeline_workers = None
+    if args.pipeline:
+        try:
+            pipeline_workers = {name.strip(): int(count) for name, count in
+                                (item.split('=') for item in args.stage_workers.split(',') if item.strip())}
+        except ValueError:
+            print(f"❌ 无效的流水线并发数: {args.stage_workers}")
+            return
+    
     # 创建分析器并开始处理
-    analyzer = UnifiedPDFAnalyzer(args.source_folder, args.target)
+    analyzer = UnifiedPDFAnalyzer(args.source_folder, args.target, workers=args.workers,
+                                  manifest_path=args.manifest, use_content_hash=args.hash_content,
+                                  line_source=args.line_source, line_detector=args.line_detector,
+                                  render_profile=args.render_profile,
+                                  color_scale=args.color_scale, render_cache_dir=args.render_cache,
+                                  render_cache_max_bytes=args.render_cache_size * 1024 * 1024,
+                                  walk_threads=args.walk_threads, pipeline_workers=pipeline_workers,
+                                  pipeline_queue_size=args.queue_size)
     
     if args.mode == "recursive":
         analyzer.run_analysis(mode="recursive")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF文件发现
+功能：使用线程池并行以os.scandir遍历目录树，边遍历边流式返回发现的PDF文件路径，
+不必等待整棵目录树遍历完成；适用于网络共享盘（SMB/NFS）上包含大量条目的目录
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# 默认遍历线程数（网络文件系统上目录读取以等待I/O为主，线程数可高于CPU核数）
+DEFAULT_WALK_THREADS = 8
+
+# 发现的文件路径队列上限，处理阶段跟不上时遍历线程暂停
+DEFAULT_QUEUE_SIZE = 10000
+
+# 遍历进度的日志间隔（秒）
+REPORT_INTERVAL = 10.0
+
+# 遍历结束标记
+_DONE = object()
+
+
+def is_skipped_dir(name):
+    """是否跳过该文件夹（隐藏文件夹和以$开头的系统文件夹，如$RECYCLE.BIN）"""
+    return name.startswith('.') or name.startswith('$')
+
+
+class DirectoryWalker:
+    """并行目录遍历器（os.scandir + 线程池），迭代时流式返回匹配的文件路径"""
+
+    def __init__(self, root, threads=DEFAULT_WALK_THREADS, suffixes=('.pdf',), skip_hidden=False,
+                 queue_size=DEFAULT_QUEUE_SIZE, report_interval=REPORT_INTERVAL):
+        """
+        初始化目录遍历器
+
+        Args:
+            root: 根目录路径
+            threads: 遍历线程数
+            suffixes: 匹配的文件扩展名（不区分大小写）
+            skip_hidden: 是否跳过隐藏文件夹和以$开头的系统文件夹（默认不跳过，与os.walk一致）
+            queue_size: 发现的文件路径队列上限
+            report_interval: 遍历进度的日志间隔（秒），None表示不输出
+        """
+        self.root = Path(root)
+        self.threads = max(1, int(threads))
+        self.suffixes = tuple(suffix.lower() for suffix in suffixes)
+        self.skip_hidden = skip_hidden
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+
+        self.stats = {'directories': 0, 'files': 0, 'errors': 0}
+        self.elapsed = 0.0
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._directories = None
+        self._found = None
+        self._pending = 0
+
+    def __iter__(self):
+        """
+        遍历目录树
+
+        Yields:
+            Path: 匹配的文件路径（顺序取决于各线程的遍历进度，不保证稳定）
+        """
+        self.stats = {'directories': 0, 'files': 0, 'errors': 0}
+        self._stopped.clear()
+        self._directories = queue.Queue()
+        self._found = queue.Queue(maxsize=self.queue_size)
+        self._pending = 1
+        self._directories.put(str(self.root))
+
+        start = time.perf_counter()
+        workers = [threading.Thread(target=self._worker, name=f"pdf-walk-{index}", daemon=True)
+                   for index in range(self.threads)]
+        for worker in workers:
+            worker.start()
+
+        last_report = start
+        try:
+            while True:
+                try:
+                    item = self._found.get(timeout=self.report_interval or None)
+                except queue.Empty:
+                    item = None
+                if item is _DONE:
+                    break
+
+                now = time.perf_counter()
+                if self.report_interval and now - last_report >= self.report_interval:
+                    last_report = now
+                    self.elapsed = now - start
+                    logger.info(f"已遍历 {self.stats['directories']} 个文件夹，找到 {self.stats['files']} 个文件 "
+                                f"（{self.directories_per_second():.0f} 个文件夹/秒）")
+                if item is not None:
+                    yield item
+        finally:
+            # 提前结束迭代时通知遍历线程停止
+            self._stopped.set()
+            for worker in workers:
+                worker.join()
+            self.elapsed = time.perf_counter() - start
+
+    def _worker(self):
+        """遍历线程：从目录队列取出目录并扫描，目录全部扫描完成后结束"""
+        while True:
+            directory = self._directories.get()
+            if directory is None:
+                return
+            try:
+                if not self._stopped.is_set():
+                    self._scan(directory)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    finished = self._pending == 0
+                if finished:
+                    for _ in range(self.threads):
+                        self._directories.put(None)
+                    self._emit(_DONE)
+
+    def _scan(self, directory):
+        """扫描单个目录：子目录放入目录队列，匹配的文件放入结果队列"""
+        subdirectories = []
+        files = []
+        errors = 0
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not (self.skip_hidden and is_skipped_dir(entry.name)):
+                                subdirectories.append(entry.path)
+                        elif entry.name.lower().endswith(self.suffixes) and entry.is_file():
+                            files.append(Path(entry.path))
+                    except OSError:
+                        errors += 1
+        except OSError as e:
+            logger.warning(f"无法访问文件夹 {directory}: {e}")
+            errors += 1
+
+        with self._lock:
+            self._pending += len(subdirectories)
+            self.stats['directories'] += 1
+            self.stats['files'] += len(files)
+            self.stats['errors'] += errors
+        for subdirectory in subdirectories:
+            self._directories.put(subdirectory)
+        for file_path in files:
+            self._emit(file_path)
+
+    def _emit(self, item):
+        """放入结果队列；队列已满时等待，迭代提前结束时放弃"""
+        while not self._stopped.is_set():
+            try:
+                self._found.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def directories_per_second(self):
+        """目录遍历速度（个/秒）"""
+        return self.stats['directories'] / self.elapsed if self.elapsed > 0 else 0.0
+
+    def get_stats(self):
+        """
+        获取遍历统计
+
+        Returns:
+            dict: 文件夹数、匹配文件数、访问错误数、耗时（秒）和文件夹/秒
+        """
+        return dict(self.stats, elapsed_seconds=self.elapsed,
+                    directories_per_second=self.directories_per_second())
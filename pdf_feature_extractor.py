@@ -9,16 +9,28 @@ import os
 import sys
 import json
 import argparse
-import io
 from datetime import datetime
 from pathlib import Path
 import cv2
 import numpy as np
-from PIL import Image
-import fitz  # PyMuPDF
 import logging
 from typing import Dict, Any, Optional, Union
 
+from line_scanner import find_projection_lines, longest_row_runs, run_thickness
+from component_lines import find_component_lines
+from skew_lines import (DOWNSAMPLE, downsample_mask, estimate_skew, refine_skew, shear_band, shear_offsets,
+                        skew_candidate_rows)
+from hough_lines import find_hough_lines
+from page_raster import PageRaster, render_raster
+from color_stats import count_colored_pixels, contrast_from_histogram, statistics_from_histograms
+from pdf_renderer import render_page, render_band, DEFAULT_SCALE
+from pdf_session import PDFSession
+from render_cache import RenderCache
+from feature_cache import FeatureCache
+from vector_lines import find_horizontal_rules, is_image_only_page, page_pixel_size
+from scan_manifest import ScanManifest, config_fingerprint
+from result_sink import JsonlResultSink, FORMAT_FEATURE_EXTRACTOR
+
 # 配置日志
 # 获取项目根目录
 project_root = Path(__file__).parent
@@ -35,11 +47,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 第二特征默认使用的长横线检测器（见LINE_DETECTORS）
+DEFAULT_LINE_DETECTOR = 'adaptive'
+
 
 class PDFFeatureExtractor:
     """PDF特征提取器"""
     
-    def __init__(self, template_path="templates/mb.png", data_dir="data", config_file=None):
+    # 检测算法版本：修改检测逻辑后需递增，使增量扫描清单中的旧结果失效
+    ALGORITHM_VERSION = "1.3"
+    
+    # 快速判定模式的检查顺序（按计算代价从低到高）
+    FAST_CHECK_ORDER = ('brightness', 'white_bg', 'black_text', 'contrast', 'colored_text', 'second_feature')
+    
+    # 分辨率升级模式的低分辨率渲染倍率
+    DEFAULT_COARSE_SCALE = 0.75
+    
+    # 分辨率升级模式下各检查的判定余量：(明确通过所需超出阈值的量, 明确不通过所需低于阈值的量)
+    # 低分辨率下细笔画被抗锯齿为灰色，白色背景占比、黑色文字占比和对比度只会偏低，
+    # 因此低于阈值时不能据此判定（None），只能升级到2倍渲染后确认
+    COARSE_CHECK_MARGINS = {
+        'brightness': (1.0, 1.0),
+        'white_bg': (0.0, None),
+        'black_text': (0.0, None),
+        'contrast': (0.5, None),
+        'colored_text': (0.01, 0.01),
+        'second_feature': (0.02, None)
+    }
+    
+    # 条带确认：提示行上下各扩展的容差（2倍渲染下的像素）
+    BAND_TOLERANCE_PX = 8
+    
+    # 由低分辨率图像生成条带提示：灰度低于该值的像素占一行宽度的比例达到BAND_HINT_MIN_RATIO即视为候选行
+    # （2倍渲染下灰度<80的单像素细线缩小到0.75倍后灰度仍低于190左右，阈值取得宽松以免漏掉候选行）
+    BAND_HINT_GRAY = 200
+    BAND_HINT_MIN_RATIO = 0.60
+    
+    # 形态学增强的条带：黑色像素达到该比例宽度、但最长连续线段不足70%宽度的行视为断裂长横线的候选行
+    # （文字行的黑色像素一般不超过宽度的30%，形态学增强只在候选行附近进行）
+    FRAGMENTED_RULE_MIN_FILL = 0.35
+    
+    def __init__(self, template_path="templates/mb.png", data_dir="data", config_file=None, render_cache=None,
+                 feature_cache=None, line_detector=DEFAULT_LINE_DETECTOR):
         """
         初始化特征提取器
         
@@ -47,7 +96,14 @@ class PDFFeatureExtractor:
             template_path: 标准模板图片路径
             data_dir: 特征数据保存目录
             config_file: 配置文件路径（可选）
+            render_cache: 页面渲染磁盘缓存（RenderCache，可选），pdf_to_images/iter_page_images渲染前先查找缓存
+            feature_cache: 页面特征缓存（FeatureCache，可选），保存与颜色阈值无关的测量结果，
+                           阈值调整后由缓存重新判定，不再重新渲染
+            line_detector: 第二特征的长横线检测器名称（见LINE_DETECTORS，默认为adaptive）
         """
+        if line_detector not in LINE_DETECTORS:
+            raise ValueError(f"不支持的长横线检测器: {line_detector}")
+        
         self.template_path = template_path
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
@@ -55,6 +111,20 @@ class PDFFeatureExtractor:
         # 加载颜色阈值配置
         self.color_thresholds = self._load_color_thresholds(config_file)
         
+        self.render_cache = render_cache
+        self.feature_cache = feature_cache
+        self.line_detector = line_detector
+        
+        # 长横线检测的行扫描统计（投影预筛选剪除的行数等）
+        self.line_scan_stats = {'masks_scanned': 0, 'rows_total': 0, 'rows_pruned': 0, 'rows_scanned': 0}
+        
+        # 形态学增强的结构元素（按宽度和倍率缓存）和复用的运算缓冲区
+        self._morphology_kernels = {}
+        self._morphology_buffers = None
+        
+        # 分辨率升级统计（低分辨率分析的页数、升级到2倍渲染的页数）
+        self.escalation_stats = {'pages': 0, 'escalated': 0, 'band_confirmed': 0}
+        
         # 设置日志
         self._setup_logging()
     
@@ -238,167 +308,515 @@ class PDFFeatureExtractor:
                 - "last_n": 从后面起的N页
             
         Returns:
-            list: 图片数组列表
+            list: 图片数组列表（所有页面同时保存在内存中，逐页处理请使用iter_page_images）
         """
         try:
-            doc = fitz.open(pdf_path)
             images = []
-            total_pages = len(doc)
-            
-            # 根据页面选择模式确定要转换的页面
-            if page_mode == "first_page":
-                pages_to_convert = 1
-                page_indices = [0]
-                logger.info(f"正在转换PDF '{pdf_path}' 的第1页")
-            elif page_mode == "all_pages":
-                pages_to_convert = total_pages
-                page_indices = list(range(total_pages))
-                logger.info(f"正在转换PDF '{pdf_path}' 的所有 {total_pages} 页")
-            elif page_mode == "last_n":
-                pages_to_convert = min(total_pages, max_pages)
-                start_page = max(0, total_pages - pages_to_convert)
-                page_indices = list(range(start_page, total_pages))
-                logger.info(f"正在转换PDF '{pdf_path}' 的后 {pages_to_convert} 页（从第{start_page + 1}页开始）")
-            else:  # "first_n" 默认模式
-                pages_to_convert = min(total_pages, max_pages)
-                page_indices = list(range(pages_to_convert))
-                logger.info(f"正在转换PDF '{pdf_path}' 的前 {pages_to_convert} 页")
-            
-            for page_num in page_indices:
-                page = doc.load_page(page_num)
-                # 设置较高的分辨率以获得更好的图像质量
-                mat = fitz.Matrix(2.0, 2.0)  # 2倍放大
-                pix = page.get_pixmap(matrix=mat)
-                
-                # 转换为PIL图像
-                img_data = pix.tobytes("ppm")
-                img = Image.open(io.BytesIO(img_data))
-                
-                # 转换为numpy数组
-                img_array = np.array(img)
-                images.append(img_array)
-                
-                logger.info(f"已转换第 {page_num + 1} 页，图像尺寸: {img_array.shape}")
-            
-            doc.close()
+            with self.iter_page_images(pdf_path, max_pages, page_mode) as page_images:
+                for page_number, img_array in page_images:
+                    images.append(img_array)
+                    logger.info(f"已转换第 {page_number} 页，图像尺寸: {img_array.shape}")
             return images
             
         except Exception as e:
             logger.error(f"PDF转换失败 '{pdf_path}': {str(e)}")
             return []
     
-    def analyze_color_features(self, image):
+    def iter_page_images(self, pdf_path, max_pages=5, page_mode="first_n", session=None):
+        """
+        逐页将PDF页面转换为图片（惰性渲染，同一时刻只持有一页图像）
+        
+        Args:
+            pdf_path: PDF文件路径
+            max_pages: 最大页数
+            page_mode: 页面选择模式（见pdf_to_images）
+            session: 已打开的PDFSession（可选，提供时复用该会话且迭代结束后不关闭）
+            
+        Returns:
+            PageImageIterator: 依次产生 (页码, 图像数组) 的迭代器，page_numbers为将要渲染的页码列表；
+                               未提供session时，迭代结束或调用close()时关闭文档
+        """
+        owns_session = session is None
+        if owns_session:
+            session = PDFSession(pdf_path, render_cache=self.render_cache)
+        # 根据页面选择模式确定要转换的页面
+        page_indices = self._select_page_indices(pdf_path, session.page_count, max_pages, page_mode)
+        # 设置较高的分辨率以获得更好的图像质量（2倍放大），直接渲染为numpy数组
+        page_images = session.iter_pages([index + 1 for index in page_indices], scale=DEFAULT_SCALE)
+        page_images.close_doc = owns_session
+        return page_images
+    
+    def _select_page_indices(self, pdf_path, total_pages, max_pages, page_mode):
+        """
+        根据页面选择模式确定要处理的页面索引
+        
+        Args:
+            pdf_path: PDF文件路径（用于日志）
+            total_pages: PDF总页数
+            max_pages: 最大页数
+            page_mode: 页面选择模式（见pdf_to_images）
+            
+        Returns:
+            list: 页面索引列表（从0开始）
+        """
+        if page_mode == "first_page":
+            logger.info(f"正在转换PDF '{pdf_path}' 的第1页")
+            return [0] if total_pages > 0 else []
+        if page_mode == "all_pages":
+            logger.info(f"正在转换PDF '{pdf_path}' 的所有 {total_pages} 页")
+            return list(range(total_pages))
+        if page_mode == "last_n":
+            pages_to_convert = min(total_pages, max_pages)
+            start_page = max(0, total_pages - pages_to_convert)
+            logger.info(f"正在转换PDF '{pdf_path}' 的后 {pages_to_convert} 页（从第{start_page + 1}页开始）")
+            return list(range(start_page, total_pages))
+        # "first_n" 默认模式
+        pages_to_convert = min(total_pages, max_pages)
+        logger.info(f"正在转换PDF '{pdf_path}' 的前 {pages_to_convert} 页")
+        return list(range(pages_to_convert))
+    
+    def analyze_page(self, page, verdict_mode="full", resolution_mode="full",
+                     coarse_scale=None, escalation_margin=1.0):
+        """
+        分析单个PDF页面的特征（负责渲染）
+        
+        Args:
+            page: fitz.Page对象
+            verdict_mode: 判定模式（见analyze_color_features）
+            resolution_mode: 分辨率模式
+                - "full": 直接以2倍渲染分析（默认）
+                - "escalate": 先以coarse_scale低倍率渲染分析，各项检查都能明确判定时直接采用，
+                              有指标落在阈值余量内（或低分辨率下无法可靠判定）时再以2倍渲染
+            coarse_scale: 低分辨率渲染倍率（默认DEFAULT_COARSE_SCALE）
+            escalation_margin: 余量缩放系数，乘以COARSE_CHECK_MARGINS中的各项余量（越大越保守）
+            
+        Returns:
+            dict: 颜色特征分析结果（escalate模式下附带render_scale、escalated等字段）
+        """
+        if resolution_mode not in ("full", "escalate"):
+            raise ValueError(f"不支持的分辨率模式: {resolution_mode}")
+        
+        uncertain_checks = []
+        if resolution_mode == "escalate":
+            coarse_scale = coarse_scale or self.DEFAULT_COARSE_SCALE
+            coarse = PageRaster(render_page(page, scale=coarse_scale), scale=coarse_scale)
+            features = self.analyze_color_features(coarse, verdict_mode)
+            self.escalation_stats['pages'] += 1
+            
+            if features is not None:
+                decided, uncertain_checks = self._coarse_verdict(features, escalation_margin)
+                if decided:
+                    features['render_scale'] = coarse_scale
+                    features['escalated'] = False
+                    return features
+                
+                # 颜色检查都已明确通过、只有长横线不确定时，只以2倍渲染候选行附近的条带来确认
+                if uncertain_checks == ['second_feature'] and self._confirm_lines_in_bands(page, coarse, features):
+                    features['render_scale'] = coarse_scale
+                    features['escalated'] = False
+                    self.escalation_stats['band_confirmed'] += 1
+                    return features
+            else:
+                uncertain_checks = ['analysis_failed']
+            
+            self.escalation_stats['escalated'] += 1
+            logger.debug(f"低分辨率结果不确定（{', '.join(uncertain_checks)}），以{DEFAULT_SCALE}倍重新渲染")
+        
+        features = self.analyze_color_features(PageRaster(render_page(page, scale=DEFAULT_SCALE)), verdict_mode)
+        if resolution_mode == "escalate" and features is not None:
+            features['render_scale'] = DEFAULT_SCALE
+            features['escalated'] = True
+            features['escalation_reasons'] = uncertain_checks
+        return features
+    
+    def _confirm_lines_in_bands(self, page, coarse, features):
+        """
+        用低分辨率图像给出的候选行提示，以2倍渲染条带确认两条长横线
+        
+        只采用确认成功的结果：提示覆盖了所有可能构成长横线的行，条带内检测到的线条与整页检测一致；
+        未确认时返回False，由调用方整页重新渲染。
+        
+        Args:
+            page: fitz.Page对象
+            coarse: 低分辨率PageRaster
+            features: 低分辨率下的颜色特征字典（确认成功时写入条带检测结果）
+            
+        Returns:
+            bool: 是否确认成功
+        """
+        band_hints, band_tolerance = self._coarse_line_hints(coarse)
+        if not band_hints:
+            return False
+        
+        result = self.detect_mb_second_feature_in_bands(page, band_hints, band_tolerance=band_tolerance)
+        if not result['has_second_feature']:
+            return False
+        
+        features['second_feature'] = result
+        if features.get('failed_check') == 'second_feature':
+            features['failed_check'] = None
+        return True
+    
+    def _coarse_line_hints(self, raster, scale=DEFAULT_SCALE):
+        """
+        由低分辨率图像生成长横线条带提示
+        
+        Args:
+            raster: 低分辨率PageRaster
+            scale: 条带渲染倍率（提示换算到该倍率下的像素坐标）
+            
+        Returns:
+            tuple: (提示行列表, 提示的容差像素数)
+        """
+        ratio = scale / raster.scale
+        rows = np.nonzero(raster.row_projection(self.BAND_HINT_GRAY) >= raster.width * self.BAND_HINT_MIN_RATIO)[0]
+        band_hints = [int((row + 0.5) * ratio) for row in rows]
+        band_tolerance = int(np.ceil(ratio)) + self.BAND_TOLERANCE_PX
+        return band_hints, band_tolerance
+    
+    def _coarse_check_outcome(self, check_name, features, escalation_margin=1.0):
+        """
+        判断低分辨率下单项检查能否明确判定
+        
+        Args:
+            check_name: 检查名称（见FAST_CHECK_ORDER）
+            features: 低分辨率下的颜色特征字典
+            escalation_margin: 余量缩放系数
+            
+        Returns:
+            str: "pass"（明确通过）、"fail"（明确不通过），无法判定时返回None
+        """
+        pass_margin, fail_margin = self.COARSE_CHECK_MARGINS[check_name]
+        pass_margin *= escalation_margin
+        
+        if check_name == 'second_feature':
+            # 细线在低分辨率下可能淡化消失，只有明确检测到两条线时才采用
+            second_feature = features.get('second_feature')
+            if second_feature and second_feature['has_second_feature'] and \
+                    min(second_feature['length_ratio_1'], second_feature['length_ratio_2']) >= 0.70 + pass_margin and \
+                    second_feature['line_distance_ratio'] >= 0.45 + pass_margin:
+                return "pass"
+            return None
+        
+        value, threshold, higher_is_better = self._check_metric(check_name, features)
+        if value is None:
+            return None
+        delta = value - threshold if higher_is_better else threshold - value
+        if delta >= pass_margin:
+            return "pass"
+        if fail_margin is not None and delta < -fail_margin * escalation_margin:
+            return "fail"
+        return None
+    
+    def _coarse_verdict(self, features, escalation_margin=1.0):
+        """
+        判断低分辨率结果能否直接采用
+        
+        任一检查明确不通过，或全部检查明确通过时可以直接采用。
+        
+        Args:
+            features: 低分辨率下的颜色特征字典
+            escalation_margin: 余量缩放系数
+            
+        Returns:
+            tuple: (能否直接采用, 无法判定的检查列表)
+        """
+        outcomes = {check_name: self._coarse_check_outcome(check_name, features, escalation_margin)
+                    for check_name in self.FAST_CHECK_ORDER}
+        uncertain_checks = [check_name for check_name, outcome in outcomes.items() if outcome is None]
+        if "fail" in outcomes.values() or not uncertain_checks:
+            return True, uncertain_checks
+        return False, uncertain_checks
+    
+    def get_escalation_stats(self) -> Dict[str, Union[int, float]]:
+        """
+        获取分辨率升级统计
+        
+        Returns:
+            Dict[str, Union[int, float]]: 低分辨率分析的页数、升级到2倍整页渲染的页数、
+                                          以条带渲染确认长横线的页数及升级率
+        """
+        pages = self.escalation_stats['pages']
+        escalated = self.escalation_stats['escalated']
+        return {'pages': pages, 'escalated': escalated, 'band_confirmed': self.escalation_stats['band_confirmed'],
+                'escalation_rate': escalated / pages if pages else 0.0}
+    
+    def reset_escalation_stats(self) -> None:
+        """重置分辨率升级统计"""
+        for key in self.escalation_stats:
+            self.escalation_stats[key] = 0
+    
+    def analyze_color_features(self, image, verdict_mode="full"):
         """
         分析图像的颜色特征
         
         Args:
-            image: 图像数组 (numpy array)
+            image: 图像数组 (numpy array) 或 PageRaster
+            verdict_mode: 判定模式
+                - "full": 计算全部特征（默认，用于诊断）
+                - "fast": 按代价从低到高逐项检查，遇到第一个不通过的检查即停止
             
         Returns:
             dict: 颜色特征分析结果
         """
+        if verdict_mode == "fast":
+            return self._analyze_color_features_fast(image)
+        
         try:
-            # 转换为RGB（如果是BGR）
-            if len(image.shape) == 3 and image.shape[2] == 3:
-                # 假设输入是RGB格式
-                rgb_image = image
-            else:
-                rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            # 转换为RGB（如果是BGR），派生数组在同一页面的各项检测间共享
+            raster = PageRaster.from_image(image)
+            height, width = raster.height, raster.width
             
-            height, width = rgb_image.shape[:2]
-            total_pixels = height * width
+            # 单次遍历得到白色/黑色/彩色像素数量、RGB均值、灰度直方图和对比度
+            stats = raster.color_statistics(self.color_thresholds['white_bg_min'],
+                                            self.color_thresholds['black_text_max'])
             
-            # 计算各颜色通道的平均值
-            mean_colors = np.mean(rgb_image.reshape(-1, 3), axis=0)
+            # 检测第二特征（mb.png模板的两条长黑线）
+            second_feature_result = self.detect_mb_second_feature(raster)
             
-            # 分析白色背景像素
-            white_mask = np.all(rgb_image >= self.color_thresholds['white_bg_min'], axis=2)
-            white_pixels = np.sum(white_mask)
-            white_ratio = white_pixels / total_pixels
+            return self._build_color_features(stats, width, height, second_feature_result)
             
-            # 分析黑色文字像素（严格的黑色）
-            black_mask = np.all(rgb_image <= self.color_thresholds['black_text_max'], axis=2)
-            black_pixels = np.sum(black_mask)
-            black_ratio = black_pixels / total_pixels
+        except Exception as e:
+            logger.error(f"颜色特征分析失败: {str(e)}")
+            return None
+    
+    def _build_color_features(self, stats, width, height, second_feature_result):
+        """
+        由颜色统计和第二特征检测结果组装特征字典
+        
+        Args:
+            stats: 颜色统计结果（见color_stats.compute_color_statistics）
+            width, height: 图像尺寸
+            second_feature_result: 第二特征检测结果
             
-            # 检测彩色文字（红色、蓝色、绿色等非黑白色）
-            colored_text_pixels = self._detect_colored_text(rgb_image)
-            colored_text_ratio = colored_text_pixels / total_pixels
+        Returns:
+            dict: 颜色特征字典
+        """
+        total_pixels = stats['total_pixels']
+        
+        # 计算各颜色通道的平均值
+        mean_colors = stats['mean_rgb']
+        
+        # 分析白色背景像素
+        white_ratio = stats['white_pixels'] / total_pixels
+        
+        # 分析黑色文字像素（严格的黑色）
+        black_ratio = stats['black_pixels'] / total_pixels
+        
+        # 检测彩色文字（红色、蓝色、绿色等非黑白色）
+        colored_text_ratio = stats['colored_text_pixels'] / total_pixels
+        
+        # 分析灰度分布
+        hist = stats['histogram'].astype(np.float32)
+        
+        # 计算对比度（标准差，由直方图得到）
+        contrast = stats['contrast']
+        
+        return {
+            'mean_rgb': mean_colors.tolist(),
+            'white_bg_ratio': float(white_ratio),
+            'black_text_ratio': float(black_ratio),
+            'colored_text_ratio': float(colored_text_ratio),  # 新增：彩色文字比例
+            'contrast': float(contrast),
+            'image_size': [width, height],
+            'total_pixels': total_pixels,
+            'histogram': hist.flatten().tolist(),
+            'second_feature': second_feature_result  # 新增：第二特征检测结果
+        }
+    
+    def measure_page(self, image):
+        """
+        测量页面与颜色阈值无关的原始数据（供特征缓存保存）
+        
+        Args:
+            image: 图像数组 (numpy array) 或 PageRaster
             
-            # 分析灰度分布
-            gray_image = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2GRAY)
-            hist = cv2.calcHist([gray_image], [0], None, [256], [0, 256])
+        Returns:
+            dict: 测量结果
+                - image_size: [宽, 高]
+                - histograms: 通道直方图（见color_stats.compute_channel_histograms）
+                - second_feature: 第二特征检测结果（长横线检测不使用颜色阈值）
+        """
+        raster = PageRaster.from_image(image)
+        return {
+            'image_size': [raster.width, raster.height],
+            'histograms': raster.channel_histograms(),
+            'second_feature': self.detect_mb_second_feature(raster)
+        }
+    
+    def features_from_measurements(self, measurements):
+        """
+        在当前颜色阈值下由测量结果计算颜色特征（与analyze_color_features的完整模式结果一致）
+        
+        Args:
+            measurements: 测量结果（见measure_page）
             
-            # 计算对比度（标准差）
-            contrast = np.std(gray_image)
+        Returns:
+            dict: 颜色特征分析结果
+        """
+        stats = statistics_from_histograms(measurements['histograms'],
+                                           self.color_thresholds['white_bg_min'],
+                                           self.color_thresholds['black_text_max'])
+        width, height = measurements['image_size']
+        return self._build_color_features(stats, width, height, measurements['second_feature'])
+    
+    @classmethod
+    def feature_fingerprint(cls, line_detector=DEFAULT_LINE_DETECTOR):
+        """
+        特征缓存的测量方式指纹（不含颜色阈值，阈值变化时缓存仍然有效）
+        
+        Args:
+            line_detector: 第二特征的长横线检测器名称（缓存中保存了第二特征的检测结果）
+        
+        Returns:
+            str: 指纹（sha256十六进制字符串）
+        """
+        return config_fingerprint(None, cls.ALGORITHM_VERSION, measurement='channel_histograms',
+                                  render_scale=DEFAULT_SCALE, line_detector=line_detector)
+    
+    def _analyze_color_features_fast(self, image):
+        """
+        快速判定模式的颜色特征分析（级联提前退出）
+        
+        检查按计算代价从低到高进行（FAST_CHECK_ORDER），第一个检查不通过即停止，
+        后续特征字段保持为None，并在skipped_checks中列出被跳过的检查。
+        
+        Args:
+            image: 图像数组 (numpy array) 或 PageRaster
             
-            # 检测第二特征（mb.png模板的两条长黑线）
-            second_feature_result = self.detect_mb_second_feature(image)
+        Returns:
+            dict: 颜色特征分析结果（可能只包含部分特征）
+        """
+        try:
+            raster = PageRaster.from_image(image)
+            height, width = raster.height, raster.width
+            total_pixels = raster.total_pixels
             
             features = {
-                'mean_rgb': mean_colors.tolist(),
-                'white_bg_ratio': float(white_ratio),
-                'black_text_ratio': float(black_ratio),
-                'colored_text_ratio': float(colored_text_ratio),  # 新增：彩色文字比例
-                'contrast': float(contrast),
+                'mean_rgb': None,
+                'white_bg_ratio': None,
+                'black_text_ratio': None,
+                'colored_text_ratio': None,
+                'contrast': None,
                 'image_size': [width, height],
                 'total_pixels': total_pixels,
-                'histogram': hist.flatten().tolist(),
-                'second_feature': second_feature_result  # 新增：第二特征检测结果
+                'histogram': None,
+                'second_feature': None,
+                'verdict_mode': 'fast',
+                'failed_check': None,
+                'skipped_checks': []
+            }
+            
+            def compute_brightness():
+                features['mean_rgb'] = raster.mean_rgb.tolist()
+            
+            def compute_white_bg():
+                white_mask = raster.white_mask(self.color_thresholds['white_bg_min'])
+                features['white_bg_ratio'] = float(np.count_nonzero(white_mask) / total_pixels)
+            
+            def compute_black_text():
+                black_mask = raster.black_mask(self.color_thresholds['black_text_max'])
+                features['black_text_ratio'] = float(np.count_nonzero(black_mask) / total_pixels)
+            
+            def compute_contrast():
+                gray_image = raster.gray
+                hist = cv2.calcHist([gray_image], [0], None, [256], [0, 256])
+                features['histogram'] = hist.flatten().tolist()
+                features['contrast'] = float(contrast_from_histogram(hist))
+            
+            def compute_colored_text():
+                features['colored_text_ratio'] = float(self._detect_colored_text(raster) / total_pixels)
+            
+            def compute_second_feature():
+                features['second_feature'] = self.detect_mb_second_feature(raster)
+            
+            stages = {
+                'brightness': compute_brightness,
+                'white_bg': compute_white_bg,
+                'black_text': compute_black_text,
+                'contrast': compute_contrast,
+                'colored_text': compute_colored_text,
+                'second_feature': compute_second_feature
             }
             
+            for index, check_name in enumerate(self.FAST_CHECK_ORDER):
+                stages[check_name]()
+                if not self._check_passed(check_name, features):
+                    features['failed_check'] = check_name
+                    features['skipped_checks'] = list(self.FAST_CHECK_ORDER[index + 1:])
+                    logger.debug(f"快速判定: 检查 {check_name} 未通过，跳过 {features['skipped_checks']}")
+                    break
+            
             return features
             
         except Exception as e:
             logger.error(f"颜色特征分析失败: {str(e)}")
             return None
     
+    def _check_passed(self, check_name, features):
+        """
+        判断单项检查是否通过
+        
+        Args:
+            check_name: 检查名称（见FAST_CHECK_ORDER）
+            features: 颜色特征字典
+            
+        Returns:
+            bool: 是否通过（特征未计算时视为不通过）
+        """
+        if check_name == 'second_feature':
+            second_feature = features.get('second_feature')
+            return bool(second_feature) and second_feature['has_second_feature']
+        
+        value, threshold, higher_is_better = self._check_metric(check_name, features)
+        if value is None:
+            return False
+        return value >= threshold if higher_is_better else value <= threshold
+    
+    def _check_metric(self, check_name, features):
+        """
+        获取颜色检查对应的特征值和阈值
+        
+        Args:
+            check_name: 颜色检查名称（brightness、white_bg、black_text、contrast、colored_text）
+            features: 颜色特征字典
+            
+        Returns:
+            tuple: (特征值或None, 阈值, 是否越大越好)
+        """
+        if check_name == 'brightness':
+            mean_rgb = features.get('mean_rgb')
+            value = None if mean_rgb is None else sum(mean_rgb) / len(mean_rgb)
+            return value, self.color_thresholds['brightness_min'], True
+        if check_name == 'white_bg':
+            return features.get('white_bg_ratio'), self.color_thresholds['bg_ratio_min'], True
+        if check_name == 'black_text':
+            return features.get('black_text_ratio'), self.color_thresholds['text_ratio_min'], True
+        if check_name == 'contrast':
+            return features.get('contrast'), self.color_thresholds['contrast_min'], True
+        if check_name == 'colored_text':
+            return features.get('colored_text_ratio'), self.color_thresholds['colored_text_max'], False
+        raise ValueError(f"未知的检查项: {check_name}")
+    
     def _detect_colored_text(self, rgb_image):
         """
         检测彩色文字像素（红色、蓝色、绿色等非黑白色）
         
         Args:
-            rgb_image: RGB图像数组
+            rgb_image: RGB图像数组或PageRaster
             
         Returns:
             int: 彩色文字像素数量
         """
-        r, g, b = rgb_image[:, :, 0], rgb_image[:, :, 1], rgb_image[:, :, 2]
+        raster = PageRaster.from_image(rgb_image)
         
         # 排除白色背景（RGB都很高）
-        white_mask = (r >= self.color_thresholds['white_bg_min']) & \
-                     (g >= self.color_thresholds['white_bg_min']) & \
-                     (b >= self.color_thresholds['white_bg_min'])
-        
-        # 排除黑色/灰色文字（RGB都很低且相近）
-        max_rgb = np.maximum(np.maximum(r, g), b)
-        min_rgb = np.minimum(np.minimum(r, g), b)
-        
-        # 黑色/灰色：最大RGB值小于阈值，且RGB通道差异小
-        grayscale_mask = (max_rgb <= self.color_thresholds['black_text_max'] + 50) & \
-                        (max_rgb - min_rgb <= 20)  # RGB通道差异小于20认为是灰度
-        
-        # 检测明显的彩色文字
-        colored_text_pixels = 0
-        
-        # 检测红色文字（红色分量明显大于绿色和蓝色）
-        red_text_mask = (r > g + 50) & (r > b + 50) & (r > 120) & ~white_mask
-        colored_text_pixels += np.sum(red_text_mask)
-        
-        # 检测蓝色文字（蓝色分量明显大于红色和绿色）
-        blue_text_mask = (b > r + 50) & (b > g + 50) & (b > 120) & ~white_mask
-        colored_text_pixels += np.sum(blue_text_mask)
-        
-        # 检测绿色文字（绿色分量明显大于红色和蓝色）
-        green_text_mask = (g > r + 50) & (g > b + 50) & (g > 120) & ~white_mask
-        colored_text_pixels += np.sum(green_text_mask)
+        white_mask = raster.white_mask(self.color_thresholds['white_bg_min'])
         
-        # 检测其他明显的彩色（RGB通道差异很大且不是白色背景）
-        rgb_range = max_rgb - min_rgb
-        high_variance_mask = (rgb_range > 60) & ~white_mask & ~grayscale_mask & (max_rgb > 100)
-        colored_text_pixels += np.sum(high_variance_mask)
-        
-        return colored_text_pixels
+        # 统计红、蓝、绿及其他明显彩色的像素（排除黑色/灰色文字）
+        return count_colored_pixels(raster.red, raster.green, raster.blue,
+                                    raster.max_channel, raster.min_channel,
+                                    ~white_mask, self.color_thresholds['black_text_max'])
     
     def _merge_nearby_lines(self, horizontal_lines, width, height):
         """
@@ -520,30 +938,55 @@ class PDFFeatureExtractor:
         自适应检测长横线
         不依赖固定位置，而是分析整个图像找出最主要的两条长横线
         包含形态学增强以处理碎片化的线条
+        
+        Args:
+            image: RGB图像数组或PageRaster
         """
-        height, width = image.shape[:2]
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        raster = PageRaster.from_image(image)
+        height, width = raster.height, raster.width
+        pixel_factor = raster.pixel_factor
         
         # 创建黑色区域的掩码
-        black_mask = gray < 80
+        black_mask = raster.dark_mask(80)
         
         logger.debug(f"自适应检测长横线，图像尺寸: {width}x{height}")
-        logger.debug(f"原始黑色像素数量: {np.sum(black_mask)}")
+        logger.debug(f"原始黑色像素数量: {int(raster.row_projection(80).sum())}")
         
-        # 首先尝试基本检测
-        basic_lines = self._detect_lines_from_mask(black_mask, width, height)
+        # 首先尝试基本检测（行投影在PageRaster中缓存）
+        row_counts = raster.row_projection(80)
+        basic_potential = self._find_potential_lines(black_mask, width, height, row_counts, pixel_factor)
+        basic_lines = self._select_main_lines([dict(line) for line in basic_potential], width, height)
         
         if len(basic_lines) >= 2:
             logger.debug("基本检测成功，返回结果")
             return basic_lines
         
-        logger.debug("基本检测不足，应用形态学增强")
+        # 倾斜的扫描件：长横线跨越多行，沿估计的页面倾斜角重新检测（无需形态学增强）
+        skew_angle, skew_potential = self._find_skewed_lines(black_mask, width, height, pixel_factor)
+        if skew_potential:
+            skewed_lines = self._select_main_lines(skew_potential, width, height)
+            if len(skewed_lines) >= 2:
+                logger.debug(f"页面倾斜{skew_angle:.2f}°，沿倾斜角检测到 {len(skewed_lines)} 条线")
+                return skewed_lines
+        
+        bands = self._fragmented_rule_bands(black_mask, row_counts, width, height, pixel_factor)
+        if not bands:
+            logger.debug("基本检测不足，行投影中没有断裂长横线的候选行，跳过形态学增强")
+            return basic_lines
         
-        # 应用形态学操作连接断开的线段
-        enhanced_mask = self._enhance_lines_morphology(black_mask, width)
+        logger.debug(f"基本检测不足，在 {len(bands)} 个条带内应用形态学增强")
         
-        # 在增强后的掩码上重新检测
-        enhanced_lines = self._detect_lines_from_mask(enhanced_mask, width, height)
+        # 条带之外沿用基本检测的潜在长横线，条带内在增强后的掩码上重新检测
+        potential_lines = [line for line in basic_potential
+                           if not any(core_start <= line['y_center'] < core_end for _, _, (core_start, core_end) in bands)]
+        for band_start, band_end, (core_start, core_end) in bands:
+            # 应用形态学操作连接断开的线段
+            enhanced_mask = self._enhance_lines_morphology(black_mask[band_start:band_end], width, pixel_factor)
+            potential_lines.extend(self._find_potential_lines(
+                enhanced_mask, width, height, pixel_factor=pixel_factor, y_offset=band_start,
+                row_limits=(core_start - band_start, core_end - band_start)
+            ))
+        enhanced_lines = self._select_main_lines(potential_lines, width, height)
         
         if len(enhanced_lines) >= len(basic_lines):
             logger.debug(f"形态学增强有效，检测到 {len(enhanced_lines)} 条线")
@@ -552,92 +995,328 @@ class PDFFeatureExtractor:
             logger.debug("形态学增强未改善，使用基本检测结果")
             return basic_lines
     
-    def _enhance_lines_morphology(self, black_mask, width):
+    def _find_skewed_lines(self, black_mask, width, height, pixel_factor=1.0):
+        """
+        沿页面倾斜角查找潜在长横线（不旋转整页图像）
+        
+        在降采样掩码上估计页面倾斜角，沿该角度找出候选行（见skew_lines.skew_candidate_rows）；
+        在最明显的候选条带内细化倾斜角后错切各候选条带，使长横线落在同一行上，再按行扫描检测（长度、线宽规则不变）。
+        页面没有倾斜（估计角为0°）时直接返回。
+        
+        Args:
+            black_mask: 整页黑色像素掩码
+            width, height: 图像尺寸
+            pixel_factor: 渲染倍率相对2倍基准的比例
+            
+        Returns:
+            tuple: (页面倾斜角（度，有候选条带时为细化后的角度）, 潜在长横线列表（坐标为整页像素坐标，angle为倾斜角）)
+        """
+        small = downsample_mask(black_mask, DOWNSAMPLE)
+        skew_angle, profile, base = estimate_skew(small)
+        if skew_angle == 0:
+            logger.debug("页面没有倾斜，跳过沿倾斜角的检测")
+            return skew_angle, []
+        
+        # 降采样第s行覆盖原图第 s*DOWNSAMPLE 到 s*DOWNSAMPLE+DOWNSAMPLE-1 行
+        hint_rows = skew_candidate_rows(small, skew_angle, profile, base)
+        logger.debug(f"估计页面倾斜角: {skew_angle:.2f}°，候选行 {len(hint_rows)} 个")
+        
+        margin = self._line_width_search_range(height, pixel_factor) + 1
+        tolerance = 2 * DOWNSAMPLE
+        cores = []
+        for hint in hint_rows.tolist():
+            core_start, core_end = hint - tolerance, hint + DOWNSAMPLE + tolerance
+            if cores and core_start <= cores[-1][1] + 2 * margin:
+                cores[-1][1] = core_end
+            else:
+                cores.append([core_start, core_end])
+        
+        if not cores:
+            return skew_angle, []
+        
+        # 倾斜角对整页相同：只在投影最高的候选行所在条带内细化一次
+        strongest = int(hint_rows[int(np.argmax(profile[hint_rows // DOWNSAMPLE - base]))])
+        core_start, core_end = next(core for core in cores if core[0] <= strongest < core[1])
+        coarse_offsets = shear_offsets(width, skew_angle)
+        angle = refine_skew(shear_band(black_mask, coarse_offsets, core_start - margin, core_end + margin),
+                            coarse_offsets, core_start - margin, skew_angle)
+        offsets = shear_offsets(width, angle)
+        
+        potential_lines = []
+        for core_start, core_end in cores:
+            # 按细化后的角度错切候选条带（错切行号为第0列处的行号）
+            band_start, band_end = core_start - margin, core_end + margin
+            sheared = shear_band(black_mask, offsets, band_start, band_end)
+            for line in self._find_potential_lines(sheared, width, height, pixel_factor=pixel_factor,
+                                                   y_offset=band_start, row_limits=(margin, margin + core_end - core_start)):
+                x1, _, x2, _ = line['coords']
+                row = int(line['y_center'])
+                y_center = row + int(offsets[(x1 + x2) // 2])
+                if not 0 <= y_center < height:
+                    continue
+                line.update({
+                    'coords': (x1, row + int(offsets[x1]), x2, row + int(offsets[x2])),
+                    'y_center': float(y_center),
+                    'angle': angle,
+                    'y_percent': y_center / height * 100
+                })
+                potential_lines.append(line)
+        
+        logger.debug(f"沿倾斜角发现 {len(potential_lines)} 条潜在长横线")
+        return angle, potential_lines
+    
+    def _fragmented_rule_bands(self, black_mask, row_counts, width, height, pixel_factor=1.0):
+        """
+        由行投影找出可能包含断裂长横线的条带
+        
+        黑色像素达到FRAGMENTED_RULE_MIN_FILL宽度、但最长连续线段不足70%宽度的行作为提示行，
+        按_band_layout合并为条带；条带上下再保留形态学运算的影响范围，使候选范围内的增强结果与整页增强一致。
+        
+        Args:
+            black_mask: 黑色像素掩码
+            row_counts: 掩码每行的黑色像素数量（行投影）
+            width, height: 图像尺寸
+            pixel_factor: 渲染倍率相对2倍基准的比例
+            
+        Returns:
+            list: 条带列表，每项为 (条带起始行, 条带结束行, (候选范围起始行, 候选范围结束行))
+        """
+        fill = row_counts / width
+        hints = np.nonzero(fill >= self.FRAGMENTED_RULE_MIN_FILL)[0]
+        # 黑色像素不足70%宽度的行不可能包含>=70%宽度的连续线段，只需扫描其余行的最长线段
+        full_rows = hints[fill[hints] >= 0.70]
+        if full_rows.size > 0:
+            run_lengths, _, _ = longest_row_runs(black_mask[full_rows])
+            hints = np.setdiff1d(hints, full_rows[run_lengths / width >= 0.70])
+        if hints.size == 0:
+            return []
+        
+        # 形态学运算在垂直方向的影响范围：两次腐蚀和一次膨胀，每次为核高度的一半
+        kernel_height = max(1, int(round(3 * pixel_factor)))
+        padding = 3 * kernel_height
+        return [(max(0, band_start - padding), min(height, band_end + padding), core)
+                for band_start, band_end, core in
+                self._band_layout(hints.tolist(), height, pixel_factor, band_tolerance=kernel_height)]
+    
+    def _morphology_kernels_for(self, width, pixel_factor=1.0):
+        """形态学增强使用的四个结构元素（按宽度和倍率缓存）"""
+        key = (width, pixel_factor)
+        kernels = self._morphology_kernels.get(key)
+        if kernels is None:
+            def px(value):
+                return max(1, int(round(value * pixel_factor)))
+            
+            kernels = (
+                cv2.getStructuringElement(cv2.MORPH_RECT, (width // 10, px(3))),
+                cv2.getStructuringElement(cv2.MORPH_RECT, (width // 20, 1)),
+                cv2.getStructuringElement(cv2.MORPH_RECT, (px(3), 1)),
+                cv2.getStructuringElement(cv2.MORPH_RECT, (1, px(3)))
+            )
+            self._morphology_kernels[key] = kernels
+        return kernels
+    
+    def _morphology_buffers_for(self, rows, width):
+        """形态学增强交替使用的两个uint8缓冲区（宽度变化或行数不足时重新分配）"""
+        buffers = self._morphology_buffers
+        if buffers is None or buffers[0].shape[1] != width or buffers[0].shape[0] < rows:
+            buffers = self._morphology_buffers = (np.empty((rows, width), dtype=np.uint8),
+                                                  np.empty((rows, width), dtype=np.uint8))
+        return buffers[0][:rows], buffers[1][:rows]
+    
+    def _enhance_lines_morphology(self, black_mask, width, pixel_factor=1.0):
         """
         使用改进的形态学操作增强线条检测
         更智能地识别真正的横线，避免误连接文字
+        
+        Args:
+            black_mask: 黑色像素掩码（整页或条带）
+            width: 图像宽度
+            pixel_factor: 渲染倍率相对2倍基准的比例，核的像素尺寸按该比例换算
+            
+        Returns:
+            np.ndarray: 增强后的uint8掩码（复用的缓冲区，下一次调用时会被覆盖）
         """
-        height = black_mask.shape[0]
+        horizontal_kernel1, horizontal_kernel2, cleanup_kernel, thin_kernel = self._morphology_kernels_for(width, pixel_factor)
+        source, target = self._morphology_buffers_for(black_mask.shape[0], black_mask.shape[1])
+        np.copyto(source, black_mask)
         
         # 第一轮：使用细长的水平核连接近距离的线段（适合真正的横线）
-        # 核的高度限制为3像素，避免连接过粗的文字行
-        horizontal_kernel1 = cv2.getStructuringElement(cv2.MORPH_RECT, (width // 10, 3))
-        enhanced_mask1 = cv2.morphologyEx(black_mask.astype(np.uint8), cv2.MORPH_CLOSE, horizontal_kernel1)
+        # 核的高度限制为3像素（2倍渲染下），避免连接过粗的文字行
+        cv2.morphologyEx(source, cv2.MORPH_CLOSE, horizontal_kernel1, dst=target)
         
         # 第二轮：使用更细的核进一步连接，但保持线条细度
-        horizontal_kernel2 = cv2.getStructuringElement(cv2.MORPH_RECT, (width // 20, 1))
-        enhanced_mask2 = cv2.morphologyEx(enhanced_mask1, cv2.MORPH_CLOSE, horizontal_kernel2)
+        cv2.morphologyEx(target, cv2.MORPH_CLOSE, horizontal_kernel2, dst=source)
         
         # 第三轮：清理和细化，移除过粗的区域
         # 使用开运算移除小的噪点
-        cleanup_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 1))
-        cleaned_mask = cv2.morphologyEx(enhanced_mask2, cv2.MORPH_OPEN, cleanup_kernel)
+        cv2.morphologyEx(source, cv2.MORPH_OPEN, cleanup_kernel, dst=target)
         
         # 最终细化：确保线条不会过粗
-        thin_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 3))
-        final_mask = cv2.morphologyEx(cleaned_mask, cv2.MORPH_ERODE, thin_kernel)
+        cv2.morphologyEx(target, cv2.MORPH_ERODE, thin_kernel, dst=source)
+        
+        logger.debug(f"改进形态学增强后黑色像素数量: {np.count_nonzero(source)}")
+        logger.debug(f"原始黑色像素数量: {np.count_nonzero(black_mask)}")
         
-        logger.debug(f"改进形态学增强后黑色像素数量: {np.sum(final_mask)}")
-        logger.debug(f"原始黑色像素数量: {np.sum(black_mask)}")
+        return source
+    
+    def get_line_scan_stats(self) -> Dict[str, int]:
+        """
+        获取长横线检测的行扫描统计
         
-        return final_mask
+        Returns:
+            Dict[str, int]: 扫描的掩码数、总行数、投影预筛选剪除的行数、进入游程扫描的行数
+        """
+        return self.line_scan_stats.copy()
+    
+    def reset_line_scan_stats(self) -> None:
+        """重置长横线检测的行扫描统计"""
+        for key in self.line_scan_stats:
+            self.line_scan_stats[key] = 0
     
-    def _detect_lines_from_mask(self, mask, width, height):
+    def _detect_lines_from_mask(self, mask, width, height, row_counts=None, pixel_factor=1.0):
         """
         从给定的掩码中检测长横线
         增加线条宽度验证，确保检测到的是细线而不是粗文字行
+        
+        Args:
+            mask: 黑色像素掩码
+            width, height: 图像尺寸
+            row_counts: 掩码每行的黑色像素数量（行投影，可选，未提供时在此计算）
+            pixel_factor: 渲染倍率相对2倍基准的比例（用于换算线宽测量的像素常数）
         """
-        potential_lines = []
+        potential_lines = self._find_potential_lines(mask, width, height, row_counts, pixel_factor)
+        return self._select_main_lines(potential_lines, width, height)
+    
+    def _detect_run_length_lines(self, image):
+        """
+        只做基本的游程扫描检测长横线（不做形态学增强回退）
         
-        for y in range(height):
-            row = mask[y, :]
-            
-            # 查找连续的黑色像素段
-            segments = []
-            start = None
-            
-            for x in range(width):
-                if row[x]:  # 黑色像素
-                    if start is None:
-                        start = x
-                else:  # 非黑色像素
-                    if start is not None:
-                        segments.append((start, x - 1))
-                        start = None
-            
-            # 处理行末的情况
-            if start is not None:
-                segments.append((start, width - 1))
-            
-            # 分析这一行的线段
-            if segments:
-                max_segment_length = max(end - start + 1 for start, end in segments)
-                max_segment_ratio = max_segment_length / width
-                
-                # 记录可能的长横线（最长线段>=70%宽度，避免误识别长行文字）
-                if max_segment_ratio >= 0.70:
-                    max_segment = max(segments, key=lambda x: x[1] - x[0])
-                    
-                    # 新增：验证线条宽度，确保是细线而不是粗文字行
-                    line_width = self._measure_line_width(mask, max_segment[0], max_segment[1], y, width, height)
-                    
-                    # 线条宽度应该小于页面高度的2%，避免误识别文字行
-                    if line_width <= height * 0.02:
-                        potential_lines.append({
-                            'coords': (max_segment[0], y, max_segment[1], y),
-                            'length': max_segment_length,
-                            'y_center': float(y),
-                            'angle': 0,
-                            'width_ratio': max_segment_ratio,
-                            'y_percent': y / height * 100,
-                            'line_width': line_width  # 新增：记录线条宽度
-                        })
-                        logger.debug(f"检测到细线: y={y}, 长度={max_segment_length:.0f}({max_segment_ratio:.1%}), 宽度={line_width:.1f}")
-                    else:
-                        logger.debug(f"忽略粗线: y={y}, 长度={max_segment_length:.0f}({max_segment_ratio:.1%}), 宽度={line_width:.1f} (超过阈值{height*0.02:.1f})")
+        Args:
+            image: RGB图像数组或PageRaster
+        """
+        raster = PageRaster.from_image(image)
+        return self._detect_lines_from_mask(raster.dark_mask(80), raster.width, raster.height,
+                                            raster.row_projection(80), raster.pixel_factor)
+    
+    def _detect_component_lines(self, image):
+        """
+        基于连通域检测长横线（见component_lines.find_component_lines）
+        
+        Args:
+            image: RGB图像数组或PageRaster
+        """
+        raster = PageRaster.from_image(image)
+        height, width = raster.height, raster.width
+        potential_lines = find_component_lines(raster.dark_mask(80), width, height, raster.row_projection(80))
+        logger.debug(f"连通域检测发现 {len(potential_lines)} 条潜在长横线")
+        return self._select_main_lines(potential_lines, width, height)
+    
+    def _detect_hough_lines(self, image):
+        """
+        基于概率Hough变换检测长横线（见hough_lines.find_hough_lines）
+        
+        Args:
+            image: RGB图像数组或PageRaster
+        """
+        raster = PageRaster.from_image(image)
+        height, width = raster.height, raster.width
+        potential_lines = find_hough_lines(raster.dark_mask(80), width, height,
+                                           self._line_width_search_range(height, raster.pixel_factor),
+                                           raster.pixel_factor)
+        logger.debug(f"Hough检测发现 {len(potential_lines)} 条潜在长横线")
+        return self._select_main_lines(potential_lines, width, height)
+    
+    def _detect_projection_lines(self, image):
+        """
+        仅凭行投影检测长横线（见line_scanner.find_projection_lines）
+        
+        Args:
+            image: RGB图像数组或PageRaster
+        """
+        raster = PageRaster.from_image(image)
+        height, width = raster.height, raster.width
+        potential_lines = find_projection_lines(raster.dark_mask(80), raster.row_projection(80), width, height)
+        logger.debug(f"行投影检测发现 {len(potential_lines)} 条潜在长横线")
+        return self._select_main_lines(potential_lines, width, height)
+    
+    def _find_potential_lines(self, mask, width, height, row_counts=None, pixel_factor=1.0, y_offset=0, row_limits=None):
+        """
+        在掩码中找出所有潜在长横线（最长线段>=70%宽度且线宽<=2%页面高度）
+        
+        Args:
+            mask: 黑色像素掩码（整页，或从第y_offset行开始的条带）
+            width, height: 整页图像尺寸
+            row_counts: 掩码每行的黑色像素数量（行投影，可选，未提供时在此计算）
+            pixel_factor: 渲染倍率相对2倍基准的比例（用于换算线宽测量的像素常数）
+            y_offset: 掩码第0行在整页中的行号
+            row_limits: 掩码中允许作为线条中心的行范围 (start, end)，默认为全部行
+            
+        Returns:
+            list: 潜在长横线列表（坐标为整页像素坐标）
+        """
+        potential_lines = []
+        mask_rows = mask.shape[0]
+
+        # 投影预筛选：一行的黑色像素总数不足70%宽度时，不可能包含>=70%宽度的连续线段
+        if row_counts is None:
+            row_counts = np.count_nonzero(mask, axis=1)
+        scan_rows = np.nonzero(row_counts / width >= 0.70)[0]
+        if row_limits is not None:
+            scan_rows = scan_rows[(scan_rows >= row_limits[0]) & (scan_rows < row_limits[1])]
+        
+        self.line_scan_stats['masks_scanned'] += 1
+        self.line_scan_stats['rows_total'] += mask_rows
+        self.line_scan_stats['rows_pruned'] += mask_rows - len(scan_rows)
+        self.line_scan_stats['rows_scanned'] += len(scan_rows)
+        logger.debug(f"投影预筛选: {mask_rows}行中剪除{mask_rows - len(scan_rows)}行，剩余{len(scan_rows)}行")
+
+        # 只对剩余行提取最长黑色像素段（向量化游程扫描）
+        run_lengths, run_starts, run_ends = longest_row_runs(mask[scan_rows])
+
+        # 记录可能的长横线（最长线段>=70%宽度，避免误识别长行文字）
+        candidate_indices = np.nonzero(run_lengths / width >= 0.70)[0]
+
+        # 新增：验证线条宽度，确保是细线而不是粗文字行（所有候选行一次测量）
+        line_widths = run_thickness(mask, scan_rows[candidate_indices], run_starts[candidate_indices],
+                                    run_ends[candidate_indices], self._line_width_search_range(height, pixel_factor))
+
+        for i, line_width in zip(candidate_indices, line_widths.tolist()):
+            row = int(scan_rows[i])
+            y = y_offset + row
+            max_segment_length = int(run_lengths[i])
+            max_segment_ratio = max_segment_length / width
+            max_segment = (int(run_starts[i]), int(run_ends[i]))
+
+            # 线条宽度应该小于页面高度的2%，避免误识别文字行
+            if line_width <= height * 0.02:
+                potential_lines.append({
+                    'coords': (max_segment[0], y, max_segment[1], y),
+                    'length': max_segment_length,
+                    'y_center': float(y),
+                    'angle': 0,
+                    'width_ratio': max_segment_ratio,
+                    'y_percent': y / height * 100,
+                    'line_width': line_width  # 新增：记录线条宽度
+                })
+                logger.debug(f"检测到细线: y={y}, 长度={max_segment_length:.0f}({max_segment_ratio:.1%}), 宽度={line_width:.1f}")
+            else:
+                logger.debug(f"忽略粗线: y={y}, 长度={max_segment_length:.0f}({max_segment_ratio:.1%}), 宽度={line_width:.1f} (超过阈值{height*0.02:.1f})")
         
         logger.debug(f"发现 {len(potential_lines)} 条潜在长横线")
         
+        return potential_lines
+    
+    def _select_main_lines(self, potential_lines, width, height):
+        """
+        从潜在长横线中选出最主要且相距足够远的两条
+        
+        Args:
+            potential_lines: 潜在长横线列表
+            width, height: 图像尺寸
+            
+        Returns:
+            list: 选中的长横线（最多2条，带质量评分）
+        """
         if len(potential_lines) == 0:
             return []
         
@@ -669,58 +1348,29 @@ class PDFFeatureExtractor:
         logger.debug(f"最终选择 {len(main_lines)} 条主要长横线")
         return main_lines
     
-    def _measure_line_width(self, mask, x1, x2, y, width, height):
+    def _line_width_search_range(self, height, pixel_factor=1.0):
+        """线宽测量向上/向下的搜索范围：页面高度的1%，最小5像素（2倍渲染下）"""
+        min_search_range = max(1, int(round(5 * pixel_factor)))
+        return max(min_search_range, height // 100)
+    
+    def _measure_line_width(self, mask, x1, x2, y, width, height, pixel_factor=1.0):
         """
         测量线条在垂直方向上的宽度
         
+        从线条所在行分别向上、向下扩展，相邻行在x1到x2范围内的黑色像素不少于30%时视为线条的一部分。
+        
         Args:
-            mask: 黑色像素掩码
+            mask: 黑色像素掩码（整页或条带）
             x1, x2: 线条的起始和结束x坐标
-            y: 线条的y坐标
-            width, height: 图像尺寸
+            y: 线条在掩码中的行号
+            width, height: 整页图像尺寸
+            pixel_factor: 渲染倍率相对2倍基准的比例（最小搜索范围按该比例换算）
             
         Returns:
-            float: 线条的垂直宽度（像素）
-        """
-        # 在y坐标附近搜索垂直方向上的连续黑色像素
-        line_center = y
-        search_range = max(5, height // 100)  # 搜索范围，最小5像素
-        
-        # 向上搜索
-        top_y = line_center
-        for dy in range(1, search_range + 1):
-            test_y = line_center - dy
-            if test_y < 0:
-                break
-            
-            # 检查这一行在x1到x2范围内是否有足够的黑色像素
-            if x2 >= x1:
-                black_pixels = np.sum(mask[test_y, x1:x2+1])
-                if black_pixels < (x2 - x1 + 1) * 0.3:  # 如果黑色像素少于30%，认为不是线条的一部分
-                    break
-                top_y = test_y
-            else:
-                break
-        
-        # 向下搜索
-        bottom_y = line_center
-        for dy in range(1, search_range + 1):
-            test_y = line_center + dy
-            if test_y >= height:
-                break
-            
-            # 检查这一行在x1到x2范围内是否有足够的黑色像素
-            if x2 >= x1:
-                black_pixels = np.sum(mask[test_y, x1:x2+1])
-                if black_pixels < (x2 - x1 + 1) * 0.3:  # 如果黑色像素少于30%，认为不是线条的一部分
-                    break
-                bottom_y = test_y
-            else:
-                break
-        
-        # 计算线条宽度
-        line_width = bottom_y - top_y + 1
-        return line_width
+            int: 线条的垂直宽度（像素）
+        """
+        search_range = self._line_width_search_range(height, pixel_factor)
+        return int(run_thickness(mask, [y], [x1], [x2], search_range)[0])
     
     def _calculate_line_quality(self, line, width, height):
         """
@@ -767,47 +1417,24 @@ class PDFFeatureExtractor:
         # 提取搜索区域
         roi = black_mask[y_start:y_end, :]
         
-        # 在搜索区域内寻找最长的水平线条
+        # 行内黑色像素总数不足25%宽度时，不可能包含>=25%宽度的连续线段
+        row_totals = np.count_nonzero(roi, axis=1)
+        scan_rows = np.nonzero(row_totals / width >= 0.25)[0]
+        run_lengths, run_starts, run_ends = longest_row_runs(roi[scan_rows])
+        
+        # 在搜索区域内寻找最长的水平线条（长度相同时取最靠上、最靠左的线段）
         best_line = None
-        max_length = 0
-        
-        for row_offset in range(roi.shape[0]):
-            row = roi[row_offset, :]
-            
-            # 查找连续的黑色像素段
-            segments = []
-            start = None
-            
-            for col in range(len(row)):
-                if row[col]:  # 黑色像素
-                    if start is None:
-                        start = col
-                else:  # 非黑色像素
-                    if start is not None:
-                        segments.append((start, col - 1))
-                        start = None
-            
-            # 处理行末的情况
-            if start is not None:
-                segments.append((start, len(row) - 1))
-            
-            # 找到最长的段
-            for start_col, end_col in segments:
-                segment_length = end_col - start_col + 1
-                segment_ratio = segment_length / width
-                
-                # 检查是否为长线段（至少25%宽度）
-                if segment_ratio >= 0.25 and segment_length > max_length:
-                    max_length = segment_length
-                    actual_y = y_start + row_offset
-                    
-                    best_line = {
-                        'coords': (start_col, actual_y, end_col, actual_y),
-                        'length': segment_length,
-                        'y_center': float(actual_y),
-                        'angle': 0,
-                        'width_ratio': segment_ratio
-                    }
+        if run_lengths.size > 0 and run_lengths.max() / width >= 0.25:
+            i = int(np.argmax(run_lengths))
+            segment_length = int(run_lengths[i])
+            actual_y = y_start + int(scan_rows[i])
+            best_line = {
+                'coords': (int(run_starts[i]), actual_y, int(run_ends[i]), actual_y),
+                'length': segment_length,
+                'y_center': float(actual_y),
+                'angle': 0,
+                'width_ratio': segment_length / width
+            }
         
         if best_line:
             y_percent = best_line['y_center'] / height * 100
@@ -818,7 +1445,7 @@ class PDFFeatureExtractor:
             logger.debug(f"{line_name}检测失败: 在y={target_y}±{search_range}范围内未找到长度>=25%宽度的线条")
             return None
 
-    def detect_mb_second_feature(self, image):
+    def detect_mb_second_feature(self, image, band_hints=None, band_tolerance=None, line_detector=None):
         """
         检测mb.png模板的第二特征：两条长黑线
         
@@ -828,96 +1455,307 @@ class PDFFeatureExtractor:
         3. 要求线段长度至少25%页面宽度
         
         Args:
-            image: 图像数组 (numpy array)
+            image: 图像数组 (numpy array) 或 PageRaster（只用到亮度平面，可使用structure配置渲染的灰度图）
+            band_hints: 长横线的大致行号列表（可选，来自低分辨率图像或矢量层），指定后只在这些行附近的条带内检测
+            band_tolerance: 提示行上下的容差像素数（默认按BAND_TOLERANCE_PX换算）
+            line_detector: 长横线检测器名称（见LINE_DETECTORS，默认使用初始化时指定的检测器；
+                           指定band_hints时始终在条带内做行扫描检测）
             
         Returns:
             dict: 第二特征检测结果
         """
+        line_detector = self.line_detector if line_detector is None else line_detector
+        if line_detector not in LINE_DETECTORS:
+            raise ValueError(f"不支持的长横线检测器: {line_detector}")
+        
         try:
             # 转换为RGB（如果是BGR）
-            if len(image.shape) == 3 and image.shape[2] == 3:
-                rgb_image = image
-            else:
-                rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            raster = PageRaster.from_image(image)
             
-            height, width = rgb_image.shape[:2]
+            height, width = raster.height, raster.width
             logger.debug(f"图像尺寸: {width}x{height}")
             
-            # 使用新的自适应检测方法
-            detected_lines = self._detect_adaptive_lines(rgb_image)
+            if band_hints is not None:
+                dark_mask = raster.dark_mask(80)
+                band_masks = [(dark_mask[band_start:band_end], band_start, core)
+                              for band_start, band_end, core in
+                              self._band_layout(band_hints, height, raster.pixel_factor, band_tolerance)]
+                detected_lines = self._detect_band_lines(band_masks, width, height, raster.pixel_factor)
+                return self._build_second_feature_result(detected_lines, height)
             
-            logger.debug(f"精确检测到的长横线数量: {len(detected_lines)}")
+            # 按名称调用长横线检测器（默认为自适应检测）
+            detected_lines = LINE_DETECTORS[line_detector](self, raster)
             
-            if len(detected_lines) == 0:
-                return {
-                    'has_second_feature': False,
-                    'detected_lines': 0,
-                    'long_lines': [],
-                    'line_lengths': [],
-                    'line_distance': 0,
-                    'reason': '在预期位置未检测到长黑线'
-                }
-            elif len(detected_lines) == 1:
-                return {
-                    'has_second_feature': False,
-                    'detected_lines': 1,
-                    'long_lines': detected_lines,
-                    'line_lengths': [line['length'] for line in detected_lines],
-                    'line_distance': 0,
-                    'reason': f'只检测到1条长黑线，要求2条'
-                }
+            return self._build_second_feature_result(detected_lines, height)
             
-            # 按y坐标排序
-            detected_lines.sort(key=lambda x: x['y_center'])
-            
-            # 取前两条线（如果检测到超过2条）
-            long_lines = detected_lines[:2]
-            
-            # 检查是否只有两条长黑线
-            if len(long_lines) != 2:
-                return {
-                    'has_second_feature': False,
-                    'detected_lines': len(long_lines),
-                    'long_lines': long_lines,
-                    'line_lengths': [line['length'] for line in long_lines],
-                    'line_distance': 0,
-                    'reason': f'检测到{len(long_lines)}条符合长度要求的长黑线，要求恰好2条'
-                }
+        except Exception as e:
+            logger.error(f"第二特征检测失败: {str(e)}")
+            return {
+                'has_second_feature': False,
+                'detected_lines': 0,
+                'long_lines': [],
+                'line_lengths': [],
+                'line_distance': 0,
+                'reason': f'检测过程出错: {str(e)}'
+            }
+    
+    def detect_mb_second_feature_in_bands(self, page, band_hints, scale=DEFAULT_SCALE, band_tolerance=None):
+        """
+        只渲染长横线候选行附近的水平条带来确认第二特征（page.get_pixmap(clip=...)）
+        
+        条带内的像素与整页渲染的对应行一致，线宽测量和质量评分也在条带上进行；
+        条带上下额外保留线宽测量的搜索范围，提示行附近的线条测量结果与整页检测相同。
+        条带内只做基本检测，不做形态学增强。
+        
+        Args:
+            page: fitz.Page对象
+            band_hints: 长横线的大致行号列表（scale倍渲染下的像素坐标，来自低分辨率图像或矢量层）
+            scale: 渲染倍率
+            band_tolerance: 提示行上下的容差像素数（默认按BAND_TOLERANCE_PX换算）
+            
+        Returns:
+            dict: 第二特征检测结果（detection_method为"band"，rendered_rows为实际渲染的行数）
+        """
+        width, height = page_pixel_size(page, scale)
+        pixel_factor = scale / DEFAULT_SCALE
+        
+        band_masks = []
+        for band_start, band_end, core in self._band_layout(band_hints, height, pixel_factor, band_tolerance):
+            strip = PageRaster(render_band(page, band_start, band_end, scale), scale=scale)
+            band_masks.append((strip.dark_mask(80), band_start, core))
+        
+        detected_lines = self._detect_band_lines(band_masks, width, height, pixel_factor)
+        result = self._build_second_feature_result(detected_lines, height)
+        result['detection_method'] = 'band'
+        result['rendered_rows'] = sum(mask.shape[0] for mask, _, _ in band_masks)
+        logger.debug(f"条带确认: 渲染 {result['rendered_rows']}/{height} 行")
+        return result
+    
+    def _band_layout(self, band_hints, height, pixel_factor=1.0, band_tolerance=None):
+        """
+        由提示行计算条带范围
+        
+        每个提示行上下扩展band_tolerance得到线条中心的候选范围，再扩展线宽测量的搜索范围得到条带，
+        相互重叠的条带合并。
+        
+        Args:
+            band_hints: 提示行列表
+            height: 整页图像高度
+            pixel_factor: 渲染倍率相对2倍基准的比例
+            band_tolerance: 提示行上下的容差像素数（默认按BAND_TOLERANCE_PX换算）
             
-            line1, line2 = long_lines[0], long_lines[1]
+        Returns:
+            list: 条带列表，每项为 (条带起始行, 条带结束行, (候选范围起始行, 候选范围结束行))，均为整页行号
+        """
+        if band_tolerance is None:
+            band_tolerance = max(1, int(round(self.BAND_TOLERANCE_PX * pixel_factor)))
+        # 与线宽测量的搜索范围一致
+        margin = self._line_width_search_range(height, pixel_factor) + 1
+        
+        cores = []
+        for hint in sorted(band_hints):
+            core_start, core_end = max(0, hint - band_tolerance), min(height, hint + band_tolerance + 1)
+            if core_start >= core_end:
+                continue
+            if cores and core_start <= cores[-1][1] + 2 * margin:
+                cores[-1][1] = max(cores[-1][1], core_end)
+            else:
+                cores.append([core_start, core_end])
+        
+        return [(max(0, core_start - margin), min(height, core_end + margin), (core_start, core_end))
+                for core_start, core_end in cores]
+    
+    def _detect_band_lines(self, band_masks, width, height, pixel_factor=1.0):
+        """
+        在条带掩码中检测长横线并选出主要的两条
+        
+        Args:
+            band_masks: 条带列表，每项为 (条带掩码, 条带起始行, (候选范围起始行, 候选范围结束行))
+            width, height: 整页图像尺寸
+            pixel_factor: 渲染倍率相对2倍基准的比例
             
-            # 计算两线间距
-            line_distance = abs(line2['y_center'] - line1['y_center'])
+        Returns:
+            list: 选中的长横线
+        """
+        potential_lines = []
+        for mask, band_start, (core_start, core_end) in band_masks:
+            potential_lines.extend(self._find_potential_lines(
+                mask, width, height, pixel_factor=pixel_factor, y_offset=band_start,
+                row_limits=(core_start - band_start, core_end - band_start)
+            ))
+        return self._select_main_lines(potential_lines, width, height)
+    
+    def detect_mb_second_feature_components(self, image):
+        """
+        基于连通域检测第二特征（两条长黑线）
+        
+        水平闭运算连接断开的线段后以cv2.connectedComponentsWithStats提取连通域，按外接矩形的宽度占比、
+        高度和填充率筛选长横线（略粗或带缺口的长横线也能检测到），再按与行扫描检测相同的规则选出两条。
+        
+        Args:
+            image: 图像数组 (numpy array) 或 PageRaster
             
-            # 记录检测结果
-            logger.debug(f"成功检测到两条长黑线:")
-            logger.debug(f"  线条1: y={line1['y_center']:.0f}, 长度={line1['length']:.0f} ({line1['width_ratio']*100:.1f}%宽度)")
-            logger.debug(f"  线条2: y={line2['y_center']:.0f}, 长度={line2['length']:.0f} ({line2['width_ratio']*100:.1f}%宽度)")
-            logger.debug(f"  间距: {line_distance:.0f}像素 ({line_distance/height*100:.1f}%高度)")
+        Returns:
+            dict: 第二特征检测结果（结构与detect_mb_second_feature相同，detection_method为"components"）
+        """
+        try:
+            raster = PageRaster.from_image(image)
+            detected_lines = self._detect_component_lines(raster)
+            result = self._build_second_feature_result(detected_lines, raster.height)
+            result['detection_method'] = 'components'
+            return result
             
-            # 直接返回成功结果（精确位置检测已经保证了正确性）
+        except Exception as e:
+            logger.error(f"连通域第二特征检测失败: {str(e)}")
             return {
-                'has_second_feature': True,
-                'detected_lines': 2,
-                'long_lines': [line1, line2],
-                'line_lengths': [line1['length'], line2['length']],
-                'line_distance': line_distance,
-                'line_distance_ratio': line_distance / height,
-                'length_ratio_1': line1['width_ratio'],
-                'length_ratio_2': line2['width_ratio'],
-                'reason': f'精确检测到位于y={line1["y_center"]:.0f}和y={line2["y_center"]:.0f}的两条长黑线'
+                'has_second_feature': False,
+                'detected_lines': 0,
+                'long_lines': [],
+                'line_lengths': [],
+                'line_distance': 0,
+                'reason': f'检测过程出错: {str(e)}',
+                'detection_method': 'components'
             }
+    
+    def detect_mb_second_feature_vector(self, page, scale=DEFAULT_SCALE):
+        """
+        基于PDF矢量绘图层检测第二特征（两条长黑线），无需渲染页面
+        
+        判定条件与位图检测一致（深色、>=70%宽度、粗细<=2%高度、两线间距>=45%高度），
+        坐标换算为scale倍渲染后的像素坐标，返回结构与detect_mb_second_feature相同。
+        
+        Args:
+            page: fitz.Page对象
+            scale: 换算像素坐标使用的渲染倍率（与位图检测一致时结果可直接对比）
+            
+        Returns:
+            dict: 第二特征检测结果；扫描件/纯图片页面或读取矢量层失败时返回None（需回退到位图检测）
+        """
+        try:
+            drawings = page.get_drawings()
+            if is_image_only_page(page, drawings=drawings):
+                logger.debug("扫描件/纯图片页面，矢量检测不适用")
+                return None
+            
+            width, height = page_pixel_size(page, scale)
+            potential_lines = []
+            for rule in find_horizontal_rules(page, scale, drawings=drawings):
+                length = rule['x2'] - rule['x1'] + 1
+                potential_lines.append({
+                    'coords': (rule['x1'], rule['y'], rule['x2'], rule['y']),
+                    'length': length,
+                    'y_center': float(rule['y']),
+                    'angle': 0,
+                    'width_ratio': length / width,
+                    'y_percent': rule['y'] / height * 100,
+                    'line_width': rule['thickness']
+                })
+            logger.debug(f"矢量层发现 {len(potential_lines)} 条潜在长横线")
+            
+            detected_lines = self._select_main_lines(potential_lines, width, height)
+            result = self._build_second_feature_result(detected_lines, height)
+            result['detection_method'] = 'vector'
+            return result
             
         except Exception as e:
-            logger.error(f"第二特征检测失败: {str(e)}")
+            logger.warning(f"矢量第二特征检测失败，回退到位图检测: {str(e)}")
+            return None
+    
+    def detect_mb_second_feature_from_page(self, page, image=None, scale=DEFAULT_SCALE, line_source="vector"):
+        """
+        页面级第二特征检测：矢量层优先，扫描件/纯图片页面回退到位图检测
+        
+        Args:
+            page: fitz.Page对象
+            image: 已渲染的页面图像或PageRaster（回退时使用，未提供时按scale渲染灰度图）
+            scale: 渲染倍率
+            line_source: 长横线来源
+                - "vector": 矢量层优先，必要时回退到位图（默认）
+                - "raster": 始终使用位图检测
+            
+        Returns:
+            dict: 第二特征检测结果（detection_method 标明使用的检测方式）
+        """
+        result = self.detect_mb_second_feature_vector(page, scale) if line_source == "vector" else None
+        if result is None:
+            if image is None:
+                image = render_raster(page, scale=scale, profile='structure')
+            result = self.detect_mb_second_feature(image)
+            result['detection_method'] = 'raster'
+        return result
+    
+    def _build_second_feature_result(self, detected_lines, height):
+        """
+        根据检测到的长横线生成第二特征检测结果
+        
+        Args:
+            detected_lines: 检测到的长横线列表
+            height: 图像高度
+            
+        Returns:
+            dict: 第二特征检测结果
+        """
+        logger.debug(f"精确检测到的长横线数量: {len(detected_lines)}")
+        
+        if len(detected_lines) == 0:
             return {
                 'has_second_feature': False,
                 'detected_lines': 0,
                 'long_lines': [],
                 'line_lengths': [],
                 'line_distance': 0,
-                'reason': f'检测过程出错: {str(e)}'
+                'reason': '在预期位置未检测到长黑线'
+            }
+        elif len(detected_lines) == 1:
+            return {
+                'has_second_feature': False,
+                'detected_lines': 1,
+                'long_lines': detected_lines,
+                'line_lengths': [line['length'] for line in detected_lines],
+                'line_distance': 0,
+                'reason': f'只检测到1条长黑线，要求2条'
             }
+        
+        # 按y坐标排序
+        detected_lines.sort(key=lambda x: x['y_center'])
+        
+        # 取前两条线（如果检测到超过2条）
+        long_lines = detected_lines[:2]
+        
+        # 检查是否只有两条长黑线
+        if len(long_lines) != 2:
+            return {
+                'has_second_feature': False,
+                'detected_lines': len(long_lines),
+                'long_lines': long_lines,
+                'line_lengths': [line['length'] for line in long_lines],
+                'line_distance': 0,
+                'reason': f'检测到{len(long_lines)}条符合长度要求的长黑线，要求恰好2条'
+            }
+        
+        line1, line2 = long_lines[0], long_lines[1]
+        
+        # 计算两线间距
+        line_distance = abs(line2['y_center'] - line1['y_center'])
+        
+        # 记录检测结果
+        logger.debug(f"成功检测到两条长黑线:")
+        logger.debug(f"  线条1: y={line1['y_center']:.0f}, 长度={line1['length']:.0f} ({line1['width_ratio']*100:.1f}%宽度)")
+        logger.debug(f"  线条2: y={line2['y_center']:.0f}, 长度={line2['length']:.0f} ({line2['width_ratio']*100:.1f}%宽度)")
+        logger.debug(f"  间距: {line_distance:.0f}像素 ({line_distance/height*100:.1f}%高度)")
+        
+        # 直接返回成功结果（精确位置检测已经保证了正确性）
+        return {
+            'has_second_feature': True,
+            'detected_lines': 2,
+            'long_lines': [line1, line2],
+            'line_lengths': [line1['length'], line2['length']],
+            'line_distance': line_distance,
+            'line_distance_ratio': line_distance / height,
+            'length_ratio_1': line1['width_ratio'],
+            'length_ratio_2': line2['width_ratio'],
+            'reason': f'精确检测到位于y={line1["y_center"]:.0f}和y={line2["y_center"]:.0f}的两条长黑线'
+        }
     
     def check_standard_compliance(self, features):
         """
@@ -933,38 +1771,41 @@ class PDFFeatureExtractor:
             return False
         
         # 检查白色背景比例
-        white_bg_ok = features['white_bg_ratio'] >= self.color_thresholds['bg_ratio_min']
+        white_bg_ok = self._check_passed('white_bg', features)
         
         # 检查黑色文字比例
-        black_text_ok = features['black_text_ratio'] >= self.color_thresholds['text_ratio_min']
+        black_text_ok = self._check_passed('black_text', features)
         
         # 检查整体亮度（RGB均值）
-        mean_rgb = features['mean_rgb']
-        avg_brightness = sum(mean_rgb) / len(mean_rgb)
-        brightness_ok = avg_brightness >= self.color_thresholds['brightness_min']
+        brightness_ok = self._check_passed('brightness', features)
         
         # 检查对比度（确保有足够的对比度）
-        contrast_ok = features['contrast'] >= self.color_thresholds['contrast_min']
+        contrast_ok = self._check_passed('contrast', features)
         
         # 检查彩色文字比例（不应有过多彩色文字）
-        colored_text_ok = features['colored_text_ratio'] <= self.color_thresholds['colored_text_max']
+        colored_text_ok = self._check_passed('colored_text', features)
         
         # 检查第二特征（两条长黑线）
-        second_feature_ok = False
-        if 'second_feature' in features:
-            second_feature_ok = features['second_feature']['has_second_feature']
+        second_feature_ok = self._check_passed('second_feature', features)
         
         compliance = white_bg_ok and black_text_ok and brightness_ok and contrast_ok and colored_text_ok and second_feature_ok
         
+        def fmt(value, spec):
+            # 快速判定模式下被跳过的特征为None
+            return '跳过' if value is None else format(value, spec)
+        
+        mean_rgb = features['mean_rgb']
+        avg_brightness = sum(mean_rgb) / len(mean_rgb) if mean_rgb is not None else None
+        
         logger.info(f"标准符合性检查:")
-        logger.info(f"  白色背景比例: {features['white_bg_ratio']:.3f} (>= {self.color_thresholds['bg_ratio_min']}) - {'✓' if white_bg_ok else '✗'}")
-        logger.info(f"  黑色文字比例: {features['black_text_ratio']:.3f} (>= {self.color_thresholds['text_ratio_min']}) - {'✓' if black_text_ok else '✗'}")
-        logger.info(f"  整体亮度: {avg_brightness:.1f} (>= {self.color_thresholds['brightness_min']}) - {'✓' if brightness_ok else '✗'}")
-        logger.info(f"  对比度: {features['contrast']:.1f} (>= {self.color_thresholds['contrast_min']}) - {'✓' if contrast_ok else '✗'}")
-        logger.info(f"  彩色文字比例: {features['colored_text_ratio']:.3f} (<= {self.color_thresholds['colored_text_max']}) - {'✓' if colored_text_ok else '✗'}")
+        logger.info(f"  白色背景比例: {fmt(features['white_bg_ratio'], '.3f')} (>= {self.color_thresholds['bg_ratio_min']}) - {'✓' if white_bg_ok else '✗'}")
+        logger.info(f"  黑色文字比例: {fmt(features['black_text_ratio'], '.3f')} (>= {self.color_thresholds['text_ratio_min']}) - {'✓' if black_text_ok else '✗'}")
+        logger.info(f"  整体亮度: {fmt(avg_brightness, '.1f')} (>= {self.color_thresholds['brightness_min']}) - {'✓' if brightness_ok else '✗'}")
+        logger.info(f"  对比度: {fmt(features['contrast'], '.1f')} (>= {self.color_thresholds['contrast_min']}) - {'✓' if contrast_ok else '✗'}")
+        logger.info(f"  彩色文字比例: {fmt(features['colored_text_ratio'], '.3f')} (<= {self.color_thresholds['colored_text_max']}) - {'✓' if colored_text_ok else '✗'}")
         
         # 第二特征详细信息
-        if 'second_feature' in features:
+        if features.get('second_feature'):
             second_feature = features['second_feature']
             logger.info(f"  第二特征（两条长黑线）: {'✓' if second_feature_ok else '✗'}")
             logger.info(f"    检测到线条数: {second_feature['detected_lines']}")
@@ -976,11 +1817,15 @@ class PDFFeatureExtractor:
         else:
             logger.info(f"  第二特征（两条长黑线）: ✗ - 未进行检测")
         
+        if features.get('skipped_checks'):
+            logger.info(f"  快速判定: {features['failed_check']} 未通过，已跳过 {', '.join(features['skipped_checks'])}")
+        
         logger.info(f"  最终结果: {'符合标准' if compliance else '不符合标准'}")
         
         return compliance
     
-    def process_pdf_file(self, pdf_path, max_pages=5, page_mode="first_n"):
+    def process_pdf_file(self, pdf_path, max_pages=5, page_mode="first_n", verdict_mode="full",
+                         resolution_mode="full", coarse_scale=None, escalation_margin=1.0):
         """
         处理单个PDF文件
         
@@ -992,6 +1837,17 @@ class PDFFeatureExtractor:
                 - "first_page": 第一页
                 - "all_pages": 所有页面
                 - "last_n": 从后面起的N页
+            verdict_mode: 判定模式
+                - "full": 分析所有页面的全部特征（默认，用于诊断）
+                - "fast": 级联提前退出，遇到第一个不通过的检查或页面即停止
+            resolution_mode: 分辨率模式（见analyze_page）
+                - "full": 所有页面以2倍渲染（默认）
+                - "escalate": 先低分辨率分析，结果不确定时再以2倍渲染
+            coarse_scale: 低分辨率渲染倍率（默认DEFAULT_COARSE_SCALE）
+            escalation_margin: 分辨率升级的余量缩放系数
+            
+        设置了特征缓存时，完整判定+全分辨率模式下已缓存的页面不再渲染，由缓存的测量结果按当前阈值计算特征，
+        未缓存的页面分析后写入缓存（其他模式只得到部分特征或低分辨率特征，不使用特征缓存）。
             
         Returns:
             dict: 处理结果
@@ -999,63 +1855,85 @@ class PDFFeatureExtractor:
         pdf_path = Path(pdf_path)
         logger.info(f"开始处理PDF文件: {pdf_path}")
         
-        # 转换PDF页面为图片
-        images = self.pdf_to_images(pdf_path, max_pages, page_mode)
-        if not images:
-            return {
-                'file_path': str(pdf_path),
-                'success': False,
-                'error': 'PDF转换失败',
-                'compliance': False
-            }
+        conversion_failed = {
+            'file_path': str(pdf_path),
+            'success': False,
+            'error': 'PDF转换失败',
+            'compliance': False
+        }
+        escalated_before = self.escalation_stats['escalated']
+        
+        # 逐页惰性渲染，同一时刻只持有一页图像
+        try:
+            page_images = self.iter_page_images(pdf_path, max_pages, page_mode)
+        except Exception as e:
+            logger.error(f"PDF转换失败 '{pdf_path}': {str(e)}")
+            return conversion_failed
+        if not page_images.page_numbers:
+            page_images.close()
+            return conversion_failed
+        actual_page_numbers = page_images.page_numbers
+        
+        if resolution_mode == "escalate":
+            # 分辨率升级模式：按需渲染，不使用迭代器的2倍图片
+            def analyze(i):
+                page = page_images.doc.load_page(page_images.page_indices[i])
+                return self.analyze_page(page, verdict_mode, resolution_mode, coarse_scale, escalation_margin)
+        elif self.feature_cache is not None and verdict_mode == "full":
+            # 特征缓存：命中的页面跳过渲染，未命中的页面测量后写入缓存
+            def analyze(i):
+                measurements = self.feature_cache.lookup(pdf_path, actual_page_numbers[i])
+                if measurements is not None:
+                    page_images.skip()
+                else:
+                    _, image = next(page_images)
+                    measurements = self.measure_page(image)
+                    self.feature_cache.store(pdf_path, actual_page_numbers[i], measurements)
+                return self.features_from_measurements(measurements)
+        else:
+            def analyze(i):
+                _, image = next(page_images)
+                return self.analyze_color_features(image, verdict_mode)
         
         # 分析每页的特征
         page_results = []
         overall_compliance = True
+        skipped_pages = []
         
-        # 根据页面选择模式确定实际的页码
-        if page_mode == "first_page":
-            actual_page_numbers = [1]
-        elif page_mode == "all_pages":
-            actual_page_numbers = list(range(1, len(images) + 1))
-        elif page_mode == "last_n":
-            # 对于后N页模式，需要先获取PDF的总页数
-            try:
-                doc = fitz.open(pdf_path)
-                total_pages = len(doc)
-                doc.close()
+        try:
+            for i, actual_page_num in enumerate(actual_page_numbers):
+                # 快速判定模式：整体已不符合时不再分析后续页面
+                if verdict_mode == "fast" and not overall_compliance:
+                    skipped_pages = actual_page_numbers[i:]
+                    logger.info(f"快速判定: 已确定不符合标准，跳过第 {skipped_pages} 页")
+                    break
                 
-                # 计算起始页码（从后往前数）
-                start_page = max(1, total_pages - len(images) + 1)
-                actual_page_numbers = list(range(start_page, start_page + len(images)))
-            except Exception as e:
-                logger.warning(f"无法获取PDF总页数，使用默认页码: {str(e)}")
-                actual_page_numbers = list(range(1, len(images) + 1))
-        else:  # "first_n" 默认模式
-            actual_page_numbers = list(range(1, len(images) + 1))
-        
-        for i, (image, actual_page_num) in enumerate(zip(images, actual_page_numbers)):
-            logger.info(f"分析第 {actual_page_num} 页特征...")
-            features = self.analyze_color_features(image)
-            
-            if features:
-                compliance = self.check_standard_compliance(features)
-                page_results.append({
-                    'page_number': actual_page_num,
-                    'features': features,
-                    'compliance': compliance
-                })
+                logger.info(f"分析第 {actual_page_num} 页特征...")
+                features = analyze(i)
                 
-                # 如果任何一页不符合标准，整体就不符合
-                if not compliance:
+                if features:
+                    compliance = self.check_standard_compliance(features)
+                    page_results.append({
+                        'page_number': actual_page_num,
+                        'features': features,
+                        'compliance': compliance
+                    })
+                    
+                    # 如果任何一页不符合标准，整体就不符合
+                    if not compliance:
+                        overall_compliance = False
+                else:
+                    page_results.append({
+                        'page_number': actual_page_num,
+                        'features': None,
+                        'compliance': False
+                    })
                     overall_compliance = False
-            else:
-                page_results.append({
-                    'page_number': actual_page_num,
-                    'features': None,
-                    'compliance': False
-                })
-                overall_compliance = False
+        except Exception as e:
+            logger.error(f"PDF转换失败 '{pdf_path}': {str(e)}")
+            return conversion_failed
+        finally:
+            page_images.close()
         
         result = {
             'file_path': str(pdf_path),
@@ -1065,13 +1943,65 @@ class PDFFeatureExtractor:
             'page_results': page_results,
             'overall_compliance': overall_compliance,
             'page_mode': page_mode,
+            'verdict_mode': verdict_mode,
+            'skipped_pages': skipped_pages,
             'timestamp': datetime.now().isoformat()
         }
+        if resolution_mode == "escalate":
+            result['resolution_mode'] = resolution_mode
+            result['escalated_pages'] = self.escalation_stats['escalated'] - escalated_before
         
         logger.info(f"PDF '{pdf_path.name}' 处理完成，页面模式: {page_mode}，整体符合性: {'是' if overall_compliance else '否'}")
         return result
     
-    def process_pdf_folder(self, folder_path, max_pages=5, page_mode="first_n"):
+    def reclassify_result(self, previous_result):
+        """
+        由特征缓存在当前颜色阈值下重新判定之前的处理结果（不渲染页面）
+        
+        Args:
+            previous_result: process_pdf_file返回的处理结果（可来自之前运行保存的JSON/JSONL）
+            
+        Returns:
+            dict: 重新判定后的处理结果（所有页面均按完整模式计算特征）；
+                  之前处理失败或缺少任一页面的缓存时返回None
+        """
+        if self.feature_cache is None:
+            raise ValueError("重新判定需要特征缓存")
+        if not previous_result.get('success', False):
+            return None
+        
+        page_numbers = [page['page_number'] for page in previous_result.get('page_results', [])]
+        page_numbers += previous_result.get('skipped_pages', [])
+        pdf_path = Path(previous_result['file_path'])
+        measurements = self.feature_cache.lookup_many(pdf_path, sorted(page_numbers))
+        if not measurements:
+            return None
+        
+        page_results = []
+        for page_number, page_measurements in zip(sorted(page_numbers), measurements):
+            features = self.features_from_measurements(page_measurements)
+            page_results.append({
+                'page_number': page_number,
+                'features': features,
+                'compliance': self.check_standard_compliance(features)
+            })
+        
+        return {
+            'file_path': str(pdf_path),
+            'file_name': previous_result.get('file_name', pdf_path.name),
+            'success': True,
+            'pages_analyzed': len(page_results),
+            'page_results': page_results,
+            'overall_compliance': all(page['compliance'] for page in page_results),
+            'page_mode': previous_result.get('page_mode'),
+            'verdict_mode': 'full',
+            'skipped_pages': [],
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def process_pdf_folder(self, folder_path, max_pages=5, page_mode="first_n", verdict_mode="full",
+                           manifest_path=None, use_content_hash=False, results_jsonl=None,
+                           resolution_mode="full", coarse_scale=None, escalation_margin=1.0):
         """
         处理文件夹中的所有PDF文件
         
@@ -1083,6 +2013,14 @@ class PDFFeatureExtractor:
                 - "first_page": 第一页
                 - "all_pages": 所有页面
                 - "last_n": 从后面起的N页
+            verdict_mode: 判定模式，"full"（默认）或 "fast"（级联提前退出）
+            manifest_path: 增量扫描清单（SQLite）路径，指定后只处理新增或变化的文件
+            use_content_hash: 清单是否额外记录并比较文件内容哈希
+            results_jsonl: JSONL结果文件路径，指定后每个文件的结果处理完即追加写入该文件，
+                           不再在返回值的results中累积（可用 result_sink.py 重新组装为汇总JSON）
+            resolution_mode: 分辨率模式，"full"（默认）或 "escalate"（先低分辨率分析，不确定时再以2倍渲染）
+            coarse_scale: 低分辨率渲染倍率（默认DEFAULT_COARSE_SCALE）
+            escalation_margin: 分辨率升级的余量缩放系数
             
         Returns:
             dict: 处理结果汇总
@@ -1111,14 +2049,44 @@ class PDFFeatureExtractor:
         
         logger.info(f"找到 {len(pdf_files)} 个PDF文件")
         
-        # 处理每个PDF文件
+        # 增量扫描清单（可选），处理参数变化时旧结果不再复用
+        manifest = None
+        if manifest_path:
+            fingerprint = config_fingerprint(
+                self.color_thresholds, self.ALGORITHM_VERSION,
+                max_pages=max_pages, page_mode=page_mode, verdict_mode=verdict_mode,
+                resolution_mode=resolution_mode, coarse_scale=coarse_scale, escalation_margin=escalation_margin,
+                line_detector=self.line_detector
+            )
+            manifest = ScanManifest(manifest_path, "feature_extractor", fingerprint, use_content_hash)
+        
+        # 处理每个PDF文件（结果写入JSONL文件或在内存中累积）
         results = []
+        sink = None
+        if results_jsonl:
+            sink = JsonlResultSink(results_jsonl, FORMAT_FEATURE_EXTRACTOR, metadata={
+                'start_time': datetime.now().isoformat(),
+                'folder_path': str(folder_path),
+                'page_mode': page_mode
+            })
+        emit_result = sink.write if sink is not None else results.append
+        
         summary = {'compliant': 0, 'non_compliant': 0, 'errors': 0}
+        if manifest is not None:
+            summary['cached'] = 0
         
         for pdf_file in pdf_files:
             try:
-                result = self.process_pdf_file(pdf_file, max_pages, page_mode)
-                results.append(result)
+                result = manifest.lookup(pdf_file) if manifest is not None else None
+                if result is not None:
+                    result['cached'] = True
+                    summary['cached'] += 1
+                else:
+                    result = self.process_pdf_file(pdf_file, max_pages, page_mode, verdict_mode,
+                                                   resolution_mode, coarse_scale, escalation_margin)
+                    if manifest is not None and result['success']:
+                        manifest.store(pdf_file, result)
+                emit_result(result)
                 
                 if result['success']:
                     if result['overall_compliance']:
@@ -1130,7 +2098,7 @@ class PDFFeatureExtractor:
                     
             except Exception as e:
                 logger.error(f"处理PDF文件时出错 '{pdf_file}': {str(e)}")
-                results.append({
+                emit_result({
                     'file_path': str(pdf_file),
                     'file_name': pdf_file.name,
                     'success': False,
@@ -1139,6 +2107,11 @@ class PDFFeatureExtractor:
                 })
                 summary['errors'] += 1
         
+        if manifest is not None:
+            manifest.close()
+        if self.feature_cache is not None:
+            self.feature_cache.commit()
+        
         # 汇总结果
         folder_result = {
             'folder_path': str(folder_path),
@@ -1149,12 +2122,39 @@ class PDFFeatureExtractor:
             'timestamp': datetime.now().isoformat()
         }
         
+        if sink is not None:
+            sink.close(summary={
+                'total_files': len(pdf_files),
+                'summary': summary,
+                'timestamp': folder_result['timestamp']
+            })
+            folder_result['results_file'] = str(sink.output_path)
+        
         logger.info(f"文件夹处理完成:")
         logger.info(f"  总文件数: {len(pdf_files)}")
         logger.info(f"  符合标准: {summary['compliant']}")
         logger.info(f"  不符合标准: {summary['non_compliant']}")
         logger.info(f"  处理错误: {summary['errors']}")
         logger.info(f"  页面模式: {page_mode}")
+        if manifest is not None:
+            logger.info(f"  复用缓存结果: {summary['cached']}")
+        scan_stats = self.line_scan_stats
+        if scan_stats['rows_total']:
+            logger.info(f"  长横线投影预筛选: 剪除 {scan_stats['rows_pruned']}/{scan_stats['rows_total']} 行")
+        if resolution_mode == "escalate":
+            escalation = self.get_escalation_stats()
+            folder_result['escalation'] = escalation
+            logger.info(f"  分辨率升级率: {escalation['escalated']}/{escalation['pages']} 页 "
+                        f"({escalation['escalation_rate']:.1%})，条带确认长横线: {escalation['band_confirmed']} 页")
+        if self.feature_cache is not None:
+            feature_stats = self.feature_cache.stats
+            folder_result['feature_cache'] = dict(feature_stats)
+            logger.info(f"  特征缓存: 命中 {feature_stats['hits']} 页，新写入 {feature_stats['stored']} 页")
+        if self.render_cache is not None:
+            cache_stats = self.render_cache.get_stats()
+            folder_result['render_cache'] = cache_stats
+            logger.info(f"  渲染缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次 "
+                        f"({cache_stats['hit_rate']:.1%})，淘汰 {cache_stats['evictions']} 个条目")
         
         return folder_result
     
@@ -1186,6 +2186,30 @@ class PDFFeatureExtractor:
             logger.error(f"保存结果失败: {str(e)}")
 
 
+# 第二特征的长横线检测器：名称 -> 检测函数(extractor, 图像或PageRaster)，返回选出的主要长横线（最多2条）
+LINE_DETECTORS = {
+    'adaptive': PDFFeatureExtractor._detect_adaptive_lines,       # 游程扫描，不足两条时在断裂长横线条带内形态学增强
+    'run_length': PDFFeatureExtractor._detect_run_length_lines,   # 只做游程扫描
+    'components': PDFFeatureExtractor._detect_component_lines,    # 连通域
+    'hough': PDFFeatureExtractor._detect_hough_lines,             # 概率Hough变换
+    'projection': PDFFeatureExtractor._detect_projection_lines,   # 仅行投影
+}
+
+
+def register_line_detector(name, detector):
+    """
+    注册长横线检测器，注册后可通过名称在detect_mb_second_feature和line_detector参数中使用
+    
+    Args:
+        name: 检测器名称
+        detector: 检测函数 detector(extractor, image)，image为图像数组或PageRaster，
+                  返回经extractor._select_main_lines选出的长横线列表
+    """
+    if name in LINE_DETECTORS:
+        raise ValueError(f"长横线检测器已存在: {name}")
+    LINE_DETECTORS[name] = detector
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='PDF特征提取工具')
@@ -1193,6 +2217,26 @@ def main():
     parser.add_argument('--max-pages', type=int, default=5, help='每个PDF最大处理页数（默认：5）')
     parser.add_argument('--page-mode', choices=['first_n', 'first_page', 'all_pages', 'last_n'], 
                        default='first_n', help='页面选择模式：first_n(前N页), first_page(第一页), all_pages(所有页面), last_n(后N页)')
+    parser.add_argument('--verdict-mode', choices=['full', 'fast'], default='full',
+                       help='判定模式：full(计算全部特征，用于诊断), fast(按代价从低到高检查，遇到第一个不通过即停止)')
+    parser.add_argument('--resolution-mode', choices=['full', 'escalate'], default='full',
+                       help='分辨率模式：full(所有页面以2倍渲染), escalate(先低分辨率分析，指标接近阈值时再以2倍渲染)')
+    parser.add_argument('--coarse-scale', type=float, default=PDFFeatureExtractor.DEFAULT_COARSE_SCALE,
+                       help=f'escalate模式的低分辨率渲染倍率（默认：{PDFFeatureExtractor.DEFAULT_COARSE_SCALE}）')
+    parser.add_argument('--escalation-margin', type=float, default=1.0,
+                       help='escalate模式的余量缩放系数，越大越容易升级到2倍渲染（默认：1.0）')
+    parser.add_argument('--line-detector', choices=list(LINE_DETECTORS), default=DEFAULT_LINE_DETECTOR,
+                       help=f'第二特征的长横线检测器（默认：{DEFAULT_LINE_DETECTOR}，'
+                            f'可先用line_detector_benchmark.py比较各检测器的一致性和耗时）')
+    parser.add_argument('--manifest', help='增量扫描清单（SQLite）路径，处理文件夹时跳过未变化的PDF文件')
+    parser.add_argument('--hash-content', action='store_true', help='增量扫描清单额外比较文件内容哈希')
+    parser.add_argument('--render-cache', help='页面渲染磁盘缓存目录，重复运行时直接读取已渲染的页面')
+    parser.add_argument('--render-cache-size', type=int, default=2048,
+                       help='页面渲染磁盘缓存的大小上限（MB，默认：2048）')
+    parser.add_argument('--feature-cache',
+                       help='页面特征缓存（SQLite）路径，保存与颜色阈值无关的测量结果，调整阈值后无需重新渲染')
+    parser.add_argument('--stream-results', action='store_true',
+                       help='处理文件夹时将每个文件的结果逐条写入JSONL文件（保存在数据目录），不在内存中累积')
     parser.add_argument('--template', default='templates/mb.png', help='标准模板图片路径')
     parser.add_argument('--output', help='输出文件名（可选）')
     parser.add_argument('--data-dir', default='data', help='数据保存目录')
@@ -1202,11 +2246,24 @@ def main():
     
     args = parser.parse_args()
     
+    # 页面渲染磁盘缓存（可选）
+    render_cache = None
+    if args.render_cache:
+        render_cache = RenderCache(args.render_cache, max_bytes=args.render_cache_size * 1024 * 1024)
+    
+    # 页面特征缓存（可选）
+    feature_cache = None
+    if args.feature_cache:
+        feature_cache = FeatureCache(args.feature_cache, PDFFeatureExtractor.feature_fingerprint(args.line_detector))
+    
     # 创建特征提取器
     extractor = PDFFeatureExtractor(
         template_path=args.template,
         data_dir=args.data_dir,
-        config_file=args.config
+        config_file=args.config,
+        render_cache=render_cache,
+        feature_cache=feature_cache,
+        line_detector=args.line_detector
     )
     
     # 处理配置相关参数
@@ -1230,15 +2287,26 @@ def main():
     if input_path.is_file() and input_path.suffix.lower() == '.pdf':
         # 处理单个PDF文件
         logger.info(f"处理模式: 单个PDF文件，页面模式: {args.page_mode}")
-        results = extractor.process_pdf_file(input_path, args.max_pages, args.page_mode)
+        results = extractor.process_pdf_file(input_path, args.max_pages, args.page_mode, args.verdict_mode,
+                                             args.resolution_mode, args.coarse_scale, args.escalation_margin)
     elif input_path.is_dir():
         # 处理PDF文件夹
         logger.info(f"处理模式: PDF文件夹，页面模式: {args.page_mode}")
-        results = extractor.process_pdf_folder(input_path, args.max_pages, args.page_mode)
+        results_jsonl = None
+        if args.stream_results:
+            results_jsonl = extractor.data_dir / f"pdf_feature_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        results = extractor.process_pdf_folder(input_path, args.max_pages, args.page_mode, args.verdict_mode,
+                                               manifest_path=args.manifest, use_content_hash=args.hash_content,
+                                               results_jsonl=results_jsonl, resolution_mode=args.resolution_mode,
+                                               coarse_scale=args.coarse_scale,
+                                               escalation_margin=args.escalation_margin)
     else:
         logger.error(f"无效的输入路径: {input_path}")
         return 1
     
+    if feature_cache is not None:
+        feature_cache.close()
+    
     # 保存结果
     if results:
         extractor.save_results(results, args.output)
@@ -1249,5 +2317,4 @@ def main():
 
 
 if __name__ == "__main__":
-    import io
     sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF页面渲染工具
+功能：将PDF页面直接渲染为NumPy数组，不经过PPM/PNG等中间编码，供特征提取器和分析器共用
+"""
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# 默认渲染倍率（2倍放大以获得更好的图像质量）
+DEFAULT_SCALE = 2.0
+
+# 支持的颜色空间
+COLORSPACES = {
+    'rgb': fitz.csRGB,
+    'gray': fitz.csGRAY,
+}
+
+
+class _PixmapBuffer:
+    """
+    Pixmap像素缓冲区的数组接口包装
+
+    NumPy数组以该对象为base，从而持有Pixmap的引用，
+    保证数组存活期间底层像素内存不会被释放。
+    """
+
+    def __init__(self, pix):
+        self._pix = pix
+        if pix.n == 1:
+            shape = (pix.height, pix.width)
+            strides = (pix.stride, 1)
+        else:
+            shape = (pix.height, pix.width, pix.n)
+            strides = (pix.stride, pix.n, 1)
+        self.__array_interface__ = {
+            'version': 3,
+            'shape': shape,
+            'typestr': '|u1',
+            'data': (pix.samples_ptr, False),
+            'strides': strides,
+        }
+
+
+def pixmap_to_array(pix):
+    """
+    将Pixmap包装为NumPy数组视图（零拷贝）
+
+    Args:
+        pix: fitz.Pixmap对象（alpha=False）
+
+    Returns:
+        numpy.ndarray: 彩色为 (height, width, 3) 的RGB数组，灰度为 (height, width) 数组
+    """
+    return np.asarray(_PixmapBuffer(pix))
+
+
+def render_page(page, scale=DEFAULT_SCALE, colorspace='rgb'):
+    """
+    渲染单个PDF页面为NumPy数组
+
+    Args:
+        page: fitz.Page对象
+        scale: 渲染倍率（默认2倍）
+        colorspace: 颜色空间，'rgb' 或 'gray'
+
+    Returns:
+        numpy.ndarray: 页面图像数组
+    """
+    if colorspace not in COLORSPACES:
+        raise ValueError(f"不支持的颜色空间: {colorspace}")
+
+    pix = page.get_pixmap(
+        matrix=fitz.Matrix(scale, scale),
+        colorspace=COLORSPACES[colorspace],
+        alpha=False
+    )
+    return pixmap_to_array(pix)
+
+
+class PageImageIterator:
+    """
+    逐页渲染PDF页面的迭代器
+
+    每次迭代渲染一页并返回 (页码, 图像数组)，文档在迭代期间保持打开，
+    迭代结束或调用close()时关闭（close_doc为False时只结束迭代，文档由调用方管理）；
+    同一时刻只持有当前页的图像。
+    """
+
+    def __init__(self, doc, page_indices, scale=DEFAULT_SCALE, colorspace='rgb', close_doc=True, renderer=None):
+        """
+        初始化页面迭代器
+
+        Args:
+            doc: 已打开的fitz.Document
+            page_indices: 要渲染的页面索引列表（从0开始）
+            scale: 渲染倍率（默认2倍）
+            colorspace: 颜色空间，'rgb' 或 'gray'
+            close_doc: 迭代结束时是否关闭文档
+            renderer: 自定义渲染函数 renderer(页面索引, scale, colorspace)（可选，如经过渲染缓存），
+                      默认直接渲染文档页面
+        """
+        self.doc = doc
+        self.close_doc = close_doc
+        self.page_indices = list(page_indices)
+        self.page_numbers = [index + 1 for index in self.page_indices]
+        self.scale = scale
+        self.colorspace = colorspace
+        self.renderer = renderer
+        self._position = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.doc is None or self._position >= len(self.page_indices):
+            self.close()
+            raise StopIteration
+        index = self.page_indices[self._position]
+        self._position += 1
+        if self.renderer is not None:
+            return index + 1, self.renderer(index, self.scale, self.colorspace)
+        return index + 1, render_page(self.doc.load_page(index), self.scale, self.colorspace)
+
+    def skip(self):
+        """
+        跳过下一页（不渲染）
+
+        Returns:
+            int: 被跳过的页码，没有剩余页面时返回None
+        """
+        if self.doc is None or self._position >= len(self.page_indices):
+            return None
+        self._position += 1
+        return self.page_indices[self._position - 1] + 1
+
+    def close(self):
+        """结束迭代并关闭文档（close_doc为False时不关闭）"""
+        if self.doc is not None:
+            if self.close_doc:
+                self.doc.close()
+            self.doc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def render_band(page, y0, y1, scale=DEFAULT_SCALE, colorspace='gray'):
+    """
+    只渲染页面的一条水平条带（page.get_pixmap(clip=...)），像素与整页渲染的对应行一致
+
+    Args:
+        page: fitz.Page对象
+        y0, y1: 条带的起止行（整页按scale渲染后的像素坐标，左闭右开）
+        scale: 渲染倍率（默认2倍）
+        colorspace: 颜色空间，'rgb' 或 'gray'（默认，长横线检测只需要亮度平面）
+
+    Returns:
+        numpy.ndarray: 条带图像数组，高度为 y1 - y0，宽度与整页渲染相同
+    """
+    if colorspace not in COLORSPACES:
+        raise ValueError(f"不支持的颜色空间: {colorspace}")
+
+    matrix = fitz.Matrix(scale, scale)
+    page_irect = (page.rect * matrix).irect
+    if page.rotation:
+        # 旋转页面的裁剪坐标与渲染坐标不一致，整页渲染后截取
+        return render_page(page, scale, colorspace)[y0:y1]
+
+    # 裁剪区域上下各多留半个像素，避免舍入丢失边界行，渲染后再按整页坐标截取
+    clip = fitz.Rect(page_irect.x0, page_irect.y0 + y0 - 0.5, page_irect.x1, page_irect.y0 + y1 + 0.5) * ~matrix
+    pix = page.get_pixmap(matrix=matrix, clip=clip, colorspace=COLORSPACES[colorspace], alpha=False)
+    row = page_irect.y0 + y0 - pix.y
+    col = page_irect.x0 - pix.x
+    return pixmap_to_array(pix)[row:row + (y1 - y0), col:col + page_irect.width]
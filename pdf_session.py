@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF文档会话
+功能：每个PDF文件只打开（解析xref）一次，缓存页数和元数据，按页码渲染页面；
+SessionCache以LRU方式保留少量打开的文档，同一文件被多次访问时不再重复打开；
+指定渲染缓存（render_cache.RenderCache）时，渲染前先查找磁盘缓存
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from pdf_renderer import DEFAULT_SCALE, PageImageIterator, render_page
+
+# SessionCache默认最多保留的打开文档数
+DEFAULT_MAX_OPEN = 8
+
+
+class PDFSession:
+    """单个PDF文件的文档会话"""
+
+    def __init__(self, pdf_path, render_cache=None, data=None):
+        """
+        打开PDF文件
+
+        Args:
+            pdf_path: PDF文件路径
+            render_cache: 页面渲染磁盘缓存（RenderCache，可选）
+            data: 已读取的文件内容（可选），指定时从内存打开，不再读取文件
+        """
+        self.pdf_path = Path(pdf_path)
+        self.render_cache = render_cache
+        # 渲染缓存由已读取的内容计算哈希，不再重新读取文件
+        self._data = data
+        if data is not None:
+            self.doc = fitz.open(stream=data, filetype="pdf")
+        else:
+            self.doc = fitz.open(self.pdf_path)
+        self.page_count = len(self.doc)
+        self._metadata = None
+
+    @property
+    def metadata(self):
+        """文档元数据（标题、作者、创建时间等），首次访问时读取"""
+        if self._metadata is None:
+            self._metadata = dict(self.doc.metadata or {})
+        return self._metadata
+
+    @property
+    def closed(self):
+        """文档是否已关闭"""
+        return self.doc is None
+
+    def load_page(self, page_number):
+        """
+        读取页面
+
+        Args:
+            page_number: 页码（从1开始）
+
+        Returns:
+            fitz.Page: 页面对象
+        """
+        return self.doc.load_page(self._page_index(page_number))
+
+    def _page_index(self, page_number):
+        """将页码（从1开始）转换为页面索引，超出范围时抛出IndexError"""
+        if not 1 <= page_number <= self.page_count:
+            raise IndexError(f"页码超出范围: {page_number}（共 {self.page_count} 页）")
+        return page_number - 1
+
+    def render(self, page_number, scale=DEFAULT_SCALE, colorspace='rgb'):
+        """
+        渲染指定页面
+
+        Args:
+            page_number: 页码（从1开始）
+            scale: 渲染倍率（默认2倍）
+            colorspace: 颜色空间，'rgb' 或 'gray'
+
+        Returns:
+            numpy.ndarray: 页面图像数组（命中渲染缓存时为只读数组）
+        """
+        if self.render_cache is None:
+            return render_page(self.load_page(page_number), scale=scale, colorspace=colorspace)
+        # 命中缓存时不需要读取页面
+        index = self._page_index(page_number)
+        return self.render_cache.fetch(self.pdf_path, index, scale, colorspace,
+                                       lambda: render_page(self.doc.load_page(index), scale=scale, colorspace=colorspace),
+                                       data=self._data)
+
+    def iter_pages(self, page_numbers, scale=DEFAULT_SCALE, colorspace='rgb'):
+        """
+        逐页渲染指定页面（迭代器不负责关闭会话）
+
+        Args:
+            page_numbers: 页码列表（从1开始）
+            scale: 渲染倍率（默认2倍）
+            colorspace: 颜色空间，'rgb' 或 'gray'
+
+        Returns:
+            PageImageIterator: 依次产生 (页码, 图像数组) 的迭代器
+        """
+        renderer = None
+        if self.render_cache is not None:
+            renderer = lambda index, scale, colorspace: self.render(index + 1, scale, colorspace)
+        return PageImageIterator(self.doc, [page_number - 1 for page_number in page_numbers],
+                                 scale=scale, colorspace=colorspace, close_doc=False, renderer=renderer)
+
+    def close(self):
+        """关闭文档"""
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
+            self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class SessionCache:
+    """打开的PDF文档会话的LRU缓存"""
+
+    def __init__(self, max_open=DEFAULT_MAX_OPEN, render_cache=None):
+        """
+        初始化会话缓存
+
+        Args:
+            max_open: 最多同时保留的打开文档数，超出时关闭最久未使用的文档
+            render_cache: 新打开的会话使用的页面渲染磁盘缓存（RenderCache，可选）
+        """
+        self.max_open = max(1, int(max_open))
+        self.render_cache = render_cache
+        self._sessions = OrderedDict()
+        self.stats = {'hits': 0, 'opens': 0, 'evictions': 0}
+
+    def get(self, pdf_path):
+        """
+        获取PDF文件的会话（已打开时直接复用）
+
+        Args:
+            pdf_path: PDF文件路径
+
+        Returns:
+            PDFSession: 文档会话
+        """
+        key = str(Path(pdf_path).resolve())
+        session = self._sessions.get(key)
+        if session is not None:
+            self._sessions.move_to_end(key)
+            self.stats['hits'] += 1
+            return session
+
+        session = PDFSession(pdf_path, render_cache=self.render_cache)
+        self.stats['opens'] += 1
+        self._sessions[key] = session
+        while len(self._sessions) > self.max_open:
+            _, evicted = self._sessions.popitem(last=False)
+            evicted.close()
+            self.stats['evictions'] += 1
+        return session
+
+    def close_all(self):
+        """关闭所有打开的文档"""
+        while self._sessions:
+            _, session = self._sessions.popitem()
+            session.close()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, pdf_path):
+        return str(Path(pdf_path).resolve()) in self._sessions
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_all()
+        return False
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分阶段流水线
+功能：将逐个文件的处理拆分为多个阶段（如 发现 → 预读 → 分析 → 复制），阶段之间以有界队列连接，
+各阶段有独立的并发数（I/O阶段使用线程，CPU阶段使用进程），下游跟不上时上游自动等待（背压）；
+统计每个阶段的队列深度、吞吐量和忙碌比例，用于找出瓶颈阶段
+"""
+
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 阶段之间的默认队列长度
+DEFAULT_QUEUE_SIZE = 8
+
+# 流水线统计的日志间隔（秒）
+REPORT_INTERVAL = 30.0
+
+# 输入结束标记
+_DONE = object()
+
+
+def _ready():
+    """进程池预热任务"""
+    return True
+
+
+class Stage:
+    """流水线中的一个阶段"""
+
+    def __init__(self, name, func, workers=1, kind='thread', initializer=None, initargs=(), bypass=None):
+        """
+        定义流水线阶段
+
+        Args:
+            name: 阶段名称（用于统计）
+            func: 处理函数，接收一个条目并返回处理后的条目；kind为'process'时必须是模块级函数
+            workers: 并发数（线程数或进程数）
+            kind: 'thread'（在线程中调用，适合I/O）或 'process'（在进程池中调用，适合CPU密集的计算）
+            initializer: 进程池工作进程的初始化函数（仅kind为'process'时使用）
+            initargs: 初始化函数的参数
+            bypass: 判断条目是否直接跳过本阶段的函数（可选，如之前阶段已失败的条目）
+        """
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"不支持的阶段类型: {kind}")
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.kind = kind
+        self.initializer = initializer
+        self.initargs = initargs
+        self.bypass = bypass
+
+
+class Pipeline:
+    """有界队列连接的多阶段流水线，迭代时按完成顺序返回最后一个阶段的输出"""
+
+    def __init__(self, source, stages, queue_size=DEFAULT_QUEUE_SIZE, source_name='discover',
+                 report_interval=REPORT_INTERVAL):
+        """
+        初始化流水线
+
+        Args:
+            source: 输入条目的可迭代对象（在单独的线程中读取，可以是流式产生条目的生成器）
+            stages: Stage列表，按处理顺序排列
+            queue_size: 每个阶段输入队列的长度上限
+            source_name: 输入阶段的名称（用于统计）
+            report_interval: 统计日志的间隔（秒），None表示不输出
+        """
+        self.source = source
+        self.stages = list(stages)
+        self.queue_size = max(1, int(queue_size))
+        self.source_name = source_name
+        self.report_interval = report_interval
+
+        self.elapsed = 0.0
+        self._start = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._error = None
+        self._queues = []
+        self._stats = {}
+
+    def __iter__(self):
+        """
+        运行流水线
+
+        Yields:
+            最后一个阶段输出的条目（按完成顺序，不保证与输入顺序一致）
+        """
+        self._stopped.clear()
+        self._error = None
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        self._stats = {self.source_name: self._new_stats('thread', 1)}
+        for stage in self.stages:
+            self._stats[stage.name] = self._new_stats(stage.kind, stage.workers)
+        remaining = [stage.workers for stage in self.stages]
+
+        executors = {}
+        threads = [threading.Thread(target=self._feed, name=f"pipeline-{self.source_name}", daemon=True)]
+        try:
+            for index, stage in enumerate(self.stages):
+                if stage.kind == 'process':
+                    executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=stage.workers, initializer=stage.initializer, initargs=stage.initargs)
+                    # 在启动各阶段线程之前创建工作进程（避免在多线程状态下fork）
+                    executor.submit(_ready).result()
+                    executors[stage.name] = executor
+                threads += [threading.Thread(target=self._work, args=(index, executors.get(stage.name), remaining),
+                                             name=f"pipeline-{stage.name}-{worker}", daemon=True)
+                            for worker in range(stage.workers)]
+
+            self._start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+
+            output = self._queues[-1]
+            last_report = self._start
+            while True:
+                item = self._get(output, timeout=self.report_interval)
+                if self._error is not None:
+                    raise self._error
+                if item is _DONE or self._stopped.is_set():
+                    break
+
+                now = time.perf_counter()
+                if self.report_interval and now - last_report >= self.report_interval:
+                    last_report = now
+                    self.elapsed = now - self._start
+                    logger.info(f"流水线进度:\n{self.format_stats()}")
+                if item is not None:
+                    yield item
+        finally:
+            # 正常结束或提前退出时停止所有阶段
+            self._stopped.set()
+            for thread in threads:
+                if thread.is_alive():
+                    thread.join()
+            for executor in executors.values():
+                executor.shutdown(wait=True, cancel_futures=True)
+            if self._start is not None:
+                self.elapsed = time.perf_counter() - self._start
+
+    @staticmethod
+    def _new_stats(kind, workers):
+        return {'kind': kind, 'workers': workers, 'processed': 0, 'busy_seconds': 0.0,
+                'queue_depth': 0, 'max_queue_depth': 0}
+
+    def _feed(self):
+        """输入线程：依次读取输入条目放入第一个阶段的队列"""
+        stats = self._stats[self.source_name]
+        iterator = None
+        try:
+            iterator = iter(self.source)
+            while not self._stopped.is_set():
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                self._record(stats, time.perf_counter() - start)
+                self._put(0, item)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            # 提前停止时关闭输入（如结束目录遍历线程）
+            if hasattr(iterator, 'close'):
+                iterator.close()
+            target = self.stages[0].workers if self.stages else 1
+            for _ in range(target):
+                self._put(0, _DONE)
+
+    def _work(self, index, executor, remaining):
+        """阶段工作线程：从输入队列取出条目处理后放入下一个队列；所有工作线程结束后向下游传递结束标记"""
+        stage = self.stages[index]
+        stats = self._stats[stage.name]
+        source = self._queues[index]
+        try:
+            while True:
+                item = self._get(source)
+                if item is _DONE:
+                    break
+                if item is None:
+                    # 已停止
+                    return
+                if stage.bypass is not None and stage.bypass(item):
+                    self._put(index + 1, item)
+                    continue
+
+                start = time.perf_counter()
+                if executor is None:
+                    item = stage.func(item)
+                else:
+                    item = executor.submit(stage.func, item).result()
+                self._record(stats, time.perf_counter() - start)
+                self._put(index + 1, item)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            with self._lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last:
+                target = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+                for _ in range(target):
+                    self._put(index + 1, _DONE)
+
+    def _record(self, stats, seconds):
+        with self._lock:
+            stats['processed'] += 1
+            stats['busy_seconds'] += seconds
+
+    def _put(self, index, item):
+        """放入第index个阶段的输入队列（index为阶段数时为输出队列）；队列已满时等待，流水线停止时放弃"""
+        target = self._queues[index]
+        while not self._stopped.is_set():
+            try:
+                target.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            if index < len(self.stages):
+                stats = self._stats[self.stages[index].name]
+                stats['max_queue_depth'] = max(stats['max_queue_depth'], target.qsize())
+            return
+
+    def _get(self, source, timeout=None):
+        """从队列取出条目；流水线停止或超时时返回None"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while not self._stopped.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return None
+        return None
+
+    def _fail(self, error):
+        """记录第一个错误并停止流水线（错误在迭代流水线的线程中重新抛出）"""
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stopped.set()
+
+    def get_stats(self):
+        """
+        获取各阶段的统计
+
+        Returns:
+            dict: {阶段名称: 统计}，统计包含
+                - kind / workers: 阶段类型和并发数
+                - processed: 已处理条目数
+                - busy_seconds: 累计处理耗时（秒）
+                - queue_depth / max_queue_depth: 当前/最大输入队列深度
+                - throughput: 吞吐量（条目/秒）
+                - utilization: 忙碌比例（累计处理耗时 / (运行时间 × 并发数)），接近1的阶段即为瓶颈
+        """
+        elapsed = self.elapsed if self._stopped.is_set() or self._start is None else time.perf_counter() - self._start
+        stats = {}
+        for position, (name, stage_stats) in enumerate(self._stats.items()):
+            snapshot = dict(stage_stats)
+            if 0 < position <= len(self._queues):
+                snapshot['queue_depth'] = self._queues[position - 1].qsize()
+            snapshot['throughput'] = snapshot['processed'] / elapsed if elapsed > 0 else 0.0
+            snapshot['utilization'] = snapshot['busy_seconds'] / (elapsed * snapshot['workers']) if elapsed > 0 else 0.0
+            stats[name] = snapshot
+        return stats
+
+    def bottleneck(self):
+        """忙碌比例最高的阶段名称（不含输入阶段）"""
+        stats = self.get_stats()
+        names = [stage.name for stage in self.stages]
+        return max(names, key=lambda name: stats[name]['utilization']) if names else None
+
+    def format_stats(self):
+        """各阶段统计的文本表格"""
+        lines = [f"{'阶段':<10}{'类型':<9}{'并发':>4}{'已处理':>8}{'吞吐(个/秒)':>12}{'忙碌比例':>10}{'队列深度':>10}{'最大深度':>10}"]
+        for name, stats in self.get_stats().items():
+            lines.append(f"{name:<10}{stats['kind']:<9}{stats['workers']:>4}{stats['processed']:>8}"
+                         f"{stats['throughput']:>14.1f}{stats['utilization']:>12.0%}"
+                         f"{stats['queue_depth']:>12}{stats['max_queue_depth']:>12}")
+        return "\n".join(lines)
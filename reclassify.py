@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按新的颜色阈值重新判定之前的运行结果
+功能：读取特征提取器之前保存的结果（JSON或JSONL），由页面特征缓存中与阈值无关的测量结果
+在新配置下重新计算特征和符合性，不重新渲染页面；输出判定发生变化的文件和新的结果文件
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from feature_cache import FeatureCache
+from pdf_feature_extractor import PDFFeatureExtractor, LINE_DETECTORS, DEFAULT_LINE_DETECTOR
+from result_sink import reassemble_legacy_json
+
+
+def load_previous_results(results_path):
+    """
+    读取之前运行的处理结果
+
+    Args:
+        results_path: 结果文件路径（process_pdf_folder/process_pdf_file保存的JSON，或流式输出的JSONL）
+
+    Returns:
+        list: 单个文件的处理结果列表
+    """
+    results_path = Path(results_path)
+    if results_path.suffix.lower() == '.jsonl':
+        data = reassemble_legacy_json(results_path)
+    else:
+        with open(results_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    if 'results' in data:
+        return data['results']
+    if 'page_results' in data:
+        return [data]
+    raise ValueError(f"不支持的结果文件格式: {results_path}")
+
+
+def reclassify_results(extractor, previous_results):
+    """
+    在提取器当前的颜色阈值下重新判定之前的处理结果
+
+    Args:
+        extractor: 设置了特征缓存的PDFFeatureExtractor
+        previous_results: 单个文件的处理结果列表
+
+    Returns:
+        tuple: (新结果列表, 判定发生变化的文件列表, 缺少缓存而保留原结果的文件数)
+    """
+    results = []
+    changed = []
+    missing = 0
+    for previous in previous_results:
+        result = extractor.reclassify_result(previous)
+        if result is None:
+            # 之前处理失败或缺少缓存：保留原结果
+            if previous.get('success', False):
+                missing += 1
+            results.append(previous)
+            continue
+        results.append(result)
+        if result['overall_compliance'] != previous.get('overall_compliance', False):
+            changed.append((previous.get('file_name', previous['file_path']),
+                            previous.get('overall_compliance', False), result['overall_compliance']))
+    return results, changed, missing
+
+
+def summarize(results):
+    """统计符合/不符合/错误文件数"""
+    summary = {'compliant': 0, 'non_compliant': 0, 'errors': 0}
+    for result in results:
+        if not result.get('success', False):
+            summary['errors'] += 1
+        elif result.get('overall_compliance', False):
+            summary['compliant'] += 1
+        else:
+            summary['non_compliant'] += 1
+    return summary
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='按新的颜色阈值重新判定之前的运行结果（使用页面特征缓存，不重新渲染）')
+    parser.add_argument('results_path', help='之前运行保存的结果文件（JSON或JSONL）')
+    parser.add_argument('--feature-cache', required=True, help='页面特征缓存（SQLite）路径')
+    parser.add_argument('--config', help='新的颜色阈值配置文件路径（JSON格式）')
+    parser.add_argument('--line-detector', choices=list(LINE_DETECTORS), default=DEFAULT_LINE_DETECTOR,
+                       help=f'建立特征缓存时使用的长横线检测器（默认：{DEFAULT_LINE_DETECTOR}，'
+                            f'须与运行特征提取器时的--line-detector一致，否则缓存不匹配）')
+    parser.add_argument('--data-dir', default='data', help='数据保存目录')
+    parser.add_argument('--output', help='输出文件名（可选）')
+
+    args = parser.parse_args()
+
+    results_path = Path(args.results_path)
+    if not results_path.exists():
+        print(f"❌ 文件不存在: {results_path}")
+        return 1
+
+    previous_results = load_previous_results(results_path)
+    with FeatureCache(args.feature_cache, PDFFeatureExtractor.feature_fingerprint(args.line_detector)) as feature_cache:
+        extractor = PDFFeatureExtractor(data_dir=args.data_dir, config_file=args.config,
+                                        feature_cache=feature_cache, line_detector=args.line_detector)
+        start = time.perf_counter()
+        results, changed, missing = reclassify_results(extractor, previous_results)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n{'='*80}")
+    print(f"重新判定完成: {len(previous_results)} 个文件，耗时 {elapsed_ms:.1f} ms "
+          f"（{elapsed_ms / max(1, len(previous_results)):.2f} ms/文件）")
+    print(f"{'='*80}")
+    for label, summary in (("原结果", summarize(previous_results)), ("新结果", summarize(results))):
+        print(f"📊 {label}: 符合 {summary['compliant']}，不符合 {summary['non_compliant']}，错误 {summary['errors']}")
+    if missing:
+        print(f"⚠️ {missing} 个文件缺少特征缓存，保留原结果（使用 --feature-cache 重新运行特征提取器后可重新判定）")
+
+    if changed:
+        print(f"\n🔄 判定发生变化的文件 ({len(changed)}个):")
+        for file_name, before, after in changed:
+            print(f"  {'符合' if before else '不符合'} -> {'符合' if after else '不符合'}  {file_name}")
+    else:
+        print(f"\n✅ 没有文件的判定发生变化")
+
+    output_name = args.output or f"pdf_feature_reclassified_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    extractor.save_results({
+        'reclassified_from': str(results_path),
+        'color_thresholds': extractor.get_color_thresholds(),
+        'total_files': len(results),
+        'results': results,
+        'summary': summarize(results),
+        'changed_files': len(changed),
+        'missing_features': missing,
+        'timestamp': datetime.now().isoformat()
+    }, output_name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面渲染磁盘缓存
+功能：以 (文件内容哈希, 页面索引, 渲染倍率, 颜色空间) 为键，将渲染后的页面数组保存为原始.npy文件，
+重复运行或重复实验时以内存映射方式读取，不再重新渲染；总大小超过上限时按最近使用时间淘汰
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from scan_manifest import file_content_hash
+
+# 缓存总大小默认上限（字节）
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# 缓存条目的文件扩展名
+ENTRY_SUFFIX = ".npy"
+
+
+class RenderCache:
+    """
+    内容寻址的页面渲染缓存
+
+    缓存键只与文件内容有关，文件被移动、重命名或重新复制后仍可命中；
+    条目文件的修改时间记录最近一次使用时间，多次运行之间沿用同一LRU顺序。
+    大小上限按进程计算：每个进程只在启动时扫描一次目录，之后只记录自己写入和读取的条目，
+    多个进程共用一个缓存目录时目录总大小最多为各进程上限之和（调用方应按进程数分摊总上限）。
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        初始化渲染缓存（扫描已有条目）
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节），超出时淘汰最久未使用的条目
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+        # 文件内容哈希按 (路径, 大小, 修改时间) 记忆，同一次运行中每个文件只读取一次
+        self._content_hashes = {}
+        # 最近一次由内存中的文件内容计算的哈希：(内容对象, 哈希)，同一会话的多次渲染只计算一次
+        self._data_hash = (None, None)
+
+        # 条目名 -> 字节数，按最近使用时间从旧到新排列
+        self._entries = OrderedDict()
+        self.total_bytes = 0
+        entries = []
+        for path in self.cache_dir.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, path.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self.total_bytes += size
+
+    def content_hash(self, pdf_path, data=None):
+        """
+        获取文件内容的sha256哈希（同一次运行中未变化的文件只计算一次）
+
+        Args:
+            pdf_path: PDF文件路径
+            data: 已读取的文件内容（可选），指定时直接对其计算哈希，不再读取文件
+
+        Returns:
+            str: sha256十六进制字符串
+        """
+        if data is not None:
+            cached_data, digest = self._data_hash
+            if cached_data is not data:
+                digest = hashlib.sha256(data).hexdigest()
+                self._data_hash = (data, digest)
+            return digest
+
+        path = Path(pdf_path).resolve()
+        stat = path.stat()
+        memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._content_hashes.get(memo_key)
+        if digest is None:
+            digest = file_content_hash(path)
+            self._content_hashes[memo_key] = digest
+        return digest
+
+    @staticmethod
+    def entry_name(content_hash, page_index, scale, colorspace):
+        """
+        计算缓存条目的文件名
+
+        Args:
+            content_hash: 文件内容哈希
+            page_index: 页面索引（从0开始）
+            scale: 渲染倍率
+            colorspace: 颜色空间，'rgb' 或 'gray'
+
+        Returns:
+            str: 条目文件名
+        """
+        key = f"{content_hash}:{int(page_index)}:{float(scale)!r}:{colorspace}"
+        return hashlib.sha256(key.encode('utf-8')).hexdigest() + ENTRY_SUFFIX
+
+    def fetch(self, pdf_path, page_index, scale, colorspace, render, data=None):
+        """
+        读取缓存的页面图像，未命中时调用render渲染并写入缓存
+
+        Args:
+            pdf_path: PDF文件路径
+            page_index: 页面索引（从0开始）
+            scale: 渲染倍率
+            colorspace: 颜色空间，'rgb' 或 'gray'
+            render: 无参数的渲染函数，返回页面图像数组
+            data: 已读取的文件内容（可选），指定时由其计算内容哈希
+
+        Returns:
+            numpy.ndarray: 页面图像数组（命中时为只读的内存映射数组）
+        """
+        name = self.entry_name(self.content_hash(pdf_path, data), page_index, scale, colorspace)
+        image = self._load(name)
+        if image is not None:
+            self.stats['hits'] += 1
+            return image
+
+        self.stats['misses'] += 1
+        image = render()
+        self._store(name, image)
+        return image
+
+    def _load(self, name):
+        """以内存映射方式读取条目，并将其标记为最近使用；条目不存在或已损坏时返回None"""
+        path = self.cache_dir / name
+        try:
+            image = np.asarray(np.load(path, mmap_mode='r', allow_pickle=False))
+            os.utime(path)
+        except FileNotFoundError:
+            self._forget(name)
+            return None
+        except (OSError, ValueError):
+            # 写入中断等原因导致的损坏条目，删除后重新渲染
+            self._forget(name)
+            path.unlink(missing_ok=True)
+            return None
+
+        if name not in self._entries:
+            # 其他进程写入的条目
+            self._entries[name] = path.stat().st_size
+            self.total_bytes += self._entries[name]
+        self._entries.move_to_end(name)
+        return image
+
+    def _store(self, name, image):
+        """写入条目（先写临时文件再原子替换，避免并发读取到不完整的文件），超出上限时淘汰旧条目"""
+        path = self.cache_dir / name
+        temp_path = path.with_name(f"{name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(image), allow_pickle=False)
+            os.replace(temp_path, path)
+        except OSError:
+            # 缓存写入失败（如磁盘已满）不影响处理结果
+            temp_path.unlink(missing_ok=True)
+            return
+
+        self._forget(name)
+        self._entries[name] = path.stat().st_size
+        self.total_bytes += self._entries[name]
+        self._evict()
+
+    def _evict(self):
+        """淘汰最久未使用的条目，直到总大小不超过上限（至少保留刚写入的条目）"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            (self.cache_dir / name).unlink(missing_ok=True)
+            self.stats['evictions'] += 1
+
+    def _forget(self, name):
+        """从索引中移除条目（不删除文件）"""
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self):
+        """
+        获取缓存统计
+
+        Returns:
+            dict: 命中/未命中/淘汰次数、命中率、条目数和总大小
+        """
+        lookups = self.stats['hits'] + self.stats['misses']
+        stats = dict(self.stats)
+        stats['hit_rate'] = self.stats['hits'] / lookups if lookups else 0.0
+        stats['entries'] = len(self._entries)
+        stats['total_bytes'] = self.total_bytes
+        return stats
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式结果输出工具
+功能：
+1. 每处理完一个文件即向JSONL文件追加一行结果，定期flush/fsync，运行中断也不会丢失已完成的结果
+2. 按需将JSONL结果重新组装为原有的汇总JSON格式
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from scan_manifest import json_default
+
+# 记录类型
+RECORD_HEADER = 'header'
+RECORD_FILE = 'file'
+RECORD_SUMMARY = 'summary'
+
+# 支持重新组装的格式
+FORMAT_UNIFIED = 'unified_analysis'
+FORMAT_FEATURE_EXTRACTOR = 'feature_extractor'
+
+
+class JsonlResultSink:
+    """JSONL流式结果写入器"""
+
+    def __init__(self, output_path, result_format, metadata=None, flush_every=20, fsync_seconds=5.0):
+        """
+        初始化写入器并写入头记录
+
+        Args:
+            output_path: JSONL文件路径
+            result_format: 结果格式（FORMAT_UNIFIED 或 FORMAT_FEATURE_EXTRACTOR），用于重新组装
+            metadata: 头记录中的附加信息（如源目录、目标目录）
+            flush_every: 每写入多少条记录flush一次
+            fsync_seconds: 两次fsync之间的最短间隔（秒）
+        """
+        self.output_path = Path(output_path)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = max(1, flush_every)
+        self.fsync_seconds = fsync_seconds
+
+        self.records_written = 0
+        self._unflushed = 0
+        self._last_fsync = time.monotonic()
+
+        self._file = open(self.output_path, 'a', encoding='utf-8')
+        header = {'record_type': RECORD_HEADER, 'format': result_format}
+        header.update(metadata or {})
+        self._write_line(header)
+        self.flush(fsync=True)
+
+    def _write_line(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=json_default))
+        self._file.write('\n')
+
+    def write(self, result):
+        """
+        追加一个文件的处理结果
+
+        Args:
+            result: 单个文件的处理结果字典
+        """
+        self._write_line({'record_type': RECORD_FILE, 'data': result})
+        self.records_written += 1
+        self._unflushed += 1
+
+        if self._unflushed >= self.flush_every:
+            fsync = time.monotonic() - self._last_fsync >= self.fsync_seconds
+            self.flush(fsync=fsync)
+
+    def flush(self, fsync=False):
+        """
+        将缓冲区写入文件
+
+        Args:
+            fsync: 是否同时调用os.fsync确保写入磁盘
+        """
+        self._file.flush()
+        self._unflushed = 0
+        if fsync:
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+
+    def close(self, summary=None):
+        """
+        写入汇总记录并关闭文件
+
+        Args:
+            summary: 汇总信息（如统计结果），为None时不写汇总记录
+        """
+        if self._file is None:
+            return
+        if summary is not None:
+            record = {'record_type': RECORD_SUMMARY}
+            record.update(summary)
+            self._write_line(record)
+        self.flush(fsync=True)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_jsonl_results(jsonl_path):
+    """
+    读取JSONL结果文件
+
+    运行中断时最后一行可能不完整，解析失败的行会被跳过。
+
+    Args:
+        jsonl_path: JSONL文件路径
+
+    Returns:
+        tuple: (头记录, 文件结果列表, 汇总记录或None)
+    """
+    header = {}
+    results = []
+    summary = None
+
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            record_type = record.get('record_type')
+            if record_type == RECORD_HEADER:
+                header = record
+            elif record_type == RECORD_FILE:
+                results.append(record['data'])
+            elif record_type == RECORD_SUMMARY:
+                summary = record
+
+    return header, results, summary
+
+
+def _clean_unified_result(result):
+    """与原汇总JSON一致：非标量字段转为字符串"""
+    cleaned_result = {}
+    for key, value in result.items():
+        if isinstance(value, (bool, int, float, str)):
+            cleaned_result[key] = value
+        elif value is None:
+            cleaned_result[key] = None
+        else:
+            cleaned_result[key] = str(value)
+    return cleaned_result
+
+
+def _recompute_unified_statistics(results):
+    """运行中断（没有汇总记录）时根据已写入的结果重新统计"""
+    return {
+        'total_pdfs': len(results),
+        'first_feature_passed': sum(1 for r in results if r.get('first_feature', False)),
+        'second_feature_passed': sum(1 for r in results if r.get('second_feature', False)),
+        'copied_files': sum(1 for r in results if r.get('copied', False)),
+        'errors': sum(1 for r in results if not r.get('success', False)),
+        'specific_files_analyzed': 0,
+        'cached_files': sum(1 for r in results if r.get('cached', False))
+    }
+
+
+def _recompute_folder_summary(results):
+    """运行中断（没有汇总记录）时根据已写入的结果重新统计"""
+    summary = {'compliant': 0, 'non_compliant': 0, 'errors': 0}
+    for result in results:
+        if not result.get('success', False):
+            summary['errors'] += 1
+        elif result.get('overall_compliance', False):
+            summary['compliant'] += 1
+        else:
+            summary['non_compliant'] += 1
+    return summary
+
+
+def reassemble_legacy_json(jsonl_path):
+    """
+    将JSONL结果重新组装为原有的汇总JSON格式
+
+    Args:
+        jsonl_path: JSONL文件路径
+
+    Returns:
+        dict: 与原汇总JSON结构一致的字典
+    """
+    header, results, summary = read_jsonl_results(jsonl_path)
+    result_format = header.get('format', FORMAT_UNIFIED)
+
+    if result_format == FORMAT_FEATURE_EXTRACTOR:
+        return {
+            'folder_path': header.get('folder_path'),
+            'total_files': summary['total_files'] if summary else len(results),
+            'results': results,
+            'summary': summary['summary'] if summary else _recompute_folder_summary(results),
+            'page_mode': header.get('page_mode'),
+            'timestamp': summary['timestamp'] if summary else header.get('start_time')
+        }
+
+    return {
+        'scan_time': summary['scan_time'] if summary else header.get('start_time'),
+        'source_directory': header.get('source_directory'),
+        'target_folder': header.get('target_folder'),
+        'statistics': summary['statistics'] if summary else _recompute_unified_statistics(results),
+        'files': [_clean_unified_result(result) for result in results]
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='将JSONL流式结果重新组装为汇总JSON')
+    parser.add_argument('jsonl_path', help='JSONL结果文件路径')
+    parser.add_argument('--output', '-o', help='输出JSON文件路径（默认与输入同名，扩展名为.json）')
+
+    args = parser.parse_args()
+
+    jsonl_path = Path(args.jsonl_path)
+    if not jsonl_path.exists():
+        print(f"❌ 文件不存在: {jsonl_path}")
+        return 1
+
+    output_path = Path(args.output) if args.output else jsonl_path.with_suffix('.json')
+    legacy_data = reassemble_legacy_json(jsonl_path)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(legacy_data, f, indent=2, ensure_ascii=False, default=json_default)
+
+    print(f"✅ 已重新组装汇总JSON: {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
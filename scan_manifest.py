@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量扫描清单
+功能：使用本地SQLite数据库记录每个PDF文件的处理结果，重复运行时跳过未变化的文件
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# 每累计多少条写入提交一次事务
+COMMIT_INTERVAL = 100
+
+
+def json_default(value):
+    """json.dump的default回调，处理numpy类型"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, Path):
+        return str(value)
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def config_fingerprint(color_thresholds, algorithm_version, **options):
+    """
+    计算配置指纹
+
+    颜色阈值、算法版本或处理参数任一变化都会得到不同的指纹，
+    清单中以旧指纹记录的结果将不再被复用。
+
+    Args:
+        color_thresholds: 颜色阈值配置字典
+        algorithm_version: 算法版本号
+        **options: 其他影响结果的处理参数（如page_mode、max_pages）
+
+    Returns:
+        str: 配置指纹（sha256十六进制字符串）
+    """
+    payload = {
+        'color_thresholds': color_thresholds,
+        'algorithm_version': algorithm_version,
+        'options': options
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=json_default).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def file_content_hash(file_path, chunk_size=1024 * 1024):
+    """
+    计算文件内容的sha256哈希
+
+    Args:
+        file_path: 文件路径
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        str: sha256十六进制字符串
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ScanManifest:
+    """增量扫描清单（SQLite）"""
+
+    def __init__(self, db_path, scope, fingerprint, use_content_hash=False):
+        """
+        初始化扫描清单
+
+        Args:
+            db_path: SQLite数据库文件路径
+            scope: 结果所属的工具/模式（如 "unified"、"feature_extractor"），不同scope的记录互不影响
+            fingerprint: 当前配置指纹（见config_fingerprint）
+            use_content_hash: 文件大小或修改时间变化时，是否再比较内容哈希
+                              （内容未变的文件只刷新大小和修改时间，仍复用结果）
+        """
+        self.db_path = Path(db_path)
+        self.scope = scope
+        self.fingerprint = fingerprint
+        self.use_content_hash = use_content_hash
+
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+        self._pending_writes = 0
+
+        # 流水线模式下查询和写入来自不同线程，访问连接时加锁
+        self._lock = threading.RLock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                scope TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT,
+                fingerprint TEXT NOT NULL,
+                result TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (scope, path)
+            )
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def _key(pdf_path):
+        return os.path.abspath(str(pdf_path))
+
+    def lookup(self, pdf_path):
+        """
+        查询文件的已存储结果
+
+        Args:
+            pdf_path: PDF文件路径
+
+        Returns:
+            dict: 文件未变化且配置指纹一致时返回已存储的结果，否则返回None
+        """
+        with self._lock:
+            key = self._key(pdf_path)
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, content_hash, fingerprint, result FROM files WHERE scope = ? AND path = ?",
+                (self.scope, key)
+            ).fetchone()
+
+            if row is None or row[3] != self.fingerprint:
+                self.stats['misses'] += 1
+                return None
+
+            size, mtime_ns, content_hash, _, result = row
+            try:
+                stat = os.stat(key)
+            except OSError:
+                self.stats['misses'] += 1
+                return None
+
+            if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                self.stats['hits'] += 1
+                return json.loads(result)
+
+            # 大小或修改时间变化：可选地比较内容哈希（如文件被重新复制但内容未变）
+            if self.use_content_hash and content_hash and stat.st_size == size:
+                if file_content_hash(key) == content_hash:
+                    self.conn.execute(
+                        "UPDATE files SET mtime_ns = ? WHERE scope = ? AND path = ?",
+                        (stat.st_mtime_ns, self.scope, key)
+                    )
+                    self._mark_write()
+                    self.stats['hits'] += 1
+                    return json.loads(result)
+
+            self.stats['misses'] += 1
+            return None
+
+    def store(self, pdf_path, result):
+        """
+        存储文件的处理结果
+
+        Args:
+            pdf_path: PDF文件路径
+            result: 处理结果字典
+        """
+        with self._lock:
+            key = self._key(pdf_path)
+            try:
+                stat = os.stat(key)
+            except OSError:
+                return
+
+            content_hash = file_content_hash(key) if self.use_content_hash else None
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO files (scope, path, size, mtime_ns, content_hash, fingerprint, result, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.scope, key, stat.st_size, stat.st_mtime_ns, content_hash, self.fingerprint,
+                    json.dumps(result, ensure_ascii=False, default=json_default),
+                    datetime.now().isoformat()
+                )
+            )
+            self.stats['stored'] += 1
+            self._mark_write()
+
+    def _mark_write(self):
+        """累计写入次数，定期提交事务"""
+        self._pending_writes += 1
+        if self._pending_writes >= COMMIT_INTERVAL:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def commit(self):
+        """提交未完成的写入"""
+        with self._lock:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        """提交未完成的写入并关闭数据库"""
+        with self._lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
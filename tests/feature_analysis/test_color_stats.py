@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试单次遍历颜色统计
+1. 与原逐项整图计算（np.all掩码、np.mean、calcHist、np.std）的结果一致
+2. 单页耗时基准对比
+"""
+
+import time
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, TEMPLATES_DIR
+
+from color_stats import compute_color_statistics, contrast_from_histogram
+from pdf_renderer import render_page
+
+WHITE_BG_MIN = 200
+BLACK_TEXT_MAX = 80
+
+
+def legacy_color_statistics(rgb_image):
+    """原逐项整图计算实现（仅用于结果对比和基准测试）"""
+    r, g, b = rgb_image[:, :, 0], rgb_image[:, :, 1], rgb_image[:, :, 2]
+    white_mask = np.all(rgb_image >= WHITE_BG_MIN, axis=2)
+    max_rgb = np.maximum(np.maximum(r, g), b)
+    min_rgb = np.minimum(np.minimum(r, g), b)
+    grayscale_mask = (max_rgb <= BLACK_TEXT_MAX + 50) & (max_rgb - min_rgb <= 20)
+
+    colored = 0
+    colored += np.sum((r > g + 50) & (r > b + 50) & (r > 120) & ~white_mask)
+    colored += np.sum((b > r + 50) & (b > g + 50) & (b > 120) & ~white_mask)
+    colored += np.sum((g > r + 50) & (g > b + 50) & (g > 120) & ~white_mask)
+    colored += np.sum((max_rgb - min_rgb > 60) & ~white_mask & ~grayscale_mask & (max_rgb > 100))
+
+    gray = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2GRAY)
+    return {
+        'mean_rgb': np.mean(rgb_image.reshape(-1, 3), axis=0),
+        'white_pixels': np.sum(white_mask),
+        'black_pixels': np.sum(np.all(rgb_image <= BLACK_TEXT_MAX, axis=2)),
+        'colored_text_pixels': colored,
+        'histogram': cv2.calcHist([gray], [0], None, [256], [0, 256]).flatten(),
+        'contrast': np.std(gray)
+    }
+
+
+def load_images():
+    """测试PDF的部分页面、所有mb*.png模板和一张随机彩色图"""
+    images = []
+    doc = fitz.open(PROJECT_ROOT / "input_pdfs" / "test.pdf")
+    for page_num in range(0, len(doc), 10):
+        images.append((f"test.pdf#{page_num + 1}", render_page(doc.load_page(page_num), scale=2.0)))
+    doc.close()
+
+    for image_path in sorted(TEMPLATES_DIR.glob('mb*.png')):
+        images.append((image_path.name, np.array(Image.open(str(image_path)).convert('RGB'))))
+
+    rng = np.random.default_rng(0)
+    images.append(("random", rng.integers(0, 256, (301, 257, 3), dtype=np.uint8)))
+    return images
+
+
+def test_matches_legacy_passes():
+    """融合统计与原逐项计算结果一致（对比度误差在浮点舍入范围内）"""
+    for name, image in load_images():
+        expected = legacy_color_statistics(image)
+        gray_out = np.empty(image.shape[:2], dtype=np.uint8)
+        actual = compute_color_statistics(image, WHITE_BG_MIN, BLACK_TEXT_MAX, gray_out=gray_out, tile_rows=50)
+
+        assert np.array_equal(actual['mean_rgb'], expected['mean_rgb']), name
+        assert actual['white_pixels'] == expected['white_pixels'], name
+        assert actual['black_pixels'] == expected['black_pixels'], name
+        assert actual['colored_text_pixels'] == expected['colored_text_pixels'], name
+        assert np.array_equal(actual['histogram'], expected['histogram']), name
+        assert abs(actual['contrast'] - expected['contrast']) <= 1e-12 * max(expected['contrast'], 1.0), name
+        assert np.array_equal(gray_out, cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)), name
+
+
+def test_contrast_from_histogram():
+    """直方图对比度与np.std一致，空直方图返回0"""
+    gray = np.array([[0, 255], [128, 128]], dtype=np.uint8)
+    histogram = np.bincount(gray.ravel(), minlength=256)
+    assert abs(contrast_from_histogram(histogram) - np.std(gray)) < 1e-12
+    assert contrast_from_histogram(np.zeros(256)) == 0.0
+
+
+def benchmark_color_statistics(repeat=5):
+    """对比原逐项计算与融合统计的单页耗时"""
+    print(f"{'图像':<32} {'原实现(ms)':>12} {'融合(ms)':>12} {'加速比':>8}")
+    for name, image in load_images()[:3]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            legacy_color_statistics(image)
+        legacy_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            compute_color_statistics(image, WHITE_BG_MIN, BLACK_TEXT_MAX)
+        fused_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        print(f"{name:<32} {legacy_ms:>12.1f} {fused_ms:>12.1f} {legacy_ms / fused_ms:>7.1f}x")
+
+
+def main():
+    """主函数"""
+    print("=== 融合颜色统计测试 ===")
+    test_matches_legacy_passes()
+    test_contrast_from_histogram()
+    print("✓ 结果与原实现一致")
+
+    print("\n=== 单页耗时基准 ===")
+    benchmark_color_statistics()
+
+
+if __name__ == "__main__":
+    main()
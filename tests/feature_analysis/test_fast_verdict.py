@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试快速判定模式（级联提前退出）
+1. 快速模式与完整模式的符合性结论一致
+2. 被跳过的检查和页面在结果中有记录
+"""
+
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
+
+from pdf_feature_extractor import PDFFeatureExtractor
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def create_test_images():
+    """创建符合标准与不符合标准的测试图像"""
+    images = {}
+    images['template'] = np.array(Image.open(str(TEMPLATES_DIR / 'mb.png')).convert('RGB'))
+    images['dark'] = np.full((600, 400, 3), 40, dtype=np.uint8)
+    colored = np.full((600, 400, 3), 255, dtype=np.uint8)
+    colored[100:400, :, :] = (220, 30, 30)
+    images['colored'] = colored
+    no_lines = np.full((600, 400, 3), 255, dtype=np.uint8)
+    cv2.putText(no_lines, "TEXT", (50, 300), cv2.FONT_HERSHEY_SIMPLEX, 3.0, (0, 0, 0), 8)
+    images['no_lines'] = no_lines
+    return images
+
+
+def test_fast_verdict_matches_full():
+    """快速模式与完整模式对每张图像给出相同的结论"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    for name, image in create_test_images().items():
+        full = extractor.analyze_color_features(image)
+        fast = extractor.analyze_color_features(image, verdict_mode="fast")
+
+        assert extractor.check_standard_compliance(fast) == extractor.check_standard_compliance(full), name
+
+        if fast['failed_check'] is None:
+            assert fast['skipped_checks'] == []
+        else:
+            index = PDFFeatureExtractor.FAST_CHECK_ORDER.index(fast['failed_check'])
+            assert fast['skipped_checks'] == list(PDFFeatureExtractor.FAST_CHECK_ORDER[index + 1:])
+
+
+def test_dark_page_skips_second_feature():
+    """亮度不通过时不再计算后续特征"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    image = np.full((600, 400, 3), 40, dtype=np.uint8)
+
+    features = extractor.analyze_color_features(image, verdict_mode="fast")
+
+    assert features['failed_check'] == 'brightness'
+    assert features['second_feature'] is None
+    assert 'second_feature' in features['skipped_checks']
+
+
+def test_process_pdf_file_fast_mode():
+    """快速模式对整份PDF的结论与完整模式一致，且记录跳过的页面"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    full = extractor.process_pdf_file(TEST_PDF, max_pages=3, page_mode="first_n")
+    fast = extractor.process_pdf_file(TEST_PDF, max_pages=3, page_mode="first_n", verdict_mode="fast")
+
+    assert fast['overall_compliance'] == full['overall_compliance']
+    assert fast['pages_analyzed'] + len(fast['skipped_pages']) == full['pages_analyzed']
+
+
+def benchmark_verdict_modes():
+    """对比两种模式的单页耗时"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    for name, image in create_test_images().items():
+        timings = {}
+        for mode in ("full", "fast"):
+            start = time.perf_counter()
+            extractor.analyze_color_features(image, verdict_mode=mode)
+            timings[mode] = (time.perf_counter() - start) * 1000
+        print(f"{name:<12} full={timings['full']:.1f}ms fast={timings['fast']:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_fast_verdict_matches_full()
+    test_dark_page_skips_second_feature()
+    test_process_pdf_file_fast_mode()
+    print("✅ 快速判定测试通过")
+    benchmark_verdict_modes()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试页面特征缓存（feature_cache.py）和按新阈值重新判定（reclassify.py）
+1. 由通道直方图换算的颜色统计与按阈值直接统计的结果一致
+2. 缓存命中的页面不再渲染，特征与直接分析一致
+3. 修改颜色阈值后由缓存重新判定，结果与按新阈值重新运行一致
+4. 由非默认长横线检测器建立的缓存，reclassify.py 按 --line-detector 匹配
+5. 重新判定与重新运行的耗时对比
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, DATA_DIR
+
+from color_stats import compute_channel_histograms, compute_color_statistics, statistics_from_histograms
+from feature_cache import FeatureCache
+from pdf_feature_extractor import PDFFeatureExtractor
+from pdf_session import PDFSession
+from reclassify import load_previous_results, reclassify_results
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+# 与默认配置差别较大的阈值，使部分页面的判定发生变化
+STRICT_THRESHOLDS = {'white_bg_min': 230, 'black_text_max': 60, 'bg_ratio_min': 0.97, 'contrast_min': 30}
+
+
+def open_cache(temp_dir):
+    return FeatureCache(Path(temp_dir) / "features.db", PDFFeatureExtractor.feature_fingerprint())
+
+
+def as_json(value):
+    """经过JSON序列化后的值（缓存中的第二特征坐标为列表而不是元组）"""
+    return json.loads(json.dumps(value))
+
+
+def test_histogram_statistics_match():
+    """任意白色/黑色阈值下，直方图换算结果与compute_color_statistics一致"""
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (60, 40, 3), dtype=np.uint8)]
+    with PDFSession(TEST_PDF) as session:
+        images.append(np.array(session.render(1, scale=1.0)))
+
+    for image in images:
+        histograms = compute_channel_histograms(image, tile_rows=16)
+        for white_bg_min, black_text_max in ((200, 80), (230, 60), (150, 120), (0, 0), (255, 255)):
+            expected = compute_color_statistics(image, white_bg_min, black_text_max)
+            actual = statistics_from_histograms(histograms, white_bg_min, black_text_max)
+            for key, value in expected.items():
+                assert np.array_equal(actual[key], value), f"{key} 不一致 ({white_bg_min}, {black_text_max})"
+
+
+def test_cached_pages_skip_rendering():
+    """第二次处理全部命中缓存，特征与不使用缓存时一致"""
+    with tempfile.TemporaryDirectory() as temp_dir, open_cache(temp_dir) as cache:
+        plain = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+        extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR), feature_cache=cache)
+        expected = plain.process_pdf_file(TEST_PDF, max_pages=3)
+
+        first = extractor.process_pdf_file(TEST_PDF, max_pages=3)
+        assert cache.stats == {'hits': 0, 'misses': 3, 'stored': 3}
+        second = extractor.process_pdf_file(TEST_PDF, max_pages=3)
+        assert cache.stats['hits'] == 3 and cache.stats['stored'] == 3
+        assert first['page_results'] == expected['page_results']
+        assert as_json(second['page_results']) == as_json(expected['page_results'])
+
+
+def test_reclassify_matches_rerun():
+    """按新阈值由缓存重新判定，结果与按新阈值重新分析一致"""
+    with tempfile.TemporaryDirectory() as temp_dir, open_cache(temp_dir) as cache:
+        extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR), feature_cache=cache)
+        previous = extractor.process_pdf_file(TEST_PDF, max_pages=4, page_mode="last_n")
+        results_path = Path(temp_dir) / "previous.json"
+        with open(results_path, 'w', encoding='utf-8') as f:
+            json.dump({'results': [previous, {'file_path': 'missing.pdf', 'success': False}]}, f)
+
+        rerun = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+        rerun.update_color_thresholds(STRICT_THRESHOLDS)
+        expected = rerun.process_pdf_file(TEST_PDF, max_pages=4, page_mode="last_n")
+
+        extractor.update_color_thresholds(STRICT_THRESHOLDS)
+        results, changed, missing = reclassify_results(extractor, load_previous_results(results_path))
+        assert missing == 0 and results[1]['success'] is False
+        assert as_json(results[0]['page_results']) == as_json(expected['page_results'])
+        assert results[0]['overall_compliance'] == expected['overall_compliance']
+        assert len(changed) == int(previous['overall_compliance'] != expected['overall_compliance'])
+
+
+def test_reclassify_cli_line_detector():
+    """由非默认长横线检测器建立的缓存：reclassify按--line-detector匹配缓存，默认检测器下全部缺失"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        cache_path = temp_dir / "features.db"
+        with FeatureCache(cache_path, PDFFeatureExtractor.feature_fingerprint('components')) as cache:
+            extractor = PDFFeatureExtractor(data_dir=str(temp_dir), feature_cache=cache, line_detector='components')
+            previous = extractor.process_pdf_file(TEST_PDF, max_pages=2)
+        results_path = temp_dir / "previous.json"
+        with open(results_path, 'w', encoding='utf-8') as f:
+            json.dump({'results': [previous]}, f, default=str)
+
+        command = [sys.executable, "reclassify.py", str(results_path), "--feature-cache", str(cache_path),
+                   "--data-dir", str(temp_dir), "--output", "reclassified.json"]
+        for extra, missing in ((["--line-detector", "components"], 0), ([], 1)):
+            subprocess.run(command + extra, cwd=PROJECT_ROOT, capture_output=True, check=True)
+            with open(temp_dir / "reclassified.json", 'r', encoding='utf-8') as f:
+                assert json.load(f)['missing_features'] == missing, extra
+
+        # 不支持的检测器名称由命令行参数检查拒绝
+        assert subprocess.run(command + ["--line-detector", "unknown"], cwd=PROJECT_ROOT,
+                              capture_output=True).returncode == 2
+
+
+def benchmark_reclassify():
+    """对比按新阈值重新运行与由缓存重新判定的单文件耗时"""
+    with tempfile.TemporaryDirectory() as temp_dir, open_cache(temp_dir) as cache:
+        extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR), feature_cache=cache)
+        previous = extractor.process_pdf_file(TEST_PDF, max_pages=5)
+
+        rerun = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+        rerun.update_color_thresholds(STRICT_THRESHOLDS)
+        start = time.perf_counter()
+        rerun.process_pdf_file(TEST_PDF, max_pages=5)
+        rerun_ms = (time.perf_counter() - start) * 1000
+
+        extractor.update_color_thresholds(STRICT_THRESHOLDS)
+        start = time.perf_counter()
+        extractor.reclassify_result(previous)
+        reclassify_ms = (time.perf_counter() - start) * 1000
+
+    print(f"按新阈值重新运行: {rerun_ms:.1f} ms/文件")
+    print(f"由缓存重新判定:   {reclassify_ms:.1f} ms/文件")
+
+
+def main():
+    """主函数"""
+    print("=== 页面特征缓存测试 ===")
+    test_histogram_statistics_match()
+    test_cached_pages_skip_rendering()
+    test_reclassify_matches_rerun()
+    test_reclassify_cli_line_detector()
+    print("✓ 缓存重新判定结果与重新运行一致")
+
+    print("\n=== 耗时对比（test.pdf 前5页） ===")
+    benchmark_reclassify()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试页面栅格对象（派生数组缓存）
+1. 缓存的掩码与原np.all/灰度阈值计算结果一致
+2. 同一页面的派生数组只计算一次
+3. 传入PageRaster与传入数组的特征分析结果一致
+"""
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, DATA_DIR
+
+from page_raster import PageRaster
+from pdf_feature_extractor import PDFFeatureExtractor
+from pdf_renderer import render_page
+
+
+def render_test_page():
+    doc = fitz.open(PROJECT_ROOT / "input_pdfs" / "test.pdf")
+    image = render_page(doc.load_page(0), scale=2.0)
+    doc.close()
+    return image
+
+
+def test_masks_match_direct_computation():
+    """派生数组与直接计算结果一致"""
+    image = render_test_page()
+    raster = PageRaster(image)
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+    assert np.array_equal(raster.gray, gray)
+    assert np.array_equal(raster.white_mask(200), np.all(image >= 200, axis=2))
+    assert np.array_equal(raster.black_mask(80), np.all(image <= 80, axis=2))
+    assert np.array_equal(raster.dark_mask(80), gray < 80)
+    assert np.array_equal(raster.row_projection(80), np.sum(gray < 80, axis=1))
+    assert np.array_equal(raster.mean_rgb, np.mean(image.reshape(-1, 3), axis=0))
+
+
+def test_derived_arrays_are_memoized():
+    """同一派生数组重复访问返回同一对象，不同阈值分别缓存"""
+    raster = PageRaster(render_test_page())
+
+    assert raster.gray is raster.gray
+    assert raster.white_mask(200) is raster.white_mask(200)
+    assert raster.white_mask(200) is not raster.white_mask(210)
+    assert PageRaster.from_image(raster) is raster
+
+
+def test_features_same_for_raster_and_array():
+    """传入PageRaster与传入数组的分析结果一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    image = render_test_page()
+
+    from_array = extractor.analyze_color_features(image)
+    from_raster = extractor.analyze_color_features(PageRaster(image))
+
+    assert from_array is not None
+    assert from_array == from_raster
+
+
+if __name__ == "__main__":
+    test_masks_match_direct_computation()
+    test_derived_arrays_are_memoized()
+    test_features_same_for_raster_and_array()
+    print("✅ 页面栅格测试通过")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试分辨率升级模式（先低分辨率分析，不确定时再以2倍渲染）
+1. 2倍渲染下像素常数换算不改变检测结果
+2. 升级模式与全部2倍渲染的判定结果一致
+3. 明确不符合的页面在低分辨率下即可判定
+4. 报告升级率和耗时对比
+"""
+
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, DATA_DIR
+
+from page_raster import PageRaster
+from pdf_feature_extractor import PDFFeatureExtractor
+from pdf_renderer import render_page
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def test_full_scale_unchanged():
+    """2倍渲染（pixel_factor=1）时analyze_page与直接分析图片的结果一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    doc = fitz.open(TEST_PDF)
+    for page_num in (0, 20):
+        page = doc.load_page(page_num)
+        expected = extractor.analyze_color_features(render_page(page, scale=2.0))
+        actual = extractor.analyze_page(page)
+        assert actual['second_feature'] == expected['second_feature']
+        assert actual['contrast'] == expected['contrast']
+        assert 'escalated' not in actual
+    doc.close()
+    assert PageRaster(np.zeros((4, 4, 3), dtype=np.uint8), scale=1.0).pixel_factor == 0.5
+
+
+def test_escalate_matches_full():
+    """升级模式下每页的符合性判定与全部2倍渲染一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    doc = fitz.open(TEST_PDF)
+    for page_num in range(0, len(doc), 3):
+        page = doc.load_page(page_num)
+        expected = extractor.check_standard_compliance(extractor.analyze_page(page))
+        for verdict_mode in ("full", "fast"):
+            features = extractor.analyze_page(page, verdict_mode, resolution_mode="escalate")
+            assert extractor.check_standard_compliance(features) == expected, f"第{page_num + 1}页判定不一致"
+    doc.close()
+
+
+def test_clear_fail_decided_at_coarse_scale():
+    """整页深色背景的页面在低分辨率下即判定为不符合，不再升级"""
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    page.draw_rect(page.rect, color=None, fill=(0.2, 0.2, 0.4))
+
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    features = extractor.analyze_page(page, resolution_mode="escalate")
+    assert features['escalated'] is False
+    assert features['render_scale'] == extractor.DEFAULT_COARSE_SCALE
+    assert not extractor.check_standard_compliance(features)
+    assert extractor.get_escalation_stats() == {'pages': 1, 'escalated': 0, 'band_confirmed': 0, 'escalation_rate': 0.0}
+    doc.close()
+
+
+def test_low_biased_checks_escalate():
+    """白色背景、黑色文字占比和对比度在低分辨率下只会偏低，低于阈值时不直接判定为不符合"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    features = {'white_bg_ratio': 0.0, 'black_text_ratio': 0.0, 'contrast': 0.0}
+    for check_name in ('white_bg', 'black_text', 'contrast'):
+        assert extractor._coarse_check_outcome(check_name, features) is None, check_name
+
+
+def benchmark_escalation():
+    """对比全部2倍渲染与升级模式的耗时，并报告升级率"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    start = time.perf_counter()
+    extractor.process_pdf_file(TEST_PDF, page_mode="all_pages")
+    full_ms = (time.perf_counter() - start) * 1000
+
+    extractor.reset_escalation_stats()
+    start = time.perf_counter()
+    extractor.process_pdf_file(TEST_PDF, page_mode="all_pages", resolution_mode="escalate")
+    escalate_ms = (time.perf_counter() - start) * 1000
+    stats = extractor.get_escalation_stats()
+
+    print(f"全部2倍渲染: {full_ms:.0f} ms")
+    print(f"分辨率升级:  {escalate_ms:.0f} ms，升级率 {stats['escalated']}/{stats['pages']} ({stats['escalation_rate']:.1%})")
+
+
+def main():
+    """主函数"""
+    print("=== 分辨率升级模式测试 ===")
+    test_full_scale_unchanged()
+    test_escalate_matches_full()
+    test_clear_fail_decided_at_coarse_scale()
+    test_low_biased_checks_escalate()
+    print("✓ 判定结果与全部2倍渲染一致")
+
+    print("\n=== 耗时对比（test.pdf 全部页面） ===")
+    benchmark_escalation()
+
+
+if __name__ == "__main__":
+    main()
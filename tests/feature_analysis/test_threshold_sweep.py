@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试颜色阈值扫描（threshold_sweep.py）
+1. 阈值取值说明的解析
+2. 每组阈值的向量化判定与按该阈值由缓存重新判定的结果一致
+3. 之前运行结果作为标签时的准确率统计
+4. 大规模扫描（合成页面特征）的耗时
+"""
+
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, DATA_DIR
+
+from feature_cache import FeatureCache
+from pdf_feature_extractor import PDFFeatureExtractor
+from threshold_sweep import (THRESHOLD_KEYS, evaluate_combinations, grid_combinations, load_labels,
+                             match_labels, parse_threshold_spec, random_combinations)
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def test_parse_threshold_spec():
+    """取值列表、含终点的等差序列和随机搜索范围"""
+    assert parse_threshold_spec("white_bg_min=200,210") == ('white_bg_min', [200, 210])
+    assert parse_threshold_spec("bg_ratio_min=0.9:0.95:0.01") == ('bg_ratio_min', [0.9, 0.91, 0.92, 0.93, 0.94, 0.95])
+    assert parse_threshold_spec("black_text_max=40:80") == ('black_text_max', (40, 80))
+    for spec in ("unknown=1", "contrast_min=1:2:0"):
+        try:
+            parse_threshold_spec(spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"应拒绝无效的取值说明: {spec}")
+
+
+def build_cache(temp_dir):
+    """处理两个文件（test.pdf第1页和其副本的后4页），返回特征缓存和之前的结果"""
+    copied = Path(temp_dir) / "copied.pdf"
+    shutil.copy(TEST_PDF, copied)
+    cache = FeatureCache(Path(temp_dir) / "features.db", PDFFeatureExtractor.feature_fingerprint())
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR), feature_cache=cache)
+    previous = [extractor.process_pdf_file(TEST_PDF, max_pages=1),
+                extractor.process_pdf_file(copied, max_pages=4, page_mode="last_n")]
+    return cache, extractor, previous
+
+
+def test_sweep_matches_reclassify():
+    """每组阈值的页面/文件通过率与逐个重新判定一致，原阈值下与之前结果的准确率为100%"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache, extractor, previous = build_cache(temp_dir)
+        with cache:
+            arrays = cache.load_arrays()
+            assert len(arrays['paths']) == 2 and len(arrays['file_index']) == 5
+
+            base = extractor.get_color_thresholds()
+            combinations = grid_combinations(base, {'white_bg_min': [200, 240], 'black_text_max': [60, 80],
+                                                    'contrast_min': [10, 60]})
+            random = random_combinations(base, {'bg_ratio_min': (0.8, 1.0), 'colored_text_max': (0.0, 0.02),
+                                                'brightness_min': [240, 244, 250]}, 20, seed=0)
+            combinations = {key: np.concatenate([combinations[key], random[key]]) for key in THRESHOLD_KEYS}
+
+            labels_path = Path(temp_dir) / "previous.json"
+            with open(labels_path, 'w', encoding='utf-8') as f:
+                json.dump({'results': previous}, f)
+            file_labels = match_labels(arrays['paths'], load_labels([labels_path]))
+            expected_labels = {str(Path(result['file_path']).resolve()): int(result['overall_compliance'])
+                               for result in previous}
+            assert list(file_labels) == [expected_labels[path] for path in arrays['paths']]
+
+            stats = evaluate_combinations(arrays, combinations, file_labels, chunk_size=5)
+            for index in range(len(combinations['white_bg_min'])):
+                extractor.update_color_thresholds({key: combinations[key][index].item() for key in THRESHOLD_KEYS})
+                results = [extractor.reclassify_result(result) for result in previous]
+                pages = [page['compliance'] for result in results for page in result['page_results']]
+                assert stats['page_pass_rate'][index] == np.mean(pages)
+                assert stats['pass_rate'][index] == np.mean([result['overall_compliance'] for result in results])
+
+        default = grid_combinations(base, {})
+        assert evaluate_combinations(arrays, default, file_labels)['accuracy'][0] == 1.0
+
+
+def benchmark_sweep(pages=20000, files=2000, combination_count=1024):
+    """合成页面特征上的大规模扫描耗时"""
+    rng = np.random.default_rng(0)
+    total = 1191 * 1684
+    arrays = {
+        'paths': [f"file_{index}.pdf" for index in range(files)],
+        'file_index': np.sort(rng.integers(0, files, pages)),
+        'total_pixels': np.full(pages, total, dtype=np.int64),
+        'channel_sums': rng.integers(240 * total, 255 * total, (pages, 3)),
+        'contrast': rng.uniform(10, 60, pages),
+        'has_second_feature': rng.random(pages) < 0.9,
+    }
+    for name in ('min_histogram', 'max_histogram', 'colored_histogram'):
+        arrays[name] = rng.multinomial(total, np.full(256, 1 / 256), pages).astype(np.int32)
+    file_labels = rng.integers(0, 2, files).astype(np.int8)
+
+    base = PDFFeatureExtractor(data_dir=str(DATA_DIR)).get_color_thresholds()
+    combinations = random_combinations(base, {key: (0, 255) if key in ('white_bg_min', 'black_text_max') else (0.0, 1.0)
+                                              for key in ('white_bg_min', 'black_text_max', 'bg_ratio_min',
+                                                          'colored_text_max')}, combination_count, seed=0)
+    start = time.perf_counter()
+    evaluate_combinations(arrays, combinations, file_labels)
+    elapsed = time.perf_counter() - start
+    print(f"{combination_count} 组阈值 × {pages} 页: {elapsed:.2f} 秒 "
+          f"（{combination_count * pages / elapsed / 1e6:.1f} 百万 页·组/秒）")
+
+
+def main():
+    """主函数"""
+    print("=== 颜色阈值扫描测试 ===")
+    test_parse_threshold_spec()
+    test_sweep_matches_reclassify()
+    print("✓ 向量化判定与逐个重新判定一致")
+
+    print("\n=== 扫描耗时（合成页面特征） ===")
+    benchmark_sweep()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试条带内的形态学增强（_detect_adaptive_lines 的回退路径）
+1. 条带候选范围内的增强结果与整页增强完全一致
+2. 结构元素按宽度缓存、运算缓冲区复用；行投影中没有断裂长横线的页面跳过形态学增强
+3. 断裂（虚线、带缺口）的长横线仍能通过增强检测到，文字行不再被连接成长横线
+4. 基本检测不足的页面上，整页增强与条带增强的单页耗时分布（p50/p95/p99）
+"""
+
+import time
+
+import cv2
+import fitz
+import numpy as np
+from PIL import Image
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
+
+from page_raster import PageRaster, render_raster
+from pdf_feature_extractor import PDFFeatureExtractor
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def legacy_enhance(black_mask, width, pixel_factor=1.0):
+    """原整页形态学增强（仅用于结果对比和基准测试）"""
+    def px(value):
+        return max(1, int(round(value * pixel_factor)))
+
+    mask = cv2.morphologyEx(black_mask.astype(np.uint8), cv2.MORPH_CLOSE,
+                            cv2.getStructuringElement(cv2.MORPH_RECT, (width // 10, px(3))))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (width // 20, 1)))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (px(3), 1)))
+    return cv2.morphologyEx(mask, cv2.MORPH_ERODE, cv2.getStructuringElement(cv2.MORPH_RECT, (1, px(3))))
+
+
+def legacy_adaptive_lines(extractor, raster):
+    """原自适应检测：基本检测不足两条线时对整页做形态学增强后重新检测"""
+    black_mask = raster.dark_mask(80)
+    height, width = black_mask.shape
+    basic_lines = extractor._detect_lines_from_mask(black_mask, width, height, raster.row_projection(80),
+                                                    raster.pixel_factor)
+    if len(basic_lines) >= 2:
+        return basic_lines
+    enhanced = legacy_enhance(black_mask, width, raster.pixel_factor)
+    enhanced_lines = extractor._detect_lines_from_mask(enhanced, width, height, pixel_factor=raster.pixel_factor)
+    return enhanced_lines if len(enhanced_lines) >= len(basic_lines) else basic_lines
+
+
+def load_rasters():
+    """templates/mb*.png 与测试PDF各页的渲染结果"""
+    rasters = [(path.name, PageRaster(np.array(Image.open(str(path)).convert('RGB'))))
+               for path in sorted(TEMPLATES_DIR.glob('mb*.png'))]
+    with fitz.open(str(TEST_PDF)) as doc:
+        rasters += [(f"test.pdf 第{index + 1}页", render_raster(page)) for index, page in enumerate(doc)]
+    return rasters
+
+
+def fragmented_rule_page(height=1684, width=1191):
+    """
+    合成页面：一条虚线、一条带缺口的长横线（扫描件上约4像素粗），以及密集的文字行
+    （形态学增强最后的纵向腐蚀会去掉不足3像素粗的线条，因此合成的长横线取4像素）
+    """
+    rng = np.random.default_rng(0)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for x in range(143, 1104, 40):
+        image[422:426, x:x + 28] = 0
+    image[1454:1458, 143:1104] = 0
+    image[1454:1458, 400:460] = 255
+    image[1454:1458, 700:760] = 255
+    for top in range(600, 1200, 40):
+        strokes = rng.random((24, width - 200)) < 0.18
+        image[top:top + 24, 100:width - 100][strokes] = 0
+    return image
+
+
+def y_centers(lines):
+    return sorted(int(line['y_center']) for line in lines)
+
+
+def test_band_enhancement_matches_full_page():
+    """条带的候选范围（及线宽测量范围）内，增强结果与整页增强一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    checked = 0
+    for name, raster in load_rasters():
+        black_mask = raster.dark_mask(80)
+        height, width = black_mask.shape
+        full = legacy_enhance(black_mask, width, raster.pixel_factor)
+        bands = extractor._fragmented_rule_bands(black_mask, raster.row_projection(80), width, height,
+                                                 raster.pixel_factor)
+        margin = extractor._line_width_search_range(height, raster.pixel_factor)
+        for band_start, band_end, (core_start, core_end) in bands:
+            enhanced = extractor._enhance_lines_morphology(black_mask[band_start:band_end], width, raster.pixel_factor)
+            low, high = max(band_start, core_start - margin), min(band_end, core_end + margin)
+            assert (enhanced[low - band_start:high - band_start] == full[low:high]).all(), name
+            checked += 1
+    assert checked > 0
+
+
+def test_kernels_and_buffers_reused():
+    """结构元素只创建一次，增强结果写入复用的缓冲区；没有候选行的页面不做形态学增强"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    raster = PageRaster(fragmented_rule_page())
+    black_mask = raster.dark_mask(80)
+    first = extractor._enhance_lines_morphology(black_mask[400:460], raster.width)
+    kernels = extractor._morphology_kernels_for(raster.width)
+    second = extractor._enhance_lines_morphology(black_mask[1430:1480], raster.width)
+    assert extractor._morphology_kernels_for(raster.width) is kernels
+    assert len(extractor._morphology_kernels) == 1
+    assert np.shares_memory(first, second)
+
+    plain = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    text_only = PageRaster(np.array(Image.open(str(TEMPLATES_DIR / "mb.png")).convert('RGB')))
+    plain._detect_adaptive_lines(text_only)
+    assert plain._morphology_kernels == {} and plain._morphology_buffers is None
+
+
+def test_fragmented_rules_detected():
+    """断裂的长横线在条带增强后检测到；整页增强会把密集文字行也连接成长横线"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    raster = PageRaster(fragmented_rule_page())
+
+    lines = extractor._detect_adaptive_lines(raster)
+    assert len(lines) == 2
+    assert abs(y_centers(lines)[0] - 424) <= 3 and abs(y_centers(lines)[1] - 1456) <= 3
+
+    legacy_lines = legacy_adaptive_lines(extractor, raster)
+    assert any(600 <= y < 1200 for y in y_centers(legacy_lines))
+    print(f"合成页面: 条带增强 y={y_centers(lines)}，整页增强 y={y_centers(legacy_lines)}")
+
+
+def percentile_table(name, samples):
+    samples = np.array(samples) * 1000
+    return (f"{name:<10} {np.percentile(samples, 50):>10.2f} {np.percentile(samples, 95):>10.2f} "
+            f"{np.percentile(samples, 99):>10.2f} {samples.max():>10.2f}")
+
+
+def benchmark(repeat=3):
+    """基本检测不足两条线的页面上，整页增强与条带增强的单页耗时分布"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    legacy_times, band_times = [], []
+    agree = 0
+    pages = 0
+    for name, raster in load_rasters():
+        black_mask = raster.dark_mask(80)
+        height, width = black_mask.shape
+        if len(extractor._detect_lines_from_mask(black_mask, width, height, raster.row_projection(80),
+                                                 raster.pixel_factor)) >= 2:
+            continue
+        pages += 1
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            legacy_lines = legacy_adaptive_lines(extractor, raster)
+        legacy_times.append((time.perf_counter() - start) / repeat)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            band_lines = extractor._detect_adaptive_lines(raster)
+        band_times.append((time.perf_counter() - start) / repeat)
+        agree += y_centers(legacy_lines) == y_centers(band_lines)
+
+    print(f"基本检测不足的页面: {pages} 页，检测到的长横线位置相同: {agree} 页")
+    print(f"{'方式':<10} {'p50(ms)':>10} {'p95(ms)':>10} {'p99(ms)':>10} {'最大(ms)':>10}")
+    print(percentile_table("整页增强", legacy_times))
+    print(percentile_table("条带增强", band_times))
+
+
+def main():
+    """主函数"""
+    print("=== 条带形态学增强测试 ===")
+    test_band_enhancement_matches_full_page()
+    test_kernels_and_buffers_reused()
+    test_fragmented_rules_detected()
+    print("✓ 条带增强结果与整页增强一致")
+
+    print("\n=== 单页耗时分布 ===")
+    benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试条带渲染确认第二特征（page.get_pixmap(clip=...)）
+1. 条带像素与整页渲染的对应行一致
+2. 按提示行在条带内检测的结果与整页检测一致
+3. 低分辨率图像生成的提示覆盖所有潜在长横线
+4. 条带确认与整页渲染的耗时对比
+"""
+
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, DATA_DIR
+
+from page_raster import render_raster
+from pdf_feature_extractor import PDFFeatureExtractor
+from pdf_renderer import render_band, render_page
+from vector_lines import find_horizontal_rules
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def test_band_pixels_match_full_render():
+    """条带渲染与整页渲染的对应行逐像素一致（含页面边界和旋转页面）"""
+    doc = fitz.open(TEST_PDF)
+    page = doc.load_page(0)
+    full = render_page(page, scale=2.0, colorspace='gray')
+    for y0, y1 in ((0, 1), (5, 300), (400, 450), (1600, full.shape[0])):
+        assert np.array_equal(render_band(page, y0, y1), full[y0:y1])
+
+    page.set_rotation(90)
+    rotated = render_page(page, scale=2.0, colorspace='gray')
+    assert np.array_equal(render_band(page, 100, 200), rotated[100:200])
+    doc.close()
+
+
+def test_band_detection_matches_full_page():
+    """以矢量层长横线位置为提示，条带检测结果与整页检测一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    doc = fitz.open(TEST_PDF)
+    page = doc.load_page(0)
+    hints = [rule['y'] for rule in find_horizontal_rules(page)]
+    expected = extractor.detect_mb_second_feature(render_page(page, scale=2.0))
+
+    result = extractor.detect_mb_second_feature_in_bands(page, hints)
+    assert result.pop('detection_method') == 'band'
+    assert result.pop('rendered_rows') < render_page(page, scale=2.0).shape[0] // 10
+    assert result == expected
+
+    assert extractor.detect_mb_second_feature(render_page(page, scale=2.0), band_hints=hints) == expected
+    assert not extractor.detect_mb_second_feature_in_bands(page, [800])['has_second_feature']
+    doc.close()
+
+
+def test_coarse_hints_cover_potential_lines():
+    """0.75倍图像生成的提示范围覆盖2倍图像上的所有潜在长横线"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    doc = fitz.open(TEST_PDF)
+    for page_num in range(0, len(doc), 3):
+        page = doc.load_page(page_num)
+        raster = render_raster(page, scale=2.0, profile='structure')
+        potential_lines = extractor._find_potential_lines(raster.dark_mask(80), raster.width, raster.height)
+
+        hints, tolerance = extractor._coarse_line_hints(render_raster(page, scale=0.75))
+        cores = [core for _, _, core in extractor._band_layout(hints, raster.height, band_tolerance=tolerance)]
+        for line in potential_lines:
+            y = line['coords'][1]
+            assert any(start <= y < end for start, end in cores), f"第{page_num + 1}页 y={y} 未被提示覆盖"
+    doc.close()
+
+
+def benchmark_band_rendering(repeat=5):
+    """对比整页渲染+检测与条带渲染确认的耗时"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    doc = fitz.open(TEST_PDF)
+    page = doc.load_page(0)
+    hints = [rule['y'] for rule in find_horizontal_rules(page)]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extractor.detect_mb_second_feature(render_raster(page, scale=2.0, profile='structure'))
+    full_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = extractor.detect_mb_second_feature_in_bands(page, hints)
+    band_ms = (time.perf_counter() - start) * 1000 / repeat
+    doc.close()
+
+    print(f"整页灰度渲染+检测: {full_ms:.1f} ms")
+    print(f"条带渲染确认:      {band_ms:.1f} ms（渲染 {result['rendered_rows']} 行）")
+
+
+def main():
+    """主函数"""
+    print("=== 条带渲染确认测试 ===")
+    test_band_pixels_match_full_render()
+    test_band_detection_matches_full_page()
+    test_coarse_hints_cover_potential_lines()
+    print("✓ 条带检测结果与整页检测一致")
+
+    print("\n=== 耗时对比（test.pdf 第1页） ===")
+    benchmark_band_rendering()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试连通域长横线检测（component_lines.py、detect_mb_second_feature_components）
+1. 只在候选行范围内做连通域分析的结果与整幅掩码上的分析完全一致
+2. 略粗、带缺口、与表格竖线相连的长横线都能检测到，文字行被填充率过滤
+3. 与行扫描检测在templates/mb*.png和测试PDF各页上的一致性及单页耗时对比
+"""
+
+import time
+
+import cv2
+import fitz
+import numpy as np
+from PIL import Image
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
+
+import component_lines
+from component_lines import find_component_lines
+from page_raster import PageRaster, render_raster
+from pdf_feature_extractor import PDFFeatureExtractor
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def full_mask_component_lines(mask):
+    """在整幅掩码上做连通域分析（不按候选行裁剪，仅用于结果对比）"""
+    height, width = mask.shape
+    binary = mask.astype(np.uint8)
+    closed = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, component_lines._horizontal_kernel(
+        int(width * component_lines.GAP_RATIO)))
+    opened = cv2.morphologyEx(closed, cv2.MORPH_OPEN, component_lines._horizontal_kernel(
+        int(width * component_lines.MIN_SEGMENT_RATIO)))
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(opened, connectivity=8)
+    found = []
+    for label in range(1, count):
+        x, y, box_width, box_height, _ = (int(value) for value in stats[label])
+        if box_width / width < component_lines.MIN_WIDTH_RATIO or box_height > height * component_lines.MAX_HEIGHT_RATIO:
+            continue
+        inside = labels[y:y + box_height, x:x + box_width] == label
+        fill = np.count_nonzero(binary[y:y + box_height, x:x + box_width][inside]) / (box_width * box_height)
+        if fill >= component_lines.MIN_FILL:
+            found.append((x, y, box_width, box_height))
+    return sorted(found, key=lambda box: box[1])
+
+
+def load_rasters():
+    """templates/mb*.png 与测试PDF各页的渲染结果"""
+    rasters = [(path.name, PageRaster(np.array(Image.open(str(path)).convert('RGB'))))
+               for path in sorted(TEMPLATES_DIR.glob('mb*.png'))]
+    with fitz.open(str(TEST_PDF)) as doc:
+        rasters += [(f"test.pdf 第{index + 1}页", render_raster(page)) for index, page in enumerate(doc)]
+    return rasters
+
+
+def synthetic_page(height=1684, width=1191):
+    """
+    合成页面：5像素粗的长横线、带两处缺口的长横线、两端与表格竖线相连的长横线，以及密集的文字行
+    """
+    rng = np.random.default_rng(0)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    image[300:305, 143:1104] = 0
+    image[800:802, 143:1104] = 0
+    image[800:802, 400:440] = 255
+    image[800:802, 700:730] = 255
+    image[1300:1302, 120:1080] = 0
+    image[1200:1500, 120:122] = 0
+    image[1200:1500, 1078:1080] = 0
+    for top in range(400, 700, 40):
+        strokes = rng.random((24, width - 200)) < 0.25
+        image[top:top + 24, 100:width - 100][strokes] = 0
+    return image
+
+
+def test_matches_full_mask_analysis():
+    """按候选行裁剪后的连通域结果与整幅掩码上的结果一致"""
+    for name, raster in load_rasters() + [("合成页面", PageRaster(synthetic_page()))]:
+        mask = raster.dark_mask(80)
+        expected = full_mask_component_lines(mask)
+        lines = find_component_lines(mask, row_counts=raster.row_projection(80))
+        actual = [(line['coords'][0], int(line['y_center']) - (line['line_width'] - 1) // 2,
+                   line['length'], line['line_width']) for line in lines]
+        assert actual == expected, name
+
+
+def test_thick_broken_and_table_rules():
+    """略粗、带缺口、与竖线相连的长横线都能检测到，文字行不会被识别为长横线"""
+    raster = PageRaster(synthetic_page())
+    lines = find_component_lines(raster.dark_mask(80))
+
+    assert [int(line['y_center']) for line in lines] == [302, 800, 1300]
+    assert [line['line_width'] for line in lines] == [5, 2, 2]
+    assert lines[1]['length'] == 961 and lines[1]['fill_ratio'] < 1.0
+
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    row_scan_keys = set(extractor._detect_adaptive_lines(raster)[0])
+    result = extractor.detect_mb_second_feature_components(raster)
+    assert result['detection_method'] == 'components' and result['has_second_feature']
+    assert row_scan_keys <= set(result['long_lines'][0])
+
+
+def test_first_page_matches_row_scan():
+    """测试PDF首页上与行扫描检测结果一致（长横线位置相差不超过线宽）"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    with fitz.open(str(TEST_PDF)) as doc:
+        raster = render_raster(doc[0])
+    reference = extractor.detect_mb_second_feature(raster)
+    result = extractor.detect_mb_second_feature_components(raster)
+    assert result['has_second_feature'] == reference['has_second_feature'] is True
+    for line, expected in zip(result['long_lines'], reference['long_lines']):
+        assert abs(line['y_center'] - expected['y_center']) <= line['line_width']
+        assert line['length'] == expected['length']
+
+
+def benchmark():
+    """与行扫描检测的判定一致性及单页耗时"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    row_times, component_times = [], []
+    agree = 0
+    rasters = load_rasters()
+    for name, raster in rasters:
+        raster.dark_mask(80)
+        raster.row_projection(80)
+
+        start = time.perf_counter()
+        reference = extractor.detect_mb_second_feature(raster)
+        row_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        result = extractor.detect_mb_second_feature_components(raster)
+        component_times.append(time.perf_counter() - start)
+
+        if result['has_second_feature'] == reference['has_second_feature']:
+            agree += 1
+        else:
+            print(f"  判定不同: {name} 行扫描={reference['has_second_feature']} 连通域={result['has_second_feature']}")
+
+    print(f"判定一致: {agree}/{len(rasters)} 页")
+    print(f"{'检测方式':<10} {'p50(ms)':>10} {'p95(ms)':>10} {'最大(ms)':>10}")
+    for name, samples in (("行扫描", row_times), ("连通域", component_times)):
+        samples = np.array(samples) * 1000
+        print(f"{name:<10} {np.percentile(samples, 50):>10.2f} {np.percentile(samples, 95):>10.2f} {samples.max():>10.2f}")
+
+
+def main():
+    """主函数"""
+    print("=== 连通域长横线检测测试 ===")
+    test_matches_full_mask_analysis()
+    test_thick_broken_and_table_rules()
+    test_first_page_matches_row_scan()
+    print("✓ 连通域检测结果正确")
+
+    print("\n=== 与行扫描检测对比 ===")
+    benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试长横线检测的灰度渲染配置（MuPDF直接渲染csGRAY）
+1. 灰度渲染与RGB渲染的长横线检测结果一致
+2. 灰度PageRaster不提供颜色信息
+3. 分析器split渲染方式
+4. 单页渲染耗时基准对比
+"""
+
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+import pytest
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, DATA_DIR
+
+from page_raster import PageRaster, render_raster
+from pdf_analyzer import UnifiedPDFAnalyzer
+from pdf_feature_extractor import PDFFeatureExtractor
+from pdf_renderer import render_page
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def test_structure_profile_matches_rgb():
+    """structure配置（灰度图）与RGB图像的第二特征检测结果一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    doc = fitz.open(TEST_PDF)
+    for page_num in range(0, len(doc), 3):
+        page = doc.load_page(page_num)
+        expected = extractor.detect_mb_second_feature(render_page(page, scale=2.0))
+        raster = render_raster(page, scale=2.0, profile='structure')
+        assert not raster.has_color
+        assert extractor.detect_mb_second_feature(raster) == expected, f"第{page_num + 1}页检测结果不一致"
+    doc.close()
+
+
+def test_gray_raster_has_no_color():
+    """灰度PageRaster可做结构检查，颜色相关计算报错"""
+    gray = np.full((20, 30), 255, dtype=np.uint8)
+    gray[10, :] = 0
+    raster = PageRaster.from_image(gray)
+
+    assert raster.row_projection(80)[10] == 30
+    with pytest.raises(ValueError):
+        raster.white_mask(200)
+    with pytest.raises(ValueError):
+        raster.color_statistics(200, 80)
+    with pytest.raises(ValueError):
+        render_raster(None, profile='cmyk')
+
+
+def test_analyzer_split_profile():
+    """split渲染方式：第一特征使用RGB图像（默认2倍，判定与shared方式一致），第二特征使用2倍灰度图"""
+    with tempfile.TemporaryDirectory() as target:
+        shared = UnifiedPDFAnalyzer(TEST_PDF.parent, target)
+        split = UnifiedPDFAnalyzer(TEST_PDF.parent, target, render_profile="split")
+        assert split.color_scale == 2.0
+        with pytest.raises(ValueError):
+            UnifiedPDFAnalyzer(TEST_PDF.parent, target, render_profile="cmyk")
+
+        expected = shared.process_pdf_file(TEST_PDF)
+        actual = split.process_pdf_file(TEST_PDF)
+        assert actual['first_feature'] == expected['first_feature']
+        assert actual['second_feature'] == expected['second_feature']
+        assert actual['second_feature_details'] == expected['second_feature_details']
+
+
+def benchmark_render_profiles():
+    """对比RGB渲染+转换灰度与直接渲染灰度图的耗时"""
+    doc = fitz.open(TEST_PDF)
+    pages = [doc.load_page(page_num) for page_num in range(len(doc))]
+
+    start = time.perf_counter()
+    for page in pages:
+        PageRaster(render_page(page, scale=2.0)).gray
+    rgb_ms = (time.perf_counter() - start) * 1000 / len(pages)
+
+    start = time.perf_counter()
+    for page in pages:
+        render_raster(page, scale=2.0, profile='structure').gray
+    gray_ms = (time.perf_counter() - start) * 1000 / len(pages)
+
+    start = time.perf_counter()
+    for page in pages:
+        render_raster(page, scale=1.0, profile='color')
+    color_ms = (time.perf_counter() - start) * 1000 / len(pages)
+    doc.close()
+
+    print(f"2倍RGB渲染+转灰度:  {rgb_ms:.1f} ms/页")
+    print(f"2倍灰度渲染:        {gray_ms:.1f} ms/页")
+    print(f"1倍RGB渲染:         {color_ms:.1f} ms/页")
+
+
+def main():
+    """主函数"""
+    print("=== 灰度渲染配置测试 ===")
+    test_structure_profile_matches_rgb()
+    test_gray_raster_has_no_color()
+    test_analyzer_split_profile()
+    print("✓ 检测结果与RGB渲染一致")
+
+    print("\n=== 单页渲染耗时基准 ===")
+    benchmark_render_profiles()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试长横线检测器注册表（LINE_DETECTORS）与检测器对比工具（line_detector_benchmark.py）
+1. detect_mb_second_feature按名称调用各检测器，默认检测器的结果与原自适应检测一致
+2. 检测器名称在提取器、分析器和工作进程之间传递，不支持的名称报错；可注册自定义检测器
+3. 行投影与Hough检测在合成页面上的结果
+4. 对比工具统计一致率与单页耗时，并推荐满足一致率要求的最快检测器
+"""
+
+import fitz
+import numpy as np
+import pytest
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
+
+import pdf_analyzer
+from hough_lines import find_hough_lines
+from line_detector_benchmark import (benchmark_detectors, iter_pdf_pages, iter_template_pages, print_table,
+                                     recommend_detector, summarize)
+from line_scanner import find_projection_lines
+from page_raster import PageRaster, render_raster
+from pdf_analyzer import UnifiedPDFAnalyzer
+from pdf_feature_extractor import DEFAULT_LINE_DETECTOR, LINE_DETECTORS, PDFFeatureExtractor, register_line_detector
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def rule_page(height=1684, width=1191):
+    """
+    合成页面：y=400和y=1300处两条2像素粗的长横线，以及密集的文字行
+    """
+    rng = np.random.default_rng(0)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    image[400:402, 143:1104] = 0
+    image[1300:1302, 143:1104] = 0
+    for top in range(600, 1100, 40):
+        strokes = rng.random((24, width - 200)) < 0.2
+        image[top:top + 24, 100:width - 100][strokes] = 0
+    return image
+
+
+def y_centers(result):
+    return sorted(int(line['y_center']) for line in result['long_lines'])
+
+
+def test_dispatch_by_name():
+    """按名称调用各检测器；默认检测器与原自适应检测一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    assert extractor.line_detector == DEFAULT_LINE_DETECTOR == 'adaptive'
+    assert set(LINE_DETECTORS) >= {'adaptive', 'run_length', 'components', 'hough', 'projection'}
+
+    with fitz.open(str(TEST_PDF)) as doc:
+        raster = render_raster(doc[0], profile='structure')
+    expected = extractor._build_second_feature_result(extractor._detect_adaptive_lines(raster), raster.height)
+    assert extractor.detect_mb_second_feature(raster) == expected
+
+    for name, detector in LINE_DETECTORS.items():
+        result = extractor.detect_mb_second_feature(raster, line_detector=name)
+        assert result == extractor._build_second_feature_result(detector(extractor, raster), raster.height), name
+        assert result['has_second_feature'], name
+
+    components = extractor.detect_mb_second_feature_components(raster)
+    assert components.pop('detection_method') == 'components'
+    assert components == extractor.detect_mb_second_feature(raster, line_detector='components')
+
+
+def test_detector_configuration():
+    """检测器名称由构造参数指定并传递到工作进程，不支持的名称报错"""
+    image = rule_page()
+    projection = PDFFeatureExtractor(data_dir=str(DATA_DIR), line_detector='projection')
+    assert projection.detect_mb_second_feature(image) == projection.detect_mb_second_feature(
+        image, line_detector='projection')
+
+    with pytest.raises(ValueError):
+        PDFFeatureExtractor(data_dir=str(DATA_DIR), line_detector='unknown')
+    with pytest.raises(ValueError):
+        projection.detect_mb_second_feature(image, line_detector='unknown')
+    with pytest.raises(ValueError):
+        UnifiedPDFAnalyzer(str(PROJECT_ROOT / "input_pdfs"), str(PROJECT_ROOT / "jc"), line_detector='unknown')
+    assert PDFFeatureExtractor.feature_fingerprint('projection') != PDFFeatureExtractor.feature_fingerprint()
+
+    pdf_analyzer._init_classify_worker(str(PROJECT_ROOT / "input_pdfs"), str(PROJECT_ROOT / "jc"),
+                                       line_detector='run_length')
+    try:
+        assert pdf_analyzer._worker_analyzer.extractor.line_detector == 'run_length'
+    finally:
+        pdf_analyzer._worker_analyzer = None
+
+
+def test_register_custom_detector():
+    """注册的检测器可按名称使用，名称不能重复"""
+    calls = []
+
+    def first_rule_only(extractor, image):
+        calls.append(image)
+        return extractor._detect_run_length_lines(image)[:1]
+
+    register_line_detector('first_rule_only', first_rule_only)
+    try:
+        with pytest.raises(ValueError):
+            register_line_detector('first_rule_only', first_rule_only)
+        extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR), line_detector='first_rule_only')
+        result = extractor.detect_mb_second_feature(rule_page())
+        assert len(calls) == 1 and result['detected_lines'] == 1 and not result['has_second_feature']
+    finally:
+        del LINE_DETECTORS['first_rule_only']
+
+
+def test_projection_and_hough_lines():
+    """行投影与Hough检测在合成页面上找到两条长横线，文字行不会被识别为长横线"""
+    raster = PageRaster(rule_page())
+    mask = raster.dark_mask(80)
+
+    lines = find_projection_lines(mask, raster.row_projection(80))
+    assert [(int(line['y_center']), line['line_width'], line['coords'][0], line['coords'][2]) for line in lines] == \
+        [(400, 2, 143, 1103), (1300, 2, 143, 1103)]
+    lines = find_hough_lines(mask, search_range=16)
+    assert [int(line['y_center']) for line in lines] == [400, 1300]
+    assert [line['line_width'] for line in lines] == [2, 2]
+
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    for name in ('hough', 'projection'):
+        assert y_centers(extractor.detect_mb_second_feature(raster, line_detector=name)) == [400, 1300], name
+
+
+def test_benchmark_harness():
+    """对比工具：参考检测器与自身完全一致，其余检测器在测试PDF前几页上与参考一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    pages = list(iter_template_pages(TEMPLATES_DIR, 'mb*.png')) + list(iter_pdf_pages(TEST_PDF, max_pages=3))
+    assert len(pages) == len(list(TEMPLATES_DIR.glob('mb*.png'))) + 3
+
+    stats = benchmark_detectors(extractor, pages, ['projection', 'run_length'])
+    assert list(stats) == ['adaptive', 'projection', 'run_length']
+    rows = summarize(stats)
+    assert rows[0]['verdict_agreement'] == rows[0]['line_agreement'] == 1.0
+    assert all(row['pages'] == len(pages) and len(stats[row['detector']]['times']) == len(pages) for row in rows)
+    for row, entry in zip(rows, stats.values()):
+        assert row['verdict_agreement'] == 1 - len(entry['disagreements']) / len(pages)
+
+    assert recommend_detector(rows, min_agreement=1.0) in [row['detector'] for row in rows
+                                                           if row['verdict_agreement'] == 1.0]
+    slow = [{'detector': 'a', 'verdict_agreement': 1.0, 'p50_ms': 2.0, 'p95_ms': 9.0},
+            {'detector': 'b', 'verdict_agreement': 0.9, 'p50_ms': 0.1, 'p95_ms': 0.2},
+            {'detector': 'c', 'verdict_agreement': 1.0, 'p50_ms': 3.0, 'p95_ms': 4.0}]
+    assert recommend_detector(slow) == 'c'
+    assert recommend_detector(slow, min_agreement=0.9) == 'b'
+    assert recommend_detector(slow, min_agreement=1.1) is None
+
+    with pytest.raises(ValueError):
+        benchmark_detectors(extractor, pages, ['unknown'])
+
+
+def benchmark():
+    """templates/mb*.png与测试PDF各页上，各检测器与默认检测器的一致率及单页耗时"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    pages = list(iter_template_pages(TEMPLATES_DIR, 'mb*.png')) + list(iter_pdf_pages(TEST_PDF))
+    stats = benchmark_detectors(extractor, pages, repeat=3)
+    rows = summarize(stats)
+    print_table(rows, DEFAULT_LINE_DETECTOR)
+    for name, entry in stats.items():
+        if entry['disagreements']:
+            print(f"  {name} 判定不同: {'、'.join(entry['disagreements'])}")
+    print(f"判定完全一致的检测器中p95耗时最低: {recommend_detector(rows)}")
+
+
+def main():
+    """主函数"""
+    print("=== 长横线检测器注册表测试 ===")
+    test_dispatch_by_name()
+    test_detector_configuration()
+    test_register_custom_detector()
+    test_projection_and_hough_lines()
+    test_benchmark_harness()
+    print("✓ 检测器注册表与对比工具正确")
+
+    print("\n=== 检测器对比 ===")
+    benchmark()
+
+
+if __name__ == "__main__":
+    main()
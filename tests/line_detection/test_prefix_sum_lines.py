@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试基于水平前缀和的线宽测量与区域线条检测
+1. 批量线宽测量（line_scanner.run_thickness）与原逐行np.sum实现的结果一致
+2. 区域检测（_detect_line_in_region）与原逐像素扫描实现在templates/mb*.png和随机掩码上的结果一致
+3. 两个函数的耗时基准对比
+"""
+
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 导入测试包配置
+from tests import TEMPLATES_DIR, DATA_DIR
+
+from line_scanner import longest_row_runs, row_prefix_sums, run_thickness, span_counts
+from pdf_feature_extractor import PDFFeatureExtractor
+
+
+def legacy_measure_line_width(mask, x1, x2, y, height, pixel_factor=1.0):
+    """原逐行np.sum实现（仅用于结果对比和基准测试）"""
+    line_center = y
+    min_search_range = max(1, int(round(5 * pixel_factor)))
+    search_range = max(min_search_range, height // 100)
+
+    top_y = line_center
+    for dy in range(1, search_range + 1):
+        test_y = line_center - dy
+        if test_y < 0:
+            break
+        if x2 >= x1:
+            black_pixels = np.sum(mask[test_y, x1:x2+1])
+            if black_pixels < (x2 - x1 + 1) * 0.3:
+                break
+            top_y = test_y
+        else:
+            break
+
+    bottom_y = line_center
+    for dy in range(1, search_range + 1):
+        test_y = line_center + dy
+        if test_y >= mask.shape[0]:
+            break
+        if x2 >= x1:
+            black_pixels = np.sum(mask[test_y, x1:x2+1])
+            if black_pixels < (x2 - x1 + 1) * 0.3:
+                break
+            bottom_y = test_y
+        else:
+            break
+
+    return bottom_y - top_y + 1
+
+
+def legacy_detect_line_in_region(black_mask, target_y, search_range, width):
+    """原逐像素扫描实现（仅用于结果对比和基准测试）"""
+    height = black_mask.shape[0]
+    y_start = max(0, target_y - search_range)
+    y_end = min(height, target_y + search_range)
+    roi = black_mask[y_start:y_end, :]
+
+    best_line = None
+    max_length = 0
+    for row_offset in range(roi.shape[0]):
+        row = roi[row_offset, :]
+        segments = []
+        start = None
+        for col in range(len(row)):
+            if row[col]:
+                if start is None:
+                    start = col
+            else:
+                if start is not None:
+                    segments.append((start, col - 1))
+                    start = None
+        if start is not None:
+            segments.append((start, len(row) - 1))
+
+        for start_col, end_col in segments:
+            segment_length = end_col - start_col + 1
+            segment_ratio = segment_length / width
+            if segment_ratio >= 0.25 and segment_length > max_length:
+                max_length = segment_length
+                actual_y = y_start + row_offset
+                best_line = {
+                    'coords': (start_col, actual_y, end_col, actual_y),
+                    'length': segment_length,
+                    'y_center': float(actual_y),
+                    'angle': 0,
+                    'width_ratio': segment_ratio
+                }
+    return best_line
+
+
+def load_template_masks():
+    """加载templates/mb*.png并生成黑色掩码"""
+    masks = []
+    for image_path in sorted(TEMPLATES_DIR.glob('mb*.png')):
+        image = np.array(Image.open(str(image_path)).convert('RGB'))
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        masks.append((image_path.name, gray < 80))
+    return masks
+
+
+def random_masks(count=20, seed=0):
+    """随机掩码：包含不同粗细、带缺口的横线和贴近上下边缘的线条"""
+    rng = np.random.default_rng(seed)
+    masks = []
+    for _ in range(count):
+        height, width = rng.integers(60, 240), rng.integers(50, 300)
+        mask = rng.random((height, width)) < rng.uniform(0.05, 0.6)
+        for _ in range(rng.integers(1, 6)):
+            y = rng.integers(0, height)
+            thickness = rng.integers(1, 12)
+            x1 = rng.integers(0, width // 2)
+            x2 = rng.integers(x1, width)
+            mask[y:y + thickness, x1:x2 + 1] = True
+            mask[y:y + thickness, rng.integers(x1, x2 + 1)] = False
+        masks.append((f"random{len(masks)}", mask))
+    return masks
+
+
+def line_candidates(mask):
+    """掩码中每一行的最长线段（作为线宽测量的输入）"""
+    lengths, starts, ends = longest_row_runs(mask)
+    rows = np.nonzero(lengths > 0)[0]
+    return rows, starts[rows], ends[rows]
+
+
+def test_span_counts():
+    """前缀和查表的区间黑色像素数与直接求和一致"""
+    rng = np.random.default_rng(1)
+    mask = rng.random((30, 50)) < 0.4
+    prefix = row_prefix_sums(mask)
+    assert prefix.shape == (30, 51) and (prefix[:, 0] == 0).all()
+    rows = rng.integers(0, 30, 200)
+    starts = rng.integers(0, 50, 200)
+    ends = np.maximum(starts, rng.integers(0, 50, 200))
+    expected = [mask[row, start:end + 1].sum() for row, start, end in zip(rows, starts, ends)]
+    assert span_counts(prefix, rows, starts, ends).tolist() == expected
+
+
+def test_thickness_matches_legacy():
+    """批量线宽测量与原实现一致（含不同搜索范围、倍率和空输入）"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    for name, mask in load_template_masks() + random_masks():
+        rows, starts, ends = line_candidates(mask)
+        for height, pixel_factor in ((mask.shape[0], 1.0), (mask.shape[0] * 4, 0.5), (100, 2.0)):
+            search_range = extractor._line_width_search_range(height, pixel_factor)
+            expected = [legacy_measure_line_width(mask, start, end, row, height, pixel_factor)
+                        for row, start, end in zip(rows, starts, ends)]
+            assert run_thickness(mask, rows, starts, ends, search_range).tolist() == expected, name
+            if len(rows):
+                assert extractor._measure_line_width(mask, starts[0], ends[0], rows[0], mask.shape[1], height,
+                                                     pixel_factor) == expected[0]
+
+    assert run_thickness(np.zeros((5, 5), dtype=bool), [], [], [], 3).size == 0
+    assert run_thickness(np.ones((1, 5), dtype=bool), [0], [0], [4], 3).tolist() == [1]
+
+
+def test_region_detection_matches_legacy():
+    """区域检测与原逐像素扫描一致（含搜索区域越界和未找到线条的情况）"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    for name, mask in load_template_masks() + random_masks():
+        height, width = mask.shape
+        for target_y in (0, height // 4, height // 2, height - 1):
+            for search_range in (0, 5, 30):
+                expected = legacy_detect_line_in_region(mask, target_y, search_range, width)
+                actual = extractor._detect_line_in_region(mask, target_y, search_range, width, "测试线")
+                assert actual == expected, f"{name} y={target_y}±{search_range}"
+
+
+def thick_block_mask(height=1684, width=1191, rows=200):
+    """包含大面积黑色区域的掩码：每一行都是线宽测量的候选行"""
+    mask = np.zeros((height, width), dtype=bool)
+    mask[400:400 + rows, 100:1100] = True
+    mask[1456, 143:1105] = True
+    return mask
+
+
+def benchmark(repeat=5):
+    """对比原实现与前缀和实现的耗时"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    masks = load_template_masks() + [("thick_block", thick_block_mask())]
+
+    print("线宽测量（每行最长线段）:")
+    print(f"{'掩码':<32} {'候选数':>8} {'原实现(ms)':>12} {'前缀和(ms)':>12} {'加速比':>8}")
+    for name, mask in masks:
+        height = mask.shape[0]
+        rows, starts, ends = line_candidates(mask)
+        search_range = extractor._line_width_search_range(height)
+
+        start = time.perf_counter()
+        for row, x1, x2 in zip(rows, starts, ends):
+            legacy_measure_line_width(mask, x1, x2, row, height)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run_thickness(mask, rows, starts, ends, search_range)
+        prefix_ms = (time.perf_counter() - start) * 1000 / repeat
+        print(f"{name:<32} {len(rows):>8} {legacy_ms:>12.1f} {prefix_ms:>12.2f} {legacy_ms / prefix_ms:>7.0f}x")
+
+    print("\n区域检测（目标行±30）:")
+    print(f"{'掩码':<32} {'原实现(ms)':>12} {'游程扫描(ms)':>12} {'加速比':>8}")
+    for name, mask in masks:
+        height, width = mask.shape
+        targets = (height // 4, height * 3 // 4)
+
+        start = time.perf_counter()
+        for target_y in targets:
+            legacy_detect_line_in_region(mask, target_y, 30, width)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for target_y in targets:
+                extractor._detect_line_in_region(mask, target_y, 30, width, "测试线")
+        scan_ms = (time.perf_counter() - start) * 1000 / repeat
+        print(f"{name:<32} {legacy_ms:>12.1f} {scan_ms:>12.2f} {legacy_ms / scan_ms:>7.0f}x")
+
+
+def main():
+    """主函数"""
+    print("=== 前缀和线宽测量与区域检测测试 ===")
+    test_span_counts()
+    test_thickness_matches_legacy()
+    test_region_detection_matches_legacy()
+    print("✓ 结果与原实现一致")
+
+    print("\n=== 耗时基准 ===")
+    benchmark()
+
+
+if __name__ == "__main__":
+    main()
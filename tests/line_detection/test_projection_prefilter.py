@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试长横线检测的投影预筛选
+1. 预筛选前后检测结果一致
+2. 剪除行数通过line_scan_stats报告
+3. 单页耗时基准对比
+"""
+
+import time
+
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
+
+from line_scanner import longest_row_runs
+from pdf_feature_extractor import PDFFeatureExtractor
+from tests.line_detection.test_run_length_scanner import legacy_detect_lines_from_mask, load_template_masks
+
+
+def detect_without_prefilter(extractor, mask, width, height):
+    """不做投影预筛选，对所有行做游程扫描（仅用于基准对比）"""
+    run_lengths, _, _ = longest_row_runs(mask)
+    return np.nonzero(run_lengths / width >= 0.70)[0]
+
+
+def test_prefilter_keeps_results():
+    """预筛选后与原逐像素扫描实现的检测结果一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    for name, mask in load_template_masks():
+        height, width = mask.shape
+        expected = legacy_detect_lines_from_mask(extractor, mask, width, height)
+        assert extractor._detect_lines_from_mask(mask, width, height) == expected, f"{name} 检测结果不一致"
+        row_counts = np.count_nonzero(mask, axis=1)
+        assert extractor._detect_lines_from_mask(mask, width, height, row_counts) == expected, f"{name} 检测结果不一致"
+
+
+def test_pruned_rows_reported():
+    """剪除行数 = 总行数 - 黑色像素不足70%宽度以外的行数"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    mask = np.zeros((100, 50), dtype=bool)
+    mask[10, :] = True          # 完整横线
+    mask[60, :40] = True        # 80%宽度的横线
+    mask[80, ::2] = True        # 像素够多但不连续（保留扫描，但不是线）
+    mask[90, :20] = True        # 像素不足，被剪除
+
+    extractor._detect_lines_from_mask(mask, 50, 100)
+    stats = extractor.get_line_scan_stats()
+
+    assert stats['masks_scanned'] == 1
+    assert stats['rows_total'] == 100
+    assert stats['rows_scanned'] == 2
+    assert stats['rows_pruned'] == 98
+
+    extractor.reset_line_scan_stats()
+    assert extractor.get_line_scan_stats()['rows_total'] == 0
+
+
+def benchmark_prefilter(repeat=5):
+    """对比整幅游程扫描与投影预筛选的耗时"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    print(f"{'模板':<32} {'剪除行数':>12} {'整幅扫描(ms)':>14} {'预筛选(ms)':>12}")
+    for name, mask in load_template_masks():
+        height, width = mask.shape
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            detect_without_prefilter(extractor, mask, width, height)
+        full_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        extractor.reset_line_scan_stats()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extractor._detect_lines_from_mask(mask, width, height)
+        prefilter_ms = (time.perf_counter() - start) * 1000 / repeat
+        stats = extractor.get_line_scan_stats()
+
+        pruned = f"{stats['rows_pruned'] // repeat}/{height}"
+        print(f"{name:<32} {pruned:>12} {full_ms:>14.2f} {prefilter_ms:>12.2f}")
+
+
+def main():
+    """主函数"""
+    print("=== 投影预筛选测试 ===")
+    test_prefilter_keeps_results()
+    test_pruned_rows_reported()
+    print("✓ 结果与原实现一致")
+
+    print("\n=== 单页耗时基准 ===")
+    benchmark_prefilter()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试向量化游程扫描引擎
+1. 与原逐像素扫描实现在templates/mb*.png上的结果一致性
+2. 单页耗时基准对比
+"""
+
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
+
+from line_scanner import longest_row_runs
+from pdf_feature_extractor import PDFFeatureExtractor
+
+
+def legacy_detect_lines_from_mask(extractor, mask, width, height):
+    """原逐像素扫描实现（仅用于结果对比和基准测试）"""
+    potential_lines = []
+
+    for y in range(height):
+        row = mask[y, :]
+
+        segments = []
+        start = None
+        for x in range(width):
+            if row[x]:
+                if start is None:
+                    start = x
+            else:
+                if start is not None:
+                    segments.append((start, x - 1))
+                    start = None
+        if start is not None:
+            segments.append((start, width - 1))
+
+        if segments:
+            max_segment_length = max(end - start + 1 for start, end in segments)
+            max_segment_ratio = max_segment_length / width
+            if max_segment_ratio >= 0.70:
+                max_segment = max(segments, key=lambda x: x[1] - x[0])
+                line_width = extractor._measure_line_width(mask, max_segment[0], max_segment[1], y, width, height)
+                if line_width <= height * 0.02:
+                    potential_lines.append({
+                        'coords': (max_segment[0], y, max_segment[1], y),
+                        'length': max_segment_length,
+                        'y_center': float(y),
+                        'angle': 0,
+                        'width_ratio': max_segment_ratio,
+                        'y_percent': y / height * 100,
+                        'line_width': line_width
+                    })
+
+    if len(potential_lines) == 0:
+        return []
+
+    potential_lines.sort(key=lambda x: x['length'], reverse=True)
+
+    main_lines = []
+    min_distance = height * 0.45
+    for line in potential_lines:
+        too_close = False
+        for selected in main_lines:
+            if abs(line['y_center'] - selected['y_center']) < min_distance:
+                too_close = True
+                break
+        if not too_close:
+            line['quality_score'] = extractor._calculate_line_quality(line, width, height)
+            main_lines.append(line)
+            if len(main_lines) == 2:
+                break
+
+    return main_lines
+
+
+def load_template_masks():
+    """加载templates/mb*.png并生成黑色掩码"""
+    masks = []
+    for image_path in sorted(TEMPLATES_DIR.glob('mb*.png')):
+        image = np.array(Image.open(str(image_path)).convert('RGB'))
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        masks.append((image_path.name, gray < 80))
+    return masks
+
+
+def test_longest_row_runs_matches_python_scan():
+    """游程引擎的每行最长线段应与逐像素扫描完全一致（含并列时取最左）"""
+    rng = np.random.default_rng(0)
+    mask = rng.random((40, 97)) < 0.6
+    mask[5, :] = True
+    mask[6, :] = False
+    mask[7, 10:20] = True
+    mask[7, 30:40] = True
+
+    lengths, starts, ends = longest_row_runs(mask)
+
+    for y in range(mask.shape[0]):
+        best = None
+        start = None
+        for x in range(mask.shape[1] + 1):
+            if x < mask.shape[1] and mask[y, x]:
+                if start is None:
+                    start = x
+            elif start is not None:
+                if best is None or (x - start) > (best[1] - best[0] + 1):
+                    best = (start, x - 1)
+                start = None
+        if best is None:
+            assert lengths[y] == 0
+        else:
+            assert (starts[y], ends[y]) == best
+            assert lengths[y] == best[1] - best[0] + 1
+
+
+def test_detect_lines_equivalent_on_templates():
+    """向量化实现与原实现在所有mb*.png模板上的检测结果一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    for name, mask in load_template_masks():
+        height, width = mask.shape
+        expected = legacy_detect_lines_from_mask(extractor, mask, width, height)
+        actual = extractor._detect_lines_from_mask(mask, width, height)
+        assert actual == expected, f"{name} 检测结果不一致"
+
+
+def benchmark_detect_lines(repeat=3):
+    """对比原实现与向量化实现的单页耗时"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+
+    print(f"{'模板':<32} {'尺寸':<12} {'原实现(ms)':>12} {'向量化(ms)':>12} {'加速比':>8}")
+    for name, mask in load_template_masks():
+        height, width = mask.shape
+
+        start = time.perf_counter()
+        legacy_detect_lines_from_mask(extractor, mask, width, height)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extractor._detect_lines_from_mask(mask, width, height)
+        vectorized_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        print(f"{name:<32} {f'{width}x{height}':<12} {legacy_ms:>12.1f} {vectorized_ms:>12.2f} {legacy_ms / vectorized_ms:>7.0f}x")
+
+
+def main():
+    """主函数"""
+    print("=== 向量化游程扫描测试 ===")
+    test_longest_row_runs_matches_python_scan()
+    test_detect_lines_equivalent_on_templates()
+    print("✓ 结果与原实现一致")
+
+    print("\n=== 单页耗时基准 ===")
+    benchmark_detect_lines()
+
+
+if __name__ == "__main__":
+    main()
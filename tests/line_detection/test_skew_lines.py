@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试倾斜页面的长横线检测（skew_lines.py、PDFFeatureExtractor._find_skewed_lines）
+1. 错切条带与逐列索引的结果一致，降采样不会丢失细线
+2. 合成的倾斜页面（±0.3-2°）上估计并细化倾斜角，两条长横线都能检测到且angle为倾斜角
+3. 没有倾斜的页面（templates/mb*.png与测试PDF各页）估计角为0°，检测结果不变
+4. 测试PDF各页旋转后，与不沿倾斜角检测（原实现）的判定一致率及单页耗时对比
+"""
+
+import math
+import time
+
+import cv2
+import fitz
+import numpy as np
+from PIL import Image
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
+
+from page_raster import PageRaster, render_raster
+from pdf_feature_extractor import PDFFeatureExtractor
+from skew_lines import (DOWNSAMPLE, REFINE_STEP, SKEW_STEP, downsample_mask, estimate_skew, refine_skew,
+                        shear_band, shear_offsets, skew_candidate_rows)
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+class LegacyExtractor(PDFFeatureExtractor):
+    """不沿倾斜角检测的提取器（原实现，仅用于结果对比）"""
+
+    def _find_skewed_lines(self, black_mask, width, height, pixel_factor=1.0):
+        return 0, []
+
+
+def indexed_shear_band(mask, offsets, start, end):
+    """逐列索引的错切条带（仅用于结果对比）"""
+    height, width = mask.shape
+    rows = np.arange(start, end)[:, None] + offsets[None, :]
+    inside = (rows >= 0) & (rows < height)
+    band = np.zeros((end - start, width), dtype=bool)
+    columns = np.broadcast_to(np.arange(width), rows.shape)
+    band[inside] = mask[rows[inside], columns[inside]]
+    return band
+
+
+def skewed_page(angle, height=1684, width=1191):
+    """
+    合成的倾斜页面：y=400和y=1300处（第0列）两条2像素粗的长横线，以及沿同一角度排列的文字行
+    """
+    rng = np.random.default_rng(0)
+    slope = math.tan(math.radians(angle))
+    image = np.full((height, width), 255, dtype=np.uint8)
+    for top in (400, 1300):
+        for row in (top, top + 1):
+            cv2.line(image, (143, int(round(row + 143 * slope))), (1103, int(round(row + 1103 * slope))), 0, 1)
+    for top in range(600, 1100, 40):
+        for x in range(100, width - 100, 4):
+            if rng.random() < 0.5:
+                y = int(round(top + x * slope))
+                image[y:y + 20, x:x + 3] = 0
+    return np.dstack([image] * 3)
+
+
+def rotated_gray(gray, angle):
+    """绕页面中心旋转灰度图（双线性插值，边缘补白）"""
+    height, width = gray.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_LINEAR, borderValue=255)
+
+
+def scanned_grays():
+    """测试PDF各页的灰度图，线条纵向加粗为3像素左右（扫描件的线条通常比矢量渲染粗，旋转后不会断成虚线）"""
+    with fitz.open(str(TEST_PDF)) as doc:
+        return [cv2.erode(render_raster(page, profile='structure').gray, np.ones((3, 1), dtype=np.uint8))
+                for page in doc]
+
+
+def test_shear_band_matches_indexing():
+    """按偏移分块复制的错切条带与逐列索引一致（含超出页面的行）"""
+    rng = np.random.default_rng(1)
+    mask = rng.random((300, 500)) < 0.1
+    for angle in (-2.0, -0.35, 0.0, 0.8, 2.0):
+        offsets = shear_offsets(mask.shape[1], angle)
+        for start, end in ((-20, 40), (100, 180), (270, 330)):
+            assert np.array_equal(shear_band(mask, offsets, start, end),
+                                  indexed_shear_band(mask, offsets, start, end)), (angle, start)
+
+    # 降采样后1像素的细线仍是连续的一行
+    mask = np.zeros((100, 400), dtype=bool)
+    mask[37, 20:380] = True
+    small = downsample_mask(mask, DOWNSAMPLE)
+    assert small.shape == (25, 100)
+    assert np.count_nonzero(small[37 // DOWNSAMPLE]) == 90 and np.count_nonzero(small) == 90
+
+
+def test_skewed_rules_detected():
+    """倾斜0.3-2°的合成页面：倾斜角误差不超过细化步长，两条长横线的位置、长度正确"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    legacy = LegacyExtractor(data_dir=str(DATA_DIR))
+    for angle in (0.3, 0.6, 0.9, -1.3, 1.9, -2.0):
+        image = skewed_page(angle)
+        mask = PageRaster(image).dark_mask(80)
+        small = downsample_mask(mask)
+        estimate, profile, base = estimate_skew(small)
+        assert abs(estimate - angle) <= SKEW_STEP, angle
+        hints = skew_candidate_rows(small, estimate, profile, base)
+        assert len(hints) == 2, angle
+
+        offsets = shear_offsets(mask.shape[1], estimate)
+        refined = refine_skew(shear_band(mask, offsets, hints[0] - 20, hints[0] + 20), offsets, hints[0] - 20,
+                              estimate)
+        assert abs(refined - angle) <= REFINE_STEP + 1e-9, angle
+
+        result = extractor.detect_mb_second_feature(image)
+        assert result['has_second_feature'], angle
+        slope = math.tan(math.radians(angle))
+        for line, top in zip(sorted(result['long_lines'], key=lambda line: line['y_center']), (400, 1300)):
+            assert abs(line['angle'] - angle) <= REFINE_STEP + 1e-9, angle
+            assert abs(line['y_center'] - (top + 623 * slope)) <= 2, angle
+            assert line['length'] >= 950 and line['line_width'] <= 3, angle
+            x1, y1, x2, y2 = line['coords']
+            assert abs((y2 - y1) - (x2 - x1) * slope) <= 2, angle
+
+        # 原实现按行扫描找不到跨越多行的长横线
+        assert not legacy.detect_mb_second_feature(image)['has_second_feature'], angle
+
+
+def test_unskewed_pages_unchanged():
+    """没有倾斜的页面估计角为0°，检测结果与原实现完全一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    legacy = LegacyExtractor(data_dir=str(DATA_DIR))
+    rasters = [PageRaster(np.array(Image.open(str(path)).convert('RGB')))
+               for path in sorted(TEMPLATES_DIR.glob('mb*.png'))]
+    with fitz.open(str(TEST_PDF)) as doc:
+        rasters += [render_raster(page, profile='structure') for page in doc]
+    for raster in rasters:
+        mask = raster.dark_mask(80)
+        assert extractor._find_skewed_lines(mask, raster.width, raster.height) == (0, [])
+        assert extractor.detect_mb_second_feature(raster) == legacy.detect_mb_second_feature(raster)
+
+
+def benchmark():
+    """测试PDF各页旋转后与未旋转时的判定一致率，以及与原实现的单页耗时对比"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    legacy = LegacyExtractor(data_dir=str(DATA_DIR))
+    grays = scanned_grays()
+    expected = [extractor.detect_mb_second_feature(PageRaster(np.dstack([gray] * 3)))['has_second_feature']
+                for gray in grays]
+    print(f"{'倾斜角':>8}{'原实现一致':>12}{'倾斜检测一致':>14}{'原p50(ms)':>12}{'原p95(ms)':>12}"
+          f"{'新p50(ms)':>12}{'新p95(ms)':>12}")
+    for angle in (0.3, 0.5, 1.0, -1.5, 2.0):
+        agree = {'legacy': 0, 'skew': 0}
+        times = {'legacy': [], 'skew': []}
+        for gray, reference in zip(grays, expected):
+            raster = PageRaster(np.dstack([rotated_gray(gray, angle)] * 3))
+            raster.dark_mask(80)
+            raster.row_projection(80)
+            for name, instance in (('legacy', legacy), ('skew', extractor)):
+                start = time.perf_counter()
+                result = instance.detect_mb_second_feature(raster)
+                times[name].append((time.perf_counter() - start) * 1000)
+                agree[name] += result['has_second_feature'] == reference
+        legacy_times, skew_times = np.array(times['legacy']), np.array(times['skew'])
+        print(f"{angle:>8.1f}{agree['legacy']:>9}/{len(grays)}{agree['skew']:>11}/{len(grays)}"
+              f"{np.percentile(legacy_times, 50):>12.2f}{np.percentile(legacy_times, 95):>12.2f}"
+              f"{np.percentile(skew_times, 50):>12.2f}{np.percentile(skew_times, 95):>12.2f}")
+
+
+def main():
+    """主函数"""
+    print("=== 倾斜页面长横线检测测试 ===")
+    test_shear_band_matches_indexing()
+    test_skewed_rules_detected()
+    test_unskewed_pages_unchanged()
+    print("✓ 倾斜页面检测结果正确")
+
+    print("\n=== 旋转后的测试PDF：与原实现对比 ===")
+    benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试基于PDF矢量绘图层的第二特征检测
+1. 与位图检测在测试PDF首页上的结果一致
+2. 描边线段、细长填充矩形、扫描页回退
+3. 单页耗时基准对比
+"""
+
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, DATA_DIR
+
+from pdf_feature_extractor import PDFFeatureExtractor
+from pdf_renderer import render_page
+from vector_lines import find_horizontal_rules, is_image_only_page
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def make_page(doc):
+    """新建A4页面并写入一行文字（模拟电子版PDF）"""
+    page = doc.new_page(width=595, height=842)
+    page.insert_text((72, 100), "standard document", fontsize=12)
+    return page
+
+
+def test_vector_matches_raster_on_cover_page():
+    """测试PDF首页：矢量检测与位图检测的两条长黑线位置和长度一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    doc = fitz.open(TEST_PDF)
+    page = doc.load_page(0)
+
+    vector = extractor.detect_mb_second_feature_vector(page)
+    raster = extractor.detect_mb_second_feature(render_page(page, scale=2.0))
+    doc.close()
+
+    assert vector is not None
+    assert vector['detection_method'] == 'vector'
+    assert vector['has_second_feature'] and raster['has_second_feature']
+    assert [line['coords'] for line in vector['long_lines']] == [line['coords'] for line in raster['long_lines']]
+    assert vector['line_lengths'] == raster['line_lengths']
+
+
+def test_stroked_and_filled_rules():
+    """描边线段（分段绘制）和细长填充矩形都能识别，短线和浅色线被忽略"""
+    doc = fitz.open()
+    page = make_page(doc)
+    # 分两段绘制的长横线
+    page.draw_line((60, 200), (300, 200), color=(0, 0, 0), width=1)
+    page.draw_line((300, 200), (540, 200), color=(0, 0, 0), width=1)
+    # 用填充矩形画出的横线
+    page.draw_rect(fitz.Rect(60, 700, 540, 702), color=None, fill=(0, 0, 0))
+    # 干扰项：短线、浅灰色长线
+    page.draw_line((60, 400), (200, 400), color=(0, 0, 0), width=1)
+    page.draw_line((60, 500), (540, 500), color=(0.8, 0.8, 0.8), width=1)
+
+    rules = find_horizontal_rules(page, scale=2.0)
+    assert [rule['y'] for rule in rules] == [400, 1402]
+    assert rules[0]['x1'] == 120 and rules[0]['x2'] == 1079
+
+    result = PDFFeatureExtractor(data_dir=str(DATA_DIR)).detect_mb_second_feature_vector(page)
+    assert result['has_second_feature']
+    assert result['detected_lines'] == 2
+    doc.close()
+
+
+def test_scanned_page_falls_back_to_raster():
+    """整页图片（扫描件）不使用矢量检测，回退到位图检测"""
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    image = np.full((842, 595, 3), 255, dtype=np.uint8)
+    image[200, 60:540] = 0
+    image[700, 60:540] = 0
+    pix = fitz.Pixmap(fitz.csRGB, 595, 842, image.tobytes(), False)
+    page.insert_image(page.rect, pixmap=pix)
+
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    assert is_image_only_page(page)
+    assert extractor.detect_mb_second_feature_vector(page) is None
+
+    result = extractor.detect_mb_second_feature_from_page(page)
+    assert result['detection_method'] == 'raster'
+    doc.close()
+
+
+def benchmark_vector_detection():
+    """对比矢量检测与渲染+位图检测的单页耗时"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    doc = fitz.open(TEST_PDF)
+
+    print(f"{'页码':<6} {'矢量(ms)':>10} {'渲染+位图(ms)':>16} {'矢量结果':>8} {'位图结果':>8}")
+    for page_num in range(0, len(doc), 6):
+        page = doc.load_page(page_num)
+
+        start = time.perf_counter()
+        vector = extractor.detect_mb_second_feature_from_page(page)
+        vector_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        raster = extractor.detect_mb_second_feature(render_page(page, scale=2.0))
+        raster_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{page_num + 1:<6} {vector_ms:>10.2f} {raster_ms:>16.2f} "
+              f"{str(vector['has_second_feature']):>8} {str(raster['has_second_feature']):>8}")
+    doc.close()
+
+
+def main():
+    """主函数"""
+    print("=== 矢量长横线检测测试 ===")
+    test_vector_matches_raster_on_cover_page()
+    test_stroked_and_filled_rules()
+    test_scanned_page_falls_back_to_raster()
+    print("✓ 测试通过")
+
+    print("\n=== 单页耗时基准 ===")
+    benchmark_vector_detection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试增量扫描清单
+1. 未变化的文件复用已存储的结果
+2. 文件变化或配置指纹变化时重新处理
+3. 递归分类重复运行时统计结果一致
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT
+
+from pdf_analyzer import UnifiedPDFAnalyzer
+from scan_manifest import ScanManifest, config_fingerprint
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def test_manifest_lookup_and_invalidation():
+    """清单按路径、大小、修改时间和配置指纹判断是否复用"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        pdf_path = temp_dir / "a.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 original")
+        db_path = temp_dir / "manifest.db"
+        fingerprint = config_fingerprint({'bg_ratio_min': 0.95}, "1.0")
+
+        with ScanManifest(db_path, "unified", fingerprint) as manifest:
+            assert manifest.lookup(pdf_path) is None
+            manifest.store(pdf_path, {'success': True, 'passed': np.bool_(True), 'ratio': np.float64(0.5)})
+
+        with ScanManifest(db_path, "unified", fingerprint) as manifest:
+            assert manifest.lookup(pdf_path) == {'success': True, 'passed': True, 'ratio': 0.5}
+
+        # 配置指纹变化
+        other_fingerprint = config_fingerprint({'bg_ratio_min': 0.90}, "1.0")
+        with ScanManifest(db_path, "unified", other_fingerprint) as manifest:
+            assert manifest.lookup(pdf_path) is None
+
+        # 文件内容变化
+        pdf_path.write_bytes(b"%PDF-1.4 modified content")
+        with ScanManifest(db_path, "unified", fingerprint) as manifest:
+            assert manifest.lookup(pdf_path) is None
+
+
+def test_manifest_content_hash():
+    """启用内容哈希时，仅修改时间变化的文件仍复用结果"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        pdf_path = temp_dir / "a.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 same content")
+        db_path = temp_dir / "manifest.db"
+        fingerprint = config_fingerprint({}, "1.0")
+
+        with ScanManifest(db_path, "unified", fingerprint, use_content_hash=True) as manifest:
+            manifest.store(pdf_path, {'success': True})
+
+        stat = pdf_path.stat()
+        os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        with ScanManifest(db_path, "unified", fingerprint, use_content_hash=True) as manifest:
+            assert manifest.lookup(pdf_path) == {'success': True}
+        with ScanManifest(db_path, "unified", fingerprint, use_content_hash=True) as manifest:
+            assert manifest.lookup(pdf_path) == {'success': True}
+            assert manifest.stats['hits'] == 1
+
+
+def test_recursive_classify_reuses_results():
+    """第二次递归分类复用全部结果，统计与第一次一致"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / "src"
+        source.mkdir()
+        shutil.copy2(TEST_PDF, source / "test.pdf")
+        db_path = temp_dir / "manifest.db"
+
+        first = UnifiedPDFAnalyzer(source, temp_dir / "target", manifest_path=db_path)
+        first_results = list(first._iter_results([source / "test.pdf"]))
+        first.manifest.commit()
+
+        second = UnifiedPDFAnalyzer(source, temp_dir / "target", manifest_path=db_path)
+        second_results = list(second._iter_results([source / "test.pdf"]))
+
+        assert second.stats['cached_files'] == 1
+        assert second_results[0]['cached'] is True
+        assert second_results[0]['copied'] == first_results[0]['copied']
+        for key in ('first_feature_passed', 'second_feature_passed', 'copied_files'):
+            assert second.stats[key] == first.stats[key]
+        # 已复制的文件不会重复复制
+        assert len(list((temp_dir / "target").iterdir())) == first.stats['copied_files']
+
+
+if __name__ == "__main__":
+    test_manifest_lookup_and_invalidation()
+    test_manifest_content_hash()
+    test_recursive_classify_reuses_results()
+    print("✅ 增量扫描测试通过")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试递归分类的进程池并行模式
+1. 并行与串行的统计结果一致
+2. 同名文件并发复制时目标路径不冲突
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+# 导入测试包配置
+from tests import PROJECT_ROOT
+
+from pdf_analyzer import UnifiedPDFAnalyzer
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def create_source_tree(root):
+    """创建包含同名PDF和损坏PDF的测试目录"""
+    for sub_dir in ['a', 'b', 'c', 'd']:
+        (root / sub_dir).mkdir(parents=True)
+        shutil.copy2(TEST_PDF, root / sub_dir / "test.pdf")
+    (root / 'b' / 'broken.pdf').write_bytes(b'not a pdf')
+    return sorted(root.rglob('*.pdf'))
+
+
+def test_parallel_matches_serial():
+    """并行模式的统计与串行模式一致，且复制目标互不覆盖"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        pdf_files = create_source_tree(temp_dir / "src")
+
+        serial = UnifiedPDFAnalyzer(temp_dir / "src", temp_dir / "serial")
+        serial_results = [serial.process_pdf_file(pdf_path) for pdf_path in pdf_files]
+
+        parallel = UnifiedPDFAnalyzer(temp_dir / "src", temp_dir / "parallel", workers=3)
+        # workers>1时递归分类经_iter_results_streaming边接收路径边提交到进程池
+        parallel_results = list(parallel._iter_results(iter(pdf_files)))
+
+        assert serial.stats == parallel.stats
+        assert [r['file_path'] for r in parallel_results] == [str(p) for p in pdf_files]
+        assert [r['copied'] for r in parallel_results] == [r['copied'] for r in serial_results]
+
+        copied_targets = [r['target_path'] for r in parallel_results if r['copied']]
+        assert len(set(copied_targets)) == len(copied_targets) == parallel.stats['copied_files']
+        assert len(list((temp_dir / "parallel").iterdir())) == parallel.stats['copied_files']
+
+
+def test_reserve_target_path_is_unique():
+    """预留目标路径时不会重复返回已存在的文件名"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        analyzer = UnifiedPDFAnalyzer(temp_dir, temp_dir)
+        paths = [analyzer._reserve_target_path("same.pdf") for _ in range(3)]
+
+        assert [p.name for p in paths] == ["same.pdf", "same_1.pdf", "same_2.pdf"]
+
+
+if __name__ == "__main__":
+    test_parallel_matches_serial()
+    test_reserve_target_path_is_unique()
+    print("✅ 并行分类测试通过")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试并行目录遍历（pdf_discovery.py）
+1. 找到的PDF与os.walk一致，隐藏文件夹和$开头的系统文件夹按需跳过
+2. 提前结束迭代时遍历线程随之退出
+3. 递归分类边遍历边处理（串行/并行、增量扫描清单），统计与逐个处理一致
+4. os.walk与并行遍历的速度对比
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 导入测试包配置
+from tests import PROJECT_ROOT
+
+from pdf_analyzer import UnifiedPDFAnalyzer
+from pdf_discovery import DirectoryWalker, is_skipped_dir
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def create_tree(root, branches=3, depth=3):
+    """创建多层目录树，包含隐藏文件夹、系统文件夹、大写扩展名和非PDF文件"""
+    directories = [root]
+    for level in range(depth):
+        directories += [directory / f"d{level}_{index}" for directory in directories[-branches ** level:]
+                        for index in range(branches)]
+    for number, directory in enumerate(directories):
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"doc{number}.pdf").write_bytes(b"%PDF-1.4")
+        (directory / f"notes{number}.txt").write_bytes(b"text")
+    (root / "d0_0" / "UPPER.PDF").write_bytes(b"%PDF-1.4")
+    for hidden in (".git", "$RECYCLE.BIN"):
+        (root / hidden).mkdir()
+        (root / hidden / "hidden.pdf").write_bytes(b"%PDF-1.4")
+    return directories
+
+
+def os_walk_pdfs(root, skip_hidden):
+    """原os.walk方式找到的PDF文件"""
+    found = set()
+    for current, dirs, files in os.walk(root):
+        if skip_hidden:
+            dirs[:] = [d for d in dirs if not is_skipped_dir(d)]
+        found.update(Path(current) / file for file in files if file.lower().endswith('.pdf'))
+    return found
+
+
+def test_walker_matches_os_walk():
+    """并行遍历找到的PDF与os.walk一致"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        directories = create_tree(root)
+        for skip_hidden in (True, False):
+            walker = DirectoryWalker(root, threads=4, skip_hidden=skip_hidden)
+            found = list(walker)
+            assert len(found) == len(set(found))
+            assert set(found) == os_walk_pdfs(root, skip_hidden)
+            stats = walker.get_stats()
+            assert stats['directories'] == len(directories) + (0 if skip_hidden else 2)
+            assert stats['files'] == len(found) and stats['errors'] == 0
+
+        # 默认不跳过任何文件夹，与原os.walk遍历一致
+        assert set(DirectoryWalker(root, threads=4)) == os_walk_pdfs(root, False)
+
+        missing = DirectoryWalker(root / "missing")
+        assert list(missing) == [] and missing.stats['errors'] == 1
+
+
+def test_early_stop():
+    """处理阶段提前结束时遍历线程退出"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        create_tree(Path(temp_dir))
+        walker = DirectoryWalker(temp_dir, threads=4, queue_size=2)
+        paths = iter(walker)
+        next(paths)
+        paths.close()
+        assert not [thread for thread in threading.enumerate() if thread.name.startswith("pdf-walk-")]
+
+
+def test_streaming_classify():
+    """递归分类直接消费遍历结果：串行/并行统计一致，第二次运行复用清单中的结果"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / "src"
+        for sub_dir in ('a', 'b/c'):
+            (source / sub_dir).mkdir(parents=True)
+            shutil.copy2(TEST_PDF, source / sub_dir / "test.pdf")
+        (source / 'a' / 'broken.pdf').write_bytes(b'not a pdf')
+        expected_paths = {str(path) for path in source.rglob('*.pdf')}
+
+        serial = UnifiedPDFAnalyzer(source, temp_dir / "serial")
+        serial.recursive_classify()
+        serial.results_file.unlink()
+        assert serial.stats['total_pdfs'] == 3
+
+        db_path = temp_dir / "manifest.db"
+        for run in range(2):
+            parallel = UnifiedPDFAnalyzer(source, temp_dir / "parallel", workers=2, manifest_path=db_path)
+            results = list(parallel._iter_results(DirectoryWalker(source)))
+            parallel.manifest.close()
+            assert {result['file_path'] for result in results} == expected_paths
+            for key in ('first_feature_passed', 'second_feature_passed', 'copied_files', 'errors'):
+                assert parallel.stats[key] == serial.stats[key], key
+        # 第二次运行时成功处理的文件全部复用清单（处理失败的文件不写入清单）
+        assert parallel.stats['cached_files'] == 3 - serial.stats['errors']
+
+
+def benchmark_discovery(branches=6, depth=4):
+    """对比os.walk与并行遍历的耗时（本地文件系统；网络共享盘上每次目录读取的延迟更高，并行的收益更大）"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        directories = create_tree(root, branches, depth)
+
+        start = time.perf_counter()
+        expected = os_walk_pdfs(root, False)
+        walk_seconds = time.perf_counter() - start
+
+        walker = DirectoryWalker(root)
+        found = sum(1 for _ in walker)
+        assert found == len(expected)
+
+        print(f"目录数: {len(directories)}，PDF文件数: {found}")
+        print(f"os.walk:  {walk_seconds * 1000:.1f} ms（{len(directories) / walk_seconds:.0f} 个文件夹/秒，遍历完成后才能开始处理）")
+        print(f"并行遍历: {walker.elapsed * 1000:.1f} ms（{walker.directories_per_second():.0f} 个文件夹/秒，边遍历边返回）")
+
+
+def main():
+    """主函数"""
+    print("=== 并行目录遍历测试 ===")
+    test_walker_matches_os_walk()
+    test_early_stop()
+    test_streaming_classify()
+    print("✓ 并行遍历结果与os.walk一致")
+
+    print("\n=== 遍历耗时对比 ===")
+    benchmark_discovery()
+
+
+if __name__ == "__main__":
+    main()
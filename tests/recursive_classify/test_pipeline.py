@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试分阶段流水线（pipeline.py）和递归分类的流水线模式（--pipeline）
+1. 线程阶段和进程阶段的输出完整，队列深度不超过上限（背压），阶段统计正确
+2. 阶段出错时在迭代线程中抛出，提前结束时所有阶段线程退出
+3. 流水线模式的统计、复制结果与逐个处理一致，第二次运行复用增量扫描清单
+4. 逐个处理与流水线处理的耗时对比及各阶段统计
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 导入测试包配置
+from tests import PROJECT_ROOT
+
+from pdf_analyzer import UnifiedPDFAnalyzer
+from pdf_discovery import DirectoryWalker
+from pdf_session import PDFSession
+from pipeline import Pipeline, Stage
+from scan_manifest import json_default
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def square(value):
+    """进程阶段的处理函数（模块级函数，可被工作进程调用）"""
+    return value * value
+
+
+def slow_identity(value):
+    time.sleep(0.002)
+    return value
+
+
+def fail_on_three(value):
+    if value == 3:
+        raise RuntimeError("第3个条目出错")
+    return value
+
+
+def pipeline_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith("pipeline-")]
+
+
+def test_pipeline_outputs_and_backpressure():
+    """所有条目经过各阶段恰好一次，被跳过的条目直接传到下游"""
+    stages = [
+        Stage('slow', slow_identity, workers=3),
+        Stage('square', square, workers=2, kind='process', bypass=lambda value: value % 10 == 0),
+        Stage('offset', lambda value: value + 1, workers=1),
+    ]
+    pipeline = Pipeline(range(100), stages, queue_size=4)
+    outputs = sorted(pipeline)
+
+    assert outputs == sorted((value if value % 10 == 0 else value * value) + 1 for value in range(100))
+    stats = pipeline.get_stats()
+    assert stats['discover']['processed'] == 100 and stats['slow']['processed'] == 100
+    assert stats['square']['processed'] == 90 and stats['offset']['processed'] == 100
+    assert all(stage_stats['max_queue_depth'] <= 4 for stage_stats in stats.values())
+    assert pipeline.bottleneck() in ('slow', 'square', 'offset')
+    assert not pipeline_threads()
+
+
+def test_pipeline_error_and_early_stop():
+    """阶段出错时迭代线程收到异常；提前结束迭代时各阶段线程退出"""
+    try:
+        list(Pipeline(range(10), [Stage('fail', fail_on_three, workers=2)]))
+    except RuntimeError as e:
+        assert "第3个条目" in str(e)
+    else:
+        raise AssertionError("阶段错误未抛出")
+    assert not pipeline_threads()
+
+    outputs = iter(Pipeline(range(1000), [Stage('slow', slow_identity, workers=2)], queue_size=2))
+    next(outputs)
+    outputs.close()
+    assert not pipeline_threads()
+
+
+def create_source(root, copies=4):
+    """创建包含多份test.pdf、损坏PDF和空PDF的源目录"""
+    for index in range(copies):
+        sub_dir = root / f"d{index % 2}"
+        sub_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(TEST_PDF, sub_dir / f"test_{index}.pdf")
+    (root / "broken.pdf").write_bytes(b"not a pdf")
+    (root / "empty.pdf").write_bytes(b"")
+
+
+def comparable(result):
+    """去掉与处理方式无关的字段（复制目标的序号、打开失败时的错误信息），元组按清单中的JSON格式比较"""
+    result = json.loads(json.dumps(result, ensure_ascii=False, default=json_default))
+    result.pop('target_path', None)
+    result.pop('cached', None)
+    if 'error' in result:
+        result['error'] = bool(result['error'])
+    return result
+
+
+def test_pipeline_matches_serial():
+    """流水线模式的结果和统计与逐个处理一致，复制的文件内容与源文件相同"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / "src"
+        create_source(source)
+
+        serial = UnifiedPDFAnalyzer(source, temp_dir / "serial")
+        serial_results = {result['file_path']: result for result in serial._iter_results(DirectoryWalker(source))}
+
+        db_path = temp_dir / "manifest.db"
+        for run in range(2):
+            piped = UnifiedPDFAnalyzer(source, temp_dir / "piped", manifest_path=db_path,
+                                       pipeline_workers={'read': 2, 'analyze': 2, 'copy': 2})
+            results = {result['file_path']: result for result in piped._iter_results(DirectoryWalker(source))}
+            piped.manifest.close()
+
+            assert results.keys() == serial_results.keys()
+            for file_path, result in results.items():
+                assert comparable(result) == comparable(serial_results[file_path]), file_path
+            for key in ('first_feature_passed', 'second_feature_passed', 'copied_files'):
+                assert piped.stats[key] == serial.stats[key], key
+            if run == 0:
+                assert piped.stats['errors'] == serial.stats['errors'] == 2
+                assert piped.pipeline.get_stats()['copy']['processed'] == serial.stats['copied_files']
+            else:
+                # 第二次运行：成功处理的文件全部复用清单，已复制的文件不重复复制
+                assert piped.stats['cached_files'] == len(results) - 2
+
+        copied = sorted((temp_dir / "piped").iterdir())
+        assert len(copied) == serial.stats['copied_files']
+        assert all(path.read_bytes() == TEST_PDF.read_bytes() for path in copied)
+        assert all(os.stat(path).st_mtime_ns == os.stat(TEST_PDF).st_mtime_ns for path in copied)
+
+
+def test_analyze_stage_returns_result_only():
+    """分析阶段在同一进程中渲染并检查两个特征，返回的条目中不再带有文件内容和页面图像"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        analyzer = UnifiedPDFAnalyzer(TEST_PDF.parent, temp_dir)
+        job = analyzer._analyze_job({'path': TEST_PDF, 'data': TEST_PDF.read_bytes(), 'stats': {}})
+        assert set(job) == {'path', 'stats', 'result'}
+        with PDFSession(TEST_PDF) as session:
+            expected = analyzer._classify_first_page(TEST_PDF, analyzer._render_first_page(session),
+                                                     session.load_page(1))
+        assert comparable(job['result']) == comparable(expected)
+
+        with pytest.raises(ValueError):
+            UnifiedPDFAnalyzer(TEST_PDF.parent, temp_dir, pipeline_workers={'render': 2})
+
+
+def benchmark_pipeline(copies=16):
+    """对比逐个处理与流水线处理的耗时（本地磁盘；网络共享盘上读取延迟更高，重叠的收益更大）"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / "src"
+        create_source(source, copies)
+
+        serial = UnifiedPDFAnalyzer(source, temp_dir / "serial")
+        start = time.perf_counter()
+        for _ in serial._iter_results(DirectoryWalker(source)):
+            pass
+        serial_seconds = time.perf_counter() - start
+
+        piped = UnifiedPDFAnalyzer(source, temp_dir / "piped", pipeline_workers={'analyze': os.cpu_count() or 2})
+        start = time.perf_counter()
+        for _ in piped._iter_results(DirectoryWalker(source)):
+            pass
+        piped_seconds = time.perf_counter() - start
+
+        total = copies + 2
+        print(f"逐个处理: {serial_seconds:.2f} 秒（{total / serial_seconds:.1f} 个文件/秒）")
+        print(f"流水线:   {piped_seconds:.2f} 秒（{total / piped_seconds:.1f} 个文件/秒，含进程启动）")
+        print(f"瓶颈阶段: {piped.pipeline.bottleneck()}")
+        print(piped.pipeline.format_stats())
+
+
+def main():
+    """主函数"""
+    print("=== 分阶段流水线测试 ===")
+    test_pipeline_outputs_and_backpressure()
+    test_pipeline_error_and_early_stop()
+    test_pipeline_matches_serial()
+    test_analyze_stage_returns_result_only()
+    print("✓ 流水线结果与逐个处理一致")
+
+    print("\n=== 耗时对比 ===")
+    benchmark_pipeline()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试逐页惰性渲染（PDFFeatureExtractor.iter_page_images）
+1. 产生的页码和图像与pdf_to_images一致
+2. 迭代结束或中途关闭时文档被关闭
+3. process_pdf_file逐页处理的结果不变
+4. 对比全部页面模式下列表方式与逐页方式的进程峰值内存
+"""
+
+import subprocess
+import sys
+
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, DATA_DIR
+
+from pdf_feature_extractor import PDFFeatureExtractor
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def test_matches_pdf_to_images():
+    """各页面模式下页码与图像与列表方式一致"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    for page_mode, expected_numbers in (("first_page", [1]), ("first_n", [1, 2, 3]), ("last_n", [41, 42, 43])):
+        images = extractor.pdf_to_images(TEST_PDF, max_pages=3, page_mode=page_mode)
+        page_images = extractor.iter_page_images(TEST_PDF, max_pages=3, page_mode=page_mode)
+        assert page_images.page_numbers == expected_numbers
+
+        pairs = list(page_images)
+        assert [page_number for page_number, _ in pairs] == expected_numbers
+        assert all(np.array_equal(image, expected) for (_, image), expected in zip(pairs, images))
+        assert page_images.doc is None
+
+
+def test_close_before_exhausted():
+    """未迭代完时可以提前关闭文档"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    with extractor.iter_page_images(TEST_PDF, page_mode="all_pages") as page_images:
+        page_number, image = next(page_images)
+        assert page_number == 1 and image.shape == (1684, 1191, 3)
+    assert page_images.doc is None
+    assert list(page_images) == []
+
+
+def test_process_pdf_file_page_numbers():
+    """process_pdf_file逐页处理后，后N页模式的页码和快速模式的跳过页码正确"""
+    extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+    result = extractor.process_pdf_file(TEST_PDF, max_pages=3, page_mode="last_n")
+    assert [page['page_number'] for page in result['page_results']] == [41, 42, 43]
+
+    result = extractor.process_pdf_file(TEST_PDF, max_pages=5, page_mode="first_n", verdict_mode="fast")
+    analyzed = [page['page_number'] for page in result['page_results']]
+    assert analyzed + result['skipped_pages'] == [1, 2, 3, 4, 5]
+
+
+PEAK_MEMORY_SCRIPT = """
+import resource, sys
+from pdf_feature_extractor import PDFFeatureExtractor
+extractor = PDFFeatureExtractor(data_dir=sys.argv[2])
+if sys.argv[1] == "list":
+    for image in extractor.pdf_to_images(sys.argv[3], page_mode="all_pages"):
+        pass
+else:
+    for page_number, image in extractor.iter_page_images(sys.argv[3], page_mode="all_pages"):
+        pass
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024)
+"""
+
+
+def benchmark_peak_memory():
+    """在独立进程中对比全部页面模式下的进程峰值内存"""
+    for mode, label in (("list", "pdf_to_images"), ("iter", "iter_page_images")):
+        output = subprocess.run(
+            [sys.executable, "-c", PEAK_MEMORY_SCRIPT, mode, str(DATA_DIR), str(TEST_PDF)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        print(f"{label:<20} 峰值内存: {output} MB")
+
+
+def main():
+    """主函数"""
+    print("=== 逐页惰性渲染测试 ===")
+    test_matches_pdf_to_images()
+    test_close_before_exhausted()
+    test_process_pdf_file_page_numbers()
+    print("✓ 页码和图像与列表方式一致")
+
+    print("\n=== 全部页面模式峰值内存（test.pdf） ===")
+    benchmark_peak_memory()
+
+
+if __name__ == "__main__":
+    main()
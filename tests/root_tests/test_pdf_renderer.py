@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试PDF页面渲染工具（零拷贝Pixmap -> numpy数组）
+"""
+
+import gc
+import io
+
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+# 导入测试包配置
+from tests import PROJECT_ROOT
+
+from pdf_renderer import render_page
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def test_render_matches_ppm_decode():
+    """直接渲染的数组应与原PPM编码再解码的结果逐像素一致"""
+    doc = fitz.open(TEST_PDF)
+    page = doc.load_page(0)
+
+    image = render_page(page, scale=2.0)
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
+    expected = np.array(Image.open(io.BytesIO(pix.tobytes("ppm"))))
+    doc.close()
+
+    assert image.dtype == np.uint8
+    assert image.shape == expected.shape
+    assert np.array_equal(image, expected)
+
+
+def test_render_gray_profile():
+    """灰度渲染返回二维数组"""
+    doc = fitz.open(TEST_PDF)
+    image = render_page(doc.load_page(0), scale=1.0, colorspace='gray')
+    doc.close()
+
+    assert image.ndim == 2
+
+
+def test_array_outlives_document():
+    """关闭文档并回收Pixmap后，数组仍可安全访问"""
+    doc = fitz.open(TEST_PDF)
+    image = render_page(doc.load_page(0), scale=1.0)
+    expected = image.copy()
+    doc.close()
+    del doc
+    gc.collect()
+
+    assert np.array_equal(image, expected)
+
+
+if __name__ == "__main__":
+    test_render_matches_ppm_decode()
+    test_render_gray_profile()
+    test_array_outlives_document()
+    print("✅ 渲染测试通过")
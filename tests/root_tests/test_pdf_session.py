@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试PDF文档会话（pdf_session.py）
+1. 页数、元数据、按页码渲染
+2. SessionCache的LRU复用与淘汰
+3. 分析器特定文件模式复用打开的文档
+4. 重复打开与会话复用的耗时对比
+"""
+
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 导入测试包配置
+from tests import PROJECT_ROOT
+
+from pdf_analyzer import UnifiedPDFAnalyzer
+from pdf_renderer import render_page
+from pdf_session import PDFSession, SessionCache
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def test_session_pages_and_render():
+    """会话缓存页数，按页码（从1开始）渲染，关闭后不可再用"""
+    with PDFSession(TEST_PDF) as session:
+        assert session.page_count == 43
+        assert isinstance(session.metadata, dict)
+        expected = render_page(session.doc.load_page(42), scale=1.0)
+        assert np.array_equal(session.render(43, scale=1.0), expected)
+        with pytest.raises(IndexError):
+            session.load_page(0)
+
+        numbers = [page_number for page_number, _ in session.iter_pages([2, 5], scale=0.5)]
+        assert numbers == [2, 5]
+        assert not session.closed
+    assert session.closed
+
+
+def test_session_cache_lru():
+    """超过max_open时关闭最久未使用的文档，再次访问已打开的文件时直接复用"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = []
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            path = Path(temp_dir) / name
+            shutil.copy(TEST_PDF, path)
+            paths.append(path)
+
+        with SessionCache(max_open=2) as cache:
+            first = cache.get(paths[0])
+            cache.get(paths[1])
+            assert cache.get(paths[0]) is first
+            cache.get(paths[2])
+
+            assert len(cache) == 2
+            assert paths[0] in cache and paths[1] not in cache
+            assert cache.stats == {'hits': 1, 'opens': 3, 'evictions': 1}
+        assert first.closed
+
+
+def test_analyzer_reuses_sessions():
+    """特定文件模式下同一文件多次转换只打开一次"""
+    with tempfile.TemporaryDirectory() as target:
+        analyzer = UnifiedPDFAnalyzer(TEST_PDF.parent, target)
+        first = analyzer.pdf_to_image(TEST_PDF)
+        second = analyzer.pdf_to_image(TEST_PDF, page_num=100)
+        assert np.array_equal(first, second)
+        assert analyzer.sessions.stats['opens'] == 1
+        assert analyzer.sessions.stats['hits'] == 1
+        analyzer.sessions.close_all()
+
+
+def benchmark_sessions(repeat=20):
+    """对比每次重新打开文档与复用会话读取页数、渲染首页的耗时"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with PDFSession(TEST_PDF) as session:
+            session.render(1, scale=0.5)
+    reopen_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    with SessionCache() as cache:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            cache.get(TEST_PDF).render(1, scale=0.5)
+        cached_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    print(f"每次重新打开: {reopen_ms:.2f} ms")
+    print(f"复用会话:     {cached_ms:.2f} ms")
+
+
+def main():
+    """主函数"""
+    print("=== PDF文档会话测试 ===")
+    test_session_pages_and_render()
+    test_session_cache_lru()
+    test_analyzer_reuses_sessions()
+    print("✓ 测试通过")
+
+    print("\n=== 耗时对比（test.pdf，0.5倍渲染首页） ===")
+    benchmark_sessions()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试页面渲染磁盘缓存（render_cache.py）
+1. 命中时返回内存映射数组，像素与直接渲染一致，文件复制后或从已读取的内容打开时仍可命中
+2. 超出大小上限时按最近使用时间淘汰，重新打开缓存目录后保留LRU顺序；多个进程平分上限时目录总大小不超过总上限
+3. pdf_to_images与分析器pdf_to_image/process_pdf_file透明使用缓存
+4. 直接渲染与读取缓存的耗时对比
+"""
+
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT, DATA_DIR
+
+from pdf_analyzer import UnifiedPDFAnalyzer
+from pdf_feature_extractor import PDFFeatureExtractor
+from pdf_renderer import render_page
+from pdf_session import PDFSession
+from render_cache import RenderCache
+
+TEST_PDF = PROJECT_ROOT / "input_pdfs" / "test.pdf"
+
+
+def test_hit_matches_render():
+    """第二次读取命中缓存，数组只读且与直接渲染一致；复制后的文件按内容命中同一条目"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = RenderCache(Path(temp_dir) / "cache")
+        with PDFSession(TEST_PDF, render_cache=cache) as session:
+            expected = render_page(session.doc.load_page(2), scale=1.0, colorspace='gray')
+            first = session.render(3, scale=1.0, colorspace='gray')
+            second = session.render(3, scale=1.0, colorspace='gray')
+        assert np.array_equal(first, expected) and np.array_equal(second, expected)
+        assert not second.flags.writeable
+        assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0}
+
+        copied = Path(temp_dir) / "copied.pdf"
+        shutil.copy(TEST_PDF, copied)
+        with PDFSession(copied, render_cache=cache) as session:
+            assert np.array_equal(session.render(3, scale=1.0, colorspace='gray'), expected)
+            session.render(3, scale=1.0, colorspace='rgb')
+        assert cache.stats['hits'] == 2 and len(cache) == 2
+
+
+def test_prefetched_data_hit():
+    """从已读取的内容打开的会话由内存中的内容计算哈希（不再读取文件），与按路径打开时命中同一条目"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = RenderCache(Path(temp_dir) / "cache")
+        with PDFSession(TEST_PDF, render_cache=cache) as session:
+            expected = session.render(2, scale=0.5, colorspace='gray')
+
+        data = TEST_PDF.read_bytes()
+        missing = Path(temp_dir) / "missing.pdf"
+        with PDFSession(missing, render_cache=cache, data=data) as session:
+            assert np.array_equal(session.render(2, scale=0.5, colorspace='gray'), expected)
+            session.render(3, scale=0.5, colorspace='gray')
+            session.render(3, scale=0.5, colorspace='gray')
+        assert cache.stats == {'hits': 2, 'misses': 2, 'evictions': 0}
+        assert cache.content_hash(missing, data) == cache.content_hash(TEST_PDF)
+
+
+def test_lru_eviction():
+    """超出大小上限时淘汰最久未使用的条目，重新打开缓存目录后沿用文件修改时间记录的顺序"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with PDFSession(TEST_PDF) as session:
+            entry_bytes = session.render(1, scale=0.5, colorspace='gray').nbytes
+        cache = RenderCache(temp_dir, max_bytes=int(entry_bytes * 2.5))
+        with PDFSession(TEST_PDF, render_cache=cache) as session:
+            session.render(1, scale=0.5, colorspace='gray')
+            time.sleep(0.01)
+            session.render(2, scale=0.5, colorspace='gray')
+            time.sleep(0.01)
+            session.render(1, scale=0.5, colorspace='gray')
+            time.sleep(0.01)
+            session.render(3, scale=0.5, colorspace='gray')
+        assert len(cache) == 2 and cache.stats['evictions'] == 1
+
+        reopened = RenderCache(temp_dir, max_bytes=cache.max_bytes)
+        assert reopened.total_bytes == cache.total_bytes
+        with PDFSession(TEST_PDF, render_cache=reopened) as session:
+            session.render(1, scale=0.5, colorspace='gray')
+            session.render(2, scale=0.5, colorspace='gray')
+        assert reopened.stats['hits'] == 1 and reopened.stats['misses'] == 1
+
+
+def test_shared_directory_cap():
+    """上限按进程计算：两个缓存实例（模拟两个工作进程）平分总上限时，共用目录的总大小不超过总上限"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with PDFSession(TEST_PDF) as session:
+            entry_bytes = session.render(1, scale=0.5, colorspace='gray').nbytes
+        max_bytes = int(entry_bytes * 4.5)
+        analyzer = UnifiedPDFAnalyzer(TEST_PDF.parent, Path(temp_dir) / "target", render_cache_max_bytes=max_bytes)
+        worker_bytes = analyzer._worker_cache_bytes(2)
+        assert worker_bytes == max_bytes // 2 and analyzer._worker_cache_bytes(0) == max_bytes
+
+        cache_dir = Path(temp_dir) / "cache"
+        workers = [RenderCache(cache_dir, max_bytes=worker_bytes) for _ in range(2)]
+        with PDFSession(TEST_PDF) as session:
+            for page_number in range(1, 11):
+                cache = workers[page_number % 2]
+                cache.fetch(TEST_PDF, page_number - 1, 0.5, 'gray',
+                            lambda: session.render(page_number, scale=0.5, colorspace='gray'))
+                assert sum(path.stat().st_size for path in cache_dir.glob("*.npy")) <= max_bytes
+
+
+def test_transparent_integration():
+    """特征提取器与分析器启用缓存后结果不变，第二次运行全部命中"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_dir = Path(temp_dir) / "cache"
+        extractor = PDFFeatureExtractor(data_dir=str(DATA_DIR), render_cache=RenderCache(cache_dir))
+        plain = PDFFeatureExtractor(data_dir=str(DATA_DIR))
+        expected = plain.process_pdf_file(TEST_PDF, max_pages=2)
+        for _ in range(2):
+            result = extractor.process_pdf_file(TEST_PDF, max_pages=2)
+            assert result['page_results'] == expected['page_results']
+        assert extractor.render_cache.stats['hits'] == 2
+
+        target = Path(temp_dir) / "target"
+        analyzer = UnifiedPDFAnalyzer(TEST_PDF.parent, target, render_cache_dir=cache_dir)
+        image = analyzer.pdf_to_image(TEST_PDF)
+        assert analyzer.render_cache.stats['hits'] == 1
+        assert image.shape == (1684, 1191, 3)
+        analyzer.sessions.close_all()
+
+        expected = UnifiedPDFAnalyzer(TEST_PDF.parent, target).process_pdf_file(TEST_PDF)
+        result = analyzer.process_pdf_file(TEST_PDF)
+        assert result['first_feature'] == expected['first_feature']
+        assert result['second_feature'] == expected['second_feature']
+        assert analyzer.render_cache.stats['hits'] == 2
+
+
+def benchmark_render_cache(pages=10):
+    """对比直接渲染与读取缓存（内存映射）的耗时"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = RenderCache(temp_dir)
+        with PDFSession(TEST_PDF) as session:
+            start = time.perf_counter()
+            for page_number in range(1, pages + 1):
+                session.render(page_number, scale=2.0)
+            render_ms = (time.perf_counter() - start) * 1000 / pages
+
+        with PDFSession(TEST_PDF, render_cache=cache) as session:
+            for page_number in range(1, pages + 1):
+                session.render(page_number, scale=2.0)
+            start = time.perf_counter()
+            for page_number in range(1, pages + 1):
+                session.render(page_number, scale=2.0).sum()
+            cached_ms = (time.perf_counter() - start) * 1000 / pages
+
+        print(f"2倍RGB直接渲染:       {render_ms:.1f} ms/页")
+        print(f"读取缓存（含遍历像素）: {cached_ms:.1f} ms/页")
+        print(f"缓存大小: {cache.total_bytes / 1024 / 1024:.1f} MB（{len(cache)} 页）")
+
+
+def main():
+    """主函数"""
+    print("=== 页面渲染磁盘缓存测试 ===")
+    test_hit_matches_render()
+    test_prefetched_data_hit()
+    test_lru_eviction()
+    test_shared_directory_cap()
+    test_transparent_integration()
+    print("✓ 缓存命中结果与直接渲染一致")
+
+    print("\n=== 耗时对比（test.pdf 前10页） ===")
+    benchmark_render_cache()
+
+
+if __name__ == "__main__":
+    main()
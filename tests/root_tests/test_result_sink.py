@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试JSONL流式结果输出及重新组装
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 导入测试包配置
+from tests import PROJECT_ROOT
+
+from pdf_analyzer import UnifiedPDFAnalyzer
+from result_sink import (
+    JsonlResultSink, read_jsonl_results, reassemble_legacy_json,
+    FORMAT_UNIFIED, FORMAT_FEATURE_EXTRACTOR
+)
+
+
+def make_unified_results():
+    return [
+        {'file_path': '/a/1.pdf', 'file_name': '1.pdf', 'success': True,
+         'first_feature': True, 'second_feature': True, 'copied': True,
+         'white_bg_ratio': np.float64(0.95), 'line_details': [1, 2]},
+        {'file_path': '/a/2.pdf', 'file_name': '2.pdf', 'success': True,
+         'first_feature': True, 'second_feature': False, 'copied': False},
+        {'file_path': '/a/3.pdf', 'file_name': '3.pdf', 'success': False, 'error': 'bad pdf'},
+        # 增量扫描复用的结果
+        {'file_path': '/a/4.pdf', 'file_name': '4.pdf', 'success': True,
+         'first_feature': True, 'second_feature': True, 'copied': True, 'cached': True},
+    ]
+
+
+def test_unified_round_trip():
+    """写入后重新组装，结构与原汇总JSON一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = Path(tmp) / 'results.jsonl'
+        statistics = {'total_pdfs': 4, 'first_feature_passed': 3, 'second_feature_passed': 2,
+                      'copied_files': 2, 'errors': 1, 'specific_files_analyzed': 0, 'cached_files': 1}
+
+        sink = JsonlResultSink(jsonl_path, FORMAT_UNIFIED, metadata={
+            'start_time': '2026-01-01T00:00:00', 'source_directory': '/a', 'target_folder': 'jc'
+        }, flush_every=2)
+        for result in make_unified_results():
+            sink.write(result)
+        sink.close(summary={'scan_time': '2026-01-01T00:01:00', 'statistics': statistics})
+
+        assert len(jsonl_path.read_text(encoding='utf-8').splitlines()) == 6
+
+        legacy = reassemble_legacy_json(jsonl_path)
+        assert set(legacy) == {'scan_time', 'source_directory', 'target_folder', 'statistics', 'files'}
+        assert legacy['statistics'] == statistics
+        assert legacy['source_directory'] == '/a'
+        assert len(legacy['files']) == 4
+        # 与原汇总JSON一致：列表等非标量字段转为字符串
+        assert legacy['files'][0]['line_details'] == '[1, 2]'
+        assert legacy['files'][0]['white_bg_ratio'] == 0.95
+
+
+def test_truncated_run_recomputes_statistics():
+    """运行中断（无汇总记录、最后一行不完整）时仍可读取已完成的结果"""
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = Path(tmp) / 'results.jsonl'
+        sink = JsonlResultSink(jsonl_path, FORMAT_UNIFIED, metadata={'start_time': 't0'})
+        for result in make_unified_results():
+            sink.write(result)
+        sink.flush()
+        sink._file.write('{"record_type": "file", "data": {"file_')
+        sink._file.close()
+        sink._file = None
+
+        header, results, summary = read_jsonl_results(jsonl_path)
+        assert header['format'] == FORMAT_UNIFIED
+        assert len(results) == 4
+        assert summary is None
+
+        legacy = reassemble_legacy_json(jsonl_path)
+        assert legacy['scan_time'] == 't0'
+        # 与正常结束时的汇总统计字段一致
+        assert set(legacy['statistics']) == set(UnifiedPDFAnalyzer(tmp, Path(tmp) / 'jc').stats)
+        assert legacy['statistics']['total_pdfs'] == 4
+        assert legacy['statistics']['second_feature_passed'] == 2
+        assert legacy['statistics']['copied_files'] == 2
+        assert legacy['statistics']['errors'] == 1
+        assert legacy['statistics']['cached_files'] == 1
+
+
+def test_feature_extractor_folder_stream():
+    """特征提取器文件夹处理的流式输出可重新组装为原结果格式"""
+    from pdf_feature_extractor import PDFFeatureExtractor
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / 'pdfs'
+        folder.mkdir()
+        (folder / 'test.pdf').write_bytes((PROJECT_ROOT / 'input_pdfs' / 'test.pdf').read_bytes())
+        jsonl_path = Path(tmp) / 'results.jsonl'
+
+        extractor = PDFFeatureExtractor(data_dir=str(Path(tmp) / 'data'))
+        folder_result = extractor.process_pdf_folder(folder, page_mode='first_page', results_jsonl=jsonl_path)
+
+        assert folder_result['results'] == []
+        assert folder_result['results_file'] == str(jsonl_path)
+
+        legacy = reassemble_legacy_json(jsonl_path)
+        assert set(legacy) == {'folder_path', 'total_files', 'results', 'summary', 'page_mode', 'timestamp'}
+        assert legacy['total_files'] == 1
+        assert legacy['summary'] == folder_result['summary']
+        assert legacy['page_mode'] == 'first_page'
+        assert legacy['results'][0]['file_name'] == 'test.pdf'
+
+
+if __name__ == "__main__":
+    test_unified_round_trip()
+    test_truncated_run_recomputes_statistics()
+    test_feature_extractor_folder_stream()
+    print("✅ 流式结果输出测试通过")
@@ -12,6 +12,7 @@ from PIL import Image
 from pathlib import Path
 # 导入测试包配置
 from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
+from pdf_discovery import DirectoryWalker
 from pdf_feature_extractor import PDFFeatureExtractor
 import logging
 import json
@@ -32,13 +33,8 @@ def batch_detect_charging_pdfs():
         print(f"❌ 目录不存在: {charging_dir}")
         return
     
-    # 查找所有PDF文件
-    pdf_files = []
-    for root, dirs, files in os.walk(charging_dir):
-        for file in files:
-            if file.lower().endswith('.pdf'):
-                pdf_path = os.path.join(root, file)
-                pdf_files.append(pdf_path)
+    # 查找所有PDF文件（并行遍历目录）
+    pdf_files = sorted(str(pdf_path) for pdf_path in DirectoryWalker(charging_dir))
     
     print(f"找到 {len(pdf_files)} 个PDF文件")
     
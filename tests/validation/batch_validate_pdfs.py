@@ -14,6 +14,7 @@ from datetime import datetime
 # 导入测试包配置
 from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
 
+from pdf_discovery import DirectoryWalker
 from pdf_feature_extractor import PDFFeatureExtractor
 
 # 设置日志
@@ -74,48 +75,31 @@ class PDFBatchValidator:
             logger.error(f"路径验证失败: {str(e)}")
             return False
     
-    def find_all_pdfs_recursively(self):
-        """递归查找所有PDF文件"""
-        pdf_files = []
-        
+    def iter_pdfs_recursively(self):
+        """递归查找PDF文件（并行遍历目录，遍历完成后按路径排序返回）"""
         logger.info(f"正在递归搜索PDF文件...")
         
-        try:
-            # 递归搜索所有PDF文件
-            for root, dirs, files in os.walk(self.source_folder):
-                # 跳过某些系统文件夹
-                dirs[:] = [d for d in dirs if not d.startswith('.') and not d.startswith('$')]
-                
-                for file in files:
-                    if file.lower().endswith('.pdf'):
-                        try:
-                            pdf_path = Path(root) / file
-                            # 验证文件是否可读
-                            if pdf_path.is_file() and os.access(pdf_path, os.R_OK):
-                                pdf_files.append(pdf_path)
-                        except Exception as e:
-                            logger.warning(f"跳过文件 {file}: {str(e)}")
-                            continue
-                
-                # 每处理100个文件夹显示一次进度
-                if len(pdf_files) % 100 == 0 and len(pdf_files) > 0:
-                    logger.info(f"已找到 {len(pdf_files)} 个PDF文件...")
-        
-        except PermissionError as e:
-            logger.error(f"权限不足，无法访问某些文件夹: {str(e)}")
-        except Exception as e:
-            logger.error(f"递归搜索时出错: {str(e)}")
-        
-        # 去重（避免大小写重复）
-        unique_pdfs = []
+        # 跳过隐藏文件夹和以$开头的系统文件夹（与原os.walk实现一致）
+        walker = DirectoryWalker(self.source_folder, skip_hidden=True)
+        # 各遍历线程找到文件的先后不固定，先按路径排序再按文件名去重（避免大小写重复），
+        # 保证同名文件中保留的总是路径排序最靠前的一个
         seen_names = set()
-        for pdf_path in pdf_files:
-            if pdf_path.name.lower() not in seen_names:
-                unique_pdfs.append(pdf_path)
-                seen_names.add(pdf_path.name.lower())
+        for pdf_path in sorted(walker):
+            if not os.access(pdf_path, os.R_OK):
+                logger.warning(f"跳过无法读取的文件: {pdf_path.name}")
+                continue
+            if pdf_path.name.lower() in seen_names:
+                continue
+            seen_names.add(pdf_path.name.lower())
+            yield pdf_path
         
-        logger.info(f"递归搜索完成，找到 {len(unique_pdfs)} 个唯一PDF文件")
-        return unique_pdfs
+        walk_stats = walker.get_stats()
+        logger.info(f"递归搜索完成，遍历 {walk_stats['directories']} 个文件夹，找到 {len(seen_names)} 个唯一PDF文件"
+                    f"（{walk_stats['directories_per_second']:.0f} 个文件夹/秒）")
+    
+    def find_all_pdfs_recursively(self):
+        """递归查找所有PDF文件"""
+        return list(self.iter_pdfs_recursively())
     
     def validate_pdf_file(self, pdf_path):
         """验证单个PDF文件是否符合标准"""
@@ -217,7 +201,7 @@ class PDFBatchValidator:
         if not self.validate_path():
             return
         
-        # 递归查找所有PDF文件
+        # 递归查找所有PDF文件（同名文件去重需要完整的排序结果，遍历完成后再处理）
         pdf_files = self.find_all_pdfs_recursively()
         
         if not pdf_files:
@@ -13,6 +13,7 @@ from PIL import Image
 from pathlib import Path
 # 导入测试包配置
 from tests import PROJECT_ROOT, TEMPLATES_DIR, DATA_DIR
+from pdf_discovery import DirectoryWalker
 from pdf_feature_extractor import PDFFeatureExtractor
 import logging
 import json
@@ -34,13 +35,8 @@ def detect_energy_storage_first_pages():
         print(f"❌ 目录不存在: {energy_storage_dir}")
         return
     
-    # 查找所有PDF文件
-    pdf_files = []
-    for root, dirs, files in os.walk(energy_storage_dir):
-        for file in files:
-            if file.lower().endswith('.pdf'):
-                pdf_path = os.path.join(root, file)
-                pdf_files.append(pdf_path)
+    # 查找所有PDF文件（并行遍历目录）
+    pdf_files = sorted(str(pdf_path) for pdf_path in DirectoryWalker(energy_storage_dir))
     
     print(f"找到 {len(pdf_files)} 个PDF文件")
     
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+颜色阈值扫描
+功能：对颜色阈值做网格搜索或随机搜索，在页面特征缓存的数组上向量化计算每组阈值下的页面/文件判定，
+以之前运行结果中的判定作为标签，输出每组阈值的准确率和通过率表格，用于大规模校准color_thresholds
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from feature_cache import FeatureCache
+from pdf_feature_extractor import PDFFeatureExtractor, LINE_DETECTORS, DEFAULT_LINE_DETECTOR
+from result_sink import reassemble_legacy_json
+
+# 可扫描的颜色阈值（与PDFFeatureExtractor._load_color_thresholds一致）
+THRESHOLD_KEYS = ('white_bg_min', 'black_text_max', 'bg_ratio_min', 'text_ratio_min',
+                  'contrast_min', 'brightness_min', 'colored_text_max')
+
+# 像素值阈值，只能取0-255的整数（直接作为直方图下标）
+PIXEL_THRESHOLD_KEYS = ('white_bg_min', 'black_text_max')
+
+# 每批同时计算的阈值组合数（页面数 × 批大小的布尔矩阵）
+DEFAULT_CHUNK_SIZE = 256
+
+
+def parse_threshold_spec(spec):
+    """
+    解析单个阈值的取值说明
+
+    Args:
+        spec: "键=值1,值2,..."（取值列表）、"键=起:止:步长"（含终点的等差序列）或 "键=下限:上限"（随机搜索的取值范围）
+
+    Returns:
+        tuple: (阈值键, 取值列表或 (下限, 上限))
+    """
+    key, _, values = spec.partition('=')
+    key = key.strip()
+    if key not in THRESHOLD_KEYS:
+        raise ValueError(f"未知的颜色阈值键: {key}")
+    cast = int if key in PIXEL_THRESHOLD_KEYS else float
+
+    if ':' not in values:
+        return key, [cast(value) for value in values.split(',') if value.strip()]
+
+    parts = [float(part) for part in values.split(':')]
+    if len(parts) == 2:
+        return key, (cast(parts[0]), cast(parts[1]))
+    if len(parts) != 3 or parts[2] <= 0:
+        raise ValueError(f"无效的取值范围: {spec}")
+    start, stop, step = parts
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return key, [cast(round(start + step * i, 10)) for i in range(count)]
+
+
+def grid_combinations(base_thresholds, grid):
+    """
+    生成网格搜索的阈值组合
+
+    Args:
+        base_thresholds: 基准阈值（未扫描的键保持该值）
+        grid: {阈值键: 取值列表}
+
+    Returns:
+        dict: {阈值键: 长度为组合数的数组}
+    """
+    keys = list(grid)
+    combinations = {key: [] for key in THRESHOLD_KEYS}
+    for values in itertools.product(*(grid[key] for key in keys)):
+        chosen = dict(zip(keys, values))
+        for key in THRESHOLD_KEYS:
+            combinations[key].append(chosen.get(key, base_thresholds[key]))
+    return {key: np.asarray(values) for key, values in combinations.items()}
+
+
+def random_combinations(base_thresholds, ranges, count, seed=None):
+    """
+    生成随机搜索的阈值组合
+
+    Args:
+        base_thresholds: 基准阈值（未扫描的键保持该值）
+        ranges: {阈值键: 取值列表或 (下限, 上限)}，列表时从中随机选取，范围时均匀采样（像素值阈值取整数）
+        count: 组合数
+        seed: 随机种子
+
+    Returns:
+        dict: {阈值键: 长度为组合数的数组}
+    """
+    rng = np.random.default_rng(seed)
+    combinations = {}
+    for key in THRESHOLD_KEYS:
+        spec = ranges.get(key)
+        if spec is None:
+            combinations[key] = np.full(count, base_thresholds[key])
+        elif isinstance(spec, list):
+            combinations[key] = rng.choice(np.asarray(spec), size=count)
+        elif key in PIXEL_THRESHOLD_KEYS:
+            combinations[key] = rng.integers(spec[0], spec[1], size=count, endpoint=True)
+        else:
+            combinations[key] = rng.uniform(spec[0], spec[1], size=count)
+    return combinations
+
+
+def load_labels(result_paths):
+    """
+    从之前运行的结果文件读取文件级标签
+
+    支持特征提取器结果（overall_compliance）、验证结果（is_compliant）、
+    统一分析器结果（first_feature且second_feature）及其JSONL格式；后读取的文件覆盖先读取的同名文件。
+
+    Args:
+        result_paths: 结果文件路径列表
+
+    Returns:
+        tuple: ({文件路径: 标签}, {文件名: 标签})
+    """
+    by_path = {}
+    by_name = {}
+    for result_path in result_paths:
+        result_path = Path(result_path)
+        try:
+            if result_path.suffix.lower() == '.jsonl':
+                data = reassemble_legacy_json(result_path)
+            else:
+                with open(result_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 跳过无法读取的结果文件 {result_path}: {e}")
+            continue
+
+        if not isinstance(data, dict):
+            continue
+        if 'page_results' in data:
+            records = [data]
+        else:
+            records = data.get('results') or data.get('files') or []
+            if not isinstance(records, list):
+                continue
+
+        for record in records:
+            if not isinstance(record, dict) or not record.get('file_path'):
+                continue
+            if 'overall_compliance' in record:
+                if not record.get('success', True):
+                    continue
+                label = bool(record['overall_compliance'])
+            elif 'is_compliant' in record:
+                label = bool(record['is_compliant'])
+            elif 'first_feature' in record:
+                if not record.get('success', True):
+                    continue
+                label = bool(record['first_feature']) and bool(record.get('second_feature', False))
+            else:
+                continue
+            by_path[str(record['file_path'])] = label
+            by_name[record.get('file_name') or Path(record['file_path']).name] = label
+    return by_path, by_name
+
+
+def match_labels(paths, labels):
+    """
+    为特征缓存中的文件匹配标签（先按完整路径，再按文件名）
+
+    Args:
+        paths: 文件路径列表
+        labels: load_labels的结果
+
+    Returns:
+        numpy.ndarray: 每个文件的标签，1=符合，0=不符合，-1=无标签
+    """
+    by_path, by_name = labels
+    matched = np.full(len(paths), -1, dtype=np.int8)
+    for index, path in enumerate(paths):
+        label = by_path.get(path)
+        if label is None:
+            label = by_name.get(Path(path).name)
+        if label is not None:
+            matched[index] = int(label)
+    return matched
+
+
+def _columns_at(histograms, thresholds, upper):
+    """
+    直方图前缀和在指定阈值处的值
+
+    Args:
+        histograms: (N, 256) 直方图
+        thresholds: 阈值数组
+        upper: True时统计 <= 阈值的像素，False时统计 < 阈值的像素
+
+    Returns:
+        numpy.ndarray: (N, len(thresholds)) 像素数量
+    """
+    cumulative = np.zeros((histograms.shape[0], 257), dtype=np.int64)
+    np.cumsum(histograms, axis=1, out=cumulative[:, 1:])
+    offset = 1 if upper else 0
+    columns = np.clip(np.asarray(thresholds, dtype=np.int64) + offset, 0, 256)
+    return cumulative[:, columns]
+
+
+def evaluate_combinations(arrays, combinations, file_labels=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    向量化计算每组阈值下的页面/文件判定和统计（判定规则与PDFFeatureExtractor.check_standard_compliance一致）
+
+    Args:
+        arrays: 页面特征数组（见FeatureCache.load_arrays）
+        combinations: {阈值键: 长度为组合数的数组}
+        file_labels: 每个文件的标签（见match_labels，可选）
+        chunk_size: 每批同时计算的组合数
+
+    Returns:
+        dict: 长度为组合数的统计数组
+            - page_pass_rate / pass_rate: 页面/文件通过率
+            - accuracy / precision / recall: 与标签比较的准确率、精确率、召回率（无标签时为nan）
+            - true_positive / false_positive / false_negative / true_negative: 混淆矩阵计数
+    """
+    count = len(combinations['white_bg_min'])
+    page_count = len(arrays['file_index'])
+    total = arrays['total_pixels'].astype(np.float64)
+
+    # 与阈值无关的页面指标（亮度与check_standard_compliance相同的求和顺序）
+    mean_rgb = arrays['channel_sums'] / arrays['total_pixels'][:, None]
+    brightness = (mean_rgb[:, 0] + mean_rgb[:, 1] + mean_rgb[:, 2]) / 3
+    contrast = arrays['contrast']
+    second = arrays['has_second_feature']
+
+    # 只计算扫描中出现的像素值阈值对应的比例
+    white_values, white_index = np.unique(combinations['white_bg_min'].astype(np.int64), return_inverse=True)
+    black_values, black_index = np.unique(combinations['black_text_max'].astype(np.int64), return_inverse=True)
+    white_ratio = (arrays['total_pixels'][:, None] - _columns_at(arrays['min_histogram'], white_values, False)) / total[:, None]
+    black_ratio = _columns_at(arrays['max_histogram'], black_values, True) / total[:, None]
+    colored_ratio = _columns_at(arrays['colored_histogram'], white_values, False) / total[:, None]
+
+    file_starts = np.flatnonzero(np.r_[True, np.diff(arrays['file_index']) != 0]) if page_count else np.array([], int)
+    stats = {name: np.zeros(count) for name in ('page_pass_rate', 'pass_rate', 'true_positive', 'false_positive',
+                                                 'false_negative', 'true_negative')}
+
+    labeled = positive = None
+    if file_labels is not None:
+        labeled = file_labels >= 0
+        positive = file_labels == 1
+
+    for start in range(0, count, chunk_size):
+        end = min(start + chunk_size, count)
+        chunk = slice(start, end)
+        page_pass = white_ratio[:, white_index[chunk]] >= combinations['bg_ratio_min'][chunk]
+        page_pass &= black_ratio[:, black_index[chunk]] >= combinations['text_ratio_min'][chunk]
+        page_pass &= brightness[:, None] >= combinations['brightness_min'][chunk]
+        page_pass &= contrast[:, None] >= combinations['contrast_min'][chunk]
+        page_pass &= colored_ratio[:, white_index[chunk]] <= combinations['colored_text_max'][chunk]
+        page_pass &= second[:, None]
+        if page_count == 0:
+            continue
+
+        # 文件内所有页面都符合时文件才符合
+        file_pass = np.logical_and.reduceat(page_pass, file_starts, axis=0)
+        stats['page_pass_rate'][chunk] = page_pass.mean(axis=0)
+        stats['pass_rate'][chunk] = file_pass.mean(axis=0)
+
+        if file_labels is not None:
+            stats['true_positive'][chunk] = np.count_nonzero(file_pass & (labeled & positive)[:, None], axis=0)
+            stats['false_positive'][chunk] = np.count_nonzero(file_pass & (labeled & ~positive)[:, None], axis=0)
+            stats['false_negative'][chunk] = np.count_nonzero(~file_pass & (labeled & positive)[:, None], axis=0)
+            stats['true_negative'][chunk] = np.count_nonzero(~file_pass & (labeled & ~positive)[:, None], axis=0)
+
+    true_positive = stats['true_positive']
+    labeled_count = true_positive + stats['false_positive'] + stats['false_negative'] + stats['true_negative']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stats['accuracy'] = (true_positive + stats['true_negative']) / labeled_count
+        stats['precision'] = true_positive / (true_positive + stats['false_positive'])
+        stats['recall'] = true_positive / (true_positive + stats['false_negative'])
+    return stats
+
+
+def write_table(output_path, combinations, stats):
+    """将每组阈值的统计写入CSV表格"""
+    columns = list(THRESHOLD_KEYS) + ['accuracy', 'precision', 'recall', 'pass_rate', 'page_pass_rate',
+                                      'true_positive', 'false_positive', 'false_negative', 'true_negative']
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for index in range(len(combinations['white_bg_min'])):
+            row = [combinations[key][index] for key in THRESHOLD_KEYS]
+            row += [stats[name][index] for name in columns[len(THRESHOLD_KEYS):]]
+            writer.writerow([value.item() if isinstance(value, np.generic) else value for value in row])
+
+
+def print_table(combinations, stats, swept_keys, order, top):
+    """在控制台显示排名靠前的阈值组合"""
+    header = ''.join(f"{key:>18}" for key in swept_keys)
+    print(f"{'排名':<4}{header}{'准确率':>10}{'精确率':>10}{'召回率':>10}{'文件通过率':>12}{'页面通过率':>12}")
+    for rank, index in enumerate(order[:top]):
+        values = ''.join(f"{combinations[key][index]:>18.6g}" for key in swept_keys)
+        metrics = ''.join(f"{stats[name][index]:>13.1%}" if not np.isnan(stats[name][index]) else f"{'-':>13}"
+                          for name in ('accuracy', 'precision', 'recall'))
+        print(f"{rank + 1:<4}{values}{metrics}{stats['pass_rate'][index]:>15.1%}{stats['page_pass_rate'][index]:>15.1%}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='颜色阈值扫描（网格/随机搜索，在页面特征缓存上向量化计算）')
+    parser.add_argument('--feature-cache', required=True, help='页面特征缓存（SQLite）路径')
+    parser.add_argument('--labels', nargs='*', default=[],
+                       help='提供标签的之前运行结果文件（JSON或JSONL，如 tests/data/*.json）')
+    parser.add_argument('--grid', action='append', default=[],
+                       help='阈值取值，可多次指定："键=值1,值2"、"键=起:止:步长"，随机搜索时可用 "键=下限:上限"')
+    parser.add_argument('--random', type=int, default=0, help='随机搜索的组合数（默认0，即网格搜索）')
+    parser.add_argument('--seed', type=int, default=None, help='随机搜索的随机种子')
+    parser.add_argument('--config', help='基准颜色阈值配置文件（未扫描的阈值取该值）')
+    parser.add_argument('--line-detector', choices=list(LINE_DETECTORS), default=DEFAULT_LINE_DETECTOR,
+                       help=f'建立特征缓存时使用的长横线检测器（默认：{DEFAULT_LINE_DETECTOR}，'
+                            f'须与运行特征提取器时的--line-detector一致，否则缓存不匹配）')
+    parser.add_argument('--top', type=int, default=20, help='显示排名前N的组合（默认：20）')
+    parser.add_argument('--data-dir', default='data', help='数据保存目录')
+    parser.add_argument('--output', help='输出CSV文件名（可选）')
+
+    args = parser.parse_args()
+
+    extractor = PDFFeatureExtractor(data_dir=args.data_dir, config_file=args.config, line_detector=args.line_detector)
+    base_thresholds = extractor.get_color_thresholds()
+    specs = dict(parse_threshold_spec(spec) for spec in args.grid)
+
+    if args.random > 0:
+        combinations = random_combinations(base_thresholds, specs, args.random, args.seed)
+    else:
+        invalid = [key for key, spec in specs.items() if isinstance(spec, tuple)]
+        if invalid:
+            print(f"❌ 网格搜索需要取值列表或 起:止:步长，无效的键: {invalid}")
+            return 1
+        combinations = grid_combinations(base_thresholds, specs)
+    for key in PIXEL_THRESHOLD_KEYS:
+        if combinations[key].min() < 0 or combinations[key].max() > 255:
+            print(f"❌ {key} 的取值必须在0-255之间")
+            return 1
+
+    with FeatureCache(args.feature_cache, PDFFeatureExtractor.feature_fingerprint(args.line_detector)) as feature_cache:
+        start = time.perf_counter()
+        arrays = feature_cache.load_arrays()
+        load_seconds = time.perf_counter() - start
+
+    if not arrays['paths']:
+        print(f"❌ 特征缓存中没有记录: {args.feature_cache}（--line-detector {args.line_detector}，须与建立缓存时一致）")
+        return 1
+
+    file_labels = None
+    if args.labels:
+        file_labels = match_labels(arrays['paths'], load_labels(args.labels))
+
+    start = time.perf_counter()
+    stats = evaluate_combinations(arrays, combinations, file_labels)
+    evaluate_seconds = time.perf_counter() - start
+
+    combination_count = len(combinations['white_bg_min'])
+    print(f"\n{'='*100}")
+    print(f"阈值扫描完成: {combination_count} 组阈值 × {len(arrays['file_index'])} 页（{len(arrays['paths'])} 个文件）")
+    print(f"读取特征缓存 {load_seconds:.2f} 秒，计算 {evaluate_seconds:.2f} 秒")
+    if file_labels is not None:
+        print(f"有标签的文件: {np.count_nonzero(file_labels >= 0)}（符合 {np.count_nonzero(file_labels == 1)}）")
+    print(f"{'='*100}")
+
+    # 有标签时按准确率排序，否则按文件通过率排序
+    swept_keys = [key for key in THRESHOLD_KEYS if len(np.unique(combinations[key])) > 1] or ['white_bg_min']
+    metric = stats['accuracy'] if file_labels is not None else stats['pass_rate']
+    order = np.lexsort((-stats['pass_rate'], -np.nan_to_num(metric, nan=-1.0)))
+    print_table(combinations, stats, swept_keys, order, args.top)
+
+    output_name = args.output or f"threshold_sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    output_path = extractor.data_dir / output_name
+    write_table(output_path, combinations, stats)
+    print(f"\n💾 全部组合的统计已保存到: {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矢量长横线提取工具
+功能：直接读取PDF页面的矢量绘图层（page.get_drawings），找出近似水平的深色描边线段和细长填充矩形，
+无需将页面渲染为位图；坐标换算为指定渲染倍率下的像素坐标，便于与位图检测结果对比
+"""
+
+import fitz  # PyMuPDF
+
+from pdf_renderer import DEFAULT_SCALE
+
+# 线段两端y坐标之差不超过该值（像素）时视为水平线
+HORIZONTAL_TOLERANCE_PX = 1.0
+
+# 同一行上的线段间隔不超过该值（像素）时合并为一条
+MERGE_GAP_PX = 1.0
+
+
+def _is_dark(color, dark_threshold):
+    """颜色（0-1浮点RGB/灰度）转换为灰度后是否低于深色阈值（0-255）"""
+    if not color:
+        return False
+    if len(color) == 1:
+        gray = color[0]
+    elif len(color) == 3:
+        gray = 0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2]
+    elif len(color) == 4:  # CMYK
+        c, m, y, k = color
+        gray = 0.299 * (1 - c) * (1 - k) + 0.587 * (1 - m) * (1 - k) + 0.114 * (1 - y) * (1 - k)
+    else:
+        return False
+    return gray * 255 < dark_threshold
+
+
+def page_pixel_size(page, scale=DEFAULT_SCALE):
+    """
+    计算页面按指定倍率渲染后的像素尺寸（与get_pixmap结果一致）
+
+    Args:
+        page: fitz.Page对象
+        scale: 渲染倍率
+
+    Returns:
+        tuple: (width, height)
+    """
+    irect = (page.rect * fitz.Matrix(scale, scale)).irect
+    return irect.width, irect.height
+
+
+def _horizontal_segments(drawing, scale, dark_threshold):
+    """从单个绘图路径中提取水平线段 (x1, x2, y, thickness)，坐标单位为像素"""
+    segments = []
+    stroke_dark = _is_dark(drawing.get('color'), dark_threshold) and drawing['type'] in ('s', 'fs')
+    fill_dark = _is_dark(drawing.get('fill'), dark_threshold) and drawing['type'] in ('f', 'fs')
+    stroke_width = (drawing.get('width') or 0) * scale
+
+    for item in drawing['items']:
+        kind = item[0]
+        if kind == 'l' and stroke_dark:
+            p1, p2 = item[1], item[2]
+            if abs(p1.y - p2.y) * scale <= HORIZONTAL_TOLERANCE_PX:
+                x1, x2 = sorted((p1.x * scale, p2.x * scale))
+                segments.append((x1, x2, (p1.y + p2.y) / 2 * scale, stroke_width))
+        elif kind == 're':
+            rect = item[1] * scale
+            if fill_dark:
+                # 细长填充矩形（如用矩形画出的横线）
+                segments.append((rect.x0, rect.x1, (rect.y0 + rect.y1) / 2, rect.height))
+            elif stroke_dark:
+                # 描边矩形的上下两条边
+                segments.append((rect.x0, rect.x1, rect.y0, stroke_width))
+                segments.append((rect.x0, rect.x1, rect.y1, stroke_width))
+
+    return segments
+
+
+def find_horizontal_rules(page, scale=DEFAULT_SCALE, dark_threshold=80, min_width_ratio=0.70,
+                          max_thickness_ratio=0.02, drawings=None):
+    """
+    从矢量绘图层提取长横线
+
+    与位图检测的判定条件保持一致：深色、长度>=70%页面宽度、粗细<=2%页面高度，
+    同一行上相接的线段先合并，每行只保留最长的一条。
+
+    Args:
+        page: fitz.Page对象
+        scale: 换算像素坐标使用的渲染倍率
+        dark_threshold: 深色阈值（灰度0-255，低于该值视为黑色）
+        min_width_ratio: 最小长度占页面宽度的比例
+        max_thickness_ratio: 最大粗细占页面高度的比例
+        drawings: 已读取的page.get_drawings()结果（可选，避免重复读取）
+
+    Returns:
+        list: 长横线列表，每项为 {'x1', 'x2', 'y', 'thickness'}（像素坐标，x2为闭区间终点）
+    """
+    width, height = page_pixel_size(page, scale)
+
+    if drawings is None:
+        drawings = page.get_drawings()
+
+    rows = {}
+    for drawing in drawings:
+        for x1, x2, y, thickness in _horizontal_segments(drawing, scale, dark_threshold):
+            if thickness > height * max_thickness_ratio:
+                continue
+            x1, x2 = max(0.0, x1), min(float(width), x2)
+            row = int(round(y))
+            if x2 <= x1 or not 0 <= row < height:
+                continue
+            rows.setdefault(row, []).append((x1, x2, thickness))
+
+    rules = []
+    for row, segments in rows.items():
+        segments.sort()
+        merged = [list(segments[0])]
+        for x1, x2, thickness in segments[1:]:
+            last = merged[-1]
+            if x1 - last[1] <= MERGE_GAP_PX:
+                last[1] = max(last[1], x2)
+                last[2] = max(last[2], thickness)
+            else:
+                merged.append([x1, x2, thickness])
+
+        x1, x2, thickness = max(merged, key=lambda segment: segment[1] - segment[0])
+        start, end = int(round(x1)), int(round(x2)) - 1
+        if (end - start + 1) / width >= min_width_ratio:
+            rules.append({'x1': start, 'x2': end, 'y': row, 'thickness': max(1, int(round(thickness)))})
+
+    rules.sort(key=lambda rule: rule['y'])
+    return rules
+
+
+def is_image_only_page(page, min_image_coverage=0.5, drawings=None):
+    """
+    判断页面是否为扫描件/纯图片页面（矢量层无法代表页面内容）
+
+    Args:
+        page: fitz.Page对象
+        min_image_coverage: 图片覆盖页面面积的比例达到该值时视为扫描页
+        drawings: 已读取的page.get_drawings()结果（可选，避免重复读取）
+
+    Returns:
+        bool: 是否为扫描件/纯图片页面
+    """
+    page_area = abs(page.rect) or 1.0
+    image_area = 0.0
+    for info in page.get_image_info():
+        image_area += abs(fitz.Rect(info['bbox']) & page.rect)
+    if image_area / page_area >= min_image_coverage:
+        return True
+
+    # 没有任何文字和矢量图形的页面只能依靠位图检测
+    if drawings is None:
+        drawings = page.get_drawings()
+    return not drawings and not page.get_text('text').strip()